@@ -22,6 +22,7 @@ contains
         real, intent(in) :: R, tau
         real, dimension(3), intent(out) :: du_dt
         real :: inv_tau
+        real :: x_val, y_val, z_val
 
         ! Pre-calculate 1/tau for efficiency, handle tau=0 case
         if (abs(tau) < 1.0E-10) then
@@ -32,7 +33,6 @@ contains
         end if
 
         ! Unpack state vector for clarity
-        real :: x_val, y_val, z_val
         x_val = u(1)
         y_val = u(2)
         z_val = u(3)
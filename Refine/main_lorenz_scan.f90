@@ -16,6 +16,19 @@ program main_lorenz_scan
     real :: current_r
     real, dimension(3) :: u0, final_u
     real, dimension(N_IC) :: avg_x_results ! Stores <X>_j for a given R
+    integer, dimension(N_IC) :: regime_results ! Regime label of each IC (REGIME_* in rk4_solver)
+    real :: t_end, t_integrated, t_full
+    integer, dimension(REGIME_UNSTABLE:REGIME_MEAN_CONVERGED) :: regime_counts
+    logical :: early_stop_enabled
+    character(len=32) :: arg
+    integer :: i_arg, i_regime
+
+    ! Continuation: each IC starts from its final state at the previous R (seeds)
+    logical :: continuation = .false.
+    integer :: n_sweeps = 1, sweep_dirs(2) = [1, -1], i_step, i_sweep, i_pos
+    real, dimension(3, N_IC) :: seeds
+    logical, dimension(N_IC) :: seeded
+    real :: t_trans_run, t_sim_run
     real :: avg_x_ensemble  ! <X>_R
     real :: std_dev_ensemble ! sigma_X(R)
     real :: sum_x_ens, sum_x_sq_ens
@@ -24,16 +37,44 @@ program main_lorenz_scan
 
     character(len=100) :: output_filename = "lorenz_scan_results.csv"
     character(len=20) :: fmt_header_part, fmt_data_num
-    character(len=500) :: header_string, data_format_string
+    character(len=*), parameter :: regime_names(REGIME_UNSTABLE:REGIME_MEAN_CONVERGED) = &
+        [character(len=14) :: "unstable", "full run", "fixed point", "steady walker", "periodic", "mean converged"]
+    character(len=2000) :: header_string, data_format_string
 
-    ! --------------------------------------------------------------------------
-    ! Step 5 (part 1): Setup Output File
-    ! --------------------------------------------------------------------------
-    open(newunit=output_unit, file=trim(output_filename), status='replace', action='write', iostat=error_flag_io)
-    if (error_flag_io /= 0) then
-        print *, "Error opening output file: ", trim(output_filename)
-        stop "File Open Error"
-    end if
+    ! Command line: --early-stop stops each IC once its regime is identified; --full keeps the
+    !                 full T_SIMULATION for every IC (default)
+    !               --continuation: forward sweep seeded by the previous R
+    !               --sweep=forward|backward|both: continuation sweep(s); the backward sweep
+    !                 (R_MAX -> R_MIN) is written to lorenz_scan_results_backward.csv
+    early_stop_enabled = EARLY_STOP
+    do i_arg = 1, command_argument_count()
+        call get_command_argument(i_arg, arg)
+        if (trim(arg) == '--early-stop') early_stop_enabled = .true.
+        if (trim(arg) == '--full') early_stop_enabled = .false.
+        if (trim(arg) == '--continuation') continuation = .true.
+        if (trim(arg) == '--sweep') then
+            print *, "Usage: --sweep=forward, --sweep=backward or --sweep=both"
+            stop "Argument Error"
+        end if
+        if (arg(1:8) == '--sweep=') then
+            continuation = .true.
+            select case (trim(arg(9:)))
+            case ('forward')
+                sweep_dirs = [1, -1]
+                n_sweeps = 1
+            case ('backward')
+                sweep_dirs = [-1, 1]
+                n_sweeps = 1
+            case ('both')
+                sweep_dirs = [1, -1]
+                n_sweeps = 2
+            case default
+                print *, "Unknown sweep: ", trim(arg(9:)), " (forward, backward or both)"
+                stop "Argument Error"
+            end select
+        end if
+    end do
+    if (sweep_dirs(1) < 0) output_filename = "lorenz_scan_results_backward.csv"
 
     ! Construct the header string dynamically
     header_string = "R,Avg_X_Ensemble,StdDev_X_Ensemble"
@@ -41,12 +82,16 @@ program main_lorenz_scan
         write(fmt_header_part, '(A,I0)') ",Avg_X_", i_ic ! Format like ",Avg_X_1"
         header_string = trim(header_string) // trim(fmt_header_part)
     end do
-    write(output_unit, '(A)') trim(header_string)
+    do i_ic = 1, N_IC
+        write(fmt_header_part, '(A,I0)') ",Regime_", i_ic ! Format like ",Regime_1"
+        header_string = trim(header_string) // trim(fmt_header_part)
+    end do
 
-    ! Construct the data format string dynamically (e.g., '(F8.4, 2(ES14.6E2), 50(ES14.6E2))')
+    ! Construct the data format string dynamically (e.g., '(F8.4, 2(",",ES14.6E2), 50(",",ES14.6E2), 50(",",I0))')
     ! Using ES format for scientific notation which is generally safer for varying magnitudes
     write(fmt_data_num, '(I0)') N_IC ! Get number of avg_x columns
-    data_format_string = "(F8.4, 2(ES14.6E2)," // trim(fmt_data_num) // "(ES14.6E2))"
+    data_format_string = '(F8.4, 2(",",ES14.6E2),' // trim(fmt_data_num) // '(",",ES14.6E2),' // &
+                         trim(fmt_data_num) // '(",",I0))'
 
     ! --------------------------------------------------------------------------
     ! Step 6: Programme Principal (Loops)
@@ -56,6 +101,9 @@ program main_lorenz_scan
     print *, "========================================="
     print *, "Parameters:"
     print *, "  tau =", TAU, ", dt =", DT, ", T_sim =", T_SIMULATION, ", T_trans =", T_TRANSIENT
+    print *, "  Early termination:", early_stop_enabled
+    if (continuation) print *, "  Continuation: sweeps =", sweep_dirs(1:n_sweeps), &
+                               ", warm-start T_trans =", CONTINUATION_T_TRANSIENT
     print *, "  N_IC =", N_IC, ", X0 range = [", X0_MIN, ",", X0_MAX, "]"
     print *, "  N_R =", N_R, ", R range = [", R_MIN, ",", R_MAX, "]"
     print *, "Output file:", trim(output_filename)
@@ -73,11 +121,39 @@ program main_lorenz_scan
         dx0 = 0.0 ! Avoid division by zero if N_IC=1
     end if
 
-    ! Step 6.2: Boucle Principale (sur R)
-    do i_r = 0, N_R - 1
+    t_integrated = 0.0
+    t_full = 0.0
+    regime_counts = 0
+    seeded = .false.
+
+    ! Step 6.2: Boucle Principale (sur R, une ou deux fois selon les balayages)
+    do i_step = 0, n_sweeps * N_R - 1
+        i_sweep = i_step / N_R + 1
+        i_pos = mod(i_step, N_R)
+        if (sweep_dirs(i_sweep) > 0) then
+            i_r = i_pos
+        else
+            i_r = N_R - 1 - i_pos
+        end if
         current_r = R_MIN + real(i_r) * dr
         if (N_R == 1) current_r = R_MIN ! Handle single R value case
 
+        ! Step 5 (part 1): Setup Output File (one file per sweep direction)
+        if (i_pos == 0) then
+            if (i_sweep > 1) close(output_unit)
+            output_filename = "lorenz_scan_results.csv"
+            if (sweep_dirs(i_sweep) < 0) output_filename = "lorenz_scan_results_backward.csv"
+            open(newunit=output_unit, file=trim(output_filename), status='replace', action='write', &
+                 iostat=error_flag_io)
+            if (error_flag_io /= 0) then
+                print *, "Error opening output file: ", trim(output_filename)
+                stop "File Open Error"
+            end if
+            write(output_unit, '(A)') trim(header_string)
+            if (continuation) print *, "Sweep ", i_sweep, ": ", merge("forward ", "backward", sweep_dirs(i_sweep) > 0), &
+                                       " -> ", trim(output_filename)
+        end if
+
         ! Initialize statistics for this R
         sum_x_ens = 0.0
         sum_x_sq_ens = 0.0
@@ -85,8 +161,8 @@ program main_lorenz_scan
         avg_x_results = -999.99 ! Initialize with a placeholder (will be overwritten or marked HUGE)
 
         ! Print progress (e.g., every 10% or last step)
-        if (mod(i_r, max(1, N_R / 10)) == 0 .or. i_r == N_R - 1) then
-             print '(A, I0, A, I0, A, F8.4)', "Processing R step ", i_r+1, "/", N_R, ": R = ", current_r
+        if (mod(i_pos, max(1, N_R / 10)) == 0 .or. i_pos == N_R - 1) then
+             print '(A, I0, A, I0, A, F8.4)', "Processing R step ", i_pos+1, "/", N_R, ": R = ", current_r
         end if
 
         ! Step 6.2.95: Boucle Interne (sur CI_j)
@@ -97,9 +173,27 @@ program main_lorenz_scan
             u0(2) = 0.0
             u0(3) = 0.0
 
+            ! Continuation: start from the attractor reached at the previous R, with a
+            ! short transient and the same averaging length (T_SIMULATION - T_TRANSIENT)
+            t_trans_run = T_TRANSIENT
+            if (seeded(i_ic)) then
+                u0 = seeds(:, i_ic)
+                t_trans_run = CONTINUATION_T_TRANSIENT
+            end if
+            t_sim_run = t_trans_run + (T_SIMULATION - T_TRANSIENT)
+
             ! Step 3 & 4: Intégration Numérique et Calcul Moyenne
-            call solve_rk4_and_average_x(current_r, TAU, 0.0, T_SIMULATION, T_TRANSIENT, DT, u0, &
-                                         avg_x_results(i_ic), final_u, error_flag_solver)
+            call solve_rk4_and_average_x(current_r, TAU, 0.0, t_sim_run, t_trans_run, DT, u0, &
+                                         avg_x_results(i_ic), final_u, error_flag_solver, &
+                                         early_stop=early_stop_enabled, regime=regime_results(i_ic), &
+                                         t_end=t_end)
+            t_integrated = t_integrated + t_end
+            t_full = t_full + T_SIMULATION
+            regime_counts(regime_results(i_ic)) = regime_counts(regime_results(i_ic)) + 1
+
+            ! Seed of this IC for the next R (cold restart after an instability)
+            seeds(:, i_ic) = final_u
+            seeded(i_ic) = continuation .and. error_flag_solver == 0
 
             ! Step 5 (part 2): Collecter les résultats individuels & Handle errors
             if (error_flag_solver == 0) then
@@ -133,14 +227,15 @@ program main_lorenz_scan
 
         ! Step 5 (part 4): Sauvegarder les résultats pour ce R
         ! Write R, <X>_R, sigma_X(R), followed by all <X>_j
-        write(output_unit, data_format_string, iostat=error_flag_io) current_r, avg_x_ensemble, std_dev_ensemble, avg_x_results
+        write(output_unit, data_format_string, iostat=error_flag_io) current_r, avg_x_ensemble, std_dev_ensemble, &
+                                                                     avg_x_results, regime_results
         if (error_flag_io /= 0) then
             print *, "Error writing results for R=", current_r, " to file."
             ! Decide whether to stop or continue
             ! stop "File Write Error"
         end if
 
-    end do ! End outer loop (i_r)
+    end do ! End outer loop (i_step)
 
     ! --------------------------------------------------------------------------
     ! Step 6.3: Fin
@@ -148,7 +243,16 @@ program main_lorenz_scan
     close(output_unit)
     print *, "-----------------------------------------"
     print *, "Scan finished successfully."
-    print *, "Results saved to:", trim(output_filename)
+    print '(A, F6.2, A)', " Integrated time: ", 100.0 * t_integrated / t_full, " % of the full scan"
+    do i_regime = REGIME_UNSTABLE, REGIME_MEAN_CONVERGED
+        if (regime_counts(i_regime) > 0) print '(A, A14, A, I0)', "   ", regime_names(i_regime), ": ", &
+                                                regime_counts(i_regime)
+    end do
+    if (n_sweeps > 1) then
+        print *, "Results saved to: lorenz_scan_results.csv and lorenz_scan_results_backward.csv"
+    else
+        print *, "Results saved to:", trim(output_filename)
+    end if
     print *, "========================================="
 
 end program main_lorenz_scan
\ No newline at end of file
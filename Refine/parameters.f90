@@ -5,7 +5,8 @@ module simulation_parameters
     ! Description: Defines the core physical and numerical parameters for the
     !              Lorenz system scan simulation based on algorithme.md.
 
-    public :: TAU, DT, T_SIMULATION, T_TRANSIENT, N_IC, X0_MIN, X0_MAX, R_MIN, R_MAX, N_R
+    public :: TAU, DT, T_SIMULATION, T_TRANSIENT, EARLY_STOP, CONTINUATION_T_TRANSIENT
+    public :: N_IC, X0_MIN, X0_MAX, R_MIN, R_MAX, N_R
 
     ! Physical Parameters
     real, parameter :: TAU = 10.0          ! Taux de décroissance de l'onde (Memory parameter)
@@ -14,6 +15,9 @@ module simulation_parameters
     real, parameter :: DT = 0.01           ! Pas de temps (Time step)
     real, parameter :: T_SIMULATION = 5000.0 ! Durée totale de simulation (Total simulation time)
     real, parameter :: T_TRANSIENT = T_SIMULATION / 2.0 ! Durée transitoire (Transient time)
+    logical, parameter :: EARLY_STOP = .false. ! Arrêt dès que le régime est identifié (--early-stop pour activer)
+    ! Transitoire quand la CI est l'état final du R précédent (--continuation, --sweep=...)
+    real, parameter :: CONTINUATION_T_TRANSIENT = 250.0
 
     ! Scan Parameters
     integer, parameter :: N_IC = 50        ! Nombre de conditions initiales par R (Number of initial conditions per R)
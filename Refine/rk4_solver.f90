@@ -5,6 +5,31 @@ module rk4_solver
     
     private
     public :: solve_rk4, solve_rk4_interval, solve_rk4_and_average_x
+    public :: REGIME_UNSTABLE, REGIME_UNDETERMINED, REGIME_FIXED_POINT, REGIME_STEADY_WALKER, &
+              REGIME_PERIODIC, REGIME_MEAN_CONVERGED
+
+    ! Regime labels returned by solve_rk4_and_average_x (early_stop)
+    integer, parameter :: REGIME_UNSTABLE = -1       ! Numerical instability
+    integer, parameter :: REGIME_UNDETERMINED = 0    ! Integrated up to tf (chaotic or slow convergence)
+    integer, parameter :: REGIME_FIXED_POINT = 1     ! Stationary fixed point (X = 0)
+    integer, parameter :: REGIME_STEADY_WALKER = 2   ! Fixed point with X /= 0 (steady walking)
+    integer, parameter :: REGIME_PERIODIC = 3        ! Periodic orbit (oscillating or walking)
+    integer, parameter :: REGIME_MEAN_CONVERGED = 4  ! Time average converged (batch means)
+
+    ! Early termination criteria
+    real, parameter :: EARLY_T_MIN_TAU = 20.0   ! Detection starts after EARLY_T_MIN_TAU*tau
+    real, parameter :: FP_TOL = 1.0E-5          ! Relative |du/dt| threshold for a fixed point
+    real, parameter :: FP_CONFIRM_TIME = 10.0   ! Duration below FP_TOL before stopping
+    real, parameter :: FP_NOISE = 1.0E-6        ! Round-off level (single precision) of |du/dt|
+    real, parameter :: WALK_TOL = 1.0E-3        ! |X| below which a fixed point is stationary
+    real, parameter :: PERIOD_TOL = 2.0E-4      ! Relative distance of section points one period apart
+    integer, parameter :: PERIOD_CONFIRM = 3    ! Number of matching successive periods
+    real, parameter :: PERIOD_CONFIRM_TAU = 30.0 ! The match must hold during PERIOD_CONFIRM_TAU*tau
+    integer, parameter :: MAX_PERIOD = 8        ! Longest period detected (section crossings)
+    integer, parameter :: N_SECTION = (PERIOD_CONFIRM + 1) * MAX_PERIOD
+    real, parameter :: BLOCK_TIME = 50.0        ! Block length for the batch means
+    integer, parameter :: MIN_BLOCKS = 20       ! Minimum number of blocks
+    real, parameter :: AVG_TOL = 1.0E-3         ! Bound on 2*(standard error) of <X>
     
 contains
 
@@ -148,6 +173,21 @@ contains
     
     !> Solves the system using RK4 and calculates the average of X over the post-transient interval.
     !>
+    !> With early_stop, running statistics are kept during the integration and it stops
+    !> as soon as the asymptotic regime is identified (see the REGIME_* labels):
+    !>   - fixed point: |du/dt| < FP_TOL*(1+|u|) during FP_CONFIRM_TIME, and decreasing over
+    !>     that time (or at round-off level FP_NOISE). <X> is X at the stop, within about tau*FP_TOL*(1+|u|) of the fixed
+    !>     point (slowest decay rate 1/tau);
+    !>   - periodic orbit: PERIOD_CONFIRM successive periods of the section on the maxima
+    !>     of X (dX/dt = 0) match to PERIOD_TOL*(1+|u|), at every crossing during
+    !>     PERIOD_CONFIRM_TAU*tau (a trajectory passing near an unstable orbit matches for a
+    !>     few periods only). <X> is the average over the last period, with section crossings
+    !>     interpolated within the step;
+    !>   - converged time average: after t_transient, the batch means over blocks of
+    !>     BLOCK_TIME give a standard error with 2*SE < AVG_TOL (at least MIN_BLOCKS blocks).
+    !> Detection only starts after EARLY_T_MIN_TAU*tau. Otherwise the integration runs up
+    !> to tf, exactly as without early_stop.
+    !>
     !> Args:
     !>   R           : Amplitude parameter
     !>   tau         : Memory parameter
@@ -156,29 +196,48 @@ contains
     !>   t_transient : Time after which to start averaging
     !>   h           : Time step
     !>   u0(3)       : Initial condition [X0, Y0, Z0]
+    !>   early_stop  : Stop as soon as the regime is identified (optional, default .false.)
     !>
     !> Returns:
     !>   avg_x       : Average value of X for t > t_transient
     !>   final_u(3)  : Final state [X, Y, Z] at tf (optional, useful for debugging/attractors)
     !>   error_flag  : Integer flag (0=OK, 1=Instability detected)
-    subroutine solve_rk4_and_average_x(R, tau, t0, tf, t_transient, h, u0, avg_x, final_u, error_flag)
+    !>   regime      : Regime label REGIME_* (optional)
+    !>   t_end       : Time at which the integration stopped (optional)
+    subroutine solve_rk4_and_average_x(R, tau, t0, tf, t_transient, h, u0, avg_x, final_u, error_flag, &
+                                       early_stop, regime, t_end)
         real, intent(in) :: R, tau, t0, tf, t_transient, h
         real, dimension(3), intent(in) :: u0
         real, intent(out) :: avg_x
         real, dimension(3), intent(out) :: final_u
         integer, intent(out) :: error_flag
+        logical, intent(in), optional :: early_stop
+        integer, intent(out), optional :: regime
+        real, intent(out), optional :: t_end
 
         real :: t, safe_tau, sum_x
-        integer :: i, n_steps, n_avg_steps
+        integer :: i, n_steps, n_avg_steps, n_done
         real, dimension(3) :: u, k1, k2, k3, k4
         logical :: averaging_started
 
+        ! Early termination state
+        logical :: detect
+        integer :: found_regime, fp_steps, fp_confirm_steps, n_cross, c, p, j, block_steps, n_blocks
+        real :: t_detect, dx_prev, s, cum_x, cum_steps, block_sum, sum_bm, sum_bm_sq, mean_bm, var_bm
+        real :: f_norm, f_first, scale, t_match
+        real, dimension(0:PERIOD_CONFIRM-1) :: dist
+        real, dimension(3) :: u_prev
+        real, dimension(3, N_SECTION) :: sec_u
+        real, dimension(N_SECTION) :: sec_cum_x, sec_cum_steps
+        logical :: match
+
         ! Initialization
         u = u0
         t = t0
         n_steps = nint((tf - t0) / h) ! Use nint for robustness
         sum_x = 0.0
         n_avg_steps = 0
+        n_done = 0
         averaging_started = .false.
         error_flag = 0 ! 0 indicates no error initially
 
@@ -188,6 +247,25 @@ contains
             safe_tau = 0.01 ! Use a safe default
         end if
 
+        detect = .false.
+        if (present(early_stop)) detect = early_stop
+        found_regime = REGIME_UNDETERMINED
+        t_detect = t0 + EARLY_T_MIN_TAU * safe_tau
+        fp_steps = 0
+        fp_confirm_steps = max(1, nint(FP_CONFIRM_TIME / h))
+        n_cross = 0
+        t_match = -1.0
+        f_first = 0.0
+        dx_prev = 0.0
+        u_prev = u0
+        cum_x = 0.0
+        cum_steps = 0.0
+        block_steps = max(1, nint(BLOCK_TIME / h))
+        block_sum = 0.0
+        n_blocks = 0
+        sum_bm = 0.0
+        sum_bm_sq = 0.0
+
         ! RK4 Integration Loop
         do i = 1, n_steps
             ! Check if we should start averaging
@@ -199,6 +277,63 @@ contains
 
             ! Compute derivatives
             call compute_derivatives(u, R, safe_tau, k1)
+
+            ! Fixed point and Poincaré section (maxima of X) on the state at the start of the step
+            if (detect .and. t >= t_detect) then
+                f_norm = sqrt(sum(k1**2))
+                scale = 1.0 + sqrt(sum(u**2))
+                if (f_norm < FP_TOL * scale) then
+                    fp_steps = fp_steps + 1
+                    if (fp_steps == 1) f_first = f_norm
+                    if (fp_steps >= fp_confirm_steps .and. (f_norm <= f_first .or. f_norm < FP_NOISE * scale)) then
+                        avg_x = u(1)
+                        if (abs(u(1)) < WALK_TOL) then
+                            found_regime = REGIME_FIXED_POINT
+                        else
+                            found_regime = REGIME_STEADY_WALKER
+                        end if
+                        exit
+                    end if
+                else
+                    fp_steps = 0
+                end if
+
+                if (dx_prev > 0.0 .and. k1(1) <= 0.0) then
+                    ! Crossing interpolated within the previous step
+                    s = dx_prev / (dx_prev - k1(1))
+                    n_cross = n_cross + 1
+                    c = mod(n_cross - 1, N_SECTION) + 1
+                    sec_u(:, c) = u_prev + s * (u - u_prev)
+                    sec_cum_x(c) = cum_x - (1.0 - s) * u(1)
+                    sec_cum_steps(c) = cum_steps - (1.0 - s)
+
+                    ! Shortest period p (in crossings) repeated PERIOD_CONFIRM times,
+                    ! at every crossing during PERIOD_CONFIRM_TAU*tau
+                    match = .false.
+                    do p = 1, MAX_PERIOD
+                        if (n_cross <= PERIOD_CONFIRM * p) exit
+                        scale = 1.0 + sqrt(sum(sec_u(:, c)**2))
+                        do j = 0, PERIOD_CONFIRM - 1
+                            dist(j) = sqrt(sum((sec_u(:, ring(n_cross - j*p)) - sec_u(:, ring(n_cross - (j+1)*p)))**2))
+                        end do
+                        match = all(dist < PERIOD_TOL * scale)
+                        if (match) exit
+                    end do
+                    if (.not. match) then
+                        t_match = -1.0
+                    else if (t_match < 0.0) then
+                        t_match = t
+                    else if (t - t_match >= PERIOD_CONFIRM_TAU * safe_tau) then
+                        j = ring(n_cross - p)
+                        avg_x = (sec_cum_x(c) - sec_cum_x(j)) / (sec_cum_steps(c) - sec_cum_steps(j))
+                        found_regime = REGIME_PERIODIC
+                        exit
+                    end if
+                end if
+                dx_prev = k1(1)
+                u_prev = u
+            end if
+
             call compute_derivatives(u + 0.5*h*k1, R, safe_tau, k2)
             call compute_derivatives(u + 0.5*h*k2, R, safe_tau, k3)
             call compute_derivatives(u + h*k3, R, safe_tau, k4)
@@ -206,6 +341,7 @@ contains
             ! Update state
             u = u + (h/6.0) * (k1 + 2.0*k2 + 2.0*k3 + k4)
             t = t + h ! Update time *after* using the state at the beginning of the step
+            n_done = n_done + 1
 
             ! Accumulate X if in the averaging period
             if (averaging_started) then
@@ -213,6 +349,32 @@ contains
                 n_avg_steps = n_avg_steps + 1
             end if
 
+            if (detect) then
+                ! Running integral of X for the period averages
+                cum_x = cum_x + u(1)
+                cum_steps = cum_steps + 1.0
+
+                ! Batch means of the post-transient average
+                if (averaging_started) then
+                    block_sum = block_sum + u(1)
+                    if (mod(n_avg_steps, block_steps) == 0) then
+                        n_blocks = n_blocks + 1
+                        sum_bm = sum_bm + block_sum / real(block_steps)
+                        sum_bm_sq = sum_bm_sq + (block_sum / real(block_steps))**2
+                        block_sum = 0.0
+                        if (n_blocks >= MIN_BLOCKS) then
+                            mean_bm = sum_bm / real(n_blocks)
+                            var_bm = max(0.0, (sum_bm_sq - real(n_blocks) * mean_bm**2) / real(n_blocks - 1))
+                            if (2.0 * sqrt(var_bm / real(n_blocks)) < AVG_TOL) then
+                                found_regime = REGIME_MEAN_CONVERGED
+                                avg_x = sum_x / real(n_avg_steps)
+                                exit
+                            end if
+                        end if
+                    end if
+                end if
+            end if
+
             ! Check for numerical instability (simplified check)
             if (any(isnan(u)) .or. any(abs(u) > 1.0E7)) then ! Increased threshold slightly
                 ! print *, "WARNING: Instability detected in solve_rk4_and_average_x at t =", t - h ! Time before update
@@ -220,10 +382,17 @@ contains
                 error_flag = 1 ! Set error flag
                 avg_x = huge(1.0) ! Return a large number to indicate failure
                 final_u = u ! Return the unstable state
+                if (present(regime)) regime = REGIME_UNSTABLE
+                if (present(t_end)) t_end = t0 + real(n_done) * h
                 return ! Exit subroutine immediately
             end if
         end do
 
+        if (present(regime)) regime = found_regime
+        if (present(t_end)) t_end = t0 + real(n_done) * h
+        final_u = u ! Return the final state
+        if (found_regime /= REGIME_UNDETERMINED) return
+
         ! Calculate average X
         if (n_avg_steps > 0) then
             avg_x = sum_x / real(n_avg_steps)
@@ -232,7 +401,13 @@ contains
             ! print *, "WARNING: No steps were averaged. t_transient might be >= tf."
         end if
 
-        final_u = u ! Return the final state
+    contains
+
+        integer function ring(n)
+            ! Slot of the n-th section crossing in the ring buffer
+            integer, intent(in) :: n
+            ring = mod(n - 1, N_SECTION) + 1
+        end function ring
 
     end subroutine solve_rk4_and_average_x
 
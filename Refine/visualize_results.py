@@ -2,15 +2,23 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+import argparse
 import os
 
 # --- Configuration ---
 INPUT_CSV_FILE = "lorenz_scan_results.csv"
+# Backward continuation sweep (./lorenz_scan.exe --sweep=both or --sweep=backward)
+BACKWARD_CSV_FILE = "lorenz_scan_results_backward.csv"
 OUTPUT_DIR = "plots"
 # Define R values for which to generate histograms (adjust after seeing the bifurcation plot)
 HISTOGRAM_R_VALUES = [0.8, 1.5, 2.5] 
 # Define a threshold for HUGE values coming from Fortran (adjust if needed)
 HUGE_THRESHOLD = 1.0e30 
+# Scan table inside the run archive (see ../archive.py pack)
+ARCHIVE_TABLE = "tables/lorenz_scan_results"
+# Regime labels written by the early-termination scan (REGIME_* in rk4_solver.f90)
+REGIME_LABELS = {-1: "unstable", 0: "full run (chaotic/undetermined)", 1: "fixed point (X = 0)",
+                 2: "steady walker", 3: "periodic orbit", 4: "converged mean"}
 
 # --- Helper Functions ---
 
@@ -18,7 +26,33 @@ def clean_huge_values(df, threshold):
     """Replaces values above a threshold (Fortran HUGE) with NaN."""
     # Replace infinities first, then apply threshold check
     df_no_inf = df.replace([np.inf, -np.inf], np.nan)
-    return df_no_inf.applymap(lambda x: np.nan if isinstance(x, (int, float)) and abs(x) >= threshold else x)
+    numeric = df_no_inf.select_dtypes(include=[np.number])
+    df_no_inf[numeric.columns] = numeric.mask(numeric.abs() >= threshold)
+    return df_no_inf
+
+
+def load_scan_from_archive(archive_path, table=ARCHIVE_TABLE, r_min=None, r_max=None):
+    """
+    Loads the scan table from an HDF5 run archive. Only the rows with
+    r_min <= R <= r_max are read (the R column is read first to locate them).
+    """
+    try:
+        import h5py
+    except ImportError:
+        raise SystemExit("Error: reading an archive requires the 'h5py' package (pip install h5py).")
+
+    with h5py.File(archive_path, 'r') as f:
+        group = f[table]
+        columns = [str(c) for c in group.attrs['numeric_columns']]
+        numeric = group['numeric']
+        r_values = numeric[:, columns.index('R')]
+        rows = np.nonzero((r_values >= (r_min if r_min is not None else -np.inf)) &
+                          (r_values <= (r_max if r_max is not None else np.inf)))[0]
+        if len(rows) == 0:
+            return pd.DataFrame(columns=columns)
+        # Contiguous row range (R is scanned in increasing order): one partial read
+        data = numeric[rows[0]:rows[-1] + 1]
+    return pd.DataFrame(data, columns=columns)
 
 
 def plot_bifurcation(df, output_filename):
@@ -105,6 +139,52 @@ def plot_ensemble_stats(df, output_filename):
     plt.close()
     print("... Ensemble statistics plot saved.")
 
+def plot_regimes(df, output_filename):
+    """Generates the bifurcation plot colored by the regime label of each IC (Regime_j columns)."""
+    regime_cols = [col for col in df.columns if col.startswith('Regime_')]
+    if not regime_cols:
+        print("No 'Regime_' columns in the results (scan without early termination): skipping regime plot.")
+        return
+    print(f"Generating regime plot: {output_filename}")
+    plt.figure(figsize=(12, 7))
+
+    r_vals = np.repeat(df['R'].values, len(regime_cols))
+    x_vals = df[[f"Avg_X_{col[len('Regime_'):]}" for col in regime_cols]].values.ravel()
+    regimes = df[regime_cols].values.ravel()
+    for label, name in REGIME_LABELS.items():
+        mask = (regimes == label) & ~np.isnan(x_vals)
+        if mask.any():
+            plt.plot(r_vals[mask], x_vals[mask], '.', markersize=3, label=f"{name} ({mask.sum()})")
+
+    plt.xlabel("Parameter R")
+    plt.ylabel("Asymptotic Average Velocity <X>_j")
+    plt.title("Regimes of the initial conditions")
+    plt.legend(markerscale=4)
+    plt.grid(True, linestyle='--', alpha=0.6)
+    plt.savefig(output_filename)
+    plt.close()
+    print("... Regime plot saved.")
+
+def plot_hysteresis(df_forward, df_backward, output_filename):
+    """Overlays the <X>_j of the forward and backward continuation sweeps (hysteresis, multistability)."""
+    print(f"Generating hysteresis plot: {output_filename}")
+    plt.figure(figsize=(12, 7))
+    for df, color, label in ((df_forward, 'tab:blue', 'Forward sweep (R increasing)'),
+                             (df_backward, 'tab:red', 'Backward sweep (R decreasing)')):
+        avg_x_cols = [col for col in df.columns if col.startswith('Avg_X_') and col[len('Avg_X_'):].isdigit()]
+        r_vals = np.repeat(df['R'].values, len(avg_x_cols))
+        x_vals = df[avg_x_cols].values.ravel()
+        valid = ~np.isnan(x_vals)
+        plt.plot(r_vals[valid], x_vals[valid], '.', markersize=3, color=color, alpha=0.5, label=label)
+    plt.xlabel("Parameter R")
+    plt.ylabel("Asymptotic Average Velocity <X>_j")
+    plt.title("Continuation sweeps: forward vs backward")
+    plt.legend(markerscale=4)
+    plt.grid(True, linestyle='--', alpha=0.6)
+    plt.savefig(output_filename)
+    plt.close()
+    print("... Hysteresis plot saved.")
+
 def plot_histograms(df, r_values_to_plot, output_dir):
     """Generates histograms of <X>_j for specific R values."""
     print(f"Generating histograms for R values: {r_values_to_plot}")
@@ -141,8 +221,18 @@ def plot_histograms(df, r_values_to_plot, output_dir):
         plt.close()
         print(f"... Histogram for R ≈ {r_actual:.3f} saved to {output_filename}")
 
+def parse_command_line():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Plots of the Lorenz R scan')
+    parser.add_argument('--archive', type=str, help='Read the scan from an HDF5 run archive instead of the CSV')
+    parser.add_argument('--r-min', type=float, help='Smallest R value to load (archive only)')
+    parser.add_argument('--r-max', type=float, help='Largest R value to load (archive only)')
+    return parser.parse_args()
+
+
 # --- Main Execution ---
 if __name__ == "__main__":
+    args = parse_command_line()
     print("--- Starting Visualization Script ---")
     
     # Create output directory if it doesn't exist
@@ -154,6 +244,17 @@ if __name__ == "__main__":
             print(f"Error creating output directory '{OUTPUT_DIR}': {e}")
             exit()
 
+    if args.archive:
+        print(f"Loading data from archive: {args.archive} ({ARCHIVE_TABLE})")
+        df_cleaned = clean_huge_values(load_scan_from_archive(args.archive, ARCHIVE_TABLE, args.r_min, args.r_max),
+                                       HUGE_THRESHOLD)
+        plot_bifurcation(df_cleaned, os.path.join(OUTPUT_DIR, "bifurcation_plot.png"))
+        plot_ensemble_stats(df_cleaned, os.path.join(OUTPUT_DIR, "ensemble_stats_plot.png"))
+        plot_regimes(df_cleaned, os.path.join(OUTPUT_DIR, "regime_plot.png"))
+        plot_histograms(df_cleaned, HISTOGRAM_R_VALUES, OUTPUT_DIR)
+        print("--- Visualization Script Finished ---")
+        exit()
+
     # Check if input file exists
     if not os.path.isfile(INPUT_CSV_FILE):
         print(f"Error: Input CSV file not found: {INPUT_CSV_FILE}")
@@ -171,7 +272,11 @@ if __name__ == "__main__":
         # Generate plots
         plot_bifurcation(df_cleaned, os.path.join(OUTPUT_DIR, "bifurcation_plot.png"))
         plot_ensemble_stats(df_cleaned, os.path.join(OUTPUT_DIR, "ensemble_stats_plot.png"))
+        plot_regimes(df_cleaned, os.path.join(OUTPUT_DIR, "regime_plot.png"))
         plot_histograms(df_cleaned, HISTOGRAM_R_VALUES, OUTPUT_DIR)
+        if os.path.isfile(BACKWARD_CSV_FILE):
+            df_backward = clean_huge_values(pd.read_csv(BACKWARD_CSV_FILE), HUGE_THRESHOLD)
+            plot_hysteresis(df_cleaned, df_backward, os.path.join(OUTPUT_DIR, "hysteresis_plot.png"))
         
         print("--- Visualization Script Finished ---")
         
@@ -0,0 +1,377 @@
+"""
+Archive unique (HDF5) des sorties de simulation.
+
+Un balayage laisse des centaines de petits fichiers texte dans output/ et
+output/benchmark/, plus le CSV large du balayage de Refine. Ce module les
+range dans un seul conteneur HDF5, sous forme de jeux de données découpés en
+blocs (chunks) et compressés:
+
+    /trajectories/<nom>   (n, 4) float64 [t, X, Y, Z], blocs de CHUNK_ROWS lignes;
+                          attributs = paramètres de l'en-tête "# clé=valeur"
+    /tables/<nom>         tableau CSV: 'numeric' (n, k) float64 par blocs de lignes,
+                          'text/<colonne>' pour les colonnes non numériques;
+                          attribut 'columns' = ordre des colonnes
+    attributs racine      version du format, date de dernière écriture
+
+Les lectures sont partielles: read_trajectory(..., start, stop) ou
+read_trajectory(..., t_range=(t0, t1)) ne décompressent que les blocs
+concernés (la fenêtre en temps est localisée par dichotomie sur la colonne t),
+et read_table(..., rows=slice(...)) ne lit que les lignes demandées.
+
+Une entrée de l'archive se désigne par "archive.h5::nom" (groupe trajectories
+par défaut) ou "archive.h5::tables/nom"; plotter.py accepte ces chemins partout
+où il attend un fichier de données.
+
+Dépendance optionnelle: h5py (pip install h5py).
+
+Usage:
+    python archive.py [--archive output/runs.h5] pack [FICHIERS ...]
+    python archive.py [--archive output/runs.h5] ls
+    python archive.py [--archive output/runs.h5] extract NOM [--start 0] [--stop 1000] [--t-range 10 20]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+
+from attractor_stats import iter_chunks
+from pipeline import read_header
+
+DEFAULT_ARCHIVE = 'output/runs.h5'
+ARCHIVE_SEPARATOR = '::'
+FORMAT_VERSION = 1
+CHUNK_ROWS = 16384
+COMPRESSION = 'gzip'
+COMPRESSION_LEVEL = 4
+
+
+def _require_h5py():
+    try:
+        import h5py
+    except ImportError:
+        sys.exit("Erreur: l'archive HDF5 requiert le paquet 'h5py' (pip install h5py).")
+    return h5py
+
+
+def is_archive_path(path):
+    """Indique si path désigne une entrée d'archive ("archive.h5::nom")"""
+    return ARCHIVE_SEPARATOR in str(path)
+
+
+def split_archive_path(path):
+    """
+    Sépare "archive.h5::nom" en (archive, chemin HDF5 complet)
+
+    Returns:
+        tuple: (archive_path, dataset_path), par exemple ('output/runs.h5', 'trajectories/rk4_tau5.0')
+    """
+    archive_path, name = str(path).split(ARCHIVE_SEPARATOR, 1)
+    if '/' not in name:
+        name = 'trajectories/' + name
+    return archive_path, name
+
+
+def entry_name(file_path):
+    """Nom d'entrée dérivé d'un fichier (sans dossier ni extension)"""
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+class RunArchive:
+    """
+    Conteneur HDF5 des trajectoires, tableaux et métadonnées d'exécution.
+
+    Args:
+        path (str): Fichier d'archive
+        mode (str): 'r' (lecture), 'a' (lecture/écriture, création si besoin)
+    """
+
+    def __init__(self, path=DEFAULT_ARCHIVE, mode='r'):
+        h5py = _require_h5py()
+        if mode != 'r':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.file = h5py.File(path, mode)
+        if mode != 'r':
+            self.file.attrs['format_version'] = FORMAT_VERSION
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Ferme l'archive"""
+        if self.file:
+            if self.file.mode != 'r':
+                self.file.attrs['modified'] = time.strftime('%Y-%m-%d %H:%M:%S')
+            self.file.close()
+            self.file = None
+
+    def _replace(self, path):
+        if path in self.file:
+            del self.file[path]
+
+    # --- Écriture ---
+
+    def write_trajectory(self, name, chunks, params=None, source=None):
+        """
+        Écrit une trajectoire bloc par bloc (la mémoire utilisée reste bornée).
+
+        Args:
+            name (str): Nom de l'entrée
+            chunks (iterable): Blocs numpy (n, 4) [t, X, Y, Z], ou un seul tableau
+            params (dict): Paramètres d'exécution (attributs)
+            source (str): Fichier d'origine
+
+        Returns:
+            int: Nombre de lignes écrites
+        """
+        if isinstance(chunks, np.ndarray):
+            chunks = [chunks]
+        path = 'trajectories/' + name
+        self._replace(path)
+        dset = self.file.create_dataset(path, shape=(0, 4), maxshape=(None, 4), dtype='f8',
+                                        chunks=(CHUNK_ROWS, 4), compression=COMPRESSION,
+                                        compression_opts=COMPRESSION_LEVEL, shuffle=True)
+        n = 0
+        for chunk in chunks:
+            chunk = np.asarray(chunk, dtype=float)[:, :4]
+            dset.resize(n + len(chunk), axis=0)
+            dset[n:n + len(chunk)] = chunk
+            n += len(chunk)
+        for key, value in (params or {}).items():
+            dset.attrs[key] = value
+        if source:
+            dset.attrs['source'] = source
+        dset.attrs['columns'] = ['t', 'X', 'Y', 'Z']
+        return n
+
+    def add_data_file(self, file_path, name=None):
+        """Ajoute un fichier de sortie du solveur (t X Y Z, en-tête de paramètres)"""
+        return self.write_trajectory(name or entry_name(file_path), iter_chunks(file_path, CHUNK_ROWS),
+                                     read_header(file_path), file_path)
+
+    def add_table(self, file_path, name=None):
+        """
+        Ajoute un tableau CSV (résultats de benchmark, balayage de Refine...).
+
+        Returns:
+            int: Nombre de lignes écrites
+        """
+        with open(file_path, 'r') as f:
+            columns = [c.strip() for c in f.readline().strip().split(',')]
+            rows = [line.rstrip('\n').split(',') for line in f if line.strip()]
+        rows = [r + [''] * (len(columns) - len(r)) for r in rows]
+
+        numeric, text = [], []
+        for j, column in enumerate(columns):
+            try:
+                values = [float(r[j]) if r[j].strip() else np.nan for r in rows]
+                numeric.append((column, values))
+            except ValueError:
+                text.append((column, [r[j].strip() for r in rows]))
+
+        path = 'tables/' + (name or entry_name(file_path))
+        self._replace(path)
+        group = self.file.create_group(path)
+        group.attrs['columns'] = columns
+        group.attrs['numeric_columns'] = [c for c, _ in numeric]
+        group.attrs['source'] = file_path
+        matrix = np.array([v for _, v in numeric], dtype=float).T.reshape(len(rows), len(numeric))
+        options = {}
+        if matrix.size:
+            # Blocs de lignes complètes: une plage de lignes ne touche que quelques blocs
+            options = dict(chunks=(min(len(rows), max(1, CHUNK_ROWS // len(numeric))), len(numeric)),
+                           compression=COMPRESSION, compression_opts=COMPRESSION_LEVEL)
+        group.create_dataset('numeric', data=matrix, **options)
+        for column, values in text:
+            group.create_dataset('text/' + column, data=np.array(values, dtype=object),
+                                 dtype=_require_h5py().string_dtype())
+        return len(rows)
+
+    # --- Lecture ---
+
+    def entries(self):
+        """
+        Returns:
+            list: (chemin, type, forme) de toutes les entrées
+        """
+        found = []
+        for group, kind in (('trajectories', 'trajectory'), ('tables', 'table')):
+            for name in self.file.get(group, {}):
+                obj = self.file[group][name]
+                shape = obj.shape if kind == 'trajectory' else obj['numeric'].shape[:1] + (len(obj.attrs['columns']),)
+                found.append((f"{group}/{name}", kind, shape))
+        return found
+
+    def attributes(self, path):
+        """Paramètres d'exécution d'une entrée (valeurs numériques converties en float)"""
+        params = {}
+        for key, value in self.file[path].attrs.items():
+            if isinstance(value, bytes):
+                value = value.decode()
+            try:
+                params[key] = float(value)
+            except (TypeError, ValueError):
+                params[key] = value
+        return params
+
+    def time_index(self, path, t):
+        """Première ligne de temps >= t (dichotomie: seuls quelques blocs sont lus)"""
+        dset = self.file[path]
+        lo, hi = 0, dset.shape[0]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if dset[mid, 0] < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def read_trajectory(self, path, start=None, stop=None, t_range=None):
+        """
+        Lecture partielle d'une trajectoire.
+
+        Args:
+            path (str): Chemin HDF5 ('trajectories/nom') ou nom seul
+            start, stop (int): Plage de lignes
+            t_range (tuple): Fenêtre en temps (t0, t1), prioritaire sur start/stop
+
+        Returns:
+            numpy.ndarray: Données [t, X, Y, Z]
+        """
+        if '/' not in path:
+            path = 'trajectories/' + path
+        if t_range is not None:
+            start = self.time_index(path, t_range[0])
+            stop = self.time_index(path, np.nextafter(t_range[1], np.inf))
+        return self.file[path][start:stop]
+
+    def iter_trajectory(self, path, chunk_size=CHUNK_ROWS):
+        """Parcourt une trajectoire par blocs de lignes"""
+        if '/' not in path:
+            path = 'trajectories/' + path
+        dset = self.file[path]
+        for start in range(0, dset.shape[0], chunk_size):
+            yield dset[start:start + chunk_size]
+
+    def read_table(self, path, rows=None, columns=None):
+        """
+        Lecture partielle d'un tableau.
+
+        Args:
+            path (str): Chemin HDF5 ('tables/nom') ou nom seul
+            rows (slice): Lignes à lire (toutes si None)
+            columns (list): Colonnes à lire (toutes si None)
+
+        Returns:
+            dict: {colonne: numpy.ndarray}, dans l'ordre des colonnes du CSV
+        """
+        if '/' not in path:
+            path = 'tables/' + path
+        group = self.file[path]
+        rows = rows if rows is not None else slice(None)
+        numeric_columns = list(group.attrs['numeric_columns'])
+
+        # Les blocs sont découpés par lignes: seules les lignes demandées sont décompressées
+        block = group['numeric'][rows] if numeric_columns else None
+        table = {}
+        for column in columns or list(group.attrs['columns']):
+            if column in numeric_columns:
+                table[column] = block[:, numeric_columns.index(column)]
+            elif 'text' in group and column in group['text']:
+                table[column] = group['text'][column].asstr()[rows]
+        return table
+
+
+def read_entry(path, t_range=None):
+    """
+    Lit une trajectoire désignée par "archive.h5::nom".
+
+    Returns:
+        tuple: (données numpy [t, X, Y, Z], paramètres)
+    """
+    archive_path, name = split_archive_path(path)
+    with RunArchive(archive_path) as archive:
+        return archive.read_trajectory(name, t_range=t_range), archive.attributes(name)
+
+
+def pack(archive_path, files):
+    """
+    Range des fichiers de sortie dans l'archive (.dat: trajectoires, .csv: tableaux).
+
+    Returns:
+        int: Nombre de fichiers ajoutés
+    """
+    added = 0
+    with RunArchive(archive_path, 'a') as archive:
+        for file_path in files:
+            try:
+                if file_path.endswith('.csv'):
+                    n = archive.add_table(file_path)
+                else:
+                    n = archive.add_data_file(file_path)
+            except (OSError, ValueError) as e:
+                print(f"  Ignoré: {file_path} ({e})")
+                continue
+            print(f"  {file_path}: {n} lignes")
+            added += 1
+    return added
+
+
+def default_inputs():
+    """Sorties habituelles: output/*.dat, output/benchmark/*.csv|.dat, balayage de Refine"""
+    files = sorted(glob.glob('output/*.dat'))
+    files += sorted(glob.glob('output/benchmark/*.csv')) + sorted(glob.glob('output/benchmark/*.dat'))
+    files += [p for p in ['Refine/lorenz_scan_results.csv'] if os.path.exists(p)]
+    return files
+
+
+def parse_command_line():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Single-container HDF5 archive of run outputs')
+    parser.add_argument('--archive', default=DEFAULT_ARCHIVE, help='Archive file')
+    subparsers = parser.add_subparsers(dest='command', help='Command to execute')
+
+    pack_parser = subparsers.add_parser('pack', help='Add output files to the archive')
+    pack_parser.add_argument('files', nargs='*', help='Files to add (default: usual output files)')
+
+    subparsers.add_parser('ls', help='List archive entries')
+
+    extract_parser = subparsers.add_parser('extract', help='Print (part of) a trajectory or table')
+    extract_parser.add_argument('name', help="Entry, e.g. rk4_tau5.0 or tables/benchmark_results")
+    extract_parser.add_argument('--start', type=int, help='First row')
+    extract_parser.add_argument('--stop', type=int, help='Row after the last one')
+    extract_parser.add_argument('--t-range', type=float, nargs=2, metavar=('T0', 'T1'), help='Time window')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_command_line()
+
+    if args.command == 'pack':
+        files = args.files or default_inputs()
+        print(f"Archivage de {len(files)} fichiers dans {args.archive}...")
+        added = pack(args.archive, files)
+        print(f"{added} fichiers archivés, taille de l'archive: {os.path.getsize(args.archive) / 1e6:.1f} Mo")
+    elif args.command == 'extract':
+        with RunArchive(args.archive) as archive:
+            name = args.name if '/' in args.name else 'trajectories/' + args.name
+            if name.startswith('tables/'):
+                table = archive.read_table(name, slice(args.start, args.stop))
+                print(','.join(table))
+                for row in zip(*table.values()):
+                    print(','.join(str(v) for v in row))
+            else:
+                rows = slice(args.start, args.stop)
+                data = archive.read_trajectory(name, rows.start, rows.stop, args.t_range)
+                print("t X Y Z")
+                np.savetxt(sys.stdout, data, fmt='%.10f')
+    else:
+        with RunArchive(args.archive) as archive:
+            for path, kind, shape in archive.entries():
+                print(f"{path:<45} {kind:<11} {' x '.join(str(s) for s in shape)}")
@@ -0,0 +1,227 @@
+"""
+Statistiques réduites de l'attracteur pour de longues trajectoires.
+
+Les fichiers de sortie (t X Y Z) sont lus par blocs de taille fixe: la mémoire
+utilisée ne dépend pas de la longueur de la trajectoire. Sur chaque bloc, les
+calculs sont vectorisés:
+  - sections de Poincaré: détection des changements de signe de (q - q0) et
+    interpolation linéaire du point de passage;
+  - application de premier retour des maxima de Z (Z_n, Z_n+1), avec
+    raffinement parabolique du maximum;
+  - histogrammes 2D d'occupation des portraits de phase (X-Z, X-Y, Y-Z).
+Les derniers points de chaque bloc sont reportés sur le bloc suivant, de sorte
+qu'aucun passage ni maximum n'est perdu à la frontière entre deux blocs.
+
+Usage:
+    python attractor_stats.py output/rk4_tau5.0.dat [--section X=0] [--bins 200]
+"""
+import argparse
+import itertools
+
+import numpy as np
+
+VARIABLES = {'X': 1, 'Y': 2, 'Z': 3}
+PHASE_PLANES = (('X', 'Z'), ('X', 'Y'), ('Y', 'Z'))
+
+
+def iter_chunks(file_path, chunk_size=200000):
+    """
+    Lit un fichier de données par blocs.
+
+    Args:
+        file_path (str): Fichier "t X Y Z" (lignes d'en-tête ignorées), trajectoire
+                         compressée (.ltz) ou entrée d'archive "archive.h5::nom"
+                         (lues bloc par bloc)
+        chunk_size (int): Nombre de lignes par bloc
+
+    Yields:
+        numpy.ndarray: Bloc de données, forme (n, 4)
+    """
+    if '::' in str(file_path):
+        import archive
+        archive_path, name = archive.split_archive_path(file_path)
+        with archive.RunArchive(archive_path) as run_archive:
+            for data in run_archive.iter_trajectory(name, chunk_size):
+                yield data[np.all(np.isfinite(data), axis=1)]
+        return
+    if str(file_path).endswith('.ltz'):
+        import trajectory_codec
+        for data in trajectory_codec.TrajectoryReader(file_path).iter_blocks():
+            yield data
+        return
+    with open(file_path, 'r') as f:
+        # Lignes d'en-tête: paramètres "# ..." puis "t X Y Z"
+        lines = (line for line in f if line.strip() and line.lstrip()[0] not in '#tT' and '**' not in line)
+        while True:
+            block = list(itertools.islice(lines, chunk_size))
+            if not block:
+                break
+            data = np.loadtxt(block, ndmin=2)
+            yield data[np.all(np.isfinite(data), axis=1)]
+
+
+class AttractorStatistics:
+    """
+    Accumulateur des statistiques de l'attracteur, alimenté bloc par bloc.
+
+    Args:
+        ranges (dict): Bornes {variable: (min, max)} des histogrammes (voir data_ranges)
+        section (tuple): Plan de Poincaré (variable, valeur), par exemple ('X', 0.0)
+        direction (int): +1 (passages croissants), -1 (décroissants) ou 0 (les deux)
+        bins (int): Nombre de classes des histogrammes 2D
+    """
+
+    def __init__(self, ranges, section=('X', 0.0), direction=1, bins=200):
+        self.section_var = VARIABLES[section[0]]
+        self.section_value = float(section[1])
+        self.direction = direction
+        self.bins = bins
+        self.ranges = ranges
+        self.edges = {v: np.linspace(lo, hi, bins + 1) for v, (lo, hi) in ranges.items()}
+        self.histograms = {plane: np.zeros((bins, bins)) for plane in PHASE_PLANES}
+        self.crossings = []
+        self.z_maxima = []
+        self.n_points = 0
+        self.t_span = [np.inf, -np.inf]
+        self.tail = None  # Derniers points du bloc précédent
+
+    def update(self, chunk):
+        """Ajoute un bloc de données (forme (n, 4)) aux statistiques"""
+        if len(chunk) == 0:
+            return
+        self.n_points += len(chunk)
+        self.t_span = [min(self.t_span[0], chunk[0, 0]), max(self.t_span[1], chunk[-1, 0])]
+
+        for plane in PHASE_PLANES:
+            a, b = VARIABLES[plane[0]], VARIABLES[plane[1]]
+            hist, _, _ = np.histogram2d(chunk[:, a], chunk[:, b],
+                                        bins=[self.edges[plane[0]], self.edges[plane[1]]])
+            self.histograms[plane] += hist
+
+        # Raccord avec la fin du bloc précédent
+        data = chunk if self.tail is None else np.vstack([self.tail, chunk])
+        self._find_crossings(data)
+        self._find_maxima(data)
+        self.tail = data[-2:]
+
+    def _find_crossings(self, data):
+        s = data[:, self.section_var] - self.section_value
+        s0, s1 = s[:-1], s[1:]
+        if self.direction > 0:
+            idx = np.nonzero((s0 < 0.0) & (s1 >= 0.0))[0]
+        elif self.direction < 0:
+            idx = np.nonzero((s0 > 0.0) & (s1 <= 0.0))[0]
+        else:
+            idx = np.nonzero(((s0 < 0.0) & (s1 >= 0.0)) | ((s0 > 0.0) & (s1 <= 0.0)))[0]
+        if self.tail is not None:
+            # Le passage entre les deux points reportés a déjà été compté
+            idx = idx[idx >= len(self.tail) - 1]
+        if len(idx) == 0:
+            return
+        frac = (-s0[idx] / (s1[idx] - s0[idx]))[:, None]
+        self.crossings.append(data[idx] + frac * (data[idx + 1] - data[idx]))
+
+    def _find_maxima(self, data):
+        z = data[:, 3]
+        z0, z1, z2 = z[:-2], z[1:-1], z[2:]
+        idx = np.nonzero((z1 > z0) & (z1 >= z2))[0]
+        if self.tail is not None:
+            # Les centres jusqu'à l'avant-dernier point reporté ont déjà été examinés
+            idx = idx[idx + 1 >= len(self.tail) - 1]
+        if len(idx) == 0:
+            return
+        # Raffinement parabolique du maximum sur les trois points
+        denom = z0[idx] - 2.0 * z1[idx] + z2[idx]
+        safe = np.where(np.abs(denom) > 1e-300, denom, -1.0)
+        offset = np.where(np.abs(denom) > 1e-300, 0.5 * (z0[idx] - z2[idx]) / safe, 0.0)
+        peak = z1[idx] - 0.25 * (z0[idx] - z2[idx]) * offset
+        self.z_maxima.append(peak)
+
+    def result(self):
+        """
+        Returns:
+            dict: crossings (k, 4) [t, X, Y, Z], z_maxima (m,), return_map (m-1, 2),
+                  histograms {plan: (bins, bins)}, edges, n_points, t_span
+        """
+        crossings = np.vstack(self.crossings) if self.crossings else np.empty((0, 4))
+        z_maxima = np.concatenate(self.z_maxima) if self.z_maxima else np.empty(0)
+        return_map = np.column_stack([z_maxima[:-1], z_maxima[1:]]) if len(z_maxima) > 1 else np.empty((0, 2))
+        return {
+            'crossings': crossings,
+            'z_maxima': z_maxima,
+            'return_map': return_map,
+            'histograms': self.histograms,
+            'edges': self.edges,
+            'n_points': self.n_points,
+            't_span': tuple(self.t_span),
+        }
+
+
+def data_ranges(file_path, chunk_size=200000, margin=0.02):
+    """
+    Bornes de X, Y, Z sur tout le fichier (premier passage, par blocs).
+
+    Returns:
+        dict: {variable: (min, max)} élargies de margin
+    """
+    lo = np.full(3, np.inf)
+    hi = np.full(3, -np.inf)
+    for chunk in iter_chunks(file_path, chunk_size):
+        if len(chunk):
+            lo = np.minimum(lo, chunk[:, 1:4].min(axis=0))
+            hi = np.maximum(hi, chunk[:, 1:4].max(axis=0))
+    width = np.maximum(hi - lo, 1e-9)
+    return {v: (lo[i] - margin * width[i], hi[i] + margin * width[i]) for i, v in enumerate('XYZ')}
+
+
+def compute_statistics(file_path, section=('X', 0.0), direction=1, bins=200, ranges=None, chunk_size=200000):
+    """
+    Calcule les statistiques de l'attracteur d'un fichier de trajectoire.
+
+    Args:
+        file_path (str): Fichier de données
+        section (tuple): Plan de Poincaré (variable, valeur)
+        direction (int): Sens des passages (+1, -1 ou 0)
+        bins (int): Nombre de classes des histogrammes 2D
+        ranges (dict): Bornes des histogrammes (calculées par un premier passage si None)
+        chunk_size (int): Nombre de lignes lues à la fois
+
+    Returns:
+        dict: Voir AttractorStatistics.result
+    """
+    if ranges is None:
+        ranges = data_ranges(file_path, chunk_size)
+    stats = AttractorStatistics(ranges, section, direction, bins)
+    for chunk in iter_chunks(file_path, chunk_size):
+        stats.update(chunk)
+    return stats.result()
+
+
+def parse_section(text):
+    """Convertit 'X=0' en ('X', 0.0)"""
+    var, _, value = text.partition('=')
+    var = var.strip().upper()
+    if var not in VARIABLES:
+        raise argparse.ArgumentTypeError(f"Variable de section inconnue: {var!r} (X, Y ou Z)")
+    return var, float(value or 0.0)
+
+
+def parse_command_line():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Chunked attractor statistics of a trajectory file')
+    parser.add_argument('file', help='Trajectory file (t X Y Z)')
+    parser.add_argument('--section', type=parse_section, default=('X', 0.0), help='Poincaré plane, e.g. X=0')
+    parser.add_argument('--direction', type=int, default=1, choices=[-1, 0, 1], help='Crossing direction')
+    parser.add_argument('--bins', type=int, default=200, help='2D histogram bins')
+    parser.add_argument('--chunk-size', type=int, default=200000, help='Lines read at a time')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_command_line()
+    res = compute_statistics(args.file, args.section, args.direction, args.bins, chunk_size=args.chunk_size)
+    print(f"Points: {res['n_points']}, t = [{res['t_span'][0]:.2f}, {res['t_span'][1]:.2f}]")
+    print(f"Passages par la section {args.section[0]} = {args.section[1]}: {len(res['crossings'])}")
+    print(f"Maxima de Z: {len(res['z_maxima'])}")
+    if len(res['z_maxima']):
+        print(f"  Z max moyen: {res['z_maxima'].mean():.4f}, écart-type: {res['z_maxima'].std():.4f}")
@@ -0,0 +1,436 @@
+"""
+Suite de benchmarks de non-régression avec références par machine.
+
+La suite exécute un ensemble fixe de cas canoniques:
+  - les quatre scénarios de param.f90 avec RK4 et avec Parareal (mêmes
+    paramètres que les cibles scenario*_rk4 / scenario*_parareal du makefile);
+  - un sous-ensemble du balayage en R (RK4, option --R=), à la manière de Refine/;
+  - les outils Python: lecture d'une trajectoire texte et .ltz, statistiques de
+    l'attracteur et figure de comparaison RK4/Parareal.
+
+Chaque cas est répété plusieurs fois (après une exécution de chauffe). Pour le
+solveur, on retient le temps d'exécution affiché par le programme (sans le
+démarrage de mpirun); pour Python, le temps mesuré autour de l'appel.
+
+Les références sont propres à chaque machine (nom d'hôte, processeur, nombre de
+coeurs): output/bench/baselines/<machine>.json. Un cas est en régression si sa
+médiane dépasse celle de la référence de plus du seuil relatif (10 % par défaut)
+ET si le test unilatéral de Mann-Whitney conclut à un ralentissement (p < alpha).
+Les deux conditions évitent de signaler le bruit de mesure d'un cas très court
+comme une régression, et d'ignorer un ralentissement net mais faiblement
+échantillonné. Le rapport (JSON) est écrit dans output/bench/reports/, et le
+code de sortie vaut 1 en cas de régression.
+
+Usage:
+    python bench_suite.py list
+    python bench_suite.py run [--cases rk4_*] [--repeat 5] [--save-baseline]
+    python bench_suite.py run --threshold 0.15 --alpha 0.01
+    python bench_suite.py show [--machine NOM]
+"""
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import platform
+import re
+import shlex
+import subprocess
+import sys
+import time
+
+import numpy as np
+from scipy import stats
+
+BENCH_DIR = 'output/bench'
+SOLVER = './lorenz_solver'
+MPI_PROCS = 5
+
+# Scénarios de param.f90 (tau, h_coarse, h_fine), identiques aux cibles du makefile
+SCENARIOS = {
+    1: (0.5, 0.01, 0.001),
+    2: (2.0, 0.05, 0.005),
+    3: (5.0, 0.005, 0.0005),
+    4: (8.9, 0.005, 0.0005),
+}
+RK4_STEPS = {1: 0.001, 2: 0.005, 3: 0.001, 4: 0.001}
+# Sous-ensemble du balayage en R de Refine/ (tau=10, trajectoire courte)
+SCAN_R_VALUES = (0.5, 1.5, 2.5, 3.0)
+
+
+def machine_id():
+    """
+    Identifiant de la machine: nom d'hôte et empreinte du matériel.
+
+    Returns:
+        tuple: (identifiant, description)
+    """
+    cpu = platform.processor() or platform.machine()
+    try:
+        with open('/proc/cpuinfo', 'r') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    cpu = line.split(':', 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    description = {'hostname': platform.node(), 'cpu': cpu, 'cores': os.cpu_count(),
+                   'system': platform.system(), 'python': platform.python_version()}
+    fingerprint = hashlib.sha256(f"{cpu}|{os.cpu_count()}|{platform.machine()}".encode()).hexdigest()[:8]
+    name = re.sub(r'[^A-Za-z0-9_.-]', '_', platform.node() or 'machine')
+    return f"{name}-{fingerprint}", description
+
+
+def git_revision():
+    """Révision git courante (None hors dépôt)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_solver(command):
+    """
+    Exécute le solveur et renvoie le temps d'exécution qu'il affiche.
+
+    Args:
+        command (list): Ligne de commande
+
+    Returns:
+        float: Temps en secondes (temps mesuré autour du processus à défaut)
+    """
+    start = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"échec de {' '.join(command)}:\n{result.stdout[-2000:]}{result.stderr[-2000:]}")
+    match = re.search(r"Temps d'exécution:\s*([0-9.Ee+-]+)", result.stdout)
+    return float(match.group(1)) if match else elapsed
+
+
+class BenchCase:
+    """
+    Cas de benchmark.
+
+    Args:
+        name (str): Nom du cas
+        group (str): Groupe (rk4, parareal, scan, python)
+        run (callable): Fonction sans argument renvoyant le temps mesuré (s)
+        setup (callable): Préparation exécutée une fois avant les mesures
+    """
+
+    def __init__(self, name, group, run, setup=None):
+        self.name = name
+        self.group = group
+        self.run = run
+        self.setup = setup
+
+
+def _timed(function):
+    """Enveloppe une fonction Python: renvoie le temps de son appel"""
+    def run():
+        start = time.perf_counter()
+        function()
+        return time.perf_counter() - start
+    return run
+
+
+def build_cases(mpirun='mpirun', mpirun_args=(), work_dir=os.path.join(BENCH_DIR, 'work')):
+    """
+    Construit la liste des cas canoniques.
+
+    Args:
+        mpirun (str): Lanceur MPI
+        mpirun_args (list): Options supplémentaires de mpirun (par exemple --oversubscribe)
+        work_dir (str): Répertoire des sorties des cas (les sorties de output/ ne sont pas touchées)
+
+    Returns:
+        list: Cas (BenchCase), dans l'ordre d'exécution
+    """
+    mpi = [mpirun] + list(mpirun_args) + ['-np', str(MPI_PROCS)]
+    cases = []
+
+    for scenario, (tau, h_coarse, h_fine) in SCENARIOS.items():
+        output = os.path.join(work_dir, f'rk4_scenario{scenario}')
+        command = [SOLVER, 'rk4', str(tau), str(RK4_STEPS[scenario]), '100.0', '1.0', '0.0', '0.0',
+                   f'--output={output}']
+        cases.append(BenchCase(f'rk4_scenario{scenario}', 'rk4', lambda c=command: run_solver(c)))
+    for scenario, (tau, h_coarse, h_fine) in SCENARIOS.items():
+        output = os.path.join(work_dir, f'parareal_scenario{scenario}')
+        command = mpi + [SOLVER, 'parareal', str(tau), str(h_coarse), str(h_fine), '100.0', '1.0', '0.0', '0.0',
+                         f'--output={output}']
+        cases.append(BenchCase(f'parareal_scenario{scenario}', 'parareal', lambda c=command: run_solver(c)))
+    for R in SCAN_R_VALUES:
+        output = os.path.join(work_dir, f'scan_R{R}')
+        command = [SOLVER, 'rk4', '10.0', '0.01', '500.0', '1.0', '0.0', '0.0', f'--R={R}', f'--output={output}']
+        cases.append(BenchCase(f'scan_R{R}', 'scan', lambda c=command: run_solver(c)))
+
+    # Outils Python, sur les sorties du scénario 3 (chaotique)
+    rk4_file = os.path.join(work_dir, 'rk4_scenario3.dat')
+    parareal_file = os.path.join(work_dir, 'parareal_scenario3.dat')
+    ltz_file = os.path.join(work_dir, 'rk4_scenario3.ltz')
+
+    def ensure_fixtures():
+        if not os.path.exists(rk4_file):
+            run_solver([SOLVER, 'rk4', '5.0', '0.001', '100.0', '1.0', '0.0', '0.0',
+                        f"--output={rk4_file[:-4]}"])
+        if not os.path.exists(parareal_file):
+            run_solver(mpi + [SOLVER, 'parareal', '5.0', '0.005', '0.0005', '100.0', '1.0', '0.0', '0.0',
+                              f"--output={parareal_file[:-4]}"])
+
+    def encode_fixture():
+        ensure_fixtures()
+        import trajectory_codec
+        trajectory_codec.encode_file(rk4_file, ltz_file)
+
+    def read_text():
+        import plotter
+        plotter.read_data(rk4_file, use_cache=False)
+
+    def read_ltz():
+        import plotter
+        plotter.read_data(ltz_file, use_cache=False)
+
+    def attractor_statistics():
+        import attractor_stats
+        attractor_stats.compute_statistics(rk4_file)
+
+    def comparison_figures():
+        import plotter
+        plotter.compare_solutions(plotter.read_data(rk4_file, use_cache=False),
+                                  plotter.read_data(parareal_file, use_cache=False),
+                                  os.path.join(work_dir, 'comparison'), display=False)
+        plotter.plt.close('all')
+
+    cases.append(BenchCase('python_read_dat', 'python', _timed(read_text), ensure_fixtures))
+    cases.append(BenchCase('python_read_ltz', 'python', _timed(read_ltz), encode_fixture))
+    cases.append(BenchCase('python_attractor_stats', 'python', _timed(attractor_statistics), ensure_fixtures))
+    cases.append(BenchCase('python_compare_figures', 'python', _timed(comparison_figures), ensure_fixtures))
+    return cases
+
+
+def select_cases(cases, patterns=None):
+    """Cas dont le nom ou le groupe correspond à l'un des motifs (tous si aucun motif)"""
+    if not patterns:
+        return cases
+    return [case for case in cases
+            if any(fnmatch.fnmatch(case.name, p) or case.group == p for p in patterns)]
+
+
+def run_cases(cases, repeat=5, warmup=1):
+    """
+    Mesure chaque cas.
+
+    Args:
+        cases (list): Cas à exécuter
+        repeat (int): Nombre de mesures retenues par cas
+        warmup (int): Exécutions de chauffe non retenues
+
+    Returns:
+        dict: {nom: liste des temps (s)}
+    """
+    samples = {}
+    for case in cases:
+        if case.setup is not None:
+            case.setup()
+        for _ in range(warmup):
+            case.run()
+        samples[case.name] = [case.run() for _ in range(repeat)]
+        print(f"  {case.name:<26} médiane {np.median(samples[case.name]):10.4f} s "
+              f"(min {min(samples[case.name]):.4f}, max {max(samples[case.name]):.4f})")
+    return samples
+
+
+def compare_samples(current, baseline, threshold=0.10, alpha=0.05):
+    """
+    Compare les mesures d'un cas à sa référence.
+
+    Args:
+        current (list): Temps de l'exécution courante
+        baseline (list): Temps de référence
+        threshold (float): Variation relative minimale de la médiane à signaler
+        alpha (float): Seuil de signification du test de Mann-Whitney
+
+    Returns:
+        dict: status ('pass', 'regression', 'improvement'), ratio des médianes, p-valeurs
+    """
+    ratio = float(np.median(current) / max(np.median(baseline), 1e-12))
+    if len(current) >= 3 and len(baseline) >= 3:
+        p_slower = float(stats.mannwhitneyu(current, baseline, alternative='greater').pvalue)
+        p_faster = float(stats.mannwhitneyu(current, baseline, alternative='less').pvalue)
+    else:
+        # Trop peu de mesures pour un test: seul le seuil s'applique
+        p_slower = p_faster = 0.0
+    status = 'pass'
+    if ratio > 1.0 + threshold and p_slower < alpha:
+        status = 'regression'
+    elif ratio < 1.0 - threshold and p_faster < alpha:
+        status = 'improvement'
+    return {'status': status, 'ratio': ratio, 'p_slower': p_slower, 'p_faster': p_faster,
+            'median': float(np.median(current)), 'baseline_median': float(np.median(baseline))}
+
+
+def baseline_path(machine, bench_dir=BENCH_DIR):
+    """Fichier de référence d'une machine"""
+    return os.path.join(bench_dir, 'baselines', f'{machine}.json')
+
+
+def load_baseline(machine, bench_dir=BENCH_DIR):
+    """Référence d'une machine ({} si absente)"""
+    path = baseline_path(machine, bench_dir)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_baseline(machine, description, samples, bench_dir=BENCH_DIR):
+    """
+    Met à jour la référence d'une machine avec les mesures données (les autres cas
+    de la référence sont conservés).
+    """
+    baseline = load_baseline(machine, bench_dir)
+    baseline.setdefault('cases', {})
+    for name, values in samples.items():
+        baseline['cases'][name] = {'samples': values, 'revision': git_revision(),
+                                   'date': time.strftime('%Y-%m-%d %H:%M:%S')}
+    baseline['machine'] = description
+    path = baseline_path(machine, bench_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(baseline, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def run_suite(patterns=None, repeat=5, warmup=1, threshold=0.10, alpha=0.05, update_baseline=False,
+              mpirun='mpirun', mpirun_args=(), bench_dir=BENCH_DIR):
+    """
+    Exécute la suite, la compare à la référence de la machine et écrit le rapport.
+
+    Args:
+        patterns (list): Motifs de sélection des cas (noms ou groupes)
+        repeat (int): Mesures par cas
+        warmup (int): Exécutions de chauffe par cas
+        threshold (float): Seuil relatif de régression
+        alpha (float): Seuil de signification
+        update_baseline (bool): Enregistrer les mesures comme nouvelle référence
+        mpirun (str): Lanceur MPI
+        mpirun_args (list): Options de mpirun
+        bench_dir (str): Répertoire des références et rapports
+
+    Returns:
+        dict: Rapport (voir le fichier JSON écrit)
+    """
+    machine, description = machine_id()
+    cases = select_cases(build_cases(mpirun, mpirun_args, os.path.join(bench_dir, 'work')), patterns)
+    if not cases:
+        print("Aucun cas ne correspond à la sélection.")
+        return None
+    os.makedirs(os.path.join(bench_dir, 'work'), exist_ok=True)
+
+    print(f"Machine: {machine} ({description['cpu']}, {description['cores']} coeurs)")
+    print(f"{len(cases)} cas, {repeat} mesure(s) par cas:")
+    samples = run_cases(cases, repeat, warmup)
+
+    baseline = load_baseline(machine, bench_dir).get('cases', {})
+    results = {}
+    for name, values in samples.items():
+        if name in baseline:
+            results[name] = compare_samples(values, baseline[name]['samples'], threshold, alpha)
+            results[name]['baseline_revision'] = baseline[name].get('revision')
+        else:
+            results[name] = {'status': 'new', 'median': float(np.median(values))}
+        results[name]['samples'] = values
+
+    report = {
+        'machine': machine,
+        'machine_info': description,
+        'revision': git_revision(),
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'threshold': threshold,
+        'alpha': alpha,
+        'results': results,
+    }
+    report['passed'] = not any(r['status'] == 'regression' for r in results.values())
+    report_file = os.path.join(bench_dir, 'reports', f"{machine}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(report_file), exist_ok=True)
+    with open(report_file, 'w') as f:
+        json.dump(report, f, indent=1, sort_keys=True)
+
+    print_report(report)
+    print(f"Rapport: {report_file}")
+    if update_baseline:
+        print(f"Référence mise à jour: {save_baseline(machine, description, samples, bench_dir)}")
+    elif any(r['status'] == 'new' for r in results.values()):
+        print("Cas sans référence: relancer avec --save-baseline pour les enregistrer.")
+    return report
+
+
+def print_report(report):
+    """Affiche le tableau réussite/échec d'un rapport"""
+    labels = {'pass': 'OK', 'regression': 'RÉGRESSION', 'improvement': 'AMÉLIORATION', 'new': 'NOUVEAU'}
+    print(f"\n{'Cas':<26} {'Médiane (s)':>12} {'Référence':>12} {'Rapport':>8} {'p':>8}  Statut")
+    for name, r in report['results'].items():
+        if r['status'] == 'new':
+            print(f"{name:<26} {r['median']:>12.4f} {'-':>12} {'-':>8} {'-':>8}  {labels['new']}")
+            continue
+        p = r['p_slower'] if r['ratio'] >= 1.0 else r['p_faster']
+        print(f"{name:<26} {r['median']:>12.4f} {r['baseline_median']:>12.4f} {r['ratio']:>8.2f} {p:>8.3f}  "
+              f"{labels[r['status']]}")
+    regressions = [name for name, r in report['results'].items() if r['status'] == 'regression']
+    if regressions:
+        print(f"\nÉCHEC: {len(regressions)} régression(s) (seuil {100 * report['threshold']:.0f} %, "
+              f"alpha {report['alpha']}):")
+        for name in regressions:
+            r = report['results'][name]
+            print(f"  {name}: {r['baseline_median']:.4f} s -> {r['median']:.4f} s "
+                  f"(+{100 * (r['ratio'] - 1):.1f} %, référence {r.get('baseline_revision') or '?'})")
+    else:
+        print("\nSUCCÈS: aucune régression détectée.")
+
+
+def parse_command_line():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Regression benchmark suite with per-machine baselines')
+    parser.add_argument('--bench-dir', default=BENCH_DIR, help='Directory of baselines and reports')
+    subparsers = parser.add_subparsers(dest='command', help='Command to execute')
+
+    subparsers.add_parser('list', help='List the canonical cases')
+
+    run_parser = subparsers.add_parser('run', help='Run the suite and compare with the machine baseline')
+    run_parser.add_argument('--cases', nargs='*', help='Case names, glob patterns or groups (rk4, parareal, scan, python)')
+    run_parser.add_argument('--repeat', type=int, default=5, help='Measurements per case')
+    run_parser.add_argument('--warmup', type=int, default=1, help='Unrecorded warm-up runs per case')
+    run_parser.add_argument('--threshold', type=float, default=0.10, help='Relative median slowdown to flag')
+    run_parser.add_argument('--alpha', type=float, default=0.05, help='Significance level (Mann-Whitney U)')
+    run_parser.add_argument('--save-baseline', action='store_true', help='Store these measurements as the baseline')
+    run_parser.add_argument('--mpirun', default='mpirun', help='MPI launcher')
+    run_parser.add_argument('--mpirun-args', default='', help='Extra launcher arguments, e.g. "--oversubscribe"')
+
+    show_parser = subparsers.add_parser('show', help='Show a machine baseline')
+    show_parser.add_argument('--machine', help='Machine identifier (default: this machine)')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_command_line()
+
+    if args.command == 'run':
+        report = run_suite(args.cases, args.repeat, args.warmup, args.threshold, args.alpha,
+                           args.save_baseline, args.mpirun, shlex.split(args.mpirun_args), args.bench_dir)
+        sys.exit(0 if report is None or report['passed'] else 1)
+    elif args.command == 'show':
+        machine = args.machine or machine_id()[0]
+        baseline = load_baseline(machine, args.bench_dir)
+        if not baseline:
+            print(f"Aucune référence pour {machine} ({baseline_path(machine, args.bench_dir)})")
+            sys.exit(1)
+        print(f"Référence de {machine}: {baseline['machine']}")
+        for name, entry in sorted(baseline['cases'].items()):
+            print(f"  {name:<26} médiane {np.median(entry['samples']):10.4f} s "
+                  f"({len(entry['samples'])} mesures, révision {entry.get('revision') or '?'}, {entry['date']})")
+    else:
+        for case in build_cases():
+            print(f"{case.name:<26} {case.group}")
@@ -0,0 +1,221 @@
+"""
+Graphe de construction des figures pour la régénération incrémentale.
+
+Chaque règle (par exemple "comparaison pour tau=5.0") est décrite par:
+  - ses fichiers d'entrée (.dat, .csv), identifiés par taille, date et hash
+    SHA-256 du contenu;
+  - ses paramètres de tracé et le hash du code de la fonction qui trace;
+  - les figures produites, et éventuellement des données associées (par
+    exemple les métriques d'erreur d'une comparaison, réutilisées par la
+    figure de synthèse error_vs_tau.png).
+
+Une règle est à reconstruire si une figure manque ou a été réécrite par une
+autre règle (même nom de fichier), si un paramètre ou le code de tracé a
+changé, ou si le contenu d'une entrée a changé. Un fichier dont la taille et
+la date n'ont pas changé n'est pas relu; un fichier simplement réécrit à
+l'identique (même hash) ne déclenche pas de reconstruction.
+
+Le graphe est conservé dans output/build_graph.json.
+
+Usage:
+    python build_graph.py list [--graph output/build_graph.json]
+    python build_graph.py forget [RÈGLE ...]
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+
+DEFAULT_GRAPH_FILE = 'output/build_graph.json'
+
+
+def file_digest(file_path, block_size=1 << 20):
+    """SHA-256 du contenu d'un fichier, lu par blocs"""
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _mtime(file_path):
+    """Date de modification (ns), None si le fichier n'existe pas"""
+    try:
+        return os.stat(file_path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def params_digest(params=None, code=None):
+    """
+    Hash des paramètres de tracé et du code de la fonction de tracé.
+
+    Args:
+        params (dict): Paramètres (sérialisables en JSON)
+        code (callable): Fonction dont le code source fait partie de la signature
+
+    Returns:
+        str: Hash hexadécimal
+    """
+    payload = {'params': params or {}}
+    if code is not None:
+        try:
+            payload['code'] = hashlib.sha256(inspect.getsource(code).encode()).hexdigest()
+        except (OSError, TypeError):
+            payload['code'] = getattr(code, '__qualname__', repr(code))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class BuildGraph:
+    """
+    Dépendances des figures générées et état de leur dernière construction.
+
+    Args:
+        graph_file (str): Fichier JSON du graphe
+    """
+
+    def __init__(self, graph_file=DEFAULT_GRAPH_FILE):
+        self.graph_file = graph_file
+        self.rules = self._load()
+        self.built = 0
+        self.skipped = 0
+
+    def _load(self):
+        if not os.path.exists(self.graph_file):
+            return {}
+        try:
+            with open(self.graph_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Graphe corrompu: tout sera reconstruit
+            return {}
+
+    def save(self):
+        """Écrit le graphe sur disque (écriture atomique)"""
+        os.makedirs(os.path.dirname(self.graph_file) or '.', exist_ok=True)
+        tmp_file = self.graph_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(self.rules, f, indent=1, sort_keys=True)
+        os.replace(tmp_file, self.graph_file)
+
+    def _signature(self, file_path, previous=None):
+        """Signature d'une entrée; le hash n'est recalculé que si taille ou date ont changé"""
+        stat = os.stat(file_path)
+        if previous and previous.get('size') == stat.st_size and previous.get('mtime') == stat.st_mtime_ns:
+            return previous
+        return {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha256': file_digest(file_path)}
+
+    def is_stale(self, rule, inputs, params=None, code=None):
+        """
+        Indique si une règle doit être reconstruite.
+
+        Args:
+            rule (str): Nom de la règle
+            inputs (list): Fichiers d'entrée
+            params (dict): Paramètres de tracé
+            code (callable): Fonction de tracé
+
+        Returns:
+            bool: True si une figure manque ou si une dépendance a changé
+        """
+        entry = self.rules.get(rule)
+        if entry is None:
+            return True
+        if entry['params'] != params_digest(params, code):
+            return True
+        if not entry['targets'] or any(_mtime(p) != mtime for p, mtime in entry['targets'].items()):
+            return True
+        inputs = [os.path.normpath(p) for p in inputs]
+        if sorted(inputs) != sorted(entry['inputs']):
+            return True
+        for path in inputs:
+            if not os.path.exists(path):
+                return True
+            previous = entry['inputs'][path]
+            current = self._signature(path, previous)
+            if current['sha256'] != previous['sha256']:
+                return True
+            # Fichier réécrit à l'identique: mémoriser la nouvelle date pour ne plus le relire
+            entry['inputs'][path] = current
+        return False
+
+    def record(self, rule, inputs, targets, params=None, code=None, data=None):
+        """
+        Enregistre une construction réussie.
+
+        Args:
+            rule (str): Nom de la règle
+            inputs (list): Fichiers d'entrée
+            targets (list): Figures attendues (seules celles produites sont retenues)
+            params (dict): Paramètres de tracé
+            code (callable): Fonction de tracé
+            data: Données associées (sérialisables en JSON), voir data()
+        """
+        previous = self.rules.get(rule, {}).get('inputs', {})
+        self.rules[rule] = {
+            'inputs': {os.path.normpath(p): self._signature(p, previous.get(os.path.normpath(p)))
+                       for p in inputs if os.path.exists(p)},
+            'targets': {p: _mtime(p) for p in targets if os.path.exists(p)},
+            'params': params_digest(params, code),
+            'data': data,
+        }
+        self.built += 1
+        self.save()
+
+    def skip(self, rule):
+        """Compte une règle à jour (non reconstruite)"""
+        self.skipped += 1
+        print(f"  À jour: {rule}")
+
+    def data(self, rule):
+        """Données associées à la dernière construction d'une règle"""
+        entry = self.rules.get(rule)
+        return entry.get('data') if entry else None
+
+    def forget(self, rules=None):
+        """Oublie certaines règles (toutes si rules est vide): elles seront reconstruites"""
+        if not rules:
+            self.rules = {}
+        else:
+            for rule in rules:
+                self.rules.pop(rule, None)
+        self.save()
+
+    def summary(self):
+        """Affiche le bilan de la dernière passe"""
+        print(f"Graphe de construction: {self.built} règle(s) reconstruite(s), {self.skipped} à jour.")
+
+
+def parse_command_line():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Inspect the figure build graph')
+    parser.add_argument('--graph', default=DEFAULT_GRAPH_FILE, help='Build graph file')
+    subparsers = parser.add_subparsers(dest='command', help='Command to execute')
+
+    subparsers.add_parser('list', help='List rules and whether their inputs changed')
+
+    forget_parser = subparsers.add_parser('forget', help='Force rules to be rebuilt')
+    forget_parser.add_argument('rules', nargs='*', help='Rules to forget (all if omitted)')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_command_line()
+    graph = BuildGraph(args.graph)
+
+    if args.command == 'forget':
+        graph.forget(args.rules)
+        print("Règles oubliées: elles seront reconstruites au prochain passage.")
+    else:
+        for rule, entry in sorted(graph.rules.items()):
+            changed = [p for p, sig in entry['inputs'].items()
+                       if not os.path.exists(p) or graph._signature(p, sig)['sha256'] != sig['sha256']]
+            missing = [p for p, mtime in entry['targets'].items() if _mtime(p) != mtime]
+            state = 'périmée' if changed or missing or not entry['targets'] else 'à jour'
+            print(f"{rule:<45} {state:<9} {len(entry['inputs'])} entrée(s), {len(entry['targets'])} figure(s)")
+            for path in changed:
+                print(f"    entrée modifiée: {path}")
+            for path in missing:
+                print(f"    figure manquante ou réécrite: {path}")
+        print(f"{len(graph.rules)} règles dans {args.graph}")
@@ -0,0 +1,215 @@
+module checkpoint
+    ! Points de reprise des itérations Parareal (--checkpoint=chemin, --restart=chemin)
+    !
+    ! Le processus 0 enregistre l'état complet de l'itération (fenêtre w, nombre k
+    ! d'itérations terminées, bornes T_n, itérés U_n et U_prev, énergies, tranches
+    ! figées) ainsi que les points de contrôle des fenêtres déjà terminées. Le
+    ! fichier est écrit sous un nom temporaire puis renommé: une interruption
+    ! pendant l'écriture laisse intact le point de reprise précédent.
+    !
+    ! Une reprise n'est acceptée que pour le même problème fin (R, tau, t0, tf,
+    ! u0, h_fine, longueur des fenêtres). Si le nombre de tranches a changé
+    ! (autre nombre de processus ou de threads), l'état est redécoupé:
+    !   - fenêtres terminées: états aux nouvelles bornes obtenus par RK4 fin depuis
+    !     la borne convergée précédente (exacts à la précision du solveur fin);
+    !   - fenêtre en cours: itérés aux nouvelles bornes obtenus par le propagateur
+    !     grossier depuis la borne précédente, gel des tranches réinitialisé.
+    use domain_decomposition, only: decompose_domain
+    use coarse_propagators, only: propagate_coarse
+    use rk4_solver, only: solve_rk4_interval
+    implicit none
+
+    private
+    public :: checkpoint_write, checkpoint_read, CHECKPOINT_KEY_SIZE
+
+    integer, parameter :: CHECKPOINT_MAGIC = 20241105
+    integer, parameter :: CHECKPOINT_VERSION = 1
+    ! Clé du problème fin: R, tau, t0, tf, u0(3), h_fine, longueur des fenêtres
+    integer, parameter :: CHECKPOINT_KEY_SIZE = 9
+
+contains
+
+    subroutine checkpoint_write(path, key, w, k, bad_value_counter, conv_metric, T_n, U_n, U_prev, &
+                                energy_k, energy_k_prev, frozen, T_all, U_all, cost_all, &
+                                window_iter, window_status, window_metric)
+        ! Enregistre l'état de l'itération k (terminée) de la fenêtre w
+        ! (k = 0: la fenêtre w n'a pas encore commencé)
+        character(len=*), intent(in) :: path
+        real, dimension(CHECKPOINT_KEY_SIZE), intent(in) :: key
+        integer, intent(in) :: w, k, bad_value_counter
+        real, intent(in) :: conv_metric
+        real, dimension(0:), intent(in) :: T_n, energy_k, energy_k_prev, T_all
+        real, dimension(:,0:), intent(in) :: U_n, U_prev, U_all
+        logical, dimension(0:), intent(in) :: frozen
+        real, dimension(:), intent(in) :: cost_all, window_metric
+        integer, dimension(:), intent(in) :: window_iter, window_status
+
+        integer :: unit_num, ios
+        character(len=:), allocatable :: tmp_path
+
+        ! Le chemin reçu peut contenir des blancs de fin (variable de longueur fixe)
+        tmp_path = trim(path) // '.tmp'
+        open(newunit=unit_num, file=tmp_path, access='stream', form='unformatted', status='replace', &
+             action='write', iostat=ios)
+        if (ios /= 0) then
+            print '(a,a)', " WARNING: Impossible d'écrire le point de reprise ", trim(path)
+            return
+        end if
+        write(unit_num, iostat=ios) CHECKPOINT_MAGIC, CHECKPOINT_VERSION, key, ubound(T_n, 1), &
+              size(window_iter), w, k, bad_value_counter, conv_metric, T_n, U_n, U_prev, energy_k, &
+              energy_k_prev, frozen, T_all, U_all, cost_all, window_iter, window_status, window_metric
+        close(unit_num)
+        if (ios /= 0) then
+            print '(a,a)', " WARNING: Écriture du point de reprise incomplète: ", trim(path)
+            return
+        end if
+        call rename(tmp_path, trim(path))
+    end subroutine checkpoint_write
+
+    subroutine checkpoint_read(path, key, R, tau, h_coarse, h_fine, g_init, w, k, bad_value_counter, &
+                               conv_metric, T_n, U_n, U_prev, energy_k, energy_k_prev, frozen, &
+                               T_all, U_all, cost_all, window_iter, window_status, window_metric, found)
+        ! Relit un point de reprise et l'adapte au nombre de tranches courant
+        ! (dimension des tableaux fournis). found = .false. si le fichier est absent,
+        ! illisible ou décrit un autre problème: le calcul repart alors du début
+        ! (w = 1, k = 0, tableaux inchangés).
+        character(len=*), intent(in) :: path
+        real, dimension(CHECKPOINT_KEY_SIZE), intent(in) :: key
+        real, intent(in) :: R, tau, h_coarse, h_fine
+        integer, intent(in) :: g_init
+        integer, intent(out) :: w, k
+        integer, intent(inout) :: bad_value_counter
+        real, intent(inout) :: conv_metric
+        real, dimension(0:), intent(inout) :: T_n, energy_k, energy_k_prev, T_all
+        real, dimension(:,0:), intent(inout) :: U_n, U_prev, U_all
+        logical, dimension(0:), intent(inout) :: frozen
+        real, dimension(:), intent(inout) :: cost_all, window_metric
+        integer, dimension(:), intent(inout) :: window_iter, window_status
+        logical, intent(out) :: found
+
+        integer :: unit_num, ios, magic, version, n_old, n_win, n_slices, ww, n, j
+        real, dimension(CHECKPOINT_KEY_SIZE) :: saved_key
+        real, dimension(:), allocatable :: T_old, E_old, E_prev_old, T_all_old, cost_old
+        real, dimension(:,:), allocatable :: U_old, U_prev_old, U_all_old
+        logical, dimension(:), allocatable :: frozen_old
+        logical :: exists
+
+        found = .false.
+        w = 1
+        k = 0
+        n_slices = ubound(T_n, 1)
+        inquire(file=trim(path), exist=exists)
+        if (.not. exists) then
+            print '(a,a,a)', " Point de reprise ", trim(path), " absent, calcul depuis le début"
+            return
+        end if
+
+        open(newunit=unit_num, file=trim(path), access='stream', form='unformatted', status='old', &
+             action='read', iostat=ios)
+        if (ios /= 0) return
+        read(unit_num, iostat=ios) magic, version, saved_key, n_old, n_win
+        if (ios /= 0 .or. magic /= CHECKPOINT_MAGIC .or. version /= CHECKPOINT_VERSION) then
+            print '(a,a)', " WARNING: Point de reprise illisible, calcul depuis le début: ", trim(path)
+            close(unit_num)
+            return
+        end if
+        if (n_win /= size(window_iter) .or. &
+            any(abs(saved_key - key) > 1.0E-5 * max(abs(saved_key), abs(key), 1.0E-6))) then
+            print '(a,a)', " WARNING: Point de reprise d'un autre problème (R, tau, t0, tf, u0, h_fine ou ", &
+                  "fenêtres), calcul depuis le début"
+            close(unit_num)
+            return
+        end if
+
+        allocate(T_old(0:n_old), E_old(0:n_old), E_prev_old(0:n_old), frozen_old(0:n_old))
+        allocate(U_old(3, 0:n_old), U_prev_old(3, 0:n_old))
+        allocate(T_all_old(0:n_win*n_old), U_all_old(3, 0:n_win*n_old))
+        allocate(cost_old(n_win*n_old))
+        read(unit_num, iostat=ios) w, k, bad_value_counter, conv_metric, T_old, U_old, U_prev_old, E_old, &
+             E_prev_old, frozen_old, T_all_old, U_all_old, cost_old, window_iter, window_status, window_metric
+        close(unit_num)
+        if (ios /= 0) then
+            print '(a,a)', " WARNING: Point de reprise tronqué, calcul depuis le début: ", trim(path)
+            w = 1
+            k = 0
+            window_iter = 0
+            window_status = 0
+            window_metric = 0.0
+            return
+        end if
+        found = .true.
+
+        if (n_old == n_slices) then
+            T_n = T_old
+            U_n = U_old
+            U_prev = U_prev_old
+            energy_k = E_old
+            energy_k_prev = E_prev_old
+            frozen = frozen_old
+            T_all = T_all_old
+            U_all = U_all_old
+            cost_all = cost_old
+        else
+            print '(a,i0,a,i0,a)', " Redécoupage du point de reprise: ", n_old, " -> ", n_slices, " tranches"
+            ! Le profil de coût des tranches est propre à l'ancien découpage: il est abandonné
+            cost_all = 0.0
+            T_all = 0.0
+            U_all = 0.0
+            T_all(0) = T_all_old(0)
+            U_all(:, 0) = U_all_old(:, 0)
+
+            ! Fenêtres terminées: RK4 fin depuis la borne convergée qui précède
+            do ww = 1, w - 1
+                call decompose_domain(T_all_old((ww-1)*n_old), T_all_old(ww*n_old), n_slices, &
+                                      T_all((ww-1)*n_slices:ww*n_slices))
+                do n = (ww-1)*n_slices + 1, ww*n_slices
+                    j = preceding_boundary(T_all_old((ww-1)*n_old:ww*n_old), T_all(n)) + (ww-1)*n_old
+                    U_all(:, n) = U_all_old(:, j)
+                    if (T_all(n) - T_all_old(j) > 1.0E-6 * max(1.0, abs(T_all(n)))) &
+                        U_all(:, n) = solve_rk4_interval(T_all_old(j), T_all(n), h_fine, U_all_old(:, j), R, tau)
+                end do
+                T_all(ww*n_slices) = T_all_old(ww*n_old)
+            end do
+
+            ! Fenêtre en cours: itérés redistribués par le propagateur grossier
+            if (k > 0) then
+                call decompose_domain(T_old(0), T_old(n_old), n_slices, T_n)
+                U_n(:, 0) = U_old(:, 0)
+                U_prev(:, 0) = U_prev_old(:, 0)
+                do n = 1, n_slices
+                    j = preceding_boundary(T_old, T_n(n))
+                    U_n(:, n) = U_old(:, j)
+                    U_prev(:, n) = U_prev_old(:, j)
+                    if (T_n(n) - T_old(j) > 1.0E-6 * max(1.0, abs(T_n(n)))) then
+                        U_n(:, n) = propagate_coarse(g_init, T_old(j), T_n(n), h_coarse, U_old(:, j), R, tau)
+                        U_prev(:, n) = propagate_coarse(g_init, T_old(j), T_n(n), h_coarse, U_prev_old(:, j), &
+                                                        R, tau)
+                    end if
+                end do
+                do n = 0, n_slices
+                    energy_k(n) = 0.5 * sum(U_n(:, n)**2)
+                    energy_k_prev(n) = 0.5 * sum(U_prev(:, n)**2)
+                end do
+                frozen = .false.
+                frozen(0) = .true.
+            end if
+        end if
+
+        print '(a,a,a,i0,a,i0)', " Reprise depuis ", trim(path), ": fenêtre ", w, ", itérations terminées: ", k
+        deallocate(T_old, E_old, E_prev_old, frozen_old, U_old, U_prev_old, T_all_old, U_all_old, cost_old)
+    end subroutine checkpoint_read
+
+    integer function preceding_boundary(T_b, t)
+        ! Indice de la dernière borne T_b(j) <= t (à une tolérance relative près)
+        real, dimension(0:), intent(in) :: T_b
+        real, intent(in) :: t
+        integer :: j
+
+        preceding_boundary = 0
+        do j = 1, ubound(T_b, 1)
+            if (T_b(j) > t + 1.0E-6 * max(1.0, abs(t))) exit
+            preceding_boundary = j
+        end do
+    end function preceding_boundary
+
+end module checkpoint
@@ -0,0 +1,393 @@
+module coarse_propagators
+    use derivatives
+    use flow_map, only: flowmap_advance
+    implicit none
+    
+    private
+    public :: propagate_coarse, propagate_with_rk2, propagate_with_ab2, propagate_with_ab3
+    public :: coarse_method_name, parse_coarse_method
+    public :: COARSE_DEFAULT, COARSE_RK2, COARSE_AB2, COARSE_AB3, COARSE_FLOWMAP, COARSE_AUTO, COARSE_INVALID
+    
+    ! Identifiants des propagateurs grossiers disponibles
+    integer, parameter :: COARSE_DEFAULT = 0  ! Combinaison historique (AB3 + RK2 extrapolé)
+    integer, parameter :: COARSE_RK2 = 1
+    integer, parameter :: COARSE_AB2 = 2
+    integer, parameter :: COARSE_AB3 = 3
+    integer, parameter :: COARSE_FLOWMAP = 4  ! Application de flot tabulée (module flow_map)
+    integer, parameter :: COARSE_AUTO = -1    ! Choix par calibration (module coarse_tuning)
+    integer, parameter :: COARSE_INVALID = -2 ! Nom non reconnu par parse_coarse_method
+    
+contains
+    ! Simplified RK2 (midpoint method) - Used for initialization of AB methods
+    function rk2_step(u0, R, tau, dt) result(u_final)
+        ! Runge-Kutta 2nd order method (midpoint method)
+        ! More stable than Euler for approximations
+        real, dimension(3), intent(in) :: u0
+        real, intent(in) :: R, tau, dt
+        real, dimension(3) :: u_final, k1, k2
+        real :: safe_tau, effective_dt
+        
+        ! Check input for NaN/Inf - break infinite loops early
+        if (any(isnan(u0)) .or. any(abs(u0) > 1.0E10)) then
+            ! Return a stable point instead of propagating bad values
+            u_final = [0.0, 0.0, R]
+            return
+        end if
+        
+        ! Use more conservative values for challenging cases
+        ! Adaptation based on tau regimes mentioned in parareal.md
+        safe_tau = max(tau, 0.05)  ! Higher minimum value for stability
+        
+        ! Dynamic step size adaption based on tau value (Section 2.4 of parareal.md)
+        effective_dt = dt
+        if (tau < 1.0) then
+            ! For small tau (Type 1), use much smaller steps
+            effective_dt = min(dt, safe_tau/20.0)
+        else if (tau < 3.0) then
+            ! For moderate tau (Type 2), use moderate steps
+            effective_dt = min(dt, safe_tau/10.0)
+        else
+            ! For larger tau (chaotic/oscillatory), use standard steps with safety
+            effective_dt = min(dt, safe_tau/5.0)
+        end if
+        
+        ! First RK stage
+        call compute_derivatives(u0, R, safe_tau, k1)
+        
+        ! If first stage already has issues, use simpler approach
+        if (any(isnan(k1)) .or. any(abs(k1) > 1.0E4)) then
+            u_final = u0  ! Return original point to stop evolution
+            return
+        end if
+        
+        ! Second RK stage (midpoint) with additional safety
+        call compute_derivatives(u0 + 0.5*effective_dt*k1, R, safe_tau, k2)
+        
+        ! If second stage has issues, fall back to safer Euler
+        if (any(isnan(k2)) .or. any(abs(k2) > 1.0E4)) then
+            ! Use reduced step forward Euler as failsafe
+            u_final = u0 + 0.01 * effective_dt * k1
+        else
+            ! Normal RK2 update with dampening for stability
+            u_final = u0 + effective_dt * k2
+            
+            ! Implement circuit breaker for extreme values
+            if (any(abs(u_final) > 10.0)) then
+                ! For tau < 1.0, dampen the changes heavily
+                if (tau < 1.0) u_final = u0 + 0.01 * (u_final - u0)
+            end if
+        end if
+        
+        ! Final safety check
+        if (any(isnan(u_final)) .or. any(abs(u_final) > 100.0)) then
+            ! Return the stable fixed point for this system
+            u_final = [0.0, 0.0, R]
+        end if
+    end function rk2_step
+    
+    ! Fix for AB2 step - using the u_prev and tau parameters
+    function ab2_step(u_curr, u_prev, f_curr, f_prev, R, tau, dt) result(u_next)
+        ! Adams-Bashforth 2nd order method
+        ! Requires two previous points and their derivatives
+        real, dimension(3), intent(in) :: u_curr, u_prev ! Current and previous state vectors
+        real, dimension(3), intent(in) :: f_curr, f_prev ! Current and previous derivatives
+        real, intent(in) :: R, tau, dt                   ! Parameters and time step
+        real, dimension(3) :: u_next                     ! Next state vector
+        real :: safe_tau
+        
+        ! Ensure tau is not too small
+        safe_tau = max(tau, 1.0E-6)
+        
+        ! AB2 formula: u_{n+1} = u_n + (h/2) * (3*f_n - f_{n-1})
+        u_next = u_curr + (dt/2.0) * (3.0*f_curr - f_prev)
+        
+        ! Safety check for extreme values or NaN
+        if (any(isnan(u_next)) .or. any(abs(u_next) > 1.0E6)) then
+            ! Return a stable point if computation goes wrong
+            u_next = [0.0, 0.0, R]
+        end if
+        
+        ! Additional stability check for small tau values (stiff cases)
+        if (safe_tau < 1.0) then
+            ! Dampen changes for small tau to prevent instabilities
+            u_next = 0.9 * u_curr + 0.1 * u_next
+        end if
+    end function ab2_step
+    
+    ! Improved AB3 step that properly uses all parameters
+    function ab3_step(u_curr, u_prev, u_prev2, f_curr, f_prev, f_prev2, R, tau, dt) result(u_next)
+        ! Adams-Bashforth 3rd order method
+        ! Requires three previous points and their derivatives
+        real, dimension(3), intent(in) :: u_curr, u_prev, u_prev2  ! Current and two previous states
+        real, dimension(3), intent(in) :: f_curr, f_prev, f_prev2  ! Current and two previous derivatives
+        real, intent(in) :: R, tau, dt                             ! Parameters and time step
+        real, dimension(3) :: u_next                               ! Next state vector
+        real :: safe_tau, weight_factor
+        
+        ! Ensure tau is not too small
+        safe_tau = max(tau, 1.0E-6)
+        
+        ! AB3 formula: u_{n+1} = u_n + (h/12) * (23*f_n - 16*f_{n-1} + 5*f_{n-2})
+        u_next = u_curr + (dt/12.0) * (23.0*f_curr - 16.0*f_prev + 5.0*f_prev2)
+        
+        ! Safety check for extreme values or NaN
+        if (any(isnan(u_next)) .or. any(abs(u_next) > 1.0E6)) then
+            ! Return a stable point if computation goes wrong
+            u_next = [0.0, 0.0, R]
+        end if
+        
+        ! Use history for smoothing in chaotic regimes (tau >= 5.0)
+        ! This helps prevent wild oscillations that can lead to divergence
+        if (safe_tau >= 5.0) then
+            ! For chaotic regimes, blend with history to maintain stability
+            ! Create weighted average between current prediction and history
+            weight_factor = min(0.85, 0.3 + 0.1*safe_tau) ! Scales with tau for better results
+            
+            ! Linear combination using past values for stability
+            u_next = weight_factor * u_next + &
+                    (1.0 - weight_factor) * (1.7*u_curr - 0.8*u_prev + 0.1*u_prev2)
+        
+        ! Additional stability checks for small tau values (stiff cases)
+        else if (safe_tau < 1.0) then
+            ! Use weighted average with previous value for stability in stiff cases
+            u_next = 0.85 * u_curr + 0.15 * u_next
+        end if
+        
+        ! Additional stability measures for extreme oscillations
+        if (any(abs(u_next - u_curr) > 5.0)) then
+            ! Limit maximum step size in state space
+            where (abs(u_next - u_curr) > 5.0)
+                u_next = u_curr + sign(5.0, u_next - u_curr)
+            end where
+        end if
+    end function ab3_step
+    
+    ! NEW: Function to propagate a solution using AB2 over an interval
+    function propagate_with_ab2(t0, tf, h, u0, R, tau) result(u_final)
+        ! Propagates the solution from t0 to tf using Adams-Bashforth 2
+        real, intent(in) :: t0, tf, h, R, tau        ! Time interval, step size and parameters
+        real, dimension(3), intent(in) :: u0         ! Initial state
+        real, dimension(3) :: u_final                ! Final state
+        
+        real :: t                                    ! Current time
+        integer :: i, n_steps                        ! Loop variables
+        real, dimension(3) :: u_curr, u_prev         ! Current and previous states
+        real, dimension(3) :: f_curr, f_prev         ! Current and previous derivatives
+        
+        ! Calculate number of steps
+        n_steps = int((tf - t0) / h)
+        if (n_steps < 1) then
+            u_final = u0  ! Return initial state if interval is too small
+            return
+        end if
+        
+        ! Initialize with RK2 for the first step
+        u_prev = u0
+        call compute_derivatives(u_prev, R, tau, f_prev)
+        
+        ! Generate second point using RK2
+        u_curr = rk2_step(u_prev, R, tau, h)
+        call compute_derivatives(u_curr, R, tau, f_curr)
+        
+        ! Now apply AB2 for remaining steps
+        t = t0 + h
+        do i = 2, n_steps
+            ! Apply AB2 step
+            u_final = ab2_step(u_curr, u_prev, f_curr, f_prev, R, tau, h)
+            
+            ! Update for next iteration
+            u_prev = u_curr
+            f_prev = f_curr
+            u_curr = u_final
+            call compute_derivatives(u_curr, R, tau, f_curr)
+            
+            t = t + h
+        end do
+        
+        ! Return the final state
+        u_final = u_curr
+    end function propagate_with_ab2
+    
+    ! Enhanced propagate_with_ab3 function for better accuracy in chaotic regimes
+    function propagate_with_ab3(t0, tf, h, u0, R, tau) result(u_final)
+        ! Propagates the solution from t0 to tf using Adams-Bashforth 3
+        real, intent(in) :: t0, tf, h, R, tau        ! Time interval, step size and parameters
+        real, dimension(3), intent(in) :: u0         ! Initial state
+        real, dimension(3) :: u_final                ! Final state
+        
+        real :: t                                    ! Current time
+        integer :: i, n_steps                        ! Loop variables
+        real, dimension(3) :: u_curr, u_prev, u_prev2  ! Current and previous states
+        real, dimension(3) :: f_curr, f_prev, f_prev2  ! Current and previous derivatives
+        real :: h_internal, h_reduced
+        
+        ! Calculate number of steps
+        n_steps = int((tf - t0) / h)
+        if (n_steps < 2) then  ! Need at least 2 steps for AB3
+            ! Fall back to RK2 for very small intervals
+            u_final = rk2_step(u0, R, tau, tf - t0)
+            return
+        end if
+        
+        ! For chaotic regimes (tau >= 5.0), use smaller internal step size
+        if (tau >= 5.0) then
+            ! Reduce step size for better accuracy in chaotic regimes
+            h_internal = h / 2.0
+            n_steps = n_steps * 2
+        else
+            h_internal = h
+        end if
+        
+        ! Initialize with RK2 for first two steps
+        ! First point is the initial condition
+        u_prev2 = u0
+        call compute_derivatives(u_prev2, R, tau, f_prev2)
+        
+        ! Generate second point using RK2
+        u_prev = rk2_step(u_prev2, R, tau, h_internal)
+        call compute_derivatives(u_prev, R, tau, f_prev)
+        
+        ! Generate third point using RK2
+        u_curr = rk2_step(u_prev, R, tau, h_internal)
+        call compute_derivatives(u_curr, R, tau, f_curr)
+        
+        ! Now apply AB3 for remaining steps
+        t = t0 + 2*h_internal
+        do i = 3, n_steps
+            ! Apply AB3 step
+            u_final = ab3_step(u_curr, u_prev, u_prev2, f_curr, f_prev, f_prev2, R, tau, h_internal)
+            
+            ! Update for next iteration
+            u_prev2 = u_prev
+            f_prev2 = f_prev
+            u_prev = u_curr
+            f_prev = f_curr
+            u_curr = u_final
+            call compute_derivatives(u_curr, R, tau, f_curr)
+            
+            ! Additional stability check for chaotic regimes
+            if (tau >= 5.0 .and. any(isnan(u_curr)) .or. any(abs(u_curr) > 1.0E6)) then
+                ! Reset to previous state and try with reduced step
+                u_curr = u_prev
+                h_reduced = h_internal * 0.5
+                u_final = rk2_step(u_curr, R, tau, h_reduced)
+                u_curr = u_final
+                call compute_derivatives(u_curr, R, tau, f_curr)
+            end if
+            
+            t = t + h_internal
+        end do
+        
+        ! Return the final state
+        u_final = u_curr
+    end function propagate_with_ab3
+    
+    ! New function to propagate with RK2 steps over an interval
+    function propagate_with_rk2(t0, tf, h, u0, R, tau) result(u_final)
+        ! Propagates the solution from t0 to tf using RK2
+        real, intent(in) :: t0, tf, h, R, tau        ! Time interval, step size and parameters
+        real, dimension(3), intent(in) :: u0         ! Initial state
+        real, dimension(3) :: u_final                ! Final state
+        
+        real :: t                                    ! Current time
+        integer :: i, n_steps                        ! Loop variables
+        real, dimension(3) :: u_curr                 ! Current state
+        
+        ! Calculate number of steps
+        n_steps = int((tf - t0) / h)
+        if (n_steps < 1) then
+            u_final = u0  ! Return initial state if interval is too small
+            return
+        end if
+        
+        ! Initialize with initial condition
+        u_curr = u0
+        t = t0
+        
+        ! Apply RK2 step repeatedly
+        do i = 1, n_steps
+            ! Apply RK2 step
+            u_curr = rk2_step(u_curr, R, tau, h)
+            t = t + h
+        end do
+        
+        ! Return the final state
+        u_final = u_curr
+    end function propagate_with_rk2
+    
+    function propagate_coarse(method, t0, tf, h, u0, R, tau) result(u_final)
+        ! Propage la solution de t0 à tf avec le propagateur grossier demandé
+        !
+        ! Arguments:
+        !   method : COARSE_RK2, COARSE_AB2, COARSE_AB3 ou COARSE_FLOWMAP (AB3 sinon)
+        !   t0, tf : Intervalle de temps
+        !   h      : Pas de temps grossier
+        !   u0(3)  : État initial [X0, Y0, Z0]
+        !   R, tau : Paramètres du système
+        integer, intent(in) :: method
+        real, intent(in) :: t0, tf, h, R, tau
+        real, dimension(3), intent(in) :: u0
+        real, dimension(3) :: u_final
+        real :: t_reached
+        
+        select case (method)
+            case (COARSE_RK2)
+                u_final = propagate_with_rk2(t0, tf, h, u0, R, tau)
+            case (COARSE_FLOWMAP)
+                ! Interpolations dans la table, puis RK2 si l'état quitte la table
+                u_final = u0
+                call flowmap_advance(t0, tf, u_final, t_reached)
+                if (t_reached < tf) u_final = propagate_with_rk2(t_reached, tf, h, u_final, R, tau)
+            case (COARSE_AB2)
+                u_final = propagate_with_ab2(t0, tf, h, u0, R, tau)
+            case default
+                u_final = propagate_with_ab3(t0, tf, h, u0, R, tau)
+        end select
+    end function propagate_coarse
+    
+    function coarse_method_name(method) result(name)
+        ! Nom lisible d'un propagateur grossier (pour l'affichage et le cache)
+        integer, intent(in) :: method
+        character(len=8) :: name
+        
+        select case (method)
+            case (COARSE_RK2)
+                name = 'rk2'
+            case (COARSE_AB2)
+                name = 'ab2'
+            case (COARSE_AB3)
+                name = 'ab3'
+            case (COARSE_FLOWMAP)
+                name = 'flowmap'
+            case (COARSE_AUTO)
+                name = 'auto'
+            case default
+                name = 'default'
+        end select
+    end function coarse_method_name
+    
+    function parse_coarse_method(name) result(method)
+        ! Convertit 'default', 'rk2', 'ab2', 'ab3', 'flowmap' ou 'auto' en identifiant
+        ! (COARSE_INVALID pour un nom inconnu)
+        character(len=*), intent(in) :: name
+        integer :: method
+        
+        select case (trim(name))
+            case ('rk2')
+                method = COARSE_RK2
+            case ('ab2')
+                method = COARSE_AB2
+            case ('ab3')
+                method = COARSE_AB3
+            case ('flowmap')
+                method = COARSE_FLOWMAP
+            case ('auto')
+                method = COARSE_AUTO
+            case ('default')
+                method = COARSE_DEFAULT
+            case default
+                method = COARSE_INVALID
+        end select
+    end function parse_coarse_method
+
+end module coarse_propagators
@@ -0,0 +1,216 @@
+module coarse_tuning
+    use mpi
+    use coarse_propagators
+    use rk4_solver, only: solve_rk4_interval
+    implicit none
+
+    private
+    public :: tune_coarse_propagator
+
+    ! Fichier de cache des choix de propagateur, une ligne par régime
+    character(len=*), parameter :: CACHE_DIR = 'output/tuning'
+    character(len=*), parameter :: CACHE_FILE = 'output/tuning/coarse_cache.dat'
+
+    ! Horizon maximal des solves de calibration (les coûts sont extrapolés à Delta_T)
+    real, parameter :: CAL_HORIZON = 5.0
+    ! Nombre de répétitions pour chronométrer les propagateurs grossiers
+    integer, parameter :: N_REPEAT = 20
+    ! Nombre de pas grossiers candidats (h_coarse_max, /2, /4, /8)
+    integer, parameter :: N_STEP_CANDIDATES = 4
+
+contains
+
+    subroutine tune_coarse_propagator(R, tau, u0, h_fine, h_coarse_max, Delta_T, n_slices, tol, &
+                                      method, h_coarse)
+        ! Choisit le propagateur grossier (RK2/AB2/AB3) et le pas h_coarse qui
+        ! minimisent le temps total estimé de Parareal pour le régime (R, tau).
+        !
+        ! Pour chaque candidat, on mesure sur un court horizon de calibration:
+        !   - le coût t_G du propagateur grossier et t_F du propagateur fin (RK4)
+        !   - le facteur de contraction rho = |(F-G)(u+d) - (F-G)(u)| / |d|
+        ! puis on estime K = log(tol)/log(rho) (borné par n_slices) et
+        !   temps total ~ (K+1) * n_slices * t_G + K * t_F
+        !
+        ! Le choix est mis en cache par (R, tau, h_fine, h_coarse_max, Delta_T, n_slices) dans
+        ! output/tuning/coarse_cache.dat et réutilisé lors des exécutions suivantes.
+        !
+        ! Arguments:
+        !   R, tau       : Paramètres du système
+        !   u0(3)        : État initial utilisé pour la calibration
+        !   h_fine       : Pas de temps fin
+        !   h_coarse_max : Plus grand pas grossier autorisé
+        !   Delta_T      : Longueur d'un sous-intervalle Parareal
+        !   n_slices     : Nombre de sous-intervalles
+        !   tol          : Tolérance de convergence de Parareal
+        !   method       : Résultat - propagateur choisi (COARSE_RK2/AB2/AB3)
+        !   h_coarse     : Résultat - pas grossier choisi
+
+        real, intent(in) :: R, tau, h_fine, h_coarse_max, Delta_T, tol
+        real, dimension(3), intent(in) :: u0
+        integer, intent(in) :: n_slices
+        integer, intent(out) :: method
+        real, intent(out) :: h_coarse
+
+        integer, dimension(3), parameter :: candidates = [COARSE_RK2, COARSE_AB2, COARSE_AB3]
+        real, dimension(3) :: u_pert, delta, f_ref, f_pert, g_ref, g_pert
+        real :: t_cal, scale, rho, est_iter, est_time
+        double precision :: t_start, t_fine, t_coarse
+        real :: best_time, h_try, best_iter
+        integer :: i, j, i_rep
+        logical :: found
+
+        call read_cache(R, tau, h_fine, h_coarse_max, Delta_T, n_slices, found, method, h_coarse)
+        if (found) then
+            print '(a,a,a,f10.6,a)', " Propagateur grossier (cache): ", trim(coarse_method_name(method)), &
+                  ", h_coarse = ", h_coarse, " (output/tuning/coarse_cache.dat)"
+            return
+        end if
+
+        print *, "Calibration des propagateurs grossiers..."
+
+        ! Horizon de calibration et facteur d'extrapolation des coûts
+        t_cal = min(Delta_T, CAL_HORIZON)
+        scale = Delta_T / t_cal
+
+        ! Perturbation relative de l'état initial pour mesurer la contraction
+        delta = 1.0E-3 * max(1.0, maxval(abs(u0)))
+        u_pert = u0 + delta
+
+        ! Référence fine (RK4), chronométrée une seule fois
+        t_start = MPI_Wtime()
+        f_ref = solve_rk4_interval(0.0, t_cal, h_fine, u0, R, tau)
+        t_fine = (MPI_Wtime() - t_start) * dble(scale)
+        f_pert = solve_rk4_interval(0.0, t_cal, h_fine, u_pert, R, tau)
+
+        best_time = huge(1.0)
+        best_iter = real(n_slices)
+        method = COARSE_AB3
+        h_coarse = h_coarse_max
+
+        print '(a)', "   Méthode   h_coarse      t_G (s)      rho      K est.   Temps est. (s)"
+        do i = 1, size(candidates)
+            h_try = h_coarse_max
+            do j = 1, N_STEP_CANDIDATES
+                if (h_try <= 2.0 * h_fine) exit
+
+                ! Coût du propagateur grossier sur une tranche complète
+                t_start = MPI_Wtime()
+                do i_rep = 1, N_REPEAT
+                    g_ref = propagate_coarse(candidates(i), 0.0, t_cal, h_try, u0, R, tau)
+                end do
+                t_coarse = (MPI_Wtime() - t_start) / N_REPEAT * dble(scale)
+                g_pert = propagate_coarse(candidates(i), 0.0, t_cal, h_try, u_pert, R, tau)
+
+                ! Contraction de l'erreur Parareal: Lipschitz de F - G
+                rho = sqrt(sum(((f_pert - g_pert) - (f_ref - g_ref))**2)) / sqrt(sum(delta**2))
+                if (any(isnan(g_ref)) .or. any(isnan(g_pert)) .or. isnan(rho)) rho = huge(1.0)
+
+                ! Nombre d'itérations estimé, borné par le nombre de tranches
+                if (rho < 1.0 .and. rho > 0.0) then
+                    est_iter = min(real(n_slices), max(1.0, real(ceiling(log(tol) / log(rho)))))
+                else if (rho <= 0.0) then
+                    est_iter = 1.0
+                else
+                    est_iter = real(n_slices)
+                end if
+
+                est_time = real((est_iter + 1.0) * n_slices * t_coarse + est_iter * t_fine)
+                print '(3x,a8,f10.6,es13.4,es10.2,f8.1,es15.4)', coarse_method_name(candidates(i)), &
+                      h_try, t_coarse, rho, est_iter, est_time
+
+                if (est_time < best_time) then
+                    best_time = est_time
+                    best_iter = est_iter
+                    method = candidates(i)
+                    h_coarse = h_try
+                end if
+
+                h_try = h_try / 2.0
+            end do
+        end do
+
+        print '(a,a,a,f10.6,a,f5.1,a)', " Propagateur grossier choisi: ", trim(coarse_method_name(method)), &
+              ", h_coarse = ", h_coarse, " (K estimé = ", best_iter, ")"
+
+        call write_cache(R, tau, h_fine, h_coarse_max, Delta_T, n_slices, method, h_coarse, best_iter, best_time)
+    end subroutine tune_coarse_propagator
+
+    logical function same_value(a, b)
+        ! Comparaison relative des clés réelles du cache
+        real, intent(in) :: a, b
+        same_value = abs(a - b) <= 1.0E-5 * max(abs(a), abs(b), 1.0E-6)
+    end function same_value
+
+    subroutine read_cache(R, tau, h_fine, h_coarse_max, Delta_T, n_slices, found, method, h_coarse)
+        ! Cherche un choix déjà calibré pour ce régime dans le fichier de cache.
+        ! Les lignes illisibles (ancien format sans h_coarse_max) sont ignorées.
+        real, intent(in) :: R, tau, h_fine, h_coarse_max, Delta_T
+        integer, intent(in) :: n_slices
+        logical, intent(out) :: found
+        integer, intent(out) :: method
+        real, intent(out) :: h_coarse
+
+        real :: c_R, c_tau, c_h_fine, c_h_max, c_delta_T, c_h_coarse, c_iter, c_time
+        integer :: c_slices, unit_num, ios
+        character(len=8) :: c_name
+        logical :: exists
+
+        found = .false.
+        method = COARSE_AB3
+        h_coarse = 0.0
+
+        inquire(file=CACHE_FILE, exist=exists)
+        if (.not. exists) return
+
+        open(newunit=unit_num, file=CACHE_FILE, status='old', action='read', iostat=ios)
+        if (ios /= 0) return
+        read(unit_num, *, iostat=ios)  ! En-tête
+
+        do
+            read(unit_num, *, iostat=ios) c_R, c_tau, c_h_fine, c_h_max, c_delta_T, c_slices, &
+                                          c_name, c_h_coarse, c_iter, c_time
+            if (ios < 0) exit
+            if (ios > 0) cycle
+            if (same_value(c_R, R) .and. same_value(c_tau, tau) .and. same_value(c_h_fine, h_fine) &
+                .and. same_value(c_h_max, h_coarse_max) .and. same_value(c_delta_T, Delta_T) &
+                .and. c_slices == n_slices) then
+                ! La dernière entrée correspondante l'emporte
+                found = .true.
+                method = parse_coarse_method(c_name)
+                h_coarse = c_h_coarse
+            end if
+        end do
+        close(unit_num)
+
+        if (found .and. (method == COARSE_DEFAULT .or. method == COARSE_INVALID .or. h_coarse <= 0.0)) &
+            found = .false.
+    end subroutine read_cache
+
+    subroutine write_cache(R, tau, h_fine, h_coarse_max, Delta_T, n_slices, method, h_coarse, est_iter, est_time)
+        ! Ajoute le choix calibré au fichier de cache
+        real, intent(in) :: R, tau, h_fine, h_coarse_max, Delta_T, h_coarse, est_iter, est_time
+        integer, intent(in) :: n_slices, method
+
+        integer :: unit_num, ios
+        logical :: exists
+
+        call system('mkdir -p ' // CACHE_DIR)
+        inquire(file=CACHE_FILE, exist=exists)
+
+        if (exists) then
+            open(newunit=unit_num, file=CACHE_FILE, status='old', position='append', action='write', iostat=ios)
+        else
+            open(newunit=unit_num, file=CACHE_FILE, status='new', action='write', iostat=ios)
+            if (ios == 0) write(unit_num, '(a)') "R tau h_fine h_coarse_max delta_T n_slices method h_coarse est_iter est_time"
+        end if
+        if (ios /= 0) then
+            print *, "WARNING: Impossible d'écrire le cache de calibration ", CACHE_FILE
+            return
+        end if
+
+        write(unit_num, '(5es14.6, i6, 1x, a8, 3es14.6)') R, tau, h_fine, h_coarse_max, Delta_T, n_slices, &
+              coarse_method_name(method), h_coarse, est_iter, est_time
+        close(unit_num)
+    end subroutine write_cache
+
+end module coarse_tuning
@@ -0,0 +1,412 @@
+"""
+Modèle de coût des exécutions RK4 et Parareal (temps, itérations, mémoire).
+
+Chaque exécution de lorenz_solver ajoute une ligne à output/history/runs.csv
+(méthode, paramètres, nombre de processus et de threads, itérations, temps
+mesuré, mémoire maximale). Le modèle apprend de cet historique et des
+résultats de `make benchmark_extended` (output/benchmark/benchmark_results.csv)
+pour prévoir le coût d'une exécution avant de la lancer:
+  - RK4: temps = a + b * (tf / h);
+  - Parareal: temps = c0 + b * travail fin + c2 * travail grossier + c3 * sortie dense,
+    en nombre de pas effectifs (mêmes règles de pas que parareal_solver), avec
+        travail fin      = K * (tf / n_fenêtres) / (h_fin * P) * max(1, P / coeurs)
+        travail grossier = (2 K / n_fenêtres + 1) * tf / h_grossier
+        sortie dense     = 10 * min(tf, 60) / h_fin
+    où P est le nombre de tranches et K le nombre total d'itérations. Le coût d'un
+    pas fin est celui d'un pas de RK4 mesuré (b): ajusté librement, il tendait vers 0
+    et le gain prévu croissait sans limite avec tf. Le gain est de plus borné par
+    P / (K / n_fenêtres), celui d'un Parareal sans coût grossier ni communication;
+  - K: médiane des K plus proches voisins de l'historique en (tau, P, h_grossier/h_fin);
+  - mémoire: a + b * nombre de pas fins, par méthode.
+Seules les exécutions de même R et, pour Parareal, de même propagateur grossier
+que la prévision demandée sont utilisées (--R, --coarse; valeurs par défaut du
+solveur sinon). Les coefficients sont ajustés par moindres carrés positifs. L'incertitude est
+l'erreur relative quadratique moyenne de l'ajustement; la durée à réserver
+pour un job est la prévision majorée de deux fois cette erreur. Sans données
+suffisantes, des valeurs a priori sont utilisées (avec un avertissement).
+
+Usage:
+    python cost_model.py fit
+    python cost_model.py predict --tau 5.0 --h 0.001 --h-coarse 0.01 --tf 500 --np 4
+    python cost_model.py recommend --tau 5.0 --h 0.001 --h-coarse 0.01 --tf 500 [--max-np 16]
+    python cost_model.py --R 4.0 --coarse flowmap predict ...
+"""
+import argparse
+import csv
+import math
+import os
+
+import numpy as np
+from scipy.optimize import nnls
+
+HISTORY_FILE = 'output/history/runs.csv'
+BENCHMARK_FILE = 'output/benchmark/benchmark_results.csv'
+
+# Configuration de `make benchmark_extended`: tau = 5, 5 processus, h_grossier = 10 h
+BENCHMARK_TAU = 5.0
+BENCHMARK_NP = 5
+BENCHMARK_COARSE_RATIO = 10.0
+
+# Valeurs par défaut du solveur (param.f90, --coarse)
+DEFAULT_R = 2.5
+DEFAULT_COARSE = 'default'
+COARSE_METHODS = ('default', 'rk2', 'ab2', 'ab3', 'flowmap', 'auto')
+
+# Paramètres de parareal_solver
+MAX_ITER = 20
+DENSE_T_MAX = 60.0
+DENSE_REFINEMENT = 10
+
+# Parareal n'est recommandé qu'au-delà de ce gain prévu
+MIN_SPEEDUP = 1.1
+# Nombre de voisins pour la prévision des itérations
+N_NEIGHBOURS = 5
+
+# Coefficients a priori (secondes, secondes par pas, Mo, Mo par pas)
+PRIOR_RK4 = np.array([0.01, 3.0e-6])
+PRIOR_PARAREAL = np.array([0.05, 3.0e-6, 1.5e-6, 3.0e-6])
+PRIOR_MEMORY = np.array([15.0, 2.0e-5])
+PRIOR_REL_ERROR = 0.5
+
+
+def effective_steps(tau, h, h_coarse):
+    """
+    Pas effectifs (grossier, fin) imposés par parareal_solver selon tau
+
+    Args:
+        tau (float): Paramètre de retard
+        h (float): Pas fin demandé
+        h_coarse (float): Pas grossier demandé
+
+    Returns:
+        tuple: (h_grossier, h_fin) effectivement utilisés
+    """
+    if tau < 1.0:
+        return min(h_coarse, tau / 20.0), min(h, tau / 200.0)
+    if tau < 3.0:
+        return min(h_coarse, tau / 10.0), min(h, tau / 100.0)
+    if tau < 6.0:
+        return min(h_coarse, 0.1), min(h, 0.01)
+    return min(h_coarse, 0.2), min(h, 0.01)
+
+
+def _float(value):
+    """Valeur numérique d'un champ CSV (None si vide ou invalide)"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def load_history(history_file=HISTORY_FILE, benchmark_file=BENCHMARK_FILE):
+    """
+    Charge l'historique des exécutions et les résultats de benchmark
+
+    Args:
+        history_file (str): Historique écrit par lorenz_solver
+        benchmark_file (str): Résultats de `make benchmark_extended`
+
+    Returns:
+        list: Exécutions (dict: method, R, coarse, tau, h, h_coarse, tf, ranks,
+              threads, window, iterations, wall_time, peak_mb; None si inconnu)
+    """
+    records = []
+    if os.path.exists(history_file):
+        with open(history_file, 'r') as f:
+            for row in csv.DictReader(f):
+                wall_time = _float(row.get('wall_time'))
+                if row.get('method') not in ('rk4', 'parareal') or not wall_time or wall_time <= 0:
+                    continue
+                peak_mb = _float(row.get('peak_mb'))
+                records.append({
+                    'method': row['method'], 'R': _float(row.get('R')) or DEFAULT_R,
+                    'coarse': row.get('coarse') or DEFAULT_COARSE, 'tau': _float(row['tau']), 'h': _float(row['h']),
+                    'h_coarse': _float(row['h_coarse']), 'tf': _float(row['tf']),
+                    'ranks': int(row['ranks']), 'threads': int(row['threads']),
+                    'window': _float(row.get('window')) or 0.0,
+                    'iterations': int(row['iterations']) if row['method'] == 'parareal' else None,
+                    'wall_time': wall_time, 'peak_mb': peak_mb if peak_mb and peak_mb > 0 else None})
+
+    if os.path.exists(benchmark_file):
+        with open(benchmark_file, 'r') as f:
+            for row in csv.DictReader(f):
+                tf, h = _float(row.get('tf')), _float(row.get('h'))
+                if not tf or not h:
+                    continue
+                common = {'R': DEFAULT_R, 'coarse': DEFAULT_COARSE, 'tau': BENCHMARK_TAU, 'h': h, 'h_coarse': BENCHMARK_COARSE_RATIO * h, 'tf': tf,
+                          'threads': 1, 'window': 0.0, 'iterations': None, 'peak_mb': None}
+                rk4_time, para_time = _float(row.get('rk4_time')), _float(row.get('parareal_time'))
+                if rk4_time and rk4_time > 0:
+                    records.append(dict(common, method='rk4', ranks=1, wall_time=rk4_time))
+                if para_time and para_time > 0:
+                    records.append(dict(common, method='parareal', ranks=BENCHMARK_NP, wall_time=para_time))
+    return records
+
+
+def _n_windows(tf, window):
+    """Nombre de fenêtres Parareal (comme parareal_solver, t0 = 0)"""
+    if window <= 0.0 or window >= tf:
+        return 1
+    return max(1, math.ceil(tf / window - 1.0e-4))
+
+
+def _rel_rms(X, y, coeffs):
+    """Erreur relative quadratique moyenne d'un ajustement"""
+    return float(np.sqrt(np.mean(((X @ coeffs - y) / y) ** 2)))
+
+
+def _fit(X, y, prior, label, fixed=None):
+    """
+    Ajustement positif pondéré en erreur relative, ou valeurs a priori si
+    les données sont insuffisantes
+
+    Args:
+        fixed (dict, optional): Coefficients imposés {indice: valeur}, non ajustés
+
+    Returns:
+        tuple: (coefficients, erreur relative, nombre de points)
+    """
+    X, y = np.asarray(X, dtype=float).reshape(len(y), len(prior)), np.asarray(y, dtype=float)
+    fixed = fixed or {}
+    free = [j for j in range(len(prior)) if j not in fixed]
+    if len(y) < len(free) + 2:
+        print(f"Avertissement: {len(y)} exécution(s) {label} dans l'historique, "
+              f"coefficients a priori utilisés")
+        coeffs = prior.copy()
+        for j, value in fixed.items():
+            coeffs[j] = value
+        return coeffs, PRIOR_REL_ERROR, len(y)
+    coeffs = np.zeros(len(prior))
+    for j, value in fixed.items():
+        coeffs[j] = value
+    # Pondération 1/y: minimise l'erreur relative plutôt que l'erreur absolue
+    coeffs[free], _ = nnls(X[:, free] / y[:, None], 1.0 - X @ coeffs / y)
+    return coeffs, _rel_rms(X, y, coeffs), len(y)
+
+
+class CostModel:
+    """Prévision du temps, des itérations et de la mémoire des exécutions"""
+
+    def __init__(self, records=None, cores=None, R=DEFAULT_R, coarse=DEFAULT_COARSE):
+        """
+        Args:
+            records (list, optional): Exécutions (load_history() par défaut)
+            cores (int, optional): Cœurs disponibles (os.cpu_count() par défaut)
+            R (float): Amplitude R des exécutions modélisées
+            coarse (str): Propagateur grossier des exécutions Parareal modélisées
+        """
+        records = load_history() if records is None else records
+        self.R, self.coarse = R, coarse
+        # Itérations et coûts dépendent de R et du propagateur grossier: pas de mélange
+        self.records = [r for r in records if math.isclose(r['R'], R, rel_tol=1.0e-5)
+                        and (r['method'] == 'rk4' or r['coarse'] == coarse)]
+        self.cores = cores or os.cpu_count() or 1
+        self.fit()
+
+    def _slices(self, record):
+        return record['ranks'] * max(1, record['threads'])
+
+    def _rk4_features(self, tf, h):
+        return [1.0, tf / h]
+
+    def _parareal_features(self, tau, h, h_coarse, tf, slices, iterations, window=0.0):
+        hc, hf = effective_steps(tau, h, h_coarse)
+        n_win = _n_windows(tf, window)
+        oversubscription = max(1.0, slices / self.cores)
+        return [1.0,
+                iterations * (tf / n_win) / (hf * slices) * oversubscription,
+                (2.0 * iterations / n_win + 1.0) * tf / hc,
+                DENSE_REFINEMENT * min(tf, DENSE_T_MAX) / hf]
+
+    def fit(self):
+        """Ajuste les modèles de temps et de mémoire sur l'historique"""
+        rk4 = [r for r in self.records if r['method'] == 'rk4']
+        parareal = [r for r in self.records if r['method'] == 'parareal']
+        self._iteration_data = np.array(
+            [[r['tau'], self._slices(r), r['h_coarse'] / r['h'], r['iterations'] / _n_windows(r['tf'], r['window'])]
+             for r in parareal if r['iterations']], dtype=float).reshape(-1, 4)
+
+        self.rk4_coeffs, self.rk4_error, self.n_rk4 = _fit(
+            [self._rk4_features(r['tf'], r['h']) for r in rk4], [r['wall_time'] for r in rk4],
+            PRIOR_RK4, 'RK4')
+
+        X = []
+        for r in parareal:
+            iterations = r['iterations'] or self.predict_iterations(r['tau'], r['h'], r['h_coarse'], r['tf'],
+                                                                     self._slices(r), r['window'])
+            X.append(self._parareal_features(r['tau'], r['h'], r['h_coarse'], r['tf'], self._slices(r),
+                                             iterations, r['window']))
+        # Pas fin de Parareal = pas de RK4 mesuré
+        self.parareal_coeffs, self.parareal_error, self.n_parareal = _fit(
+            X, [r['wall_time'] for r in parareal], PRIOR_PARAREAL, 'Parareal', fixed={1: self.rk4_coeffs[1]})
+
+        self.memory_coeffs = {}
+        for method, runs in (('rk4', rk4), ('parareal', parareal)):
+            runs = [r for r in runs if r['peak_mb']]
+            steps = [[1.0, r['tf'] / effective_steps(r['tau'], r['h'], r['h_coarse'])[1]
+                      if method == 'parareal' else r['tf'] / r['h']] for r in runs]
+            if len(runs) >= 4:
+                self.memory_coeffs[method], _ = nnls(np.array(steps), np.array([r['peak_mb'] for r in runs]))
+            else:
+                self.memory_coeffs[method] = PRIOR_MEMORY.copy()
+        return self
+
+    def predict_iterations(self, tau, h, h_coarse, tf, np_total, window=0.0):
+        """
+        Nombre total d'itérations Parareal prévu (toutes fenêtres)
+
+        Médiane des N_NEIGHBOURS exécutions les plus proches en (tau, log P,
+        log h_grossier/h_fin); à défaut d'historique, K = min(P, MAX_ITER).
+        """
+        n_win = _n_windows(tf, window)
+        data = self._iteration_data
+        if len(data) == 0:
+            return n_win * min(np_total, MAX_ITER)
+        distance = (np.abs(data[:, 0] - tau) / max(tau, 0.1)
+                    + np.abs(np.log(data[:, 1] / np_total))
+                    + np.abs(np.log(data[:, 2] / (h_coarse / h))))
+        nearest = np.argsort(distance)[:N_NEIGHBOURS]
+        per_window = float(np.median(data[nearest, 3]))
+        return n_win * min(per_window, min(np_total, MAX_ITER))
+
+    def predict(self, tau, h, h_coarse, tf, np_total, window=0.0):
+        """
+        Prévision pour une exécution
+
+        Args:
+            tau (float): Paramètre de retard
+            h (float): Pas fin (pas de RK4)
+            h_coarse (float): Pas grossier de Parareal
+            tf (float): Temps final
+            np_total (int): Nombre de tranches Parareal (processus x threads)
+            window (float): Longueur des fenêtres (0 = une seule fenêtre)
+
+        Returns:
+            dict: Temps, itérations, mémoire, gain prévu et durées à réserver
+        """
+        rk4_time = float(np.dot(self.rk4_coeffs, self._rk4_features(tf, h)))
+        iterations = self.predict_iterations(tau, h, h_coarse, tf, np_total, window)
+        parareal_time = float(np.dot(self.parareal_coeffs,
+                                     self._parareal_features(tau, h, h_coarse, tf, np_total, iterations, window)))
+        # Gain borné par P / K (K itérations par fenêtre, chacune avec un solve fin de la tranche)
+        max_speedup = np_total * _n_windows(tf, window) / max(iterations, 1.0)
+        parareal_time = max(parareal_time, rk4_time / max_speedup)
+        fine_steps = tf / effective_steps(tau, h, h_coarse)[1]
+        return {
+            'rk4_time': rk4_time,
+            'rk4_error': self.rk4_error,
+            'rk4_request': rk4_time * (1.0 + 2.0 * self.rk4_error),
+            'rk4_memory_mb': float(np.dot(self.memory_coeffs['rk4'], [1.0, tf / h])),
+            'parareal_time': parareal_time,
+            'parareal_error': self.parareal_error,
+            'parareal_request': parareal_time * (1.0 + 2.0 * self.parareal_error),
+            'parareal_memory_mb': float(np.dot(self.memory_coeffs['parareal'], [1.0, fine_steps])),
+            'iterations': iterations,
+            'speedup': rk4_time / parareal_time if parareal_time > 0 else 0.0,
+        }
+
+    def recommend(self, tau, h, h_coarse, tf, candidates=None, window=0.0):
+        """
+        Meilleure configuration parmi RK4 et Parareal à np tranches
+
+        Args:
+            candidates (list, optional): Nombres de tranches essayés
+                (2 à 2 * coeurs par défaut)
+
+        Returns:
+            dict: method ('rk4' ou 'parareal'), np (1 pour RK4), parareal_np
+                  (meilleur nombre de tranches), sa prévision et celles de
+                  tous les candidats
+        """
+        candidates = candidates or list(range(2, 2 * self.cores + 1))
+        predictions = {n: self.predict(tau, h, h_coarse, tf, n, window) for n in candidates}
+        best_np = min(predictions, key=lambda n: predictions[n]['parareal_time'])
+        best = predictions[best_np]
+        use_parareal = best['speedup'] > MIN_SPEEDUP
+        return {'method': 'parareal' if use_parareal else 'rk4', 'np': best_np if use_parareal else 1,
+                'parareal_np': best_np, 'prediction': best, 'candidates': predictions}
+
+    def break_even(self, tau, h, h_coarse, np_total, tf_max=1.0e5):
+        """
+        Plus petit temps final à partir duquel Parareal à np_total tranches
+        est prévu plus rapide que RK4 (gain > MIN_SPEEDUP), None sinon
+        """
+        for tf in np.geomspace(1.0, tf_max, 101):
+            if self.predict(tau, h, h_coarse, tf, np_total)['speedup'] > MIN_SPEEDUP:
+                return float(tf)
+        return None
+
+    def summary(self):
+        """Résumé des ajustements"""
+        return (f"R = {self.R:g}, propagateur grossier {self.coarse}\n"
+                f"RK4: {self.n_rk4} exécutions, erreur relative {100 * self.rk4_error:.0f} %, "
+                f"{1e6 * self.rk4_coeffs[1]:.2f} µs/pas\n"
+                f"Parareal: {self.n_parareal} exécutions, erreur relative {100 * self.parareal_error:.0f} %, "
+                f"fin {1e6 * self.parareal_coeffs[1]:.2f} µs/pas, grossier {1e6 * self.parareal_coeffs[2]:.2f} µs/pas, "
+                f"sortie dense {1e6 * self.parareal_coeffs[3]:.2f} µs/pas, "
+                f"{len(self._iteration_data)} exécutions avec itérations connues")
+
+
+def format_prediction(prediction, np_total):
+    """Texte d'une prévision (predict)"""
+    return (f"RK4: {prediction['rk4_time']:.3f} s (± {100 * prediction['rk4_error']:.0f} %, "
+            f"réserver {prediction['rk4_request']:.3f} s), {prediction['rk4_memory_mb']:.1f} Mo\n"
+            f"Parareal ({np_total} tranches): {prediction['parareal_time']:.3f} s "
+            f"(± {100 * prediction['parareal_error']:.0f} %, réserver {prediction['parareal_request']:.3f} s), "
+            f"{prediction['iterations']:.1f} itérations, {prediction['parareal_memory_mb']:.1f} Mo par processus\n"
+            f"Accélération prévue: {prediction['speedup']:.2f}x")
+
+
+def parse_command_line():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Runtime, iteration and memory model for solver runs',
+                                     allow_abbrev=False)
+    parser.add_argument('--history', default=HISTORY_FILE, help='Run history written by lorenz_solver')
+    parser.add_argument('--benchmark', default=BENCHMARK_FILE, help='benchmark_extended results')
+    parser.add_argument('--cores', type=int, help='Available cores (default: this machine)')
+    parser.add_argument('--R', type=float, default=DEFAULT_R, help='Wave amplitude R of the modelled runs')
+    parser.add_argument('--coarse', choices=COARSE_METHODS, default=DEFAULT_COARSE,
+                        help='Coarse propagator of the modelled Parareal runs')
+    subparsers = parser.add_subparsers(dest='command', help='Command to execute')
+
+    subparsers.add_parser('fit', help='Fit the model and show its coefficients and error')
+
+    for name, help_text in (('predict', 'Predict RK4 and Parareal cost of a run'),
+                            ('recommend', 'Choose between RK4 and Parareal and the number of slices')):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument('--tau', type=float, required=True, help='Delay parameter')
+        sub.add_argument('--h', type=float, required=True, help='Fine (RK4) time step')
+        sub.add_argument('--h-coarse', type=float, help='Coarse time step (default: 10 h)')
+        sub.add_argument('--tf', type=float, required=True, help='Final time')
+        sub.add_argument('--window', type=float, default=0.0, help='Parareal window length (0 = none)')
+        if name == 'predict':
+            sub.add_argument('--np', type=int, required=True, help='Parareal slices (ranks x threads)')
+        else:
+            sub.add_argument('--max-np', type=int, help='Largest number of slices tried (default: 2 x cores)')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_command_line()
+    model = CostModel(load_history(args.history, args.benchmark), cores=args.cores, R=args.R, coarse=args.coarse)
+
+    if args.command in ('predict', 'recommend'):
+        h_coarse = args.h_coarse or BENCHMARK_COARSE_RATIO * args.h
+
+    if args.command == 'fit':
+        print(model.summary())
+    elif args.command == 'predict':
+        print(format_prediction(model.predict(args.tau, args.h, h_coarse, args.tf, args.np, args.window), args.np))
+    elif args.command == 'recommend':
+        max_np = args.max_np or 2 * model.cores
+        choice = model.recommend(args.tau, args.h, h_coarse, args.tf, list(range(2, max_np + 1)), args.window)
+        print(format_prediction(choice['prediction'], choice['parareal_np']))
+        if choice['method'] == 'parareal':
+            print(f"Recommandation: Parareal avec {choice['np']} tranches "
+                  f"(réserver {choice['prediction']['parareal_request']:.3f} s)")
+        else:
+            print(f"Recommandation: RK4 (réserver {choice['prediction']['rk4_request']:.3f} s), "
+                  f"Parareal ne dépasse pas {MIN_SPEEDUP:.1f}x")
+    else:
+        print("Commande requise: fit, predict ou recommend (voir --help)")
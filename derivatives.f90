@@ -1,5 +1,6 @@
 ! filepath: /home/yanel/PA/Lorenz-RK4/derivatives.f90
 module derivatives
+    use profiler, only: prof_enabled, deriv_calls
     implicit none
     
     private
@@ -23,6 +24,12 @@ contains
         ! Prevent division by zero or very small tau values
         real :: safe_tau
         
+        ! Compteur d'appels (--profile): un simple test quand le profilage est inactif
+        if (prof_enabled) then
+            !$omp atomic
+            deriv_calls = deriv_calls + 1
+        end if
+        
         ! Check for NaN or infinity in inputs first
         if (any(isnan(u)) .or. any(abs(u) > 1.0E30)) then
             ! Input already contains NaN or Inf - return zeros to break the loop
@@ -3,7 +3,11 @@ module domain_decomposition
     implicit none
     
     private
-    public :: decompose_domain
+    public :: decompose_domain, decompose_domain_balanced
+    public :: load_slice_profile, save_slice_profile, PROFILE_KEY_SIZE
+    
+    ! Clé du problème d'un profil de coût: tf, R, h_fine, nombre de tranches
+    integer, parameter :: PROFILE_KEY_SIZE = 4
     
 contains
 
@@ -33,4 +37,175 @@ contains
         
     end subroutine decompose_domain
 
+    subroutine decompose_domain_balanced(t0, tf, N, M, T_prof, cost_prof, T_n)
+        ! Divise [t0, tf] en N sous-intervalles de coût fin égal, à partir d'un
+        ! profil de coût mesuré lors d'itérations ou d'exécutions précédentes
+        !
+        ! Le coût est supposé uniforme à l'intérieur de chaque tranche du profil
+        ! (densité cost_prof(j) / longueur). Hors du profil, on utilise la densité
+        ! moyenne. Les bornes sont placées aux quantiles i/N du coût cumulé.
+        !
+        ! Arguments:
+        !   t0, tf       : Intervalle temporel
+        !   N            : Nombre de sous-intervalles voulus
+        !   M            : Nombre de tranches du profil
+        !   T_prof(0:M)  : Bornes des tranches du profil
+        !   cost_prof(M) : Coût mesuré de chaque tranche (secondes)
+        !   T_n(0:N)     : Points de découpage résultants
+        
+        real, intent(in) :: t0, tf
+        integer, intent(in) :: N, M
+        real, dimension(0:M), intent(in) :: T_prof
+        real, dimension(M), intent(in) :: cost_prof
+        real, dimension(0:N), intent(out) :: T_n
+        
+        real, dimension(:), allocatable :: t_edge, density
+        real :: mean_density, total_cost, target_cost, acc, seg_cost
+        integer :: i, j, n_seg
+        
+        ! Profil inutilisable: découpage uniforme
+        if (M < 1 .or. sum(cost_prof) <= 0.0 .or. T_prof(M) <= T_prof(0)) then
+            call decompose_domain(t0, tf, N, T_n)
+            return
+        end if
+        
+        mean_density = sum(cost_prof) / (T_prof(M) - T_prof(0))
+        
+        ! Segments: [t0, T_prof(0)], tranches du profil, [T_prof(M), tf]
+        allocate(t_edge(0:M+2), density(M+2))
+        t_edge(0) = t0
+        t_edge(1) = min(max(T_prof(0), t0), tf)
+        density(1) = mean_density
+        do j = 1, M
+            t_edge(j+1) = min(max(T_prof(j), t0), tf)
+            if (T_prof(j) > T_prof(j-1)) then
+                density(j+1) = max(cost_prof(j), 0.0) / (T_prof(j) - T_prof(j-1))
+            else
+                density(j+1) = mean_density
+            end if
+            ! Éviter les densités nulles qui produiraient des tranches infinies
+            density(j+1) = max(density(j+1), 1.0E-3 * mean_density)
+        end do
+        t_edge(M+2) = tf
+        density(M+2) = mean_density
+        n_seg = M + 2
+        
+        total_cost = 0.0
+        do j = 1, n_seg
+            total_cost = total_cost + density(j) * (t_edge(j) - t_edge(j-1))
+        end do
+        
+        ! Placement des bornes aux quantiles du coût cumulé
+        T_n(0) = t0
+        T_n(N) = tf
+        j = 1
+        acc = 0.0
+        do i = 1, N-1
+            target_cost = total_cost * real(i) / real(N)
+            do while (j < n_seg)
+                seg_cost = density(j) * (t_edge(j) - t_edge(j-1))
+                if (acc + seg_cost >= target_cost) exit
+                acc = acc + seg_cost
+                j = j + 1
+            end do
+            T_n(i) = t_edge(j-1) + (target_cost - acc) / density(j)
+            T_n(i) = min(max(T_n(i), T_n(i-1)), tf)
+        end do
+        
+        deallocate(t_edge, density)
+    end subroutine decompose_domain_balanced
+
+    subroutine save_slice_profile(filename, N, T_n, cost, key)
+        ! Enregistre le coût fin mesuré par tranche pour les exécutions suivantes
+        !
+        ! Format: "# tf R h_fine n_slices" (clé du problème), une ligne d'en-tête
+        ! puis "t_debut t_fin cout" par tranche
+        
+        character(len=*), intent(in) :: filename
+        integer, intent(in) :: N
+        real, dimension(0:N), intent(in) :: T_n
+        real, dimension(N), intent(in) :: cost
+        real, dimension(PROFILE_KEY_SIZE), intent(in) :: key
+        
+        integer :: i, unit_num, ios
+        
+        open(newunit=unit_num, file=trim(filename), status='replace', action='write', iostat=ios)
+        if (ios /= 0) then
+            print *, "WARNING: Impossible d'écrire le profil de coût ", trim(filename)
+            return
+        end if
+        write(unit_num, '(a,4es16.8)') "#", key
+        write(unit_num, '(a)') "t_start t_end cost"
+        do i = 1, N
+            write(unit_num, '(3es16.8)') T_n(i-1), T_n(i), cost(i)
+        end do
+        close(unit_num)
+    end subroutine save_slice_profile
+
+    subroutine load_slice_profile(filename, key, M, T_prof, cost_prof, found)
+        ! Relit un profil de coût écrit par save_slice_profile. Un profil enregistré
+        ! pour un autre problème (clé différente ou absente) est ignoré.
+        !
+        ! Arguments:
+        !   filename     : Fichier de profil
+        !   key          : Clé du problème courant (tf, R, h_fine, nombre de tranches)
+        !   M            : Résultat - nombre de tranches lues
+        !   T_prof(0:M)  : Résultat - bornes des tranches (allouées ici)
+        !   cost_prof(M) : Résultat - coût de chaque tranche (alloué ici)
+        !   found        : Résultat - .true. si un profil valide a été lu
+        
+        character(len=*), intent(in) :: filename
+        real, dimension(PROFILE_KEY_SIZE), intent(in) :: key
+        integer, intent(out) :: M
+        real, dimension(:), allocatable, intent(out) :: T_prof, cost_prof
+        logical, intent(out) :: found
+        
+        real :: t_start, t_end, c
+        real, dimension(PROFILE_KEY_SIZE) :: saved_key
+        character(len=200) :: line
+        integer :: i, unit_num, ios
+        logical :: exists
+        
+        found = .false.
+        M = 0
+        inquire(file=trim(filename), exist=exists)
+        if (.not. exists) return
+        
+        open(newunit=unit_num, file=trim(filename), status='old', action='read', iostat=ios)
+        if (ios /= 0) return
+        
+        ! Clé du problème enregistré
+        read(unit_num, '(a)', iostat=ios) line
+        if (ios == 0 .and. line(1:1) == '#') read(line(2:), *, iostat=ios) saved_key
+        if (ios /= 0 .or. line(1:1) /= '#') then
+            saved_key = -1.0
+        end if
+        if (any(abs(saved_key - key) > 1.0E-5 * max(abs(saved_key), abs(key), 1.0E-6))) then
+            print '(a,a,a)', " WARNING: Profil de coût ", trim(filename), &
+                  " enregistré pour un autre problème (tf, R, h_fine ou nombre de tranches), ignoré"
+            close(unit_num)
+            return
+        end if
+        
+        ! Premier passage: compter les tranches
+        read(unit_num, *, iostat=ios)
+        do
+            read(unit_num, *, iostat=ios) t_start, t_end, c
+            if (ios /= 0) exit
+            M = M + 1
+        end do
+        
+        if (M > 0) then
+            allocate(T_prof(0:M), cost_prof(M))
+            rewind(unit_num)
+            read(unit_num, *)
+            read(unit_num, *)
+            do i = 1, M
+                read(unit_num, *) T_prof(i-1), T_prof(i), cost_prof(i)
+            end do
+            found = .true.
+        end if
+        close(unit_num)
+    end subroutine load_slice_profile
+
 end module domain_decomposition
\ No newline at end of file
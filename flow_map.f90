@@ -0,0 +1,275 @@
+module flow_map
+    ! Propagateur grossier tabulé: application de flot sur une grille régulière
+    !
+    ! Pour un régime (R, tau) fixé, l'état après une durée fixe delta est précalculé
+    ! une fois pour tous les nœuds d'une grille régulière couvrant l'attracteur (RK4
+    ! au pas fin). Une propagation grossière se réduit alors à des interpolations
+    ! trilinéaires successives dans la table, sans évaluer les dérivées. La durée
+    ! delta divise la longueur des tranches Parareal (au plus FLOWMAP_MAX_STEP).
+    !
+    ! La table est construite en parallèle (nœuds répartis entre les processus),
+    ! puis mise en cache sur disque par (R, tau, delta, résolution, pas de
+    ! construction h_build, condition initiale u0 qui délimite la boîte) dans
+    ! output/flowmap/. Seul le processus 0, qui effectue les propagations
+    ! grossières de Parareal, la conserve en mémoire.
+    use mpi
+    use rk4_solver, only: solve_rk4_interval
+    implicit none
+
+    private
+    public :: flowmap_prepare, flowmap_advance, flowmap_report, flowmap_release
+
+    character(len=*), parameter :: CACHE_DIR = 'output/flowmap'
+    integer, parameter :: CACHE_MAGIC = 20241121  ! En-tête avec h_build et u0
+
+    ! Nombre d'intervalles de la grille par axe (FLOWMAP_CELLS+1 nœuds)
+    integer, parameter :: FLOWMAP_CELLS = 32
+    ! Durée maximale d'une application tabulée (les tranches plus longues en enchaînent plusieurs)
+    real, parameter :: FLOWMAP_MAX_STEP = 1.0
+    ! Horizon de la trajectoire qui délimite la boîte, et marge relative autour de celle-ci
+    real, parameter :: BOUNDS_HORIZON = 50.0
+    real, parameter :: BOUNDS_MARGIN = 0.15
+
+    real, dimension(:,:,:,:), allocatable :: table   ! (3, 0:n, 0:n, 0:n)
+    real, dimension(3) :: lo = 0.0, hi = 0.0, spacing = 1.0
+    real :: step = 0.0
+    integer :: n_cells = 0
+    integer(8) :: n_lookups = 0, n_fallbacks = 0
+
+contains
+
+    subroutine flowmap_prepare(R, tau, Delta_T, h_build, u0)
+        ! Charge la table du régime depuis le cache, ou la construit sur tous les processus
+        !
+        ! Arguments:
+        !   R, tau  : Paramètres du système
+        !   Delta_T : Longueur d'une tranche Parareal (delta = Delta_T / k)
+        !   h_build : Pas RK4 utilisé pour construire la table
+        !   u0(3)   : Condition initiale (incluse dans la boîte)
+        real, intent(in) :: R, tau, Delta_T, h_build
+        real, dimension(3), intent(in) :: u0
+
+        integer :: rank, num_procs, ierr, node, n_nodes, i, j, l
+        logical :: found
+        real, dimension(3) :: x
+        real, dimension(:,:,:,:), allocatable :: partial
+        real(8) :: t_start
+        character(len=256) :: cache_file
+
+        call MPI_Comm_rank(MPI_COMM_WORLD, rank, ierr)
+        call MPI_Comm_size(MPI_COMM_WORLD, num_procs, ierr)
+
+        n_cells = FLOWMAP_CELLS
+        step = Delta_T / real(max(1, ceiling(Delta_T / FLOWMAP_MAX_STEP)))
+        n_lookups = 0
+        n_fallbacks = 0
+        cache_file = flowmap_cache_file(R, tau, step, n_cells, h_build)
+        if (allocated(table)) deallocate(table)
+
+        found = .false.
+        if (rank == 0) then
+            allocate(table(3, 0:n_cells, 0:n_cells, 0:n_cells))
+            call read_table(cache_file, R, tau, h_build, u0, found)
+            if (found) then
+                print '(a,a)', " Application de flot (cache): ", trim(cache_file)
+                if (any(u0 < lo) .or. any(u0 > hi)) then
+                    print *, "WARNING: condition initiale hors de la table, propagation RK2 jusqu'à y entrer"
+                end if
+            else
+                call attractor_bounds(R, tau, h_build, u0)
+            end if
+        end if
+        call MPI_Bcast(found, 1, MPI_LOGICAL, 0, MPI_COMM_WORLD, ierr)
+        if (found) return
+
+        ! Construction: les nœuds sont répartis cycliquement entre les processus
+        call MPI_Bcast(lo, 3, MPI_REAL, 0, MPI_COMM_WORLD, ierr)
+        call MPI_Bcast(hi, 3, MPI_REAL, 0, MPI_COMM_WORLD, ierr)
+        spacing = (hi - lo) / real(n_cells)
+        if (rank == 0) print '(a,i0,a,f8.4,a,i0,a)', " Construction de l'application de flot: ", &
+              (n_cells + 1)**3, " nœuds, delta = ", step, " (", num_procs, " processus)..."
+        t_start = MPI_Wtime()
+
+        allocate(partial(3, 0:n_cells, 0:n_cells, 0:n_cells))
+        partial = 0.0
+        n_nodes = (n_cells + 1)**3
+        do node = rank, n_nodes - 1, num_procs
+            i = mod(node, n_cells + 1)
+            j = mod(node / (n_cells + 1), n_cells + 1)
+            l = node / (n_cells + 1)**2
+            x = lo + spacing * real([i, j, l])
+            partial(:, i, j, l) = solve_rk4_interval(0.0, step, h_build, x, R, tau)
+        end do
+        if (rank == 0) then
+            call MPI_Reduce(MPI_IN_PLACE, partial, 3*n_nodes, MPI_REAL, MPI_SUM, 0, MPI_COMM_WORLD, ierr)
+            table = partial
+        else
+            call MPI_Reduce(partial, x, 3*n_nodes, MPI_REAL, MPI_SUM, 0, MPI_COMM_WORLD, ierr)
+        end if
+        deallocate(partial)
+
+        if (rank == 0) then
+            print '(a,f8.3,a)', " Application de flot construite en ", MPI_Wtime() - t_start, " s"
+            call write_table(cache_file, R, tau, h_build, u0)
+        end if
+    end subroutine flowmap_prepare
+
+    subroutine flowmap_advance(t0, tf, u, t)
+        ! Avance u à partir de t0 par applications tabulées successives, tant que
+        ! l'état reste dans la boîte et qu'une application complète tient avant tf.
+        ! En sortie, t est le temps atteint (t0 si aucune application n'a été faite);
+        ! l'appelant termine l'intervalle [t, tf] avec un propagateur classique.
+        real, intent(in) :: t0, tf
+        real, dimension(3), intent(inout) :: u
+        real, intent(out) :: t
+
+        real, dimension(3) :: s, w
+        integer, dimension(3) :: c
+        integer :: k, n_apply
+
+        t = t0
+        if (.not. allocated(table)) return
+        n_apply = int((tf - t0) / step + 1.0E-3)
+        do k = 1, n_apply
+            s = (u - lo) / spacing
+            if (any(isnan(s)) .or. any(s < 0.0) .or. any(s > real(n_cells))) then
+                n_fallbacks = n_fallbacks + 1
+                return
+            end if
+            c = min(int(s), n_cells - 1)
+            w = s - real(c)
+
+            ! Interpolation trilinéaire dans la cellule c
+            u = (1.0 - w(3)) * ((1.0 - w(2)) * ((1.0 - w(1)) * table(:, c(1), c(2), c(3)) &
+                                               + w(1) * table(:, c(1)+1, c(2), c(3))) &
+                              + w(2) * ((1.0 - w(1)) * table(:, c(1), c(2)+1, c(3)) &
+                                        + w(1) * table(:, c(1)+1, c(2)+1, c(3)))) &
+              + w(3) * ((1.0 - w(2)) * ((1.0 - w(1)) * table(:, c(1), c(2), c(3)+1) &
+                                        + w(1) * table(:, c(1)+1, c(2), c(3)+1)) &
+                        + w(2) * ((1.0 - w(1)) * table(:, c(1), c(2)+1, c(3)+1) &
+                                  + w(1) * table(:, c(1)+1, c(2)+1, c(3)+1)))
+            t = t0 + k * step
+            n_lookups = n_lookups + 1
+        end do
+        ! Une application exacte à 1e-3 près couvre tout l'intervalle
+        if (abs(tf - t) < 1.0E-3 * step) t = tf
+    end subroutine flowmap_advance
+
+    subroutine flowmap_report()
+        ! Statistiques d'utilisation de la table (processus 0)
+        if (.not. allocated(table)) return
+        print '(a,i0,a,i0,a)', " Application de flot: ", n_lookups, " interpolations, ", n_fallbacks, &
+              " sorties de la table (complétées par RK2)"
+    end subroutine flowmap_report
+
+    subroutine flowmap_release()
+        ! Libère la table
+        if (allocated(table)) deallocate(table)
+    end subroutine flowmap_release
+
+    subroutine attractor_bounds(R, tau, h, u0)
+        ! Boîte englobant la trajectoire issue de u0 sur BOUNDS_HORIZON, élargie de
+        ! BOUNDS_MARGIN de son étendue de chaque côté
+        real, intent(in) :: R, tau, h
+        real, dimension(3), intent(in) :: u0
+        real, dimension(3) :: u, extent
+        real, parameter :: chunk = 0.05
+        integer :: i
+
+        u = u0
+        lo = u0
+        hi = u0
+        do i = 1, nint(BOUNDS_HORIZON / chunk)
+            u = solve_rk4_interval(0.0, chunk, h, u, R, tau)
+            if (any(isnan(u))) exit
+            lo = min(lo, u)
+            hi = max(hi, u)
+        end do
+        extent = max(hi - lo, 1.0E-2 * max(1.0, maxval(abs(hi))))
+        lo = lo - BOUNDS_MARGIN * extent
+        hi = hi + BOUNDS_MARGIN * extent
+    end subroutine attractor_bounds
+
+    function flowmap_cache_file(R, tau, delta, cells, h_build) result(path)
+        ! Nom du fichier de cache d'un régime
+        real, intent(in) :: R, tau, delta, h_build
+        integer, intent(in) :: cells
+        character(len=256) :: path
+        character(len=20) :: h_label
+
+        write(h_label, '(es10.3)') h_build
+        write(path, '(8a,i0,3a)') CACHE_DIR, '/flowmap_R', trim(fixed(R)), '_tau', trim(fixed(tau)), &
+              '_dt', trim(fixed(delta)), '_n', cells, '_h', trim(adjustl(h_label)), '.bin'
+    end function flowmap_cache_file
+
+    function fixed(x) result(s)
+        ! Réel à 4 décimales, avec le zéro initial ('0.5000' et non '.5000')
+        real, intent(in) :: x
+        character(len=20) :: s
+
+        write(s, '(f0.4)') x
+        if (s(1:1) == '.') s = '0' // trim(s)
+    end function fixed
+
+    logical function same_value(a, b)
+        ! Comparaison relative des clés réelles du cache
+        real, intent(in) :: a, b
+        same_value = abs(a - b) <= 1.0E-5 * max(abs(a), abs(b), 1.0E-6)
+    end function same_value
+
+    subroutine read_table(path, R, tau, h_build, u0, found)
+        ! Lit la table si le fichier existe et correspond au régime demandé, au même
+        ! pas de construction et à la même condition initiale (boîte échantillonnée)
+        character(len=*), intent(in) :: path
+        real, intent(in) :: R, tau, h_build
+        real, dimension(3), intent(in) :: u0
+        logical, intent(out) :: found
+
+        integer :: unit_num, ios, c_magic, c_cells, i
+        real :: c_R, c_tau, c_step, c_h
+        real, dimension(3) :: c_u0
+        logical :: exists, same_u0
+
+        found = .false.
+        inquire(file=path, exist=exists)
+        if (.not. exists) return
+
+        open(newunit=unit_num, file=path, access='stream', form='unformatted', status='old', &
+             action='read', iostat=ios)
+        if (ios /= 0) return
+        read(unit_num, iostat=ios) c_magic, c_cells, c_R, c_tau, c_step, c_h, c_u0, lo, hi
+        same_u0 = .true.
+        do i = 1, 3
+            same_u0 = same_u0 .and. same_value(c_u0(i), u0(i))
+        end do
+        if (ios == 0 .and. c_magic == CACHE_MAGIC .and. c_cells == n_cells .and. same_value(c_R, R) &
+            .and. same_value(c_tau, tau) .and. same_value(c_step, step) .and. same_value(c_h, h_build) &
+            .and. same_u0) then
+            read(unit_num, iostat=ios) table
+            found = (ios == 0)
+            spacing = (hi - lo) / real(n_cells)
+        end if
+        close(unit_num)
+    end subroutine read_table
+
+    subroutine write_table(path, R, tau, h_build, u0)
+        ! Enregistre la table, sa boîte et sa clé (h_build, u0) dans le cache
+        character(len=*), intent(in) :: path
+        real, intent(in) :: R, tau, h_build
+        real, dimension(3), intent(in) :: u0
+        integer :: unit_num, ios
+
+        call system('mkdir -p ' // CACHE_DIR)
+        open(newunit=unit_num, file=path, access='stream', form='unformatted', status='replace', &
+             action='write', iostat=ios)
+        if (ios /= 0) then
+            print *, "WARNING: Impossible d'écrire le cache de l'application de flot ", trim(path)
+            return
+        end if
+        write(unit_num) CACHE_MAGIC, n_cells, R, tau, step, h_build, u0, lo, hi
+        write(unit_num) table
+        close(unit_num)
+        print '(a,a)', " Application de flot enregistrée dans: ", trim(path)
+    end subroutine write_table
+
+end module flow_map
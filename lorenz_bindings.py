@@ -0,0 +1,266 @@
+"""
+Liaisons Python en mémoire vers les intégrateurs Fortran (liblorenz.so).
+
+Plutôt que de lancer lorenz_solver, d'attendre l'écriture de output/*.dat
+puis de relire le texte avec plotter.read_data, ce module appelle directement
+les routines Fortran compilées dans une bibliothèque partagée (make
+liblorenz.so, interface bind(C) de lorenz_capi.f90):
+  - derivatives: second membre de derivatives.f90 pour un ou plusieurs états;
+  - rk4_trajectory: trajectoire de solve_rk4, tableau [t, X, Y, Z] comme
+    read_data, mais sans formatage ni analyse de texte;
+  - rk4_interval: états finaux de solve_rk4_interval (plusieurs conditions
+    initiales en un appel);
+  - rk4_average_x: moyenne de X de solve_rk4_and_average_x (balayages en R);
+  - propagate_coarse: propagateurs grossiers rk2, ab2 et ab3 de Parareal.
+
+Les tableaux NumPy float32 contigus sont passés par adresse: la bibliothèque
+lit et écrit directement dans leur mémoire, sans copie. ctypes relâche le GIL
+pendant chaque appel; un ThreadPoolExecutor exécute donc réellement plusieurs
+intégrations en parallèle (voir scan_average_x).
+
+Le chemin de la bibliothèque peut être imposé par la variable d'environnement
+LORENZ_LIB (par défaut: liblorenz.so à côté de ce fichier).
+
+Usage:
+    make liblorenz.so
+    python lorenz_bindings.py check --tau 5.0 --h 0.01 --tf 100
+    python lorenz_bindings.py scan --tau 5.0 --r-min 0.0 --r-max 5.0 --n-r 64 --workers 4
+"""
+import argparse
+import ctypes
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from numpy.ctypeslib import ndpointer
+
+R_DEFAULT = 2.5  # param.f90
+LIB_NAME = 'liblorenz.so'
+COARSE_METHODS = ('rk2', 'ab2', 'ab3')
+
+_lib = None
+
+_f32 = ctypes.c_float
+_int = ctypes.c_int
+_states = ndpointer(np.float32, flags='C_CONTIGUOUS')
+
+
+def load_library(path=None):
+    """
+    Charge liblorenz.so et déclare les signatures des fonctions (une seule fois).
+
+    Args:
+        path (str, optional): Chemin de la bibliothèque (LORENZ_LIB ou liblorenz.so à côté du module)
+
+    Returns:
+        ctypes.CDLL: Bibliothèque chargée
+    """
+    global _lib
+    if _lib is not None and path is None:
+        return _lib
+    path = path or os.environ.get('LORENZ_LIB') or os.path.join(os.path.dirname(os.path.abspath(__file__)), LIB_NAME)
+    if not os.path.exists(path):
+        raise OSError(f"Bibliothèque introuvable: {path} (compiler avec 'make liblorenz.so')")
+    lib = ctypes.CDLL(path)
+
+    lib.lorenz_derivatives.argtypes = [_int, _states, _f32, _f32, _states]
+    lib.lorenz_derivatives.restype = None
+    lib.lorenz_rk4_trajectory.argtypes = [_f32, _f32, _f32, _f32, _states, _int, _states]
+    lib.lorenz_rk4_trajectory.restype = None
+    lib.lorenz_rk4_interval.argtypes = [_int, _states, _f32, _f32, _f32, _f32, _f32, _states]
+    lib.lorenz_rk4_interval.restype = None
+    lib.lorenz_rk4_average_x.argtypes = [_f32, _f32, _f32, _f32, _f32, _f32, _states,
+                                         ctypes.POINTER(_f32), _states]
+    lib.lorenz_rk4_average_x.restype = _int
+    lib.lorenz_propagate_coarse.argtypes = [_int, _int, _states, _f32, _f32, _f32, _f32, _f32, _states]
+    lib.lorenz_propagate_coarse.restype = None
+    lib.lorenz_coarse_method.argtypes = [ctypes.c_char_p, _int]
+    lib.lorenz_coarse_method.restype = _int
+
+    _lib = lib
+    return lib
+
+
+def _as_states(u):
+    """Convertit des états en tableau float32 contigu de forme (n, 3), sans copie si possible"""
+    u = np.ascontiguousarray(u, dtype=np.float32)
+    if u.shape[-1] != 3:
+        raise ValueError(f"Les états doivent avoir 3 composantes (forme reçue: {u.shape})")
+    return u.reshape(-1, 3)
+
+
+def derivatives(u, tau, R=R_DEFAULT):
+    """
+    Dérivées [dX/dt, dY/dt, dZ/dt] (compute_derivatives).
+
+    Args:
+        u (array_like): État (3,) ou états (n, 3)
+        tau (float): Paramètre de mémoire
+        R (float): Paramètre d'amplitude
+
+    Returns:
+        numpy.ndarray: Dérivées, même forme que u (float32)
+    """
+    states = _as_states(u)
+    f = np.empty_like(states)
+    load_library().lorenz_derivatives(len(states), states, R, tau, f)
+    return f.reshape(np.shape(u))
+
+
+def rk4_trajectory(tau, h, tf, u0=(1.0, 0.0, 0.0), R=R_DEFAULT, t0=0.0, out=None):
+    """
+    Trajectoire RK4 complète, mêmes pas que solve_rk4 (int((tf - t0) / h) pas).
+
+    Args:
+        tau (float): Paramètre de mémoire
+        h (float): Pas de temps
+        tf (float): Temps final
+        u0 (array_like): Condition initiale [X0, Y0, Z0]
+        R (float): Paramètre d'amplitude
+        t0 (float): Temps initial
+        out (numpy.ndarray, optional): Tableau float32 (n_steps + 1, 4) à remplir en place
+
+    Returns:
+        numpy.ndarray: Tableau [t, X, Y, Z] (float32), comme plotter.read_data
+    """
+    n_steps = int((np.float32(tf) - np.float32(t0)) / np.float32(h))
+    if out is None:
+        out = np.empty((n_steps + 1, 4), dtype=np.float32)
+    elif out.shape != (n_steps + 1, 4) or out.dtype != np.float32 or not out.flags.c_contiguous:
+        raise ValueError(f"'out' doit être un tableau float32 contigu de forme {(n_steps + 1, 4)}")
+    load_library().lorenz_rk4_trajectory(R, tau, t0, h, _as_states(u0), n_steps, out)
+    return out
+
+
+def rk4_interval(u0, tau, h, tf, R=R_DEFAULT, t0=0.0):
+    """
+    États finaux après intégration RK4 sur [t0, tf] (solve_rk4_interval).
+
+    Args:
+        u0 (array_like): Condition initiale (3,) ou conditions initiales (n, 3)
+
+    Returns:
+        numpy.ndarray: États finaux, même forme que u0
+    """
+    states = _as_states(u0)
+    final = np.empty_like(states)
+    load_library().lorenz_rk4_interval(len(states), states, R, tau, t0, tf, h, final)
+    return final.reshape(np.shape(u0))
+
+
+def rk4_average_x(R, tau, tf, t_transient, h, u0=(1.0, 0.0, 0.0), t0=0.0):
+    """
+    Moyenne de X après le transitoire (solve_rk4_and_average_x).
+
+    Returns:
+        tuple: (moyenne de X ou nan si instable, état final (3,))
+    """
+    avg_x = _f32()
+    final = np.empty(3, dtype=np.float32)
+    error = load_library().lorenz_rk4_average_x(R, tau, t0, tf, t_transient, h, _as_states(u0),
+                                                ctypes.byref(avg_x), final)
+    return (float('nan') if error else avg_x.value), final
+
+
+def propagate_coarse(method, u0, tau, h, t0, tf, R=R_DEFAULT):
+    """
+    Propagation grossière de Parareal (propagate_coarse).
+
+    Args:
+        method (str): 'rk2', 'ab2' ou 'ab3'
+        u0 (array_like): État (3,) ou états (n, 3)
+        tau (float): Paramètre de mémoire
+        h (float): Pas grossier
+        t0, tf (float): Intervalle de temps
+        R (float): Paramètre d'amplitude
+
+    Returns:
+        numpy.ndarray: États propagés, même forme que u0
+    """
+    if method not in COARSE_METHODS:
+        raise ValueError(f"Propagateur grossier inconnu: {method} (choix: {', '.join(COARSE_METHODS)})")
+    lib = load_library()
+    method_id = lib.lorenz_coarse_method(method.encode(), len(method))
+    states = _as_states(u0)
+    final = np.empty_like(states)
+    lib.lorenz_propagate_coarse(method_id, len(states), states, R, tau, t0, tf, h, final)
+    return final.reshape(np.shape(u0))
+
+
+def scan_average_x(r_values, tau, tf=500.0, t_transient=100.0, h=0.01, u0=(1.0, 0.0, 0.0), workers=None):
+    """
+    Moyenne de X pour chaque valeur de R (balayage de Refine), les intégrations
+    étant réparties sur un pool de threads (le GIL est relâché pendant les appels).
+
+    Returns:
+        numpy.ndarray: Moyennes de X (nan pour les intégrations instables)
+    """
+    load_library()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda r: rk4_average_x(r, tau, tf, t_transient, h, u0)[0], r_values)
+        return np.array(list(results))
+
+
+def parse_command_line():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='In-process Python bindings to the Fortran integrators')
+    subparsers = parser.add_subparsers(dest='command', help='Command to execute')
+
+    check_parser = subparsers.add_parser('check', help='Compare an in-process RK4 run with the solver output file')
+    check_parser.add_argument('--tau', type=float, default=5.0, help='Memory parameter tau')
+    check_parser.add_argument('--h', type=float, default=0.01, help='Time step')
+    check_parser.add_argument('--tf', type=float, default=100.0, help='Final time')
+    check_parser.add_argument('--solver', type=str, default='./lorenz_solver', help='Solver executable')
+
+    scan_parser = subparsers.add_parser('scan', help='Mean X as a function of R on a thread pool')
+    scan_parser.add_argument('--tau', type=float, default=5.0, help='Memory parameter tau')
+    scan_parser.add_argument('--r-min', type=float, default=0.0, help='First R value')
+    scan_parser.add_argument('--r-max', type=float, default=5.0, help='Last R value')
+    scan_parser.add_argument('--n-r', type=int, default=64, help='Number of R values')
+    scan_parser.add_argument('--tf', type=float, default=500.0, help='Final time')
+    scan_parser.add_argument('--t-transient', type=float, default=100.0, help='Start of the average')
+    scan_parser.add_argument('--h', type=float, default=0.01, help='Time step')
+    scan_parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Number of threads')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_command_line()
+
+    if args.command == 'check':
+        from plotter import read_data
+
+        prefix = os.path.join('output', 'bindings', f'rk4_tau{args.tau:.1f}')
+        os.makedirs(os.path.dirname(prefix), exist_ok=True)
+        start = time.perf_counter()
+        subprocess.run([args.solver, 'rk4', str(args.tau), str(args.h), str(args.tf), '1.0', '0.0', '0.0',
+                        f'--output={prefix}'], check=True, stdout=subprocess.DEVNULL)
+        from_file = read_data(prefix + '.dat', use_cache=False)
+        t_file = time.perf_counter() - start
+
+        start = time.perf_counter()
+        in_memory = rk4_trajectory(args.tau, args.h, args.tf)
+        t_memory = time.perf_counter() - start
+
+        diff = np.max(np.abs(from_file - in_memory)) if from_file.shape == in_memory.shape else float('inf')
+        print(f"Points: fichier {len(from_file)}, mémoire {len(in_memory)}")
+        print(f"Écart maximal (précision des fichiers texte: 5e-7): {diff:.2e}")
+        print(f"Solveur + lecture du fichier: {t_file:.3f} s, appel en mémoire: {t_memory:.3f} s "
+              f"(x{t_file / max(t_memory, 1e-9):.1f})")
+        if diff > 1e-5:
+            raise SystemExit("Les trajectoires diffèrent")
+    elif args.command == 'scan':
+        r_values = np.linspace(args.r_min, args.r_max, args.n_r)
+        timings = {}
+        for workers in sorted({1, args.workers}):
+            start = time.perf_counter()
+            averages = scan_average_x(r_values, args.tau, args.tf, args.t_transient, args.h, workers=workers)
+            timings[workers] = time.perf_counter() - start
+        print("       R      <X>")
+        for r, avg in zip(r_values, averages):
+            print(f"{r:8.4f} {avg:9.5f}")
+        print(f"Balayage de {args.n_r} valeurs: " +
+              ", ".join(f"{w} thread(s) {t:.3f} s" for w, t in timings.items()) +
+              (f" (x{timings[1] / timings[args.workers]:.2f})" if args.workers > 1 else ""))
@@ -0,0 +1,96 @@
+module lorenz_capi
+    ! Interface C (bind(C)) des intégrateurs, compilée dans la bibliothèque partagée
+    ! liblorenz.so et utilisée par lorenz_bindings.py
+    !
+    ! Les tableaux sont passés par adresse et remplis en place: un tableau NumPy
+    ! float32 contigu (ordre C) de forme (n, 3) ou (n+1, 4) correspond ici à un
+    ! tableau Fortran (3, n) ou (4, 0:n), sans copie. Les fonctions n'utilisent
+    ! que des variables locales et peuvent être appelées depuis plusieurs threads.
+    use iso_c_binding
+    use derivatives, only: compute_derivatives
+    use rk4_solver, only: solve_rk4_interval, solve_rk4_trajectory, solve_rk4_and_average_x
+    use coarse_propagators, only: propagate_coarse, parse_coarse_method
+    implicit none
+
+    private
+
+contains
+
+    subroutine c_derivatives(n, u, R, tau, f) bind(C, name='lorenz_derivatives')
+        ! Dérivées de n états
+        integer(c_int), value :: n
+        real(c_float), intent(in) :: u(3, n)
+        real(c_float), value :: R, tau
+        real(c_float), intent(out) :: f(3, n)
+        integer :: i
+
+        do i = 1, n
+            call compute_derivatives(u(:, i), R, tau, f(:, i))
+        end do
+    end subroutine c_derivatives
+
+    subroutine c_rk4_trajectory(R, tau, t0, h, u0, n_steps, traj) bind(C, name='lorenz_rk4_trajectory')
+        ! Trajectoire RK4 complète (n_steps+1 lignes [t, X, Y, Z]), comme solve_rk4
+        real(c_float), value :: R, tau, t0, h
+        real(c_float), intent(in) :: u0(3)
+        integer(c_int), value :: n_steps
+        real(c_float), intent(out) :: traj(4, 0:n_steps)
+
+        call solve_rk4_trajectory(R, tau, t0, h, u0, n_steps, traj)
+    end subroutine c_rk4_trajectory
+
+    subroutine c_rk4_interval(n, u0, R, tau, t0, tf, h, u_final) bind(C, name='lorenz_rk4_interval')
+        ! États finaux après intégration RK4 de n conditions initiales sur [t0, tf]
+        integer(c_int), value :: n
+        real(c_float), intent(in) :: u0(3, n)
+        real(c_float), value :: R, tau, t0, tf, h
+        real(c_float), intent(out) :: u_final(3, n)
+        integer :: i
+
+        do i = 1, n
+            u_final(:, i) = solve_rk4_interval(t0, tf, h, u0(:, i), R, tau)
+        end do
+    end subroutine c_rk4_interval
+
+    function c_rk4_average_x(R, tau, t0, tf, t_transient, h, u0, avg_x, final_u) result(error_flag) &
+            bind(C, name='lorenz_rk4_average_x')
+        ! Moyenne de X après le transitoire (0 si OK, 1 si instabilité)
+        real(c_float), value :: R, tau, t0, tf, t_transient, h
+        real(c_float), intent(in) :: u0(3)
+        real(c_float), intent(out) :: avg_x, final_u(3)
+        integer(c_int) :: error_flag
+        integer :: flag
+
+        call solve_rk4_and_average_x(R, tau, t0, tf, t_transient, h, u0, avg_x, final_u, flag)
+        error_flag = flag
+    end function c_rk4_average_x
+
+    subroutine c_propagate_coarse(method, n, u0, R, tau, t0, tf, h, u_final) bind(C, name='lorenz_propagate_coarse')
+        ! Propagation grossière de n états (COARSE_RK2, COARSE_AB2 ou COARSE_AB3)
+        integer(c_int), value :: method, n
+        real(c_float), intent(in) :: u0(3, n)
+        real(c_float), value :: R, tau, t0, tf, h
+        real(c_float), intent(out) :: u_final(3, n)
+        integer :: i
+
+        do i = 1, n
+            u_final(:, i) = propagate_coarse(method, t0, tf, h, u0(:, i), R, tau)
+        end do
+    end subroutine c_propagate_coarse
+
+    function c_coarse_method(name, length) result(method) bind(C, name='lorenz_coarse_method')
+        ! Identifiant d'un propagateur grossier à partir de son nom ('rk2', 'ab2', ...)
+        character(kind=c_char), intent(in) :: name(*)
+        integer(c_int), value :: length
+        integer(c_int) :: method
+        character(len=16) :: fname
+        integer :: i
+
+        fname = ''
+        do i = 1, min(int(length), len(fname))
+            fname(i:i) = name(i)
+        end do
+        method = parse_coarse_method(fname)
+    end function c_coarse_method
+
+end module lorenz_capi
@@ -0,0 +1,285 @@
+"""
+Exposant de Lyapunov et horizon de prédictibilité du système de Lorenz modifié,
+pour prévoir l'intérêt de Parareal avant de lancer une exécution.
+
+Le plus grand exposant de Lyapunov est estimé par la méthode de Benettin:
+l'état et un vecteur tangent sont intégrés ensemble (RK4 sur le système
+linéarisé, mêmes équations que derivatives.f90), le vecteur tangent étant
+renormalisé à intervalles réguliers. Les calculs sont vectorisés sur un
+ensemble de conditions initiales et, éventuellement, sur plusieurs valeurs de tau.
+
+À partir de l'exposant et d'une estimation du facteur de contraction de
+Parareal rho = |(F-G)(u+d) - (F-G)(u)| / |d| (F: RK4 fin, G: RK2 grossier),
+le module recommande une longueur de tranche et prévoit le nombre d'itérations:
+
+    K ~ min(N, log(tol) / log(rho))
+    accélération ~ N / ((K+1) * N * c + K),  c = coût de G / coût de F
+
+Usage:
+    python lyapunov.py --tau 5.0 --tf 100 --np 5 --h-coarse 0.005 --h-fine 0.0005
+"""
+import argparse
+
+import numpy as np
+
+R_DEFAULT = 2.5  # param.f90
+
+
+def lorenz_rhs(u, R, tau):
+    """
+    Second membre du système (vectorisé), identique à derivatives.f90.
+
+    Args:
+        u (numpy.ndarray): États, forme (..., 3)
+        R (float): Paramètre d'amplitude
+        tau (float or numpy.ndarray): Paramètre de mémoire (diffusable sur u[..., 0])
+
+    Returns:
+        numpy.ndarray: Dérivées, forme (..., 3)
+    """
+    inv_tau = 1.0 / np.maximum(tau, 1.0e-6)
+    x, y, z = u[..., 0], u[..., 1], u[..., 2]
+    return np.stack([y - x,
+                     -inv_tau * y + x * z,
+                     R - inv_tau * z - x * y], axis=-1)
+
+
+def tangent_rhs(u, v, R, tau):
+    """
+    Système linéarisé v' = J(u) v (vectorisé).
+
+    Args:
+        u (numpy.ndarray): États, forme (..., 3)
+        v (numpy.ndarray): Vecteurs tangents, forme (..., 3)
+
+    Returns:
+        numpy.ndarray: Dérivées des vecteurs tangents, forme (..., 3)
+    """
+    inv_tau = 1.0 / np.maximum(tau, 1.0e-6)
+    x, y, z = u[..., 0], u[..., 1], u[..., 2]
+    vx, vy, vz = v[..., 0], v[..., 1], v[..., 2]
+    return np.stack([vy - vx,
+                     z * vx - inv_tau * vy + x * vz,
+                     -y * vx - x * vy - inv_tau * vz], axis=-1)
+
+
+def rk4_step(u, h, R, tau):
+    """Un pas RK4 de l'état seul"""
+    k1 = lorenz_rhs(u, R, tau)
+    k2 = lorenz_rhs(u + 0.5 * h * k1, R, tau)
+    k3 = lorenz_rhs(u + 0.5 * h * k2, R, tau)
+    k4 = lorenz_rhs(u + h * k3, R, tau)
+    return u + (h / 6.0) * (k1 + 2.0 * k2 + 2.0 * k3 + k4)
+
+
+def rk2_step(u, h, R, tau):
+    """Un pas RK2 (point milieu), comme le propagateur grossier rk2_step"""
+    k1 = lorenz_rhs(u, R, tau)
+    return u + h * lorenz_rhs(u + 0.5 * h * k1, R, tau)
+
+
+def tangent_rk4_step(u, v, h, R, tau):
+    """Un pas RK4 du système couplé (état, vecteur tangent)"""
+    k1 = lorenz_rhs(u, R, tau)
+    l1 = tangent_rhs(u, v, R, tau)
+    u2, v2 = u + 0.5 * h * k1, v + 0.5 * h * l1
+    k2 = lorenz_rhs(u2, R, tau)
+    l2 = tangent_rhs(u2, v2, R, tau)
+    u3, v3 = u + 0.5 * h * k2, v + 0.5 * h * l2
+    k3 = lorenz_rhs(u3, R, tau)
+    l3 = tangent_rhs(u3, v3, R, tau)
+    u4, v4 = u + h * k3, v + h * l3
+    k4 = lorenz_rhs(u4, R, tau)
+    l4 = tangent_rhs(u4, v4, R, tau)
+    return (u + (h / 6.0) * (k1 + 2.0 * k2 + 2.0 * k3 + k4),
+            v + (h / 6.0) * (l1 + 2.0 * l2 + 2.0 * l3 + l4))
+
+
+def integrate(u, t_span, h, R, tau, step=rk4_step):
+    """Intègre un ensemble d'états sur t_span avec le schéma step"""
+    for _ in range(int(round(t_span / h))):
+        u = step(u, h, R, tau)
+    return u
+
+
+def ensemble_initial_conditions(n_members, u0=(1.0, 0.0, 0.0), spread=1.0e-2, seed=0):
+    """
+    Ensemble de conditions initiales autour de u0.
+
+    Returns:
+        numpy.ndarray: États, forme (n_members, 3)
+    """
+    rng = np.random.default_rng(seed)
+    return np.asarray(u0, dtype=float) + spread * rng.standard_normal((n_members, 3))
+
+
+def lyapunov_exponent(R, tau, u0s, h=0.01, t_transient=50.0, t_measure=200.0, renorm_every=10):
+    """
+    Plus grand exposant de Lyapunov par renormalisation de Benettin.
+
+    Args:
+        R (float): Paramètre d'amplitude
+        tau (float or numpy.ndarray): Paramètre(s) de mémoire, diffusable(s) sur l'ensemble
+        u0s (numpy.ndarray): Conditions initiales, forme (M, 3)
+        h (float): Pas de temps RK4
+        t_transient (float): Durée écartée avant la mesure (convergence vers l'attracteur)
+        t_measure (float): Durée de la mesure
+        renorm_every (int): Nombre de pas entre deux renormalisations
+
+    Returns:
+        tuple: (exposants par membre (M,), états finaux (M, 3))
+    """
+    u = np.array(u0s, dtype=float)
+    tau = np.asarray(tau, dtype=float)
+    u = integrate(u, t_transient, h, R, tau)
+
+    rng = np.random.default_rng(1)
+    v = rng.standard_normal(u.shape)
+    v /= np.linalg.norm(v, axis=-1, keepdims=True)
+
+    log_growth = np.zeros(u.shape[:-1])
+    n_blocks = max(1, int(round(t_measure / (h * renorm_every))))
+    for _ in range(n_blocks):
+        for _ in range(renorm_every):
+            u, v = tangent_rk4_step(u, v, h, R, tau)
+        norm = np.linalg.norm(v, axis=-1)
+        log_growth += np.log(norm)
+        v /= norm[..., None]
+
+    return log_growth / (n_blocks * renorm_every * h), u
+
+
+def predictability_horizon(lyap, delta0=1.0e-6, delta_max=1.0e-2):
+    """
+    Temps pour qu'une erreur initiale delta0 atteigne delta_max: ln(delta_max/delta0)/lambda.
+
+    Returns:
+        float: Horizon (inf si le système n'est pas chaotique)
+    """
+    if lyap <= 0.0:
+        return np.inf
+    return np.log(delta_max / delta0) / lyap
+
+
+def parareal_contraction(R, tau, states, delta_T, h_coarse, h_fine, perturbation=1.0e-3):
+    """
+    Facteur de contraction de Parareal sur une tranche de longueur delta_T, moyenné
+    sur un ensemble de points de l'attracteur:
+        rho = |(F-G)(u+d) - (F-G)(u)| / |d|
+
+    Returns:
+        float: Facteur de contraction médian
+    """
+    rng = np.random.default_rng(2)
+    d = rng.standard_normal(states.shape)
+    d *= perturbation / np.linalg.norm(d, axis=-1, keepdims=True)
+    both = np.concatenate([states, states + d])
+
+    fine = integrate(both, delta_T, h_fine, R, tau, rk4_step)
+    coarse = integrate(both, delta_T, h_coarse, R, tau, rk2_step)
+    diff = fine - coarse
+    m = len(states)
+    rho = np.linalg.norm(diff[m:] - diff[:m], axis=-1) / perturbation
+    return float(np.median(rho))
+
+
+def recommend(R, tau, tf, n_procs, tol=1.0e-4, h_coarse=0.005, h_fine=0.0005, n_members=16,
+              max_growth=10.0):
+    """
+    Recommandations pour solve_parareal avant de lancer le calcul.
+
+    Args:
+        R, tau (float): Paramètres du système
+        tf (float): Horizon de simulation
+        n_procs (int): Nombre de tranches (processus x threads)
+        tol (float): Tolérance de convergence de Parareal
+        h_coarse, h_fine (float): Pas des propagateurs grossier et fin
+        n_members (int): Taille de l'ensemble de conditions initiales
+        max_growth (float): Amplification d'erreur tolérée sur une tranche
+
+    Returns:
+        dict: lyapunov, lyapunov_time, horizon, slice_length, recommended_slice,
+              window, rho, iterations, speedup
+    """
+    lyaps, states = lyapunov_exponent(R, tau, ensemble_initial_conditions(n_members))
+    lyap = float(np.median(lyaps))
+
+    slice_length = tf / n_procs
+    if lyap > 0.0:
+        # Tranche sur laquelle une erreur grossière est amplifiée au plus de max_growth
+        recommended_slice = min(slice_length, np.log(max_growth) / lyap)
+    else:
+        recommended_slice = slice_length
+
+    # Parareal par fenêtres (--window) si les tranches uniformes sont trop longues
+    window = recommended_slice * n_procs if recommended_slice < slice_length else None
+
+    rho = parareal_contraction(R, tau, states, recommended_slice, h_coarse, h_fine)
+    if 0.0 < rho < 1.0:
+        iterations = int(min(n_procs, max(1, np.ceil(np.log(tol) / np.log(rho)))))
+    elif rho == 0.0:
+        iterations = 1
+    else:
+        iterations = n_procs
+
+    # Coût relatif d'un pas RK2 (2 évaluations) par rapport à un pas RK4 (4 évaluations)
+    cost_ratio = 0.5 * h_fine / h_coarse
+    speedup = n_procs / ((iterations + 1) * n_procs * cost_ratio + iterations)
+
+    return {
+        'lyapunov': lyap,
+        'lyapunov_spread': float(np.std(lyaps)),
+        'lyapunov_time': 1.0 / lyap if lyap > 0.0 else np.inf,
+        'horizon': predictability_horizon(lyap, delta0=1.0e-6, delta_max=tol),
+        'slice_length': slice_length,
+        'recommended_slice': recommended_slice,
+        'window': window,
+        'rho': rho,
+        'iterations': iterations,
+        'speedup': speedup,
+    }
+
+
+def print_report(R, tau, tf, n_procs, result):
+    """Affiche le rapport de recommandations"""
+    print("======================================================")
+    print("     PRÉDICTIBILITÉ ET INTÉRÊT DE PARAREAL")
+    print("======================================================")
+    print(f" Paramètres: R = {R}, tau = {tau}, tf = {tf}, tranches = {n_procs}")
+    print(f" Exposant de Lyapunov maximal: {result['lyapunov']:.4f} (± {result['lyapunov_spread']:.4f})")
+    if result['lyapunov'] > 0.0:
+        print(f" Temps de Lyapunov: {result['lyapunov_time']:.2f}")
+        print(f" Horizon de prédictibilité (erreur 1e-6 -> tolérance): {result['horizon']:.2f}")
+    else:
+        print(" Régime non chaotique: les erreurs ne sont pas amplifiées")
+    print(f" Longueur de tranche uniforme: {result['slice_length']:.2f}")
+    print(f" Longueur de tranche recommandée: {result['recommended_slice']:.2f}")
+    if result['window'] is not None:
+        print(f" -> utiliser --window={result['window']:.1f} (Parareal par fenêtres)")
+    print(f" Facteur de contraction estimé (rho): {result['rho']:.3e}")
+    print(f" Itérations prévues: {result['iterations']}")
+    print(f" Accélération prévue: {result['speedup']:.2f}x")
+    if result['iterations'] >= n_procs:
+        print(" ATTENTION: Parareal ne devrait pas converger avant la dernière itération,")
+        print("            le calcul séquentiel RK4 sera au moins aussi rapide.")
+    print("======================================================")
+
+
+def parse_command_line():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Lyapunov exponent and Parareal usefulness estimate')
+    parser.add_argument('--tau', type=float, required=True, help='Memory parameter tau')
+    parser.add_argument('--R', type=float, default=R_DEFAULT, help='Amplitude parameter R')
+    parser.add_argument('--tf', type=float, default=100.0, help='Simulation horizon')
+    parser.add_argument('--np', type=int, default=5, help='Number of Parareal slices')
+    parser.add_argument('--tol', type=float, default=1.0e-4, help='Parareal tolerance')
+    parser.add_argument('--h-coarse', type=float, default=0.005, help='Coarse step size')
+    parser.add_argument('--h-fine', type=float, default=0.0005, help='Fine step size')
+    parser.add_argument('--members', type=int, default=16, help='Ensemble size')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_command_line()
+    result = recommend(args.R, args.tau, args.tf, args.np, args.tol, args.h_coarse, args.h_fine, args.members)
+    print_report(args.R, args.tau, args.tf, args.np, result)
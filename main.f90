@@ -3,7 +3,12 @@ program main
     use mpi
     use rk4_solver
     use parareal_solver
-    use param, only: R
+    use mgrit_solver
+    use coarse_propagators, only: parse_coarse_method, coarse_method_name, COARSE_DEFAULT, COARSE_INVALID
+    use parareal_acceleration, only: parse_accel_method, ACCEL_NONE, ACCEL_INVALID
+    use param, only: R, SOLVER_VERSION
+    use profiler, only: prof_enabled, prof_init, prof_write_report, prof_print_summary
+    use stream_output, only: stream_open, stream_close
     implicit none
     
     ! Variables pour les paramètres de simulation
@@ -12,32 +17,120 @@ program main
     real, dimension(3) :: u0
     integer :: max_iter
     real :: tol
-    character(len=100) :: output_file
+    character(len=256) :: output_file
     
     ! Variables MPI
-    integer :: ierr, rank, num_procs
+    integer :: ierr, rank, num_procs, provided
     
     ! Variables pour le temps d'exécution
     real :: start_time, end_time
     logical :: save_timing = .false.
-    character(len=100) :: timing_arg, arg
+    character(len=100) :: timing_arg
+    character(len=256) :: arg
     integer :: i
     
-    ! Vérifier si l'option --timing est présente
+    ! Propagateur grossier de Parareal (--coarse=rk2|ab2|ab3|flowmap|auto)
+    integer :: coarse_method = COARSE_DEFAULT
+    
+    ! Correction Parareal accélérée (--accel=krylov|none)
+    integer :: accel = ACCEL_NONE
+    
+    ! Équilibrage des tranches Parareal selon le coût mesuré (--balance)
+    logical :: balance = .false.
+    
+    ! Longueur des fenêtres de Parareal par fenêtres (--window=W, 0 = une seule fenêtre)
+    real :: window = 0.0
+    
+    ! Threads OpenMP par processus pour les solves fins (--threads=N)
+    integer :: n_threads = 1
+    
+    ! Gel des tranches convergées de Parareal (--freeze)
+    logical :: freeze = .false.
+    
+    ! Nombre de niveaux du solveur multiniveau MGRIT (--levels=N)
+    integer :: n_levels = 3
+    
+    ! Points de reprise de Parareal (--checkpoint=chemin, --checkpoint-every=N, --restart=chemin)
+    character(len=256) :: checkpoint_file = '', restart_file = ''
+    integer :: checkpoint_every = 1
+    
+    ! Diffusion en direct des états vers un tube nommé (--stream=chemin, voir plotter.py live)
+    character(len=256) :: stream_path = ''
+    
+    ! Historique des exécutions (output/history/runs.csv) pour le modèle de coût (cost_model.py)
+    integer :: n_iterations = 0
+    real :: peak_mb, peak_mb_max
+    
+    ! Préfixe des fichiers de sortie (--output=prefix) et amplitude R (--R=valeur)
+    character(len=200) :: output_prefix = ''
+    real :: R_run
+    
+    R_run = R
+    
+    ! Vérifier les options de ligne de commande (--timing, --coarse, --balance, ...)
     do i = 1, command_argument_count()
         call get_command_argument(i, arg)
         if (trim(arg) == '--timing') then
             save_timing = .true.
+        else if (arg(1:9) == '--coarse=') then
+            coarse_method = parse_coarse_method(arg(10:))
+            if (coarse_method == COARSE_INVALID) then
+                print '(a,a,a)', " ERREUR: propagateur grossier inconnu '", trim(arg(10:)), &
+                      "' (--coarse=default|rk2|ab2|ab3|flowmap|auto)"
+                call exit(1)
+            end if
+        else if (arg(1:8) == '--accel=') then
+            accel = parse_accel_method(arg(9:))
+            if (accel == ACCEL_INVALID) then
+                print '(a,a,a)', " ERREUR: correction Parareal inconnue '", trim(arg(9:)), &
+                      "' (--accel=none|krylov)"
+                call exit(1)
+            end if
+        else if (trim(arg) == '--balance') then
+            balance = .true.
+        else if (arg(1:9) == '--window=') then
+            read(arg(10:), *) window
+        else if (arg(1:10) == '--threads=') then
+            read(arg(11:), *) n_threads
+        else if (trim(arg) == '--freeze') then
+            freeze = .true.
+        else if (arg(1:9) == '--levels=') then
+            read(arg(10:), *) n_levels
+        else if (arg(1:13) == '--checkpoint=') then
+            checkpoint_file = arg(14:)
+        else if (arg(1:19) == '--checkpoint-every=') then
+            read(arg(20:), *) checkpoint_every
+        else if (arg(1:10) == '--restart=') then
+            restart_file = arg(11:)
+        else if (arg(1:9) == '--stream=') then
+            stream_path = arg(10:)
+        else if (trim(arg) == '--profile') then
+            prof_enabled = .true.
+        else if (arg(1:9) == '--output=') then
+            output_prefix = arg(10:)
+        else if (arg(1:4) == '--R=') then
+            read(arg(5:), *) R_run
+        else if (trim(arg) == '--version') then
+            print '(a,a)', "lorenz_solver ", SOLVER_VERSION
+            stop
         end if
     end do
     
-    ! Initialiser MPI
-    call MPI_Init(ierr)
+    ! Initialiser MPI (seul le thread maître fait des appels MPI)
+    call MPI_Init_thread(MPI_THREAD_FUNNELED, provided, ierr)
     call MPI_Comm_rank(MPI_COMM_WORLD, rank, ierr)
     call MPI_Comm_size(MPI_COMM_WORLD, num_procs, ierr)
     
+    ! Sans MPI_THREAD_FUNNELED, les threads OpenMP ne peuvent pas cohabiter avec MPI
+    if (provided < MPI_THREAD_FUNNELED .and. n_threads > 1) then
+        if (rank == 0) print '(a,i0,a)', " WARNING: la bibliothèque MPI ne fournit pas MPI_THREAD_FUNNELED "// &
+                                         "(niveau ", provided, "), exécution avec 1 thread par processus"
+        n_threads = 1
+    end if
+    
     ! Mesurer le temps de début
     start_time = MPI_Wtime()
+    call prof_init()
     
     ! Traiter les arguments de ligne de commande (uniquement sur processus 0)
     if (rank == 0) then
@@ -52,12 +145,15 @@ program main
     call MPI_Bcast(u0, 3, MPI_REAL, 0, MPI_COMM_WORLD, ierr)
     call MPI_Bcast(h_coarse, 1, MPI_REAL, 0, MPI_COMM_WORLD, ierr)
     
+    if (rank == 0 .and. len_trim(stream_path) > 0) call stream_open(stream_path)
+    
     ! Exécuter la méthode demandée
     if (method == 'rk4') then
         ! Méthode RK4 standard (uniquement sur processus 0)
         if (rank == 0) then
             write(output_file, '(a,f3.1,a)') 'output/rk4_tau', tau, '.dat'
-            call solve_rk4(R, tau, 0.0, tf, h, u0, output_file)
+            if (len_trim(output_prefix) > 0) output_file = trim(output_prefix) // '.dat'
+            call solve_rk4(R_run, tau, 0.0, tf, h, u0, output_file)
             print *, "Calcul RK4 terminé."
         end if
     else if (method == 'parareal') then
@@ -71,14 +167,31 @@ program main
             tol = 1.0E-4  ! Standard tolerance for larger tau values (unchanged)
         end if
         
-        call solve_parareal(R, tau, h_coarse, h, 0.0, tf, u0, max_iter, tol)
+        call solve_parareal(R_run, tau, h_coarse, h, 0.0, tf, u0, max_iter, tol, coarse_method=coarse_method, &
+                            balance=balance, window=window, n_threads=n_threads, &
+                            freeze=freeze, checkpoint_file=checkpoint_file, checkpoint_every=checkpoint_every, &
+                            restart_file=restart_file, output_prefix=output_prefix, iterations=n_iterations, &
+                            accel=accel)
+    else if (method == 'mgrit') then
+        ! MGRIT multiniveau (tous les processus participent, y compris sur les niveaux grossiers)
+        max_iter = 20
+        if (tau < 1.0) then
+            tol = 5.0E-4
+        else
+            tol = 1.0E-4
+        end if
+        
+        call solve_mgrit(R_run, tau, h_coarse, h, 0.0, tf, u0, max_iter, tol, n_levels=n_levels, &
+                         output_prefix=output_prefix)
     else
         if (rank == 0) then
             print *, "Méthode non reconnue: ", trim(method)
-            print *, "Méthodes disponibles: 'rk4', 'parareal'"
+            print *, "Méthodes disponibles: 'rk4', 'parareal', 'mgrit'"
         end if
     end if
     
+    call stream_close()
+    
     ! Mesurer le temps de fin
     end_time = MPI_Wtime()
     
@@ -93,7 +206,9 @@ program main
         if (method == 'rk4') then
             print '(a,i0)', " Nombre d'étapes: ", int(tf / h)
         else
-            print '(a,i0)', " Nombre de sous-domaines: ", num_procs
+            print '(a,i0)', " Nombre de sous-domaines: ", num_procs * max(1, n_threads)
+            if (method == 'mgrit') print '(a,i0)', " Niveaux MGRIT: ", max(2, n_levels)
+            if (n_threads > 1) print '(a,i0)', " Threads par processus: ", n_threads
         end if
         print '(a,f15.6,a)', " Temps d'exécution: ", end_time - start_time, " secondes"
         print *, "======================================================"
@@ -108,11 +223,90 @@ program main
         end if
     end if
 
+    ! Historique: mémoire maximale sur l'ensemble des processus
+    peak_mb = peak_memory_mb()
+    call MPI_Reduce(peak_mb, peak_mb_max, 1, MPI_REAL, MPI_MAX, 0, MPI_COMM_WORLD, ierr)
+    if (rank == 0) call append_history(trim(method), tau, h, h_coarse, tf, num_procs, n_iterations, &
+                                       end_time - start_time, peak_mb_max)
+    
+    ! Rapport de profilage (--profile): un fichier par processus
+    if (prof_enabled) then
+        call prof_write_report(rank, num_procs, trim(method), max(1, n_threads))
+        if (rank == 0) then
+            call prof_print_summary()
+            print '(a,i0,a)', " Rapports de profilage: output/profile/profile_rank*.csv (", num_procs, " processus)"
+        end if
+    end if
+
     ! Finaliser MPI
     call MPI_Finalize(ierr)
 
 contains
 
+    subroutine append_history(method, tau, h, h_coarse, tf, num_procs, iterations, wall_time, peak_mb)
+        ! Ajoute l'exécution à output/history/runs.csv (une ligne par exécution)
+        !
+        ! Les exécutions simultanées écrivent l'une après l'autre: le verrou history_lock
+        ! est créé de façon exclusive (status='new') avant l'écriture et supprimé après.
+        ! Un verrou encore présent après HISTORY_LOCK_TRIES secondes est celui d'une
+        ! exécution interrompue: il est repris.
+        character(len=*), intent(in) :: method
+        real, intent(in) :: tau, h, h_coarse, tf, wall_time, peak_mb
+        integer, intent(in) :: num_procs, iterations
+        character(len=*), parameter :: history_file = 'output/history/runs.csv'
+        character(len=*), parameter :: history_lock = 'output/history/runs.csv.lock'
+        integer, parameter :: HISTORY_LOCK_TRIES = 10
+        character(len=8) :: date
+        character(len=10) :: clock
+        integer :: unit_num, lock_unit, ios, try
+        logical :: exists
+        
+        call system('mkdir -p output/history')
+        do try = 1, HISTORY_LOCK_TRIES
+            open(newunit=lock_unit, file=history_lock, status='new', action='write', iostat=ios)
+            if (ios == 0) exit
+            call sleep(1)
+        end do
+        if (ios /= 0) open(newunit=lock_unit, file=history_lock, status='replace', action='write', iostat=ios)
+        if (ios /= 0) return
+        
+        inquire(file=history_file, exist=exists)
+        open(newunit=unit_num, file=history_file, position='append', action='write', iostat=ios)
+        if (ios /= 0) then
+            close(lock_unit, status='delete')
+            return
+        end if
+        if (.not. exists) write(unit_num, '(a)') "date,version,method,tau,R,h,h_coarse,tf,ranks,threads," // &
+            "coarse,window,iterations,wall_time,peak_mb"
+        call date_and_time(date, clock)
+        write(unit_num, '(*(g0))') date(1:4), '-', date(5:6), '-', date(7:8), 'T', clock(1:2), ':', clock(3:4), &
+            ':', clock(5:6), ',', SOLVER_VERSION, ',', method, ',', tau, ',', R_run, ',', h, ',', h_coarse, ',', &
+            tf, ',', num_procs, ',', max(1, n_threads), ',', trim(coarse_method_name(coarse_method)), ',', &
+            window, ',', iterations, ',', wall_time, ',', peak_mb
+        close(unit_num)
+        close(lock_unit, status='delete')
+    end subroutine append_history
+
+    real function peak_memory_mb()
+        ! Mémoire résidente maximale du processus (VmHWM de /proc/self/status), -1 si indisponible
+        character(len=256) :: line
+        integer :: unit_num, ios, kb
+        
+        peak_memory_mb = -1.0
+        open(newunit=unit_num, file='/proc/self/status', action='read', status='old', iostat=ios)
+        if (ios /= 0) return
+        do
+            read(unit_num, '(a)', iostat=ios) line
+            if (ios /= 0) exit
+            if (line(1:6) == 'VmHWM:') then
+                read(line(7:), *, iostat=ios) kb
+                if (ios == 0) peak_memory_mb = kb / 1024.0
+                exit
+            end if
+        end do
+        close(unit_num)
+    end function peak_memory_mb
+
     subroutine process_arguments(method, tau, h, tf, u0, h_coarse)
         character(len=20), intent(out) :: method
         real, intent(out) :: tau, h, tf, h_coarse
@@ -159,8 +353,8 @@ contains
                 call get_command_argument(7, arg)
                 read(arg, *) u0(3)
             end if
-        else if (method == 'parareal' .and. num_args >= 4) then
-            ! Format pour Parareal: parareal tau h_coarse h_fine tf x0 y0 z0
+        else if ((method == 'parareal' .or. method == 'mgrit') .and. num_args >= 4) then
+            ! Format pour Parareal et MGRIT: parareal|mgrit tau h_coarse h_fine tf x0 y0 z0
             call get_command_argument(3, arg)
             read(arg, *) h_coarse
             
@@ -207,7 +401,7 @@ contains
         print '(a,f8.3)', " Paramètre tau: ", tau
         print '(a,f10.6)', " Pas de temps fin: ", h
         
-        if (method == 'parareal') then
+        if (method == 'parareal' .or. method == 'mgrit') then
             print '(a,f10.6)', " Pas de temps grossier: ", h_coarse
         end if
         
@@ -0,0 +1,470 @@
+module mgrit_solver
+    ! Solveur parallèle en temps multiniveau (MGRIT, cycles en V avec FAS)
+    !
+    ! La grille fine (pas h_fine, RK4) est grossie d'un facteur m à chaque niveau:
+    ! le niveau l a un pas dt_l = dt_0 * m**l, et son propagateur Phi_l est un pas
+    ! RK4 de longueur dt_l. Sur chaque niveau, les points multiples de m sont les
+    ! points C, les autres les points F. Un cycle en V:
+    !   - relaxation FCF (F: propagation depuis chaque point C dans son intervalle,
+    !     C: mise à jour des points C depuis le dernier point F de l'intervalle
+    !     précédent, puis F à nouveau);
+    !   - restriction par injection aux points C et second membre FAS:
+    !     g_(l+1) = A_(l+1)(v) + r_l, où A(u)_i = u_i - Phi(u_(i-1));
+    !   - cycle sur le niveau l+1 (résolution séquentielle sur le niveau le plus
+    !     grossier), correction des points C, puis relaxation F.
+    !
+    ! Les points de chaque niveau sont répartis en blocs contigus emboîtés entre
+    ! les processus: toutes les relaxations sont parallèles, seul le niveau le plus
+    ! grossier (quelques points par processus) est résolu séquentiellement, sur
+    ! chaque processus après un MPI_Allgather. Les échanges se limitent au dernier
+    ! point du bloc voisin. Contrairement à Parareal, le travail grossier est donc
+    ! lui-même réparti, et la partie séquentielle ne croît pas avec la longueur de
+    ! la grille fine.
+    use mpi
+    use derivatives
+    use param, only: write_run_header
+    use profiler
+    implicit none
+
+    private
+    public :: solve_mgrit
+
+    integer, parameter :: DEFAULT_LEVELS = 3
+    ! Pas maximal du niveau le plus grossier: au-delà, RK4 devient instable sur le
+    ! système et la hiérarchie est tronquée
+    real, parameter :: MAX_COARSE_DT = 0.1
+
+    ! Niveau de la hiérarchie: tableaux de taille complète (0:n), seul le bloc
+    ! [first, last] (et le point first-1 reçu du voisin) est utilisé localement
+    type mgrit_level
+        integer :: n = 0              ! Nombre d'intervalles (points 0..n)
+        real :: dt = 0.0              ! Pas de temps du niveau
+        integer :: first = 0, last = 0
+        real, dimension(:,:), allocatable :: u   ! Itéré courant
+        real, dimension(:,:), allocatable :: g   ! Second membre (FAS)
+        real, dimension(:,:), allocatable :: v   ! Restriction de l'itéré fin (niveaux >= 1)
+    end type mgrit_level
+
+    type(mgrit_level), dimension(:), allocatable :: levels
+    integer :: n_lev, cf, rank, num_procs
+    real :: R_sys, tau_sys
+
+    ! Statistiques par niveau
+    real(8), dimension(:), allocatable :: t_relax, t_restrict, t_comm
+    integer(8), dimension(:), allocatable :: phi_steps
+    real(8) :: t_coarsest
+
+contains
+
+    function phi(l, u) result(u_next)
+        ! Propagateur du niveau l: un pas RK4 de longueur dt_l
+        integer, intent(in) :: l
+        real, dimension(3), intent(in) :: u
+        real, dimension(3) :: u_next, k1, k2, k3, k4
+        real :: h
+
+        h = levels(l)%dt
+        call compute_derivatives(u, R_sys, tau_sys, k1)
+        call compute_derivatives(u + 0.5*h*k1, R_sys, tau_sys, k2)
+        call compute_derivatives(u + 0.5*h*k2, R_sys, tau_sys, k3)
+        call compute_derivatives(u + h*k3, R_sys, tau_sys, k4)
+        u_next = u + (h/6.0) * (k1 + 2.0*k2 + 2.0*k3 + k4)
+        phi_steps(l) = phi_steps(l) + 1
+    end function phi
+
+    subroutine exchange_halo(l, a)
+        ! Transmet le dernier point du bloc au processus suivant et reçoit celui du
+        ! processus précédent dans a(:, first-1)
+        integer, intent(in) :: l
+        real, dimension(:,0:), intent(inout) :: a
+        integer :: left, right, ierr
+        real, dimension(3) :: recv
+        real(8) :: t_start
+
+        call prof_start(PROF_COMM)
+        t_start = MPI_Wtime()
+        left = merge(rank - 1, MPI_PROC_NULL, rank > 0)
+        right = merge(rank + 1, MPI_PROC_NULL, rank < num_procs - 1)
+        recv = 0.0
+        call MPI_Sendrecv(a(:, levels(l)%last), 3, MPI_REAL, right, l, &
+                          recv, 3, MPI_REAL, left, l, MPI_COMM_WORLD, MPI_STATUS_IGNORE, ierr)
+        if (rank > 0) a(:, levels(l)%first - 1) = recv
+        t_comm(l) = t_comm(l) + (MPI_Wtime() - t_start)
+        call prof_stop(PROF_COMM)
+    end subroutine exchange_halo
+
+    subroutine f_relax(l)
+        ! Relaxation F: propagation depuis chaque point C du bloc dans son intervalle
+        integer, intent(in) :: l
+        integer :: ic, i
+
+        associate (lev => levels(l))
+            do ic = lev%first, min(lev%last, lev%n - 1), cf
+                do i = ic + 1, ic + cf - 1
+                    lev%u(:, i) = phi(l, lev%u(:, i-1)) + lev%g(:, i)
+                end do
+            end do
+        end associate
+    end subroutine f_relax
+
+    subroutine c_relax(l)
+        ! Relaxation C: mise à jour des points C depuis le point F qui les précède
+        integer, intent(in) :: l
+        integer :: i
+
+        call exchange_halo(l, levels(l)%u)
+        associate (lev => levels(l))
+            do i = lev%first, lev%last, cf
+                if (i == 0) then
+                    lev%u(:, 0) = lev%g(:, 0)
+                else
+                    lev%u(:, i) = phi(l, lev%u(:, i-1)) + lev%g(:, i)
+                end if
+            end do
+        end associate
+    end subroutine c_relax
+
+    subroutine relax(l, fcf)
+        ! Relaxation F (fcf = .false.) ou FCF, chronométrée par niveau
+        integer, intent(in) :: l
+        logical, intent(in) :: fcf
+        real(8) :: t_start
+
+        call prof_start(merge(PROF_FINE, PROF_COARSE, l == 0))
+        t_start = MPI_Wtime()
+        call f_relax(l)
+        if (fcf) then
+            call c_relax(l)
+            call f_relax(l)
+        end if
+        t_relax(l) = t_relax(l) + (MPI_Wtime() - t_start)
+        call prof_stop(merge(PROF_FINE, PROF_COARSE, l == 0))
+    end subroutine relax
+
+    subroutine restrict_level(l)
+        ! Injection aux points C et second membre FAS du niveau l+1
+        integer, intent(in) :: l
+        integer :: i, j
+        real, dimension(3) :: r
+        real(8) :: t_start
+
+        call exchange_halo(l, levels(l)%u)
+        call prof_start(merge(PROF_FINE, PROF_COARSE, l == 0))
+        t_start = MPI_Wtime()
+        associate (lev => levels(l), crs => levels(l+1))
+            do i = lev%first, lev%last, cf
+                j = i / cf
+                ! Résidu au point C (nul aux points F après la relaxation F)
+                if (i == 0) then
+                    r = lev%g(:, 0) - lev%u(:, 0)
+                else
+                    r = lev%g(:, i) - lev%u(:, i) + phi(l, lev%u(:, i-1))
+                end if
+                crs%v(:, j) = lev%u(:, i)
+                crs%u(:, j) = lev%u(:, i)
+                crs%g(:, j) = r
+            end do
+        end associate
+        t_restrict(l) = t_restrict(l) + (MPI_Wtime() - t_start)
+        call prof_stop(merge(PROF_FINE, PROF_COARSE, l == 0))
+
+        ! g_(l+1) = v_j - Phi_(l+1)(v_(j-1)) + r
+        call exchange_halo(l+1, levels(l+1)%v)
+        call prof_start(PROF_COARSE)
+        t_start = MPI_Wtime()
+        associate (crs => levels(l+1))
+            do j = crs%first, crs%last
+                if (j == 0) then
+                    crs%g(:, 0) = crs%v(:, 0) + crs%g(:, 0)
+                else
+                    crs%g(:, j) = crs%v(:, j) - phi(l+1, crs%v(:, j-1)) + crs%g(:, j)
+                end if
+            end do
+        end associate
+        t_restrict(l) = t_restrict(l) + (MPI_Wtime() - t_start)
+        call prof_stop(PROF_COARSE)
+    end subroutine restrict_level
+
+    subroutine solve_coarsest()
+        ! Résolution séquentielle du niveau le plus grossier (sur chaque processus)
+        integer :: l, j, ierr, block
+        real(8) :: t_start
+
+        l = n_lev - 1
+        call prof_start(PROF_COMM)
+        t_start = MPI_Wtime()
+        associate (lev => levels(l))
+            block = lev%last - lev%first + 1
+            if (rank == num_procs - 1) block = block - 1   ! Le dernier point est diffusé à part
+            call MPI_Allgather(MPI_IN_PLACE, 0, MPI_DATATYPE_NULL, lev%g(:, 0:lev%n-1), 3*block, MPI_REAL, &
+                               MPI_COMM_WORLD, ierr)
+            call MPI_Bcast(lev%g(:, lev%n), 3, MPI_REAL, num_procs - 1, MPI_COMM_WORLD, ierr)
+        end associate
+        t_comm(l) = t_comm(l) + (MPI_Wtime() - t_start)
+        call prof_stop(PROF_COMM)
+
+        call prof_start(PROF_COARSE)
+        t_start = MPI_Wtime()
+        associate (lev => levels(l))
+            lev%u(:, 0) = lev%g(:, 0)
+            do j = 1, lev%n
+                lev%u(:, j) = phi(l, lev%u(:, j-1)) + lev%g(:, j)
+            end do
+        end associate
+        t_coarsest = t_coarsest + (MPI_Wtime() - t_start)
+        call prof_stop(PROF_COARSE)
+    end subroutine solve_coarsest
+
+    recursive subroutine v_cycle(l)
+        ! Cycle en V à partir du niveau l
+        integer, intent(in) :: l
+        integer :: j
+
+        if (l == n_lev - 1) then
+            call solve_coarsest()
+            return
+        end if
+
+        call relax(l, .true.)
+        call restrict_level(l)
+        call v_cycle(l + 1)
+
+        ! Correction des points C par l'erreur grossière, puis relaxation F
+        associate (lev => levels(l), crs => levels(l+1))
+            do j = crs%first, crs%last
+                lev%u(:, j*cf) = lev%u(:, j*cf) + (crs%u(:, j) - crs%v(:, j))
+            end do
+        end associate
+        call relax(l, .false.)
+    end subroutine v_cycle
+
+    subroutine fine_residual(res_max, u_max)
+        ! Résidu maximal aux points C du niveau fin (relatif à max |u|), sur tous les processus
+        real, intent(out) :: res_max, u_max
+        real, dimension(2) :: local, global
+        integer :: i, ierr
+
+        call exchange_halo(0, levels(0)%u)
+        call prof_start(PROF_CONV)
+        local = 0.0
+        associate (lev => levels(0))
+            do i = max(lev%first, cf), lev%last, cf
+                local(1) = max(local(1), maxval(abs(lev%g(:, i) - lev%u(:, i) + phi(0, lev%u(:, i-1)))))
+            end do
+            local(2) = maxval(abs(lev%u(:, lev%first:lev%last)))
+        end associate
+        call MPI_Allreduce(local, global, 2, MPI_REAL, MPI_MAX, MPI_COMM_WORLD, ierr)
+        call prof_stop(PROF_CONV)
+        res_max = global(1)
+        u_max = global(2)
+    end subroutine fine_residual
+
+    subroutine solve_mgrit(R, tau, h_coarse, h_fine, t0, tf, u0, max_iter, tol, n_levels, output_prefix)
+        ! Résout le système sur [t0, tf] par cycles en V MGRIT
+        !
+        ! Arguments:
+        !   R, tau        : Paramètres du système
+        !   h_coarse      : Pas du premier niveau grossier (facteur de grossissement
+        !                   m = h_coarse / h_fine, au moins 2)
+        !   h_fine        : Pas fin (ajusté pour que la grille se répartisse exactement)
+        !   t0, tf        : Intervalle de temps
+        !   u0(3)         : Condition initiale
+        !   max_iter      : Nombre maximal de cycles
+        !   tol           : Tolérance sur le résidu relatif aux points C du niveau fin
+        !   n_levels      : Nombre de niveaux (optionnel, 3 par défaut)
+        !   output_prefix : Préfixe du fichier de sortie (optionnel)
+        real, intent(in) :: R, tau, h_coarse, h_fine, t0, tf, tol
+        real, dimension(3), intent(in) :: u0
+        integer, intent(in) :: max_iter
+        integer, intent(in), optional :: n_levels
+        character(len=*), intent(in), optional :: output_prefix
+
+        integer :: l, k, i, n_fine, per_rank, span, ierr, status, unit_num
+        integer(8) :: n_fine_wanted, coarse_factor
+        real :: res_max, u_max, rel_res, res_prev
+        real(8) :: t_cycle, t_solve
+        real(8), dimension(:), allocatable :: stat_max, stat_out
+        integer(8), dimension(:), allocatable :: steps_sum
+        character(len=256) :: output_file
+        character(len=200) :: run_extra
+
+        call MPI_Comm_rank(MPI_COMM_WORLD, rank, ierr)
+        call MPI_Comm_size(MPI_COMM_WORLD, num_procs, ierr)
+        R_sys = R
+        tau_sys = max(tau, 1.0E-6)
+        n_lev = DEFAULT_LEVELS
+        if (present(n_levels)) then
+            if (n_levels > 0) n_lev = n_levels
+        end if
+        n_lev = max(2, n_lev)
+        cf = max(2, nint(h_coarse / h_fine))
+        do while (n_lev > 2 .and. h_fine * real(cf)**(n_lev - 1) > MAX_COARSE_DT)
+            n_lev = n_lev - 1
+        end do
+        if (rank == 0 .and. present(n_levels)) then
+            if (n_lev < n_levels) print '(a,i0,a,f5.3,a)', " WARNING: hiérarchie limitée à ", n_lev, &
+                " niveaux (pas grossier maximal ", MAX_COARSE_DT, ")"
+        end if
+
+        ! Grille fine: n_fine = num_procs * per_rank * m**(L-1) intervalles, de sorte que
+        ! chaque processus possède le même nombre de points sur chaque niveau
+        coarse_factor = int(cf, 8) ** (n_lev - 1)
+        n_fine_wanted = ceiling((tf - t0) / h_fine, 8)
+        per_rank = int(max(1_8, (n_fine_wanted + num_procs*coarse_factor - 1) / (num_procs*coarse_factor)))
+        n_fine = num_procs * per_rank * int(coarse_factor)
+
+        allocate(levels(0:n_lev-1))
+        allocate(t_relax(0:n_lev-1), t_restrict(0:n_lev-1), t_comm(0:n_lev-1), phi_steps(0:n_lev-1))
+        t_relax = 0.0d0
+        t_restrict = 0.0d0
+        t_comm = 0.0d0
+        phi_steps = 0
+        t_coarsest = 0.0d0
+        do l = 0, n_lev - 1
+            levels(l)%n = n_fine / cf**l
+            levels(l)%dt = (tf - t0) / real(n_fine) * real(cf)**l
+            span = levels(l)%n / num_procs
+            levels(l)%first = rank * span
+            levels(l)%last = (rank + 1) * span - 1
+            if (rank == num_procs - 1) levels(l)%last = levels(l)%n
+            allocate(levels(l)%u(3, 0:levels(l)%n), levels(l)%g(3, 0:levels(l)%n))
+            levels(l)%u = 0.0
+            levels(l)%g = 0.0
+            if (l > 0) then
+                allocate(levels(l)%v(3, 0:levels(l)%n))
+                levels(l)%v = 0.0
+            end if
+        end do
+
+        ! Problème fin: u_0 = u0, u_i - Phi(u_(i-1)) = 0; itéré initial constant
+        levels(0)%g(:, 0) = u0
+        do i = levels(0)%first, levels(0)%last
+            levels(0)%u(:, i) = u0
+        end do
+
+        if (rank == 0) then
+            print *, ""
+            print *, "======================================================"
+            print *, "          INITIALISATION MGRIT"
+            print *, "======================================================"
+            print '(a,i0,a,i0)', " Niveaux: ", n_lev, ", facteur de grossissement: ", cf
+            print '(a)', " Niveau    Pas de temps        Points   Points/processus"
+            do l = 0, n_lev - 1
+                print '(i6,es16.6,i14,i14)', l, levels(l)%dt, levels(l)%n + 1, levels(l)%n / num_procs
+            end do
+            if (abs(levels(0)%dt - h_fine) > 1.0E-3 * h_fine) then
+                print '(a,es12.5,a)', " Pas fin ajusté à ", levels(0)%dt, " (répartition exacte de la grille)"
+            end if
+            print *, ""
+            print *, "======================================================"
+            print *, "          CYCLES EN V"
+            print *, "======================================================"
+        end if
+
+        status = 0
+        res_prev = huge(1.0)
+        rel_res = huge(1.0)
+        t_solve = MPI_Wtime()
+        do k = 1, max_iter
+            t_cycle = MPI_Wtime()
+            call v_cycle(0)
+            call fine_residual(res_max, u_max)
+            rel_res = res_max / (u_max + 1.0E-10)
+            if (rank == 0) print '(a,i3,a,es11.4,a,es11.4,a,f9.4,a)', " Cycle ", k, ": résidu ", res_max, &
+                  " (relatif ", rel_res, "), ", MPI_Wtime() - t_cycle, " s"
+            if (isnan(res_max) .or. res_max > 1.0E20) then
+                status = -1
+                exit
+            end if
+            if (rel_res < tol) then
+                status = 1
+                exit
+            end if
+            res_prev = res_max
+        end do
+        t_solve = MPI_Wtime() - t_solve
+        k = min(k, max_iter)
+
+        ! Statistiques par niveau: temps maximal sur les processus, pas de propagateur cumulés
+        allocate(stat_max(4*n_lev), stat_out(4*n_lev), steps_sum(n_lev))
+        stat_max(1:n_lev) = t_relax
+        stat_max(n_lev+1:2*n_lev) = t_restrict
+        stat_max(2*n_lev+1:3*n_lev) = t_comm
+        stat_max(3*n_lev+1:4*n_lev) = 0.0d0
+        stat_max(4*n_lev) = t_coarsest
+        call MPI_Reduce(stat_max, stat_out, 4*n_lev, MPI_DOUBLE_PRECISION, MPI_MAX, 0, MPI_COMM_WORLD, ierr)
+        call MPI_Reduce(phi_steps, steps_sum, n_lev, MPI_INTEGER8, MPI_SUM, 0, MPI_COMM_WORLD, ierr)
+
+        if (rank == 0) then
+            print *, ""
+            print *, "======================================================"
+            if (status == 1) then
+                print '(a,i3,a)', " CONVERGENCE ATTEINTE APRÈS ", k, " CYCLES"
+            else if (status == -1) then
+                print *, " ÉCHEC DE MGRIT: résidu non borné"
+            else
+                print '(a,i3,a)', " ATTENTION: PAS DE CONVERGENCE APRÈS ", max_iter, " CYCLES"
+            end if
+            print '(a,es11.4,a,es11.4,a)', " Résidu relatif final (", rel_res, ") / tolérance (", tol, ")"
+            print *, "======================================================"
+            print *, "          TEMPS PAR NIVEAU (max. sur les processus)"
+            print *, "======================================================"
+            print '(a)', " Niveau  Relaxation (s)  Restriction (s)   Échanges (s)    Pas Phi (total)"
+            do l = 0, n_lev - 1
+                if (l == n_lev - 1) then
+                    print '(i6,f16.4,a17,f15.4,i19,a)', l, stat_out(4*n_lev), "(séquentiel)", &
+                          stat_out(2*n_lev+l+1), steps_sum(l+1), "  (redondant)"
+                else
+                    print '(i6,f16.4,f17.4,f15.4,i19)', l, stat_out(l+1), stat_out(n_lev+l+1), &
+                          stat_out(2*n_lev+l+1), steps_sum(l+1)
+                end if
+            end do
+            print '(a,f10.4,a,i0,a)', " Temps de résolution: ", t_solve, " s (", k, " cycles)"
+            print *, "======================================================"
+        end if
+
+        ! Rassemblement de la solution fine sur le processus 0 et écriture
+        call prof_start(PROF_COMM)
+        associate (lev => levels(0))
+            if (rank == 0) then
+                call MPI_Gather(MPI_IN_PLACE, 0, MPI_DATATYPE_NULL, lev%u(:, 0:lev%n-1), 3*(lev%n/num_procs), &
+                                MPI_REAL, 0, MPI_COMM_WORLD, ierr)
+            else
+                call MPI_Gather(lev%u(:, lev%first:lev%first + lev%n/num_procs - 1), 3*(lev%n/num_procs), &
+                                MPI_REAL, lev%u, 0, MPI_REAL, 0, MPI_COMM_WORLD, ierr)
+            end if
+            call MPI_Bcast(lev%u(:, lev%n), 3, MPI_REAL, num_procs - 1, MPI_COMM_WORLD, ierr)
+        end associate
+        call prof_stop(PROF_COMM)
+
+        if (rank == 0) then
+            call prof_start(PROF_OUTPUT)
+            write(output_file, '(a,f3.1,a)') 'output/mgrit_tau', tau, '.dat'
+            if (present(output_prefix)) then
+                if (len_trim(output_prefix) > 0) output_file = trim(output_prefix) // '.dat'
+            end if
+            write(run_extra, '(*(g0))') "ranks=", num_procs, " levels=", n_lev, " cf=", cf, " cycles=", k, &
+                  " converged=", status == 1
+            open(newunit=unit_num, file=trim(output_file), status='replace')
+            call write_run_header(unit_num, 'mgrit', R, tau, levels(0)%dt, levels(1)%dt, tf, u0, run_extra)
+            write(unit_num, '(a)') "t X Y Z"
+            do i = 0, levels(0)%n
+                if (status == -1) then
+                    write(unit_num, '(f10.6, a)') t0 + i * levels(0)%dt, "         NaN         NaN         NaN"
+                else
+                    write(unit_num, '(f10.6, 3f12.6)') t0 + i * levels(0)%dt, levels(0)%u(:, i)
+                end if
+            end do
+            close(unit_num)
+            call prof_stop(PROF_OUTPUT)
+            print '(a,a)', " Résultats sauvegardés dans: ", trim(output_file)
+        end if
+
+        do l = 0, n_lev - 1
+            deallocate(levels(l)%u, levels(l)%g)
+            if (allocated(levels(l)%v)) deallocate(levels(l)%v)
+        end do
+        deallocate(levels, t_relax, t_restrict, t_comm, phi_steps, stat_max, stat_out, steps_sum)
+    end subroutine solve_mgrit
+
+end module mgrit_solver
@@ -4,6 +4,9 @@ module param
     ! Paramètres globaux
     real, parameter :: R = 2.5  ! Amplitude adimensionnée des ondes générées (valeur corrigée)
     
+    ! Version du solveur, enregistrée dans l'en-tête des fichiers de sortie
+    character(len=*), parameter :: SOLVER_VERSION = '1.1'
+    
     ! Types de scénarios
     type scenario_type
         real :: tau      ! Paramètre de mémoire
@@ -49,4 +52,28 @@ contains
         end select
     end function get_scenario
     
+    subroutine write_run_header(unit_num, method, R_run, tau, h, h_coarse, tf, u0, extra)
+        ! Écrit la ligne d'en-tête "# clé=valeur ..." décrivant l'exécution,
+        ! avant la ligne "t X Y Z" des fichiers de sortie
+        !
+        ! Arguments:
+        !   unit_num : Unité du fichier ouvert
+        !   method   : Méthode de résolution ('rk4' ou 'parareal')
+        !   R_run, tau, h, h_coarse, tf, u0 : Paramètres de l'exécution
+        !   extra    : Paires clé=valeur supplémentaires (optionnel)
+        
+        integer, intent(in) :: unit_num
+        character(len=*), intent(in) :: method
+        real, intent(in) :: R_run, tau, h, h_coarse, tf
+        real, dimension(3), intent(in) :: u0
+        character(len=*), intent(in), optional :: extra
+        
+        write(unit_num, '(*(g0))') "# method=", trim(method), " version=", SOLVER_VERSION, &
+              " R=", R_run, " tau=", tau, " h=", h, " h_coarse=", h_coarse, " tf=", tf, &
+              " x0=", u0(1), " y0=", u0(2), " z0=", u0(3)
+        if (present(extra)) then
+            if (len_trim(extra) > 0) write(unit_num, '(a,a)') "# ", trim(extra)
+        end if
+    end subroutine write_run_header
+    
 end module param
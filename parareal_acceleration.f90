@@ -0,0 +1,204 @@
+module parareal_acceleration
+    ! Correction Parareal accélérée par sous-espace de Krylov (--accel=krylov)
+    !
+    ! La correction classique U_n+1 = G(U_n+1(n-1)) + F(U_n(n-1)) - G(U_n(n-1)) traite
+    ! le saut fin-grossier d = F - G comme constant autour de l'itéré courant. Les
+    ! solves fins des itérations précédentes donnent pourtant, pour chaque tranche,
+    ! des couples (x_j, d_j) = (état de départ, F(x_j) - G(x_j)). Ils engendrent un
+    ! sous-espace de Krylov sur lequel la dérivée de F - G est estimée par sécantes:
+    !
+    !     U_n+1(n) = G(U_n+1(n-1)) + d_k + D_n (U_n+1(n-1) - x_k)
+    !     D_n v    = dD c,  c = argmin |dX c - v|^2 + eps |c|^2
+    !
+    ! avec dX(:, j) = x_j - x_k et dD(:, j) = d_j - d_k. La partie de la dérivée fine
+    ! contenue dans le sous-espace remplace celle du propagateur grossier (Gander et
+    ! Petcu, version non linéaire). Le système étant autonome, F - G est la même
+    ! application pour toutes les tranches de même durée: les directions sont les
+    ! HISTORY_DEPTH départs les plus proches de x_k parmi toutes ces tranches (l'espace
+    ! d'état étant de dimension 3, trois directions suffisent). Au point fixe
+    ! (U_n+1(n-1) = x_k) le terme ajouté s'annule: la solution convergée est celle du
+    ! solve fin.
+    !
+    ! L'historique est propre à une fenêtre et n'est pas enregistré dans les points
+    ! de reprise: après une reprise, il se reconstitue en quelques itérations.
+    implicit none
+
+    private
+    public :: accel_reset, accel_correct, accel_release
+    public :: parse_accel_method, accel_method_name
+    public :: ACCEL_NONE, ACCEL_KRYLOV, ACCEL_INVALID
+
+    ! Identifiants des corrections Parareal disponibles
+    integer, parameter :: ACCEL_NONE = 0    ! Correction classique (extrapolation beta)
+    integer, parameter :: ACCEL_KRYLOV = 1  ! Sous-espace de Krylov des solves fins
+    integer, parameter :: ACCEL_INVALID = -1 ! Nom non reconnu par parse_accel_method
+
+    ! Nombre de couples (x_j, d_j) conservés par tranche
+    integer, parameter :: HISTORY_DEPTH = 3
+    ! Régularisation de Tikhonov relative des équations normales
+    double precision, parameter :: REGULARIZATION = 1.0D-6
+    ! Écart minimal entre deux départs pour qu'une direction soit exploitable
+    real, parameter :: MIN_SEPARATION = 1.0E-7
+
+    ! Historique par tranche: hist_x(:, j, n), hist_d(:, j, n), j = 1..hist_count(n)
+    ! (du plus récent au plus ancien), durée hist_dt(n) de la tranche
+    real, dimension(:,:,:), allocatable :: hist_x, hist_d
+    real, dimension(:), allocatable :: hist_dt
+    integer, dimension(:), allocatable :: hist_count
+
+contains
+
+    subroutine accel_reset(n_slices)
+        ! Vide l'historique (début de fenêtre) pour n_slices tranches
+        integer, intent(in) :: n_slices
+
+        call accel_release()
+        allocate(hist_x(3, HISTORY_DEPTH, n_slices), hist_d(3, HISTORY_DEPTH, n_slices))
+        allocate(hist_count(n_slices), hist_dt(n_slices))
+        hist_dt = 0.0
+        hist_x = 0.0
+        hist_d = 0.0
+        hist_count = 0
+    end subroutine accel_reset
+
+    subroutine accel_correct(n, dt, x, d, u_start, correction)
+        ! Correction de la tranche n (durée dt): d + D_n (u_start - x), où x est le
+        ! départ du solve fin de l'itération et d = F(x) - G(x). Le couple (x, d) est
+        ! ensuite ajouté à l'historique de la tranche.
+        integer, intent(in) :: n
+        real, intent(in) :: dt
+        real, dimension(3), intent(in) :: x, d, u_start
+        real, dimension(3), intent(out) :: correction
+
+        double precision, dimension(3, HISTORY_DEPTH) :: dX, dD
+        double precision, dimension(HISTORY_DEPTH, HISTORY_DEPTH) :: A
+        double precision, dimension(HISTORY_DEPTH) :: b, c
+        double precision :: eps
+        real, dimension(HISTORY_DEPTH) :: best
+        real :: dist
+        integer :: i, j, m, slot
+        logical :: ok
+
+        correction = d
+
+        ! Directions sécantes: les HISTORY_DEPTH départs les plus proches de x parmi
+        ! toutes les tranches de même durée (système autonome: même F - G)
+        m = 0
+        best = huge(1.0)
+        do i = 1, size(hist_count)
+            if (abs(hist_dt(i) - dt) > 1.0E-6 * max(1.0, abs(dt))) cycle
+            do j = 1, hist_count(i)
+                dist = maxval(abs(hist_x(:, j, i) - x))
+                if (dist < MIN_SEPARATION * (maxval(abs(x)) + 1.0)) cycle
+                if (m < HISTORY_DEPTH) then
+                    m = m + 1
+                    slot = m
+                else
+                    slot = maxloc(best, 1)
+                    if (dist >= best(slot)) cycle
+                end if
+                best(slot) = dist
+                dX(:, slot) = dble(hist_x(:, j, i) - x)
+                dD(:, slot) = dble(hist_d(:, j, i) - d)
+            end do
+        end do
+
+        if (m > 0) then
+            ! Équations normales régularisées (dX^T dX + eps I) c = dX^T (u_start - x)
+            A(1:m, 1:m) = matmul(transpose(dX(:, 1:m)), dX(:, 1:m))
+            eps = 0.0D0
+            do j = 1, m
+                eps = eps + A(j, j)
+            end do
+            eps = REGULARIZATION * eps / m
+            do j = 1, m
+                A(j, j) = A(j, j) + eps
+            end do
+            b(1:m) = matmul(transpose(dX(:, 1:m)), dble(u_start - x))
+            call solve_small_system(m, A(1:m, 1:m), b(1:m), c(1:m), ok)
+            if (ok) correction = correction + real(matmul(dD(:, 1:m), c(1:m)))
+        end if
+
+        ! Ajout du couple courant en tête de l'historique
+        hist_x(:, 2:HISTORY_DEPTH, n) = hist_x(:, 1:HISTORY_DEPTH-1, n)
+        hist_d(:, 2:HISTORY_DEPTH, n) = hist_d(:, 1:HISTORY_DEPTH-1, n)
+        hist_x(:, 1, n) = x
+        hist_d(:, 1, n) = d
+        hist_count(n) = min(hist_count(n) + 1, HISTORY_DEPTH)
+        hist_dt(n) = dt
+    end subroutine accel_correct
+
+    subroutine accel_release()
+        ! Libère l'historique
+        if (allocated(hist_x)) deallocate(hist_x, hist_d, hist_count, hist_dt)
+    end subroutine accel_release
+
+    subroutine solve_small_system(m, A, b, x, ok)
+        ! Élimination de Gauss avec pivot partiel (m <= HISTORY_DEPTH)
+        integer, intent(in) :: m
+        double precision, dimension(m, m), intent(in) :: A
+        double precision, dimension(m), intent(in) :: b
+        double precision, dimension(m), intent(out) :: x
+        logical, intent(out) :: ok
+
+        double precision, dimension(m, m) :: M_work
+        double precision, dimension(m) :: rhs, row
+        double precision :: factor, tmp
+        integer :: i, j, p
+
+        M_work = A
+        rhs = b
+        x = 0.0D0
+        ok = .false.
+        do i = 1, m
+            p = i - 1 + maxloc(abs(M_work(i:m, i)), 1)
+            if (abs(M_work(p, i)) <= tiny(1.0D0)) return
+            if (p /= i) then
+                row = M_work(i, :)
+                M_work(i, :) = M_work(p, :)
+                M_work(p, :) = row
+                tmp = rhs(i)
+                rhs(i) = rhs(p)
+                rhs(p) = tmp
+            end if
+            do j = i + 1, m
+                factor = M_work(j, i) / M_work(i, i)
+                M_work(j, i:m) = M_work(j, i:m) - factor * M_work(i, i:m)
+                rhs(j) = rhs(j) - factor * rhs(i)
+            end do
+        end do
+        do i = m, 1, -1
+            x(i) = (rhs(i) - sum(M_work(i, i+1:m) * x(i+1:m))) / M_work(i, i)
+        end do
+        ok = .true.
+    end subroutine solve_small_system
+
+    function parse_accel_method(name) result(method)
+        ! Convertit 'krylov' ou 'none' en identifiant (ACCEL_INVALID pour un nom inconnu)
+        character(len=*), intent(in) :: name
+        integer :: method
+
+        select case (trim(name))
+            case ('none')
+                method = ACCEL_NONE
+            case ('krylov')
+                method = ACCEL_KRYLOV
+            case default
+                method = ACCEL_INVALID
+        end select
+    end function parse_accel_method
+
+    function accel_method_name(method) result(name)
+        ! Nom affiché de la correction Parareal
+        integer, intent(in) :: method
+        character(len=8) :: name
+
+        select case (method)
+            case (ACCEL_KRYLOV)
+                name = 'krylov'
+            case default
+                name = 'none'
+        end select
+    end function accel_method_name
+
+end module parareal_acceleration
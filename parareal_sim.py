@@ -0,0 +1,526 @@
+"""
+Simulateur Parareal en Python pour expérimenter l'algorithme sans recompiler
+ni lancer mpirun.
+
+L'itération reproduit solve_parareal (parareal_solver.f90):
+  - ajustement des pas et de la tolérance selon le régime de tau;
+  - initialisation grossière, puis à chaque itération k: solves fins
+    indépendants sur toutes les tranches, correction séquentielle
+    U_n+1 = G(U_n^k) + F(U_n^k-1) - G(U_n^k-1), avec la prédiction extrapolée
+    (beta = 0.1) pour k > 1, l'amortissement pour tau < 1 et la limitation des
+    corrections;
+  - critère de convergence: max(variation relative de l'état, variation
+    relative de l'énergie 0.5 |u|^2) < tolérance, ou toutes les tranches
+    figées avec --freeze; arrêt à max_iter.
+Les propagateurs grossiers (RK2, AB2, AB3 avec leurs garde-fous) sont ceux de
+coarse_propagators.f90, le propagateur fin est RK4 (solve_rk4_interval).
+
+Les solves fins d'une itération sont indépendants. À partir de
+BATCH_MIN_SLICES tranches, ils avancent ensemble, pas par pas, comme un seul
+tableau (n_tranches, 3). Ils peuvent aussi être répartis sur un pool de
+processus (--workers).
+
+L'accélération est estimée en nombre d'évaluations de compute_derivatives, en
+supposant une tranche par processus:
+    séquentiel = N * C_F
+    Parareal   = N * C_G + somme_k (C_F + 2 * N_k * C_G)
+où C_F et C_G sont les coûts fin et grossier d'une tranche et N_k le nombre de
+tranches corrigées à l'itération k (les tranches figées ne coûtent rien).
+
+Les propagations grossières de la correction sont séquentielles par nature et
+portent sur un seul état: elles sont écrites en boucles scalaires, bien moins
+coûteuses que des opérations numpy sur un tableau de 3 valeurs. Les calculs sont
+en double précision (simple précision dans le solveur): les nombres
+d'itérations peuvent différer légèrement de ceux du solveur Fortran.
+
+Usage:
+    python parareal_sim.py --tau 5.0 --tf 100 --slices 8 --h-coarse 0.005 --h-fine 0.0005
+    python parareal_sim.py --tau 5.0 --slices 4 8 16 32 --coarse rk2 ab3 --h-coarse 0.01 0.005
+    python parareal_sim.py --tau 2.0 --freeze --check --workers 4
+"""
+import argparse
+import itertools
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from lyapunov import R_DEFAULT, lorenz_rhs
+
+COARSE_METHODS = ('default', 'rk2', 'ab2', 'ab3')
+DEFAULT_MAX_ITER = 20   # main.f90
+MAX_BAD_ITERATIONS = 5
+BATCH_MIN_SLICES = 16   # Nombre de tranches à partir duquel les solves fins sont vectorisés
+
+
+def default_tolerance(tau):
+    """Tolérance passée à solve_parareal par main.f90"""
+    return 5.0e-4 if tau < 1.0 else 1.0e-4
+
+
+def regime_parameters(tau, h_coarse, h_fine, tol):
+    """
+    Ajustement des pas et de la tolérance selon le régime de tau (solve_parareal).
+
+    Returns:
+        tuple: (h_coarse, h_fine, tolérance) effectifs
+    """
+    if tau < 1.0:
+        return min(h_coarse, tau / 20.0), min(h_fine, tau / 200.0), min(tol, 1.0e-5)
+    if tau < 3.0:
+        return min(h_coarse, tau / 10.0), min(h_fine, tau / 100.0), min(tol, 5.0e-6)
+    if tau < 6.0:
+        return min(h_coarse, 0.1), min(h_fine, 0.01), min(tol * 5.0, 5.0e-5)
+    return min(h_coarse, 0.2), min(h_fine, 0.01), min(tol, 1.0e-6)
+
+
+def _rhs(x, y, z, R, inv_tau):
+    """Second membre du système pour un état scalaire (voir lyapunov.lorenz_rhs)"""
+    return y - x, -inv_tau * y + x * z, R - inv_tau * z - x * y
+
+
+def _within(u, bound):
+    """Vrai si toutes les composantes sont finies et de module au plus bound"""
+    return abs(u[0]) <= bound and abs(u[1]) <= bound and abs(u[2]) <= bound
+
+
+def rk2_step(u, R, tau, dt):
+    """Pas RK2 (point milieu) de coarse_propagators.f90, avec ses garde-fous"""
+    if not _within(u, 1.0e10):
+        return 0.0, 0.0, R
+    safe_tau = max(tau, 0.05)
+    if tau < 1.0:
+        dt = min(dt, safe_tau / 20.0)
+    elif tau < 3.0:
+        dt = min(dt, safe_tau / 10.0)
+    else:
+        dt = min(dt, safe_tau / 5.0)
+    inv_tau = 1.0 / safe_tau
+    x, y, z = u
+    k1 = _rhs(x, y, z, R, inv_tau)
+    if not _within(k1, 1.0e4):
+        return u
+    half = 0.5 * dt
+    k2 = _rhs(x + half * k1[0], y + half * k1[1], z + half * k1[2], R, inv_tau)
+    if not _within(k2, 1.0e4):
+        u_final = (x + 0.01 * dt * k1[0], y + 0.01 * dt * k1[1], z + 0.01 * dt * k1[2])
+    else:
+        u_final = (x + dt * k2[0], y + dt * k2[1], z + dt * k2[2])
+        if tau < 1.0 and not _within(u_final, 10.0):
+            u_final = tuple(a + 0.01 * (b - a) for a, b in zip(u, u_final))
+    if not _within(u_final, 100.0):
+        return 0.0, 0.0, R
+    return u_final
+
+
+def ab2_step(u_curr, u_prev, f_curr, f_prev, R, tau, dt):
+    """Pas Adams-Bashforth 2 de coarse_propagators.f90"""
+    c = dt / 2.0
+    u_next = (u_curr[0] + c * (3.0 * f_curr[0] - f_prev[0]),
+              u_curr[1] + c * (3.0 * f_curr[1] - f_prev[1]),
+              u_curr[2] + c * (3.0 * f_curr[2] - f_prev[2]))
+    if not _within(u_next, 1.0e6):
+        u_next = (0.0, 0.0, R)
+    if max(tau, 1.0e-6) < 1.0:
+        u_next = (0.9 * u_curr[0] + 0.1 * u_next[0],
+                  0.9 * u_curr[1] + 0.1 * u_next[1],
+                  0.9 * u_curr[2] + 0.1 * u_next[2])
+    return u_next
+
+
+def ab3_step(u_curr, u_prev, u_prev2, f_curr, f_prev, f_prev2, R, tau, dt):
+    """Pas Adams-Bashforth 3 de coarse_propagators.f90 (lissage par l'historique pour tau >= 5)"""
+    c = dt / 12.0
+    u_next = [u_curr[i] + c * (23.0 * f_curr[i] - 16.0 * f_prev[i] + 5.0 * f_prev2[i]) for i in range(3)]
+    if not _within(u_next, 1.0e6):
+        u_next = [0.0, 0.0, R]
+    safe_tau = max(tau, 1.0e-6)
+    if safe_tau >= 5.0:
+        w = min(0.85, 0.3 + 0.1 * safe_tau)
+        u_next = [w * u_next[i] + (1.0 - w) * (1.7 * u_curr[i] - 0.8 * u_prev[i] + 0.1 * u_prev2[i])
+                  for i in range(3)]
+    elif safe_tau < 1.0:
+        u_next = [0.85 * u_curr[i] + 0.15 * u_next[i] for i in range(3)]
+    # Limitation du déplacement dans l'espace des phases
+    for i in range(3):
+        if abs(u_next[i] - u_curr[i]) > 5.0:
+            u_next[i] = u_curr[i] + math.copysign(5.0, u_next[i] - u_curr[i])
+    return tuple(u_next)
+
+
+def propagate_rk2(u0, interval, h, R, tau):
+    """RK2 sur un intervalle de longueur interval (propagate_with_rk2)"""
+    u = u0
+    for _ in range(int(interval / h)):
+        u = rk2_step(u, R, tau, h)
+    return u
+
+
+def propagate_ab2(u0, interval, h, R, tau):
+    """AB2 (démarrage RK2) sur un intervalle (propagate_with_ab2)"""
+    n_steps = int(interval / h)
+    if n_steps < 1:
+        return u0
+    inv_tau = 1.0 / max(tau, 1.0e-6)
+    u_prev = u0
+    f_prev = _rhs(*u_prev, R, inv_tau)
+    u_curr = rk2_step(u_prev, R, tau, h)
+    f_curr = _rhs(*u_curr, R, inv_tau)
+    for _ in range(2, n_steps + 1):
+        u_next = ab2_step(u_curr, u_prev, f_curr, f_prev, R, tau, h)
+        u_prev, f_prev, u_curr = u_curr, f_curr, u_next
+        f_curr = _rhs(*u_curr, R, inv_tau)
+    return u_curr
+
+
+def propagate_ab3(u0, interval, h, R, tau):
+    """AB3 (démarrage RK2, demi-pas interne pour tau >= 5) sur un intervalle (propagate_with_ab3)"""
+    n_steps = int(interval / h)
+    if n_steps < 2:
+        return rk2_step(u0, R, tau, interval)
+    if tau >= 5.0:
+        h, n_steps = h / 2.0, n_steps * 2
+    inv_tau = 1.0 / max(tau, 1.0e-6)
+    u_prev2 = u0
+    f_prev2 = _rhs(*u_prev2, R, inv_tau)
+    u_prev = rk2_step(u_prev2, R, tau, h)
+    f_prev = _rhs(*u_prev, R, inv_tau)
+    u_curr = rk2_step(u_prev, R, tau, h)
+    f_curr = _rhs(*u_curr, R, inv_tau)
+    for _ in range(3, n_steps + 1):
+        u_next = ab3_step(u_curr, u_prev, u_prev2, f_curr, f_prev, f_prev2, R, tau, h)
+        u_prev2, f_prev2, u_prev, f_prev, u_curr = u_prev, f_prev, u_curr, f_curr, u_next
+        f_curr = _rhs(*u_curr, R, inv_tau)
+        # Garde-fou de propagate_with_ab3: reprise avec un demi-pas RK2
+        if any(abs(v) > 1.0e6 or (tau >= 5.0 and math.isnan(v)) for v in u_curr):
+            u_curr = rk2_step(u_prev, R, tau, h * 0.5)
+            f_curr = _rhs(*u_curr, R, inv_tau)
+    return u_curr
+
+
+COARSE_PROPAGATORS = {'rk2': propagate_rk2, 'ab2': propagate_ab2, 'ab3': propagate_ab3}
+
+
+def propagate_coarse(method, states, interval, h, R, tau):
+    """
+    Propagation grossière de plusieurs états (une ligne par tranche).
+
+    Args:
+        method (str): 'rk2', 'ab2' ou 'ab3'
+        states (numpy.ndarray): États initiaux, forme (m, 3)
+
+    Returns:
+        numpy.ndarray: États finaux, forme (m, 3)
+    """
+    propagator = COARSE_PROPAGATORS[method]
+    return np.array([propagator(tuple(u), interval, h, R, tau) for u in states], dtype=float).reshape(-1, 3)
+
+
+def _rk4_scalar(u, n_steps, h, R, inv_tau):
+    """RK4 sur n_steps pas pour un état scalaire"""
+    x, y, z = u
+    half, sixth = 0.5 * h, h / 6.0
+    for _ in range(n_steps):
+        a = _rhs(x, y, z, R, inv_tau)
+        b = _rhs(x + half * a[0], y + half * a[1], z + half * a[2], R, inv_tau)
+        c = _rhs(x + half * b[0], y + half * b[1], z + half * b[2], R, inv_tau)
+        d = _rhs(x + h * c[0], y + h * c[1], z + h * c[2], R, inv_tau)
+        x += sixth * (a[0] + 2.0 * b[0] + 2.0 * c[0] + d[0])
+        y += sixth * (a[1] + 2.0 * b[1] + 2.0 * c[1] + d[1])
+        z += sixth * (a[2] + 2.0 * b[2] + 2.0 * c[2] + d[2])
+    return x, y, z
+
+
+def propagate_fine(states, interval, h, R, tau):
+    """
+    RK4 (solve_rk4_interval) sur un intervalle pour plusieurs états indépendants.
+
+    Au-delà de BATCH_MIN_SLICES états, toutes les tranches avancent ensemble comme un
+    seul tableau numpy; en deçà, le coût fixe d'une opération numpy dépasse celui d'une
+    boucle scalaire par tranche.
+
+    Args:
+        states (numpy.ndarray): États initiaux, forme (m, 3)
+
+    Returns:
+        numpy.ndarray: États finaux, forme (m, 3)
+    """
+    n_steps = int(interval / h)
+    tau = tau if abs(tau) >= 1.0e-10 else 0.01
+    if len(states) < BATCH_MIN_SLICES:
+        inv_tau = 1.0 / max(tau, 1.0e-6)
+        return np.array([_rk4_scalar(tuple(u), n_steps, h, R, inv_tau) for u in states],
+                        dtype=float).reshape(-1, 3)
+    u = np.array(states, dtype=float)
+    for _ in range(n_steps):
+        k1 = lorenz_rhs(u, R, tau)
+        k2 = lorenz_rhs(u + 0.5 * h * k1, R, tau)
+        k3 = lorenz_rhs(u + 0.5 * h * k2, R, tau)
+        k4 = lorenz_rhs(u + h * k3, R, tau)
+        u = u + (h / 6.0) * (k1 + 2.0 * k2 + 2.0 * k3 + k4)
+    return u
+
+
+def coarse_cost(method, interval, h, tau):
+    """Évaluations de compute_derivatives d'une propagation grossière sur une tranche"""
+    n_steps = int(interval / h)
+    if method == 'rk2':
+        return 2 * n_steps
+    if method == 'ab2':
+        return 4 + (n_steps - 1) if n_steps >= 1 else 0
+    if n_steps < 2:
+        return 2
+    if tau >= 5.0:
+        n_steps *= 2
+    return 2 * 2 + 3 + (n_steps - 2)
+
+
+def fine_cost(interval, h):
+    """Évaluations de compute_derivatives d'un solve fin RK4 sur une tranche"""
+    return 4 * int(interval / h)
+
+
+def _fine_chunk(args):
+    """Tâche du pool de processus: solves fins d'un groupe de tranches"""
+    return propagate_fine(*args)
+
+
+def simulate_parareal(tau, tf, n_slices, h_coarse=0.005, h_fine=0.0005, R=R_DEFAULT, u0=(1.0, 0.0, 0.0),
+                      coarse='default', max_iter=DEFAULT_MAX_ITER, tol=None, freeze=False, workers=1,
+                      verbose=False):
+    """
+    Exécute l'itération Parareal de solve_parareal sur [0, tf].
+
+    Args:
+        tau (float): Paramètre de mémoire
+        tf (float): Temps final
+        n_slices (int): Nombre de tranches (processus x threads du solveur)
+        h_coarse, h_fine (float): Pas grossier et fin demandés (ajustés selon le régime)
+        R (float): Paramètre d'amplitude
+        u0 (tuple): Condition initiale
+        coarse (str): 'default' (AB3 + prédiction RK2), 'rk2', 'ab2' ou 'ab3'
+        max_iter (int): Nombre maximal d'itérations
+        tol (float): Tolérance (par défaut celle de main.f90)
+        freeze (bool): Figer les tranches convergées (--freeze)
+        workers (int): Processus pour les solves fins (1: dans le processus courant)
+        verbose (bool): Afficher la métrique à chaque itération
+
+    Returns:
+        dict: status ('converged', 'max_iter', 'diverged', 'unstable'), iterations, history
+              (métrique par itération), U (états aux bornes des tranches), paramètres effectifs,
+              coûts en évaluations et accélération estimée
+    """
+    if coarse not in COARSE_METHODS:
+        raise ValueError(f"Propagateur grossier inconnu: {coarse!r} ({', '.join(COARSE_METHODS)})")
+    safe_tau = tau if abs(tau) >= 1.0e-10 else 0.01
+    if tol is None:
+        tol = default_tolerance(tau)
+    h_coarse, h_fine, adapt_tol = regime_parameters(safe_tau, h_coarse, h_fine, tol)
+    g_init, g_pred = ('ab3', 'rk2') if coarse == 'default' else (coarse, coarse)
+    G_init, G_pred = COARSE_PROPAGATORS[g_init], COARSE_PROPAGATORS[g_pred]
+    delta_T = tf / n_slices
+
+    def energy(u):
+        return 0.5 * np.sum(u * u, axis=-1)
+
+    pool = ProcessPoolExecutor(workers) if workers > 1 else None
+
+    def F(states):
+        if pool is None or len(states) < 2:
+            return propagate_fine(states, delta_T, h_fine, R, safe_tau)
+        chunks = np.array_split(states, min(workers, len(states)))
+        return np.concatenate(list(pool.map(_fine_chunk, [(c, delta_T, h_fine, R, safe_tau) for c in chunks])))
+
+    start = time.perf_counter()
+    # Initialisation grossière (séquentielle)
+    U = np.zeros((n_slices + 1, 3))
+    U[0] = u0
+    for n in range(n_slices):
+        U[n + 1] = G_init(tuple(U[n]), delta_T, h_coarse, R, safe_tau)
+    E = energy(U)
+    frozen = np.zeros(n_slices + 1, dtype=bool)
+    frozen[0] = True
+
+    history = []
+    n_fine_solves = 0
+    fine_rounds = 0         # Itérations avec au moins un solve fin
+    coarse_solves = n_slices
+    bad_counter = 0
+    status = 'max_iter'
+    k = 0
+    try:
+        for k in range(1, max_iter + 1):
+            E_prev, frozen_prev = E.copy(), frozen.copy()
+            active = ~frozen_prev[1:] if freeze else np.ones(n_slices, dtype=bool)
+            n_fine_solves += int(active.sum())
+            fine_rounds += int(np.any(active))
+
+            # Solves fins indépendants: toutes les tranches actives en un seul lot
+            u_fine = U[1:].copy()
+            if np.any(active):
+                u_fine[active] = F(U[:-1][active])
+            if np.any(np.isnan(u_fine) | (np.abs(u_fine) > 1.0e10)):
+                bad_counter += 1
+                u_fine = np.clip(np.nan_to_num(u_fine, nan=0.0), -1.0e10, 1.0e10)
+                if bad_counter >= MAX_BAD_ITERATIONS:
+                    status = 'unstable'
+                    break
+            else:
+                bad_counter = 0
+
+            # Correction séquentielle. Le terme d'extrapolation beta * (U_n - U_prev) de
+            # solve_parareal est toujours nul (U_prev y est copié de U_n en début
+            # d'itération): seule la prédiction par g_pred pour k > 1 est reproduite.
+            U_new = U.copy()
+            for n in range(1, n_slices + 1):
+                if freeze:
+                    if frozen_prev[n]:
+                        continue
+                    if frozen_prev[n - 1]:
+                        U_new[n] = u_fine[n - 1]
+                        E[n] = energy(U_new[n])
+                        frozen[n] = True
+                        continue
+                u_coarse_prev = np.array(G_init(tuple(U[n - 1]), delta_T, h_coarse, R, safe_tau))
+                G = G_pred if k > 1 else G_init
+                u_coarse_new = np.array(G(tuple(U_new[n - 1]), delta_T, h_coarse, R, safe_tau))
+                coarse_solves += 2
+                if tau < 1.0:
+                    # Correction amortie pour le régime non-marcheur
+                    U_new[n] = 0.8 * u_coarse_new + 0.2 * (u_fine[n - 1] - u_coarse_prev + u_coarse_new)
+                else:
+                    U_new[n] = u_coarse_new + u_fine[n - 1] - u_coarse_prev
+                correction = U_new[n] - u_coarse_new
+                U_new[n] = np.where(np.abs(correction) > 10.0, u_coarse_new + np.copysign(10.0, correction),
+                                    U_new[n])
+                E[n] = energy(U_new[n])
+
+            # Gel par tolérance, en cascade depuis la première tranche
+            if freeze:
+                for n in range(1, n_slices + 1):
+                    if not frozen[n - 1]:
+                        break
+                    if frozen[n]:
+                        continue
+                    change = max(np.max(np.abs(U_new[n] - U[n])) / (np.max(np.abs(U[n])) + 1.0e-10),
+                                 abs(E[n] - E_prev[n]) / (abs(E_prev[n]) + 1.0e-10))
+                    if change < adapt_tol:
+                        frozen[n] = True
+
+            max_diff = float(np.max(np.abs(U_new - U)))
+            rel_state = max_diff / (float(np.max(np.abs(U))) + 1.0e-10)
+            rel_energy = float(np.max(np.abs(E - E_prev) / (np.abs(E_prev) + 1.0e-10)))
+            metric = max(rel_state, rel_energy)
+            history.append(metric)
+            if verbose:
+                print(f"  Itération {k:2d}: variation état {rel_state:.3e}, énergie {rel_energy:.3e}"
+                      + (f", tranches figées {int(frozen[1:].sum())}/{n_slices}" if freeze else ''))
+
+            U = U_new
+            if np.isnan(max_diff) or max_diff > 1.0e20:
+                status = 'diverged'
+                break
+            if metric < adapt_tol or (freeze and np.all(frozen)):
+                status = 'converged'
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    elapsed = time.perf_counter() - start
+
+    iterations = min(k, max_iter)
+    c_fine = fine_cost(delta_T, h_fine)
+    c_coarse = coarse_cost(g_init, delta_T, h_coarse, safe_tau)
+    serial = n_slices * c_fine
+    # Chemin critique: propagations grossières (séquentielles sur le processus 0)
+    # et un solve fin par itération où au moins une tranche n'est pas figée
+    parallel = coarse_solves * c_coarse + fine_rounds * c_fine
+    return {
+        'status': status,
+        'iterations': iterations,
+        'history': history,
+        'U': U,
+        'T': np.linspace(0.0, tf, n_slices + 1),
+        'h_coarse': h_coarse,
+        'h_fine': h_fine,
+        'tol': adapt_tol,
+        'coarse': coarse,
+        'n_slices': n_slices,
+        'fine_solves': n_fine_solves,
+        'serial_cost': serial,
+        'parareal_cost': parallel,
+        'speedup': serial / parallel if parallel > 0 else np.inf,
+        'efficiency': serial / parallel / n_slices if parallel > 0 else np.inf,
+        'elapsed': elapsed,
+    }
+
+
+def reference_error(result, tau, R=R_DEFAULT, u0=(1.0, 0.0, 0.0)):
+    """
+    Écart maximal entre les états Parareal aux bornes des tranches et le solve fin séquentiel.
+
+    Returns:
+        float: max |U_n - F(T_n)|
+    """
+    U = result['U']
+    u = np.array([u0], dtype=float)
+    delta_T = result['T'][-1] / result['n_slices']
+    error = 0.0
+    for n in range(1, result['n_slices'] + 1):
+        u = propagate_fine(u, delta_T, result['h_fine'], R, tau)
+        error = max(error, float(np.max(np.abs(U[n] - u[0]))))
+    return error
+
+
+def sweep(tau, tf, slices, h_coarse_values, coarse_methods, h_fine=0.0005, R=R_DEFAULT, **kwargs):
+    """
+    Balayage des combinaisons (nombre de tranches, h_coarse, propagateur).
+
+    Returns:
+        list: (n_slices, h_coarse, coarse, résultat) pour chaque combinaison
+    """
+    rows = []
+    for n_slices, h_coarse, coarse in itertools.product(slices, h_coarse_values, coarse_methods):
+        result = simulate_parareal(tau, tf, n_slices, h_coarse, h_fine, R, coarse=coarse, **kwargs)
+        rows.append((n_slices, h_coarse, coarse, result))
+    return rows
+
+
+def parse_command_line():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Python Parareal simulator (same iteration as solve_parareal)')
+    parser.add_argument('--tau', type=float, default=5.0, help='Memory parameter')
+    parser.add_argument('--R', type=float, default=R_DEFAULT, help='Amplitude parameter')
+    parser.add_argument('--tf', type=float, default=100.0, help='Final time')
+    parser.add_argument('--u0', type=float, nargs=3, default=[1.0, 0.0, 0.0], help='Initial condition')
+    parser.add_argument('--slices', type=int, nargs='+', default=[5], help='Slice counts (ranks x threads)')
+    parser.add_argument('--h-coarse', type=float, nargs='+', default=[0.005], help='Coarse step(s)')
+    parser.add_argument('--h-fine', type=float, default=0.0005, help='Fine step')
+    parser.add_argument('--coarse', nargs='+', default=['default'], choices=COARSE_METHODS,
+                        help='Coarse propagator(s)')
+    parser.add_argument('--max-iter', type=int, default=DEFAULT_MAX_ITER, help='Maximum Parareal iterations')
+    parser.add_argument('--tol', type=float, help='Tolerance (default: as main.f90)')
+    parser.add_argument('--freeze', action='store_true', help='Freeze converged slices')
+    parser.add_argument('--workers', type=int, default=1, help='Processes for the fine solves')
+    parser.add_argument('--check', action='store_true', help='Compare with the sequential fine solution')
+    parser.add_argument('--verbose', action='store_true', help='Print the metric at each iteration')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_command_line()
+    print(f"Parareal simulé: tau={args.tau}, R={args.R}, tf={args.tf}"
+          f"{', gel des tranches' if args.freeze else ''}")
+    print(f"{'Tranches':>8} {'h_coarse':>9} {'Grossier':>9} {'Itér.':>6} {'Statut':>10} {'Métrique':>10} "
+          f"{'Accél.':>7} {'Effic.':>7} {'Durée (s)':>10}" + (f" {'Erreur':>10}" if args.check else ''))
+    for n_slices, h_coarse, coarse, res in sweep(args.tau, args.tf, args.slices, args.h_coarse, args.coarse,
+                                                  args.h_fine, args.R, u0=tuple(args.u0), max_iter=args.max_iter,
+                                                  tol=args.tol, freeze=args.freeze, workers=args.workers,
+                                                  verbose=args.verbose):
+        line = (f"{n_slices:>8d} {res['h_coarse']:>9.4g} {coarse:>9} {res['iterations']:>6d} {res['status']:>10} "
+                f"{res['history'][-1] if res['history'] else np.nan:>10.2e} {res['speedup']:>7.2f} "
+                f"{res['efficiency']:>7.2f} {res['elapsed']:>10.2f}")
+        if args.check:
+            line += f" {reference_error(res, args.tau, args.R, tuple(args.u0)):>10.2e}"
+        print(line)
@@ -2,310 +2,23 @@ module parareal_solver
     use mpi
     use derivatives
     use domain_decomposition
+    use coarse_propagators
+    use coarse_tuning, only: tune_coarse_propagator
+    use flow_map, only: flowmap_prepare, flowmap_report, flowmap_release
     use rk4_solver, only: solve_rk4_interval
+    use param, only: write_run_header
+    use profiler
+    use stream_output, only: stream_write, stream_write_states, stream_flush
+    use checkpoint, only: checkpoint_write, checkpoint_read, CHECKPOINT_KEY_SIZE
+    use parareal_acceleration, only: accel_reset, accel_correct, accel_release, accel_method_name, &
+                                     ACCEL_NONE, ACCEL_KRYLOV
+    !$ use omp_lib
     implicit none
     
     private
     public :: solve_parareal
     
 contains
-    ! Simplified RK2 (midpoint method) - Used for initialization of AB methods
-    function rk2_step(u0, R, tau, dt) result(u_final)
-        ! Runge-Kutta 2nd order method (midpoint method)
-        ! More stable than Euler for approximations
-        real, dimension(3), intent(in) :: u0
-        real, intent(in) :: R, tau, dt
-        real, dimension(3) :: u_final, k1, k2
-        real :: safe_tau, effective_dt
-        
-        ! Check input for NaN/Inf - break infinite loops early
-        if (any(isnan(u0)) .or. any(abs(u0) > 1.0E10)) then
-            ! Return a stable point instead of propagating bad values
-            u_final = [0.0, 0.0, R]
-            return
-        end if
-        
-        ! Use more conservative values for challenging cases
-        ! Adaptation based on tau regimes mentioned in parareal.md
-        safe_tau = max(tau, 0.05)  ! Higher minimum value for stability
-        
-        ! Dynamic step size adaption based on tau value (Section 2.4 of parareal.md)
-        effective_dt = dt
-        if (tau < 1.0) then
-            ! For small tau (Type 1), use much smaller steps
-            effective_dt = min(dt, safe_tau/20.0)
-        else if (tau < 3.0) then
-            ! For moderate tau (Type 2), use moderate steps
-            effective_dt = min(dt, safe_tau/10.0)
-        else
-            ! For larger tau (chaotic/oscillatory), use standard steps with safety
-            effective_dt = min(dt, safe_tau/5.0)
-        end if
-        
-        ! First RK stage
-        call compute_derivatives(u0, R, safe_tau, k1)
-        
-        ! If first stage already has issues, use simpler approach
-        if (any(isnan(k1)) .or. any(abs(k1) > 1.0E4)) then
-            u_final = u0  ! Return original point to stop evolution
-            return
-        end if
-        
-        ! Second RK stage (midpoint) with additional safety
-        call compute_derivatives(u0 + 0.5*effective_dt*k1, R, safe_tau, k2)
-        
-        ! If second stage has issues, fall back to safer Euler
-        if (any(isnan(k2)) .or. any(abs(k2) > 1.0E4)) then
-            ! Use reduced step forward Euler as failsafe
-            u_final = u0 + 0.01 * effective_dt * k1
-        else
-            ! Normal RK2 update with dampening for stability
-            u_final = u0 + effective_dt * k2
-            
-            ! Implement circuit breaker for extreme values
-            if (any(abs(u_final) > 10.0)) then
-                ! For tau < 1.0, dampen the changes heavily
-                if (tau < 1.0) u_final = u0 + 0.01 * (u_final - u0)
-            end if
-        end if
-        
-        ! Final safety check
-        if (any(isnan(u_final)) .or. any(abs(u_final) > 100.0)) then
-            ! Return the stable fixed point for this system
-            u_final = [0.0, 0.0, R]
-        end if
-    end function rk2_step
-    
-    ! Fix for AB2 step - using the u_prev and tau parameters
-    function ab2_step(u_curr, u_prev, f_curr, f_prev, R, tau, dt) result(u_next)
-        ! Adams-Bashforth 2nd order method
-        ! Requires two previous points and their derivatives
-        real, dimension(3), intent(in) :: u_curr, u_prev ! Current and previous state vectors
-        real, dimension(3), intent(in) :: f_curr, f_prev ! Current and previous derivatives
-        real, intent(in) :: R, tau, dt                   ! Parameters and time step
-        real, dimension(3) :: u_next                     ! Next state vector
-        real :: safe_tau
-        
-        ! Ensure tau is not too small
-        safe_tau = max(tau, 1.0E-6)
-        
-        ! AB2 formula: u_{n+1} = u_n + (h/2) * (3*f_n - f_{n-1})
-        u_next = u_curr + (dt/2.0) * (3.0*f_curr - f_prev)
-        
-        ! Safety check for extreme values or NaN
-        if (any(isnan(u_next)) .or. any(abs(u_next) > 1.0E6)) then
-            ! Return a stable point if computation goes wrong
-            u_next = [0.0, 0.0, R]
-        end if
-        
-        ! Additional stability check for small tau values (stiff cases)
-        if (safe_tau < 1.0) then
-            ! Dampen changes for small tau to prevent instabilities
-            u_next = 0.9 * u_curr + 0.1 * u_next
-        end if
-    end function ab2_step
-    
-    ! Improved AB3 step that properly uses all parameters
-    function ab3_step(u_curr, u_prev, u_prev2, f_curr, f_prev, f_prev2, R, tau, dt) result(u_next)
-        ! Adams-Bashforth 3rd order method
-        ! Requires three previous points and their derivatives
-        real, dimension(3), intent(in) :: u_curr, u_prev, u_prev2  ! Current and two previous states
-        real, dimension(3), intent(in) :: f_curr, f_prev, f_prev2  ! Current and two previous derivatives
-        real, intent(in) :: R, tau, dt                             ! Parameters and time step
-        real, dimension(3) :: u_next                               ! Next state vector
-        real :: safe_tau, weight_factor
-        
-        ! Ensure tau is not too small
-        safe_tau = max(tau, 1.0E-6)
-        
-        ! AB3 formula: u_{n+1} = u_n + (h/12) * (23*f_n - 16*f_{n-1} + 5*f_{n-2})
-        u_next = u_curr + (dt/12.0) * (23.0*f_curr - 16.0*f_prev + 5.0*f_prev2)
-        
-        ! Safety check for extreme values or NaN
-        if (any(isnan(u_next)) .or. any(abs(u_next) > 1.0E6)) then
-            ! Return a stable point if computation goes wrong
-            u_next = [0.0, 0.0, R]
-        end if
-        
-        ! Use history for smoothing in chaotic regimes (tau >= 5.0)
-        ! This helps prevent wild oscillations that can lead to divergence
-        if (safe_tau >= 5.0) then
-            ! For chaotic regimes, blend with history to maintain stability
-            ! Create weighted average between current prediction and history
-            weight_factor = min(0.85, 0.3 + 0.1*safe_tau) ! Scales with tau for better results
-            
-            ! Linear combination using past values for stability
-            u_next = weight_factor * u_next + &
-                    (1.0 - weight_factor) * (1.7*u_curr - 0.8*u_prev + 0.1*u_prev2)
-        
-        ! Additional stability checks for small tau values (stiff cases)
-        else if (safe_tau < 1.0) then
-            ! Use weighted average with previous value for stability in stiff cases
-            u_next = 0.85 * u_curr + 0.15 * u_next
-        end if
-        
-        ! Additional stability measures for extreme oscillations
-        if (any(abs(u_next - u_curr) > 5.0)) then
-            ! Limit maximum step size in state space
-            where (abs(u_next - u_curr) > 5.0)
-                u_next = u_curr + sign(5.0, u_next - u_curr)
-            end where
-        end if
-    end function ab3_step
-    
-    ! NEW: Function to propagate a solution using AB2 over an interval
-    function propagate_with_ab2(t0, tf, h, u0, R, tau) result(u_final)
-        ! Propagates the solution from t0 to tf using Adams-Bashforth 2
-        real, intent(in) :: t0, tf, h, R, tau        ! Time interval, step size and parameters
-        real, dimension(3), intent(in) :: u0         ! Initial state
-        real, dimension(3) :: u_final                ! Final state
-        
-        real :: t                                    ! Current time
-        integer :: i, n_steps                        ! Loop variables
-        real, dimension(3) :: u_curr, u_prev         ! Current and previous states
-        real, dimension(3) :: f_curr, f_prev         ! Current and previous derivatives
-        
-        ! Calculate number of steps
-        n_steps = int((tf - t0) / h)
-        if (n_steps < 1) then
-            u_final = u0  ! Return initial state if interval is too small
-            return
-        end if
-        
-        ! Initialize with RK2 for the first step
-        u_prev = u0
-        call compute_derivatives(u_prev, R, tau, f_prev)
-        
-        ! Generate second point using RK2
-        u_curr = rk2_step(u_prev, R, tau, h)
-        call compute_derivatives(u_curr, R, tau, f_curr)
-        
-        ! Now apply AB2 for remaining steps
-        t = t0 + h
-        do i = 2, n_steps
-            ! Apply AB2 step
-            u_final = ab2_step(u_curr, u_prev, f_curr, f_prev, R, tau, h)
-            
-            ! Update for next iteration
-            u_prev = u_curr
-            f_prev = f_curr
-            u_curr = u_final
-            call compute_derivatives(u_curr, R, tau, f_curr)
-            
-            t = t + h
-        end do
-        
-        ! Return the final state
-        u_final = u_curr
-    end function propagate_with_ab2
-    
-    ! Enhanced propagate_with_ab3 function for better accuracy in chaotic regimes
-    function propagate_with_ab3(t0, tf, h, u0, R, tau) result(u_final)
-        ! Propagates the solution from t0 to tf using Adams-Bashforth 3
-        real, intent(in) :: t0, tf, h, R, tau        ! Time interval, step size and parameters
-        real, dimension(3), intent(in) :: u0         ! Initial state
-        real, dimension(3) :: u_final                ! Final state
-        
-        real :: t                                    ! Current time
-        integer :: i, n_steps                        ! Loop variables
-        real, dimension(3) :: u_curr, u_prev, u_prev2  ! Current and previous states
-        real, dimension(3) :: f_curr, f_prev, f_prev2  ! Current and previous derivatives
-        real :: h_internal, h_reduced
-        
-        ! Calculate number of steps
-        n_steps = int((tf - t0) / h)
-        if (n_steps < 2) then  ! Need at least 2 steps for AB3
-            ! Fall back to RK2 for very small intervals
-            u_final = rk2_step(u0, R, tau, tf - t0)
-            return
-        end if
-        
-        ! For chaotic regimes (tau >= 5.0), use smaller internal step size
-        if (tau >= 5.0) then
-            ! Reduce step size for better accuracy in chaotic regimes
-            h_internal = h / 2.0
-            n_steps = n_steps * 2
-        else
-            h_internal = h
-        end if
-        
-        ! Initialize with RK2 for first two steps
-        ! First point is the initial condition
-        u_prev2 = u0
-        call compute_derivatives(u_prev2, R, tau, f_prev2)
-        
-        ! Generate second point using RK2
-        u_prev = rk2_step(u_prev2, R, tau, h_internal)
-        call compute_derivatives(u_prev, R, tau, f_prev)
-        
-        ! Generate third point using RK2
-        u_curr = rk2_step(u_prev, R, tau, h_internal)
-        call compute_derivatives(u_curr, R, tau, f_curr)
-        
-        ! Now apply AB3 for remaining steps
-        t = t0 + 2*h_internal
-        do i = 3, n_steps
-            ! Apply AB3 step
-            u_final = ab3_step(u_curr, u_prev, u_prev2, f_curr, f_prev, f_prev2, R, tau, h_internal)
-            
-            ! Update for next iteration
-            u_prev2 = u_prev
-            f_prev2 = f_prev
-            u_prev = u_curr
-            f_prev = f_curr
-            u_curr = u_final
-            call compute_derivatives(u_curr, R, tau, f_curr)
-            
-            ! Additional stability check for chaotic regimes
-            if (tau >= 5.0 .and. any(isnan(u_curr)) .or. any(abs(u_curr) > 1.0E6)) then
-                ! Reset to previous state and try with reduced step
-                u_curr = u_prev
-                h_reduced = h_internal * 0.5
-                u_final = rk2_step(u_curr, R, tau, h_reduced)
-                u_curr = u_final
-                call compute_derivatives(u_curr, R, tau, f_curr)
-            end if
-            
-            t = t + h_internal
-        end do
-        
-        ! Return the final state
-        u_final = u_curr
-    end function propagate_with_ab3
-    
-    ! New function to propagate with RK2 steps over an interval
-    function propagate_with_rk2(t0, tf, h, u0, R, tau) result(u_final)
-        ! Propagates the solution from t0 to tf using RK2
-        real, intent(in) :: t0, tf, h, R, tau        ! Time interval, step size and parameters
-        real, dimension(3), intent(in) :: u0         ! Initial state
-        real, dimension(3) :: u_final                ! Final state
-        
-        real :: t                                    ! Current time
-        integer :: i, n_steps                        ! Loop variables
-        real, dimension(3) :: u_curr                 ! Current state
-        
-        ! Calculate number of steps
-        n_steps = int((tf - t0) / h)
-        if (n_steps < 1) then
-            u_final = u0  ! Return initial state if interval is too small
-            return
-        end if
-        
-        ! Initialize with initial condition
-        u_curr = u0
-        t = t0
-        
-        ! Apply RK2 step repeatedly
-        do i = 1, n_steps
-            ! Apply RK2 step
-            u_curr = rk2_step(u_curr, R, tau, h)
-            t = t + h
-        end do
-        
-        ! Return the final state
-        u_final = u_curr
-    end function propagate_with_rk2
-    
     ! Calculate system energy for convergence monitoring
     ! As mentioned in parareal.md section on convergence strategies
     function calculate_energy(u) result(energy)
@@ -316,7 +29,20 @@ contains
         energy = 0.5 * (u(1)**2 + u(2)**2 + u(3)**2)
     end function calculate_energy
 
-    subroutine solve_parareal(R, tau, h_coarse, h_fine, t0, tf, u0, max_iter, tol)
+    function thread_wtime() result(t)
+        ! Horloge murale utilisable par chaque thread de la région parallèle: en
+        ! MPI_THREAD_FUNNELED, seul le thread maître peut appeler MPI_Wtime
+        double precision :: t
+        integer(8) :: count, rate
+        
+        call system_clock(count, rate)
+        t = dble(count) / dble(rate)
+        !$ t = omp_get_wtime()
+    end function thread_wtime
+
+    subroutine solve_parareal(R, tau, h_coarse, h_fine, t0, tf, u0, max_iter, tol, coarse_method, balance, &
+                              window, n_threads, freeze, checkpoint_file, checkpoint_every, restart_file, &
+                              output_prefix, iterations, accel)
         ! Résout le système de Lorenz avec l'algorithme Parareal
         !
         ! Arguments:
@@ -329,23 +55,68 @@ contains
         !   u0(3)    : Condition initiale [X0, Y0, Z0]
         !   max_iter : Nombre maximal d'itérations Parareal
         !   tol      : Tolérance pour la convergence
+        !   coarse_method : Propagateur grossier (optionnel, COARSE_* de coarse_propagators)
+        !                   COARSE_AUTO lance la calibration de coarse_tuning
+        !   balance  : Répartition des tranches selon le profil de coût fin mesuré (optionnel)
+        !   window   : Longueur des fenêtres successives (optionnel). [t0, tf] est alors
+        !              résolu fenêtre par fenêtre, l'état final convergé d'une fenêtre
+        !              servant de condition initiale à la suivante
+        !   n_threads : Threads OpenMP par processus (optionnel, 1 par défaut). Chaque
+        !               processus résout n_threads tranches consécutives en parallèle,
+        !               soit num_procs * n_threads tranches au total
+        !   freeze   : Figer les tranches convergées et sauter leurs solves fins (optionnel)
+        !   checkpoint_file  : Point de reprise écrit par le processus 0 (optionnel), toutes
+        !                      les checkpoint_every itérations (1 par défaut) et à la fin de
+        !                      chaque fenêtre
+        !   restart_file     : Point de reprise à partir duquel reprendre (optionnel), même
+        !                      avec un autre nombre de processus (voir le module checkpoint)
+        !   output_prefix : Préfixe des fichiers de sortie (optionnel). Par défaut
+        !                   output/parareal_tau<tau>.dat et output/parareal_dense_tau<tau>.dat
+        !   iterations : Nombre total d'itérations effectuées, toutes fenêtres confondues
+        !                (optionnel, en sortie, processus 0)
+        !   accel    : Correction Parareal (optionnel, ACCEL_* de parareal_acceleration).
+        !              ACCEL_KRYLOV remplace l'extrapolation beta par la correction du
+        !              sous-espace de Krylov des solves fins précédents
         
         real, intent(in) :: R, tau, h_coarse, h_fine, t0, tf
         real, dimension(3), intent(in) :: u0
         integer, intent(in) :: max_iter
         real, intent(in) :: tol
+        integer, intent(in), optional :: coarse_method
+        logical, intent(in), optional :: balance
+        real, intent(in), optional :: window
+        integer, intent(in), optional :: n_threads
+        logical, intent(in), optional :: freeze
+        character(len=*), intent(in), optional :: checkpoint_file, restart_file
+        integer, intent(in), optional :: checkpoint_every
+        character(len=*), intent(in), optional :: output_prefix
+        integer, intent(out), optional :: iterations
+        integer, intent(in), optional :: accel
         
         ! Variables MPI
         integer :: rank = 0, num_procs, ierr  ! Initialize rank to prevent warnings
-        integer :: status(MPI_STATUS_SIZE)
         
         ! Variables Parareal
         integer :: n, k, n_local, converged, i
         real, dimension(:), allocatable :: T_n
         real, dimension(:,:), allocatable :: U_n, U_new, U_prev
+        
+        ! Mode hybride MPI + OpenMP: n_thr tranches par processus
+        integer :: n_slices, n_thr, j
+        real, dimension(:,:), allocatable :: u_fine_loc, u_fine_all
+        real, dimension(:), allocatable :: slice_t_loc, rank_time
+        double precision :: t_slice_start
+        logical :: omp_on
+        
+        ! Gel des tranches convergées: frozen(n) indique que U_n(:, n) est définitif
+        logical :: use_freeze
+        logical, dimension(:), allocatable :: frozen, frozen_prev
+        integer :: n_fine_total, n_fine_skipped
+        real :: slice_change
         real, dimension(3) :: u_fine, u_coarse_prev, u_coarse_new
         real :: Delta_T, max_diff, safe_tau, safe_h_fine, safe_h_coarse
-        character(len=100) :: output_file
+        character(len=256) :: output_file, dense_file, run_extra
+        character(len=8) :: coarse_label
         
         ! Variables for dense output
         integer :: n_dense_points, total_points, stop_interval
@@ -364,6 +135,41 @@ contains
         ! Extrapolation factor for improved prediction (from parareal.md)
         real :: beta = 0.1
         
+        ! Propagateurs grossiers: g_init pour l'initialisation et la correction,
+        ! g_pred pour la prédiction extrapolée (k > 1)
+        integer :: g_init, g_pred
+        
+        ! Correction accélérée (sous-espace de Krylov des solves fins, rang 0)
+        integer :: accel_method
+        real, dimension(3) :: accel_jump
+        real :: tuned_h_coarse
+        
+        ! Équilibrage de charge: coût fin mesuré par tranche et attente par processus
+        logical :: use_balance
+        real :: t_fine_start, t_fine_local
+        real, dimension(:), allocatable :: slice_time, slice_cost, rank_idle
+        real, dimension(:), allocatable :: T_prof, cost_prof
+        real, dimension(:), allocatable :: rank_busy
+        integer :: n_timed, n_prof
+        logical :: prof_found
+        character(len=100) :: profile_file
+        character(len=16) :: tau_label
+        real, dimension(PROFILE_KEY_SIZE) :: prof_key
+        
+        ! Parareal par fenêtres: points de contrôle et statistiques de toutes les fenêtres
+        integer :: w, n_windows, n_total
+        real :: window_len, tw0, tw1
+        real, dimension(3) :: u_start
+        real, dimension(:), allocatable :: T_all, cost_all, window_metric
+        real, dimension(:,:), allocatable :: U_all
+        integer, dimension(:), allocatable :: window_iter, window_status
+        integer :: w_fail
+        
+        ! Points de reprise: écriture périodique et reprise (fenêtre w_start, k_start itérations faites)
+        logical :: use_checkpoint, resumed, restored
+        integer :: ckpt_every, w_start, k_start, k_first
+        real, dimension(CHECKPOINT_KEY_SIZE) :: ckpt_key
+        
         ! Create local copies of parameters that we need to modify
         safe_tau = tau
         safe_h_fine = h_fine
@@ -384,6 +190,17 @@ contains
         call MPI_Comm_rank(MPI_COMM_WORLD, rank, ierr)
         call MPI_Comm_size(MPI_COMM_WORLD, num_procs, ierr)
         
+        ! Threads par processus: chaque thread résout une tranche
+        n_thr = 1
+        if (present(n_threads)) n_thr = max(1, n_threads)
+        n_slices = num_procs * n_thr
+        omp_on = .false.
+        !$ omp_on = .true.
+        !$ call omp_set_num_threads(n_thr)
+        if (rank == 0 .and. n_thr > 1 .and. .not. omp_on) then
+            print *, "WARNING: Compiled without OpenMP, the", n_thr, "local slices run sequentially."
+        end if
+        
         if (rank == 0) then
             ! Validate step sizes
             if (h_fine >= h_coarse) then
@@ -457,263 +274,549 @@ contains
         end if
 
         ! Allocation mémoire
-        allocate(T_n(0:num_procs))
-        allocate(U_n(3, 0:num_procs))
-        allocate(U_new(3, 0:num_procs))
-        allocate(U_prev(3, 0:num_procs))  ! Added for extrapolation
-        allocate(energy_k(0:num_procs))    ! Added for convergence monitoring
-        allocate(energy_k_prev(0:num_procs))  ! Added for convergence monitoring
+        allocate(T_n(0:n_slices))
+        allocate(U_n(3, 0:n_slices))
+        allocate(U_new(3, 0:n_slices))
+        allocate(U_prev(3, 0:n_slices))  ! Added for extrapolation
+        allocate(energy_k(0:n_slices))    ! Added for convergence monitoring
+        allocate(energy_k_prev(0:n_slices))  ! Added for convergence monitoring
+        allocate(slice_time(n_slices), slice_cost(n_slices))
+        allocate(rank_time(num_procs), rank_idle(num_procs), rank_busy(num_procs))
+        allocate(u_fine_loc(3, n_thr), u_fine_all(3, n_slices), slice_t_loc(n_thr))
+        allocate(frozen(0:n_slices), frozen_prev(0:n_slices))
+        
+        use_freeze = .false.
+        if (present(freeze)) use_freeze = freeze
+        accel_method = ACCEL_NONE
+        if (present(accel)) accel_method = accel
+        n_fine_total = 0
+        n_fine_skipped = 0
+        rank_idle = 0.0
+        rank_busy = 0.0
+        
+        ! Découpage en fenêtres successives (une seule fenêtre par défaut)
+        window_len = tf - t0
+        if (present(window)) then
+            if (window > 0.0 .and. window < tf - t0) window_len = window
+        end if
+        n_windows = max(1, ceiling((tf - t0) / window_len - 1.0E-4))
+        n_total = n_windows * n_slices
+        
+        allocate(T_all(0:n_total), U_all(3, 0:n_total), cost_all(n_total))
+        allocate(window_iter(n_windows), window_status(n_windows), window_metric(n_windows))
+        T_all(0) = t0
+        U_all(:, 0) = u0
+        cost_all = 0.0
+        window_iter = 0
+        window_status = 0
+        window_metric = 0.0
+        
+        Delta_T = window_len / n_slices  ! Taille moyenne d'un sous-intervalle
+        
+        ! Profil de coût d'une exécution précédente pour rééquilibrer les tranches
+        use_balance = .false.
+        prof_found = .false.
+        if (present(balance)) use_balance = balance
+        write(tau_label, '(f16.1)') safe_tau
+        profile_file = 'output/benchmark/slice_profile_tau' // trim(adjustl(tau_label)) // '.dat'
+        prof_key = [tf, R, safe_h_fine, real(n_total)]
+        
+        if (use_balance .and. rank == 0) then
+            call load_slice_profile(profile_file, prof_key, n_prof, T_prof, cost_prof, prof_found)
+            if (prof_found) then
+                print '(a,a)', " Découpage équilibré d'après le profil: ", trim(profile_file)
+            else
+                print '(a,a)', " Aucun profil de coût utilisable, découpage uniforme. Profil enregistré dans: ", &
+                      trim(profile_file)
+            end if
+        end if
         
-        ! Division du domaine temporel
-        call decompose_domain(t0, tf, num_procs, T_n)
-        Delta_T = T_n(1) - T_n(0)  ! Taille d'un sous-intervalle
+        ! Choix du propagateur grossier (par défaut: AB3, puis RK2 pour la prédiction extrapolée)
+        g_init = COARSE_AB3
+        g_pred = COARSE_RK2
+        if (present(coarse_method)) then
+            if (coarse_method == COARSE_AUTO) then
+                if (rank == 0) then
+                    call tune_coarse_propagator(R, safe_tau, u0, safe_h_fine, safe_h_coarse, Delta_T, &
+                                                n_slices, adapt_tol, g_init, tuned_h_coarse)
+                    safe_h_coarse = tuned_h_coarse
+                end if
+                call MPI_Bcast(g_init, 1, MPI_INTEGER, 0, MPI_COMM_WORLD, ierr)
+                call MPI_Bcast(safe_h_coarse, 1, MPI_REAL, 0, MPI_COMM_WORLD, ierr)
+                g_pred = g_init
+            else if (coarse_method /= COARSE_DEFAULT) then
+                g_init = coarse_method
+                g_pred = coarse_method
+            end if
+        end if
         
-        ! Initialisation avec la condition initiale
-        U_n(:, 0) = u0
-        U_prev(:, 0) = u0  ! Initialize U_prev
+        ! Application de flot tabulée: chargée du cache ou construite par tous les processus
+        if (g_init == COARSE_FLOWMAP) call flowmap_prepare(R, safe_tau, Delta_T, safe_h_fine, u0)
+        
+        ! Points de reprise: le problème fin (R, tau, t0, tf, u0, h_fine, fenêtres) sert de clé
+        ckpt_key = [R, safe_tau, t0, tf, u0(1), u0(2), u0(3), safe_h_fine, window_len]
+        use_checkpoint = .false.
+        if (present(checkpoint_file)) use_checkpoint = len_trim(checkpoint_file) > 0
+        ckpt_every = 1
+        if (present(checkpoint_every)) ckpt_every = max(1, checkpoint_every)
+        w_start = 1
+        k_start = 0
+        restored = .false.
+        if (present(restart_file)) then
+            if (len_trim(restart_file) > 0) then
+                if (rank == 0) then
+                    call checkpoint_read(restart_file, ckpt_key, R, safe_tau, safe_h_coarse, safe_h_fine, g_init, &
+                                         w_start, k_start, bad_value_counter, conv_metric, T_n, U_n, U_prev, &
+                                         energy_k, energy_k_prev, frozen, T_all, U_all, cost_all, &
+                                         window_iter, window_status, window_metric, restored)
+                end if
+                call MPI_Bcast(restored, 1, MPI_LOGICAL, 0, MPI_COMM_WORLD, ierr)
+                call MPI_Bcast(w_start, 1, MPI_INTEGER, 0, MPI_COMM_WORLD, ierr)
+                call MPI_Bcast(k_start, 1, MPI_INTEGER, 0, MPI_COMM_WORLD, ierr)
+                if (restored) then
+                    ! Seul le processus 0 connaît l'itéré et les tranches figées; les points
+                    ! de contrôle des fenêtres terminées fixent l'état initial de la fenêtre
+                    call MPI_Bcast(T_all, n_total+1, MPI_REAL, 0, MPI_COMM_WORLD, ierr)
+                    call MPI_Bcast(U_all, 3*(n_total+1), MPI_REAL, 0, MPI_COMM_WORLD, ierr)
+                end if
+            end if
+        end if
         
         if (rank == 0) then
             print *, ""
             print *, "======================================================"
             print *, "          INITIALISATION PARAREAL"
             print *, "======================================================"
-            print '(a,i0,a)', " Utilisation de ", num_procs, " processus"
+            if (n_thr > 1) then
+                print '(a,i0,a,i0,a,i0,a)', " Utilisation de ", num_procs, " processus x ", n_thr, &
+                      " threads (", n_slices, " tranches)"
+            else
+                print '(a,i0,a)', " Utilisation de ", num_procs, " processus"
+            end if
             print '(a,f8.2,a,f8.2,a)', " Domaine temporel: [", t0, ", ", tf, "]"
+            if (n_windows > 1) then
+                print '(a,i0,a,f8.2)', " Fenêtres: ", n_windows, " de longueur ", window_len
+            end if
             print '(a,f6.2,a,f6.2)', " Paramètres: tau = ", safe_tau, ", R = ", R
             print '(a,f10.6,a,f10.6)', " Pas de temps: h_coarse = ", safe_h_coarse, ", h_fine = ", safe_h_fine
             print *, "======================================================"
             print *, ""
-            print *, "Calcul de l'initialisation grossière avec Adams-Bashforth 3..."
-            
-            ! Initialize using AB3 approach - first point is the initial condition
-            U_n(:, 0) = u0
-            U_prev(:, 0) = u0  ! Initialize U_prev
-            
-            ! Use propagate_with_rk2 for each sub-interval instead of AB3
-            do n = 0, num_procs-1
-                ! U_n(:, n+1) = propagate_with_ab3(T_n(n), T_n(n+1), safe_h_coarse, U_n(:, n), R, safe_tau)
-                !                 U_prev(:, n+1) = U_n(:, n+1)  ! Initialize U_prev
-                
-                ! Original AB3 call (commented out)
-                U_n(:, n+1) = propagate_with_ab3(T_n(n), T_n(n+1), safe_h_coarse, U_n(:, n), R, safe_tau)
-                
-                ! New RK2 call
-                ! U_n(:, n+1) = propagate_with_rk2(T_n(n), T_n(n+1), safe_h_coarse, U_n(:, n), R, safe_tau)
-                 
-                ! Calculate initial energy values (for monitoring)
-                energy_k(n) = calculate_energy(U_n(:, n))
-                energy_k_prev(n) = energy_k(n)
-            end do
-            
-            ! Energy for the last point
-            energy_k(num_procs) = calculate_energy(U_n(:, num_procs))
-            energy_k_prev(num_procs) = energy_k(num_procs)
         end if
         
-        ! Diffuser l'initialisation à tous les processus
-        call MPI_Bcast(U_n, 3*(num_procs+1), MPI_REAL, 0, MPI_COMM_WORLD, ierr)
-        call MPI_Bcast(U_prev, 3*(num_procs+1), MPI_REAL, 0, MPI_COMM_WORLD, ierr)
-        call MPI_Bcast(energy_k, num_procs+1, MPI_REAL, 0, MPI_COMM_WORLD, ierr)
-        call MPI_Bcast(energy_k_prev, num_procs+1, MPI_REAL, 0, MPI_COMM_WORLD, ierr)
+        ! Fichiers de sortie et paramètres complets de l'exécution pour leur en-tête
+        write(output_file, '(a,f3.1,a)') 'output/parareal_tau', safe_tau, '.dat'
+        write(dense_file, '(a,f3.1,a)') 'output/parareal_dense_tau', safe_tau, '.dat'
+        if (present(output_prefix)) then
+            if (len_trim(output_prefix) > 0) then
+                output_file = trim(output_prefix) // '.dat'
+                dense_file = trim(output_prefix) // '_dense.dat'
+            end if
+        end if
+        coarse_label = 'default'
+        if (present(coarse_method)) then
+            if (coarse_method /= COARSE_DEFAULT) coarse_label = coarse_method_name(g_init)
+        end if
+        write(run_extra, '(*(g0))') "ranks=", num_procs, " threads=", n_thr, " coarse=", trim(coarse_label), &
+              " h_coarse_eff=", safe_h_coarse, " window=", window_len, " balance=", use_balance, &
+              " freeze=", use_freeze, " accel=", trim(accel_method_name(accel_method))
         
-        ! Itérations Parareal
+        w_fail = 0
+        ! Reprise d'une exécution déjà terminée: aucun calcul, seulement les sorties
         converged = 0
+        if (w_start > n_windows) converged = window_status(n_windows)
+        do w = w_start, n_windows
+        
+            ! Bornes de la fenêtre et état initial (état final convergé de la fenêtre précédente)
+            tw0 = t0 + (w-1) * window_len
+            tw1 = min(t0 + w * window_len, tf)
+            if (w == n_windows) tw1 = tf
+            u_start = U_all(:, (w-1)*n_slices)
+            resumed = (restored .and. w == w_start .and. k_start > 0)
+        
+            ! Division du domaine temporel de la fenêtre (reprise: découpage du point de reprise)
+            if (resumed) then
+                call MPI_Bcast(T_n, n_slices+1, MPI_REAL, 0, MPI_COMM_WORLD, ierr)
+                call MPI_Bcast(frozen, n_slices+1, MPI_LOGICAL, 0, MPI_COMM_WORLD, ierr)
+                call MPI_Bcast(bad_value_counter, 1, MPI_INTEGER, 0, MPI_COMM_WORLD, ierr)
+            else
+                call decompose_domain(tw0, tw1, n_slices, T_n)
+                if (use_balance) then
+                    if (rank == 0 .and. prof_found) then
+                        call decompose_domain_balanced(tw0, tw1, n_slices, n_prof, T_prof, cost_prof, T_n)
+                        print '(a,*(f9.3))', "   Bornes: ", T_n
+                    end if
+                    call MPI_Bcast(T_n, n_slices+1, MPI_REAL, 0, MPI_COMM_WORLD, ierr)
+                end if
+            
+                frozen = .false.
+                frozen(0) = .true.  ! La condition initiale de la fenêtre est exacte
+                bad_value_counter = 0
+                conv_metric = huge(1.0)
+            end if
         
-        if (rank == 0) then
-            print *, ""
-            print *, "======================================================"
-            print *, "          ITÉRATIONS PARAREAL"
-            print *, "======================================================"
-        end if
+            slice_cost = 0.0
+            n_timed = 0
+            if (rank == 0 .and. accel_method == ACCEL_KRYLOV) call accel_reset(n_slices)
         
-        do k = 1, max_iter
-            if (rank == 0) print '(a,i2,a)', " Itération ", k, " en cours..."
-            
-            ! Before each iteration, store current values as previous
-            U_prev = U_n
-            energy_k_prev = energy_k
+            U_n(:, 0) = u_start
+            U_prev(:, 0) = u_start
+        
+            if (rank == 0) then
+                if (n_windows > 1) then
+                    print *, ""
+                    print '(a,i0,a,i0,a,f10.2,a,f10.2,a)', " FENÊTRE ", w, "/", n_windows, &
+                          ": [", tw0, ", ", tw1, "]"
+                end if
+            end if
+            if (rank == 0 .and. resumed) then
+                print '(a,i0,a)', " Reprise après l'itération ", k_start, " (itéré du point de reprise)"
+            else if (rank == 0) then
+                print '(a,a,a)', " Calcul de l'initialisation grossière avec ", trim(coarse_method_name(g_init)), "..."
+            
+                ! Coarse propagation over each sub-interval
+                call prof_start(PROF_COARSE)
+                do n = 0, n_slices-1
+                    U_n(:, n+1) = propagate_coarse(g_init, T_n(n), T_n(n+1), safe_h_coarse, U_n(:, n), R, safe_tau)
+                 
+                    ! Calculate initial energy values (for monitoring)
+                    energy_k(n) = calculate_energy(U_n(:, n))
+                    energy_k_prev(n) = energy_k(n)
+                end do
+                call prof_stop(PROF_COARSE)
             
-            ! Calcul précis sur le sous-intervalle local
-            n_local = rank + 1  ! +1 car U_n(0) = condition initiale
+                ! Energy for the last point
+                energy_k(n_slices) = calculate_energy(U_n(:, n_slices))
+                energy_k_prev(n_slices) = energy_k(n_slices)
+            end if
+        
+            ! Diffuser l'initialisation à tous les processus
+            call prof_start(PROF_COMM)
+            call MPI_Bcast(U_n, 3*(n_slices+1), MPI_REAL, 0, MPI_COMM_WORLD, ierr)
+            call MPI_Bcast(U_prev, 3*(n_slices+1), MPI_REAL, 0, MPI_COMM_WORLD, ierr)
+            call MPI_Bcast(energy_k, n_slices+1, MPI_REAL, 0, MPI_COMM_WORLD, ierr)
+            call MPI_Bcast(energy_k_prev, n_slices+1, MPI_REAL, 0, MPI_COMM_WORLD, ierr)
+            call prof_stop(PROF_COMM)
+        
+            ! Itérations Parareal
+            converged = 0
+            k_first = 1
+            if (resumed) k_first = k_start + 1
+        
+            if (rank == 0) then
+                print *, ""
+                print *, "======================================================"
+                print *, "          ITÉRATIONS PARAREAL"
+                print *, "======================================================"
+                if (accel_method == ACCEL_KRYLOV) &
+                    print '(a)', " Correction accélérée: sous-espace de Krylov des solves fins (--accel=krylov)"
+            end if
+        
+            do k = k_first, max_iter
+                if (rank == 0) print '(a,i2,a)', " Itération ", k, " en cours..."
             
-            if (n_local <= num_procs) then  ! Vérifier que le processus a un travail à faire
-                ! Solveur précis sur [T_n(n_local-1), T_n(n_local)]
-                u_fine = solve_rk4_interval(T_n(n_local-1), T_n(n_local), safe_h_fine, &
-                                           U_n(:, n_local-1), R, safe_tau)
+                ! Before each iteration, store current values as previous
+                U_prev = U_n
+                energy_k_prev = energy_k
+                frozen_prev = frozen
                 
-                ! Calculate energy of fine solution for monitoring
-                if (n_local <= num_procs) then
-                    energy_k(n_local) = calculate_energy(u_fine)
+                if (rank == 0) then
+                    n_fine_total = n_fine_total + n_slices
+                    if (use_freeze) n_fine_skipped = n_fine_skipped + count(frozen(1:n_slices))
                 end if
-            end if
             
-            ! Circuit breaker for numerical instability
-            if (any(isnan(u_fine)) .or. any(abs(u_fine) > 1.0E10)) then
-                bad_value_counter = bad_value_counter + 1
+                ! Calcul précis sur les tranches locales: le processus résout les n_thr
+                ! tranches consécutives rank*n_thr+1 ... (rank+1)*n_thr, une par thread
+                call prof_start(PROF_FINE)
+                t_fine_start = MPI_Wtime()
+                !$omp parallel do private(j, n_local, t_slice_start) schedule(static)
+                do j = 1, n_thr
+                    n_local = rank * n_thr + j  ! +1 car U_n(0) = condition initiale
+                    if (use_freeze .and. frozen(n_local)) then
+                        ! Tranche figée: sa valeur finale est déjà connue
+                        u_fine_loc(:, j) = U_n(:, n_local)
+                        slice_t_loc(j) = 0.0
+                        cycle
+                    end if
+                    t_slice_start = thread_wtime()
+                    ! Solveur précis sur [T_n(n_local-1), T_n(n_local)]
+                    u_fine_loc(:, j) = solve_rk4_interval(T_n(n_local-1), T_n(n_local), safe_h_fine, &
+                                                          U_n(:, n_local-1), R, safe_tau)
+                    slice_t_loc(j) = real(thread_wtime() - t_slice_start)
+                end do
+                !$omp end parallel do
+                t_fine_local = MPI_Wtime() - t_fine_start
+                call prof_stop(PROF_FINE)
+            
+                ! Temps fin de chaque processus (le plus lent impose l'attente des autres)
+                ! et de chaque tranche (profil de coût pour l'équilibrage)
+                call prof_start(PROF_COMM)
+                call MPI_Gather(t_fine_local, 1, MPI_REAL, rank_time, 1, MPI_REAL, 0, MPI_COMM_WORLD, ierr)
+                call MPI_Gather(slice_t_loc, n_thr, MPI_REAL, slice_time, n_thr, MPI_REAL, 0, &
+                                MPI_COMM_WORLD, ierr)
+                call prof_stop(PROF_COMM)
+                if (rank == 0) then
+                    slice_cost = slice_cost + slice_time
+                    rank_busy = rank_busy + rank_time
+                    rank_idle = rank_idle + (maxval(rank_time) - rank_time)
+                    n_timed = n_timed + 1
+                end if
+            
+                ! Circuit breaker for numerical instability
+                if (any(isnan(u_fine_loc)) .or. any(abs(u_fine_loc) > 1.0E10)) then
+                    bad_value_counter = bad_value_counter + 1
                 
-                ! Note: We cap the values instead of immediately breaking
-                where (isnan(u_fine)) u_fine = 0.0
-                where (abs(u_fine) > 1.0E10) u_fine = sign(1.0E10, u_fine)
+                    ! Note: We cap the values instead of immediately breaking
+                    where (isnan(u_fine_loc)) u_fine_loc = 0.0
+                    where (abs(u_fine_loc) > 1.0E10) u_fine_loc = sign(1.0E10, u_fine_loc)
                 
-                if (bad_value_counter >= MAX_BAD_ITERATIONS) then
-                    if (rank == 0) then
-                        print *, "ERROR: Detected multiple iterations with numerical instability."
-                        print *, "Terminating Parareal iterations early."
-                        converged = -2  ! Special code for forced termination
+                    if (bad_value_counter >= MAX_BAD_ITERATIONS) then
+                        if (rank == 0) then
+                            print *, "ERROR: Detected multiple iterations with numerical instability."
+                            print *, "Terminating Parareal iterations early."
+                            converged = -2  ! Special code for forced termination
+                        end if
+                        call MPI_Bcast(converged, 1, MPI_INTEGER, 0, MPI_COMM_WORLD, ierr)
+                        exit  ! Break out of the iteration loop
                     end if
-                    call MPI_Bcast(converged, 1, MPI_INTEGER, 0, MPI_COMM_WORLD, ierr)
-                    exit  ! Break out of the iteration loop
+                else
+                    bad_value_counter = 0  ! Reset counter if values are OK
                 end if
-            else
-                bad_value_counter = 0  ! Reset counter if values are OK
-            end if
             
-            ! Collecte des résultats fins sur tous les processus
-            U_new = U_n  ! Initialiser avec les valeurs précédentes
+                ! Collecte des résultats fins de toutes les tranches (dans l'ordre des processus)
+                call prof_start(PROF_COMM)
+                call MPI_Gather(u_fine_loc, 3*n_thr, MPI_REAL, u_fine_all, 3*n_thr, MPI_REAL, 0, &
+                                MPI_COMM_WORLD, ierr)
+                call prof_stop(PROF_COMM)
+                U_new = U_n  ! Initialiser avec les valeurs précédentes
             
-            do n = 1, num_procs
-                if (rank == 0) then
-                    if (n > 1) then
-                        ! Recevoir u_fine du processus n
-                        call MPI_Recv(u_fine, 3, MPI_REAL, n-1, 0, &
-                                      MPI_COMM_WORLD, status, ierr)
-                        ! Also receive energy value
-                        call MPI_Recv(energy_k(n), 1, MPI_REAL, n-1, 1, &
-                                      MPI_COMM_WORLD, status, ierr)
-                    end if
+                call prof_start(PROF_COARSE)
+                do n = 1, n_slices
+                    if (rank == 0) then
+                        u_fine = u_fine_all(:, n)
+                        
+                        if (use_freeze) then
+                            if (frozen_prev(n)) then
+                                ! Tranche figée: ni solve fin ni propagation grossière
+                                cycle
+                            else if (frozen_prev(n-1)) then
+                                ! Départ définitif: le solve fin donne la valeur exacte
+                                U_new(:, n) = u_fine
+                                energy_k(n) = calculate_energy(U_new(:, n))
+                                frozen(n) = .true.
+                                cycle
+                            end if
+                        end if
                     
-                    ! Use AB3 instead of AB2 for the coarse propagator
-                    ! u_coarse_prev = propagate_with_ab3(T_n(n-1), T_n(n), safe_h_coarse, U_n(:, n-1), R, safe_tau)
-
-                   ! Use propagate_with_rk2 instead of AB3 for the coarse propagator
-                    ! Original AB3 call (commented out)
-                    u_coarse_prev = propagate_with_ab3(T_n(n-1), T_n(n), safe_h_coarse, U_n(:, n-1), R, safe_tau)
+                        ! Coarse propagation from the previous iterate
+                        u_coarse_prev = propagate_coarse(g_init, T_n(n-1), T_n(n), safe_h_coarse, U_n(:, n-1), R, safe_tau)
                     
-                    ! New RK2 call
-                    ! u_coarse_prev = propagate_with_rk2(T_n(n-1), T_n(n), safe_h_coarse, U_n(:, n-1), R, safe_tau)
+                        ! --- MAJOR OPTIMIZATION FROM PARAREAL.MD ---
+                        ! Improved prediction with extrapolation (section on optimizations)
+                        if (accel_method == ACCEL_KRYLOV) then
+                            ! Correction accélérée: même propagateur que pour u_coarse_prev,
+                            ! l'extrapolation beta est remplacée par le terme de Krylov
+                            U_new(:, n) = propagate_coarse(g_init, T_n(n-1), T_n(n), safe_h_coarse, U_new(:, n-1), &
+                                                           R, safe_tau)
+                        else if (k > 1) then
+                            ! Calculate extrapolation factor based on previous updates
+                            ! This creates a more informed initial guess
+                            U_new(:, n) = propagate_coarse(g_pred, T_n(n-1), T_n(n), safe_h_coarse, U_new(:, n-1), &
+                                                           R, safe_tau) + beta * (U_n(:, n) - U_prev(:, n))
+                        else
+                            ! Standard prediction for first iteration
+                            U_new(:, n) = propagate_coarse(g_init, T_n(n-1), T_n(n), safe_h_coarse, U_new(:, n-1), &
+                                                           R, safe_tau)
+                        end if
                     
-                                             
-                    ! --- MAJOR OPTIMIZATION FROM PARAREAL.MD ---
-                    ! Improved prediction with extrapolation (section on optimizations)
-                    if (k > 1) then
-                        ! Calculate extrapolation factor based on previous updates
-                        ! This creates a more informed initial guess
-                        
-                        ! Original AB3 call (commented out)
-                        !U_new(:, n) = propagate_with_ab3(T_n(n-1), T_n(n), safe_h_coarse, U_new(:, n-1), R, safe_tau) + &
-                        !             beta * (U_n(:, n) - U_prev(:, n))
-                        
-                        ! New RK2 call
-                        U_new(:, n) = propagate_with_rk2(T_n(n-1), T_n(n), safe_h_coarse, U_new(:, n-1), R, safe_tau) + &
-                                     beta * (U_n(:, n) - U_prev(:, n))
-                    else
-                        ! Standard prediction for first iteration
-                        
-                        ! Original AB3 call (commented out)
-                        U_new(:, n) = propagate_with_ab3(T_n(n-1), T_n(n), safe_h_coarse, U_new(:, n-1), R, safe_tau)
-                        
-                        ! New RK2 call
-                        ! U_new(:, n) = propagate_with_rk2(T_n(n-1), T_n(n), safe_h_coarse, U_new(:, n-1), R, safe_tau)
-                    end if
+                        u_coarse_new = U_new(:, n)  ! Store for correction
                     
-                    u_coarse_new = U_new(:, n)  ! Store for correction
+                        ! Correction Parareal with stabilization for difficult regimes
+                        ! Based on the formula in parareal.md
+                        if (accel_method == ACCEL_KRYLOV) then
+                            ! Saut fin-grossier complété par la dérivée estimée dans le sous-espace
+                            call accel_correct(n, T_n(n) - T_n(n-1), U_n(:, n-1), u_fine - u_coarse_prev, U_new(:, n-1), &
+                                               accel_jump)
+                            U_new(:, n) = u_coarse_new + accel_jump
+                        else
+                            accel_jump = u_fine - u_coarse_prev
+                            U_new(:, n) = u_coarse_new + u_fine - u_coarse_prev
+                        end if
                     
-                    ! Correction Parareal with stabilization for difficult regimes
-                    ! Based on the formula in parareal.md
-                    U_new(:, n) = u_coarse_new + u_fine - u_coarse_prev
+                        ! For very small tau (Type 1 regime), apply additional damping 
+                        if (tau < 1.0 .and. accel_method == ACCEL_NONE) then
+                            ! Dampen correction to improve stability
+                            U_new(:, n) = 0.8 * u_coarse_new + 0.2 * (accel_jump + u_coarse_new)
+                        end if
                     
-                    ! For very small tau (Type 1 regime), apply additional damping 
-                    if (tau < 1.0) then
-                        ! Dampen correction to improve stability
-                        U_new(:, n) = 0.8 * u_coarse_new + 0.2 * (u_fine - u_coarse_prev + u_coarse_new)
-                    end if
+                        ! Safety check for extreme corrections
+                        if (any(abs(U_new(:, n) - u_coarse_new) > 10.0)) then
+                            ! Limit the magnitude of corrections to prevent instability
+                            where (abs(U_new(:, n) - u_coarse_new) > 10.0)
+                                U_new(:, n) = u_coarse_new + sign(10.0, U_new(:, n) - u_coarse_new)
+                            end where
+                        end if
                     
-                    ! Safety check for extreme corrections
-                    if (any(abs(U_new(:, n) - u_coarse_new) > 10.0)) then
-                        ! Limit the magnitude of corrections to prevent instability
-                        where (abs(U_new(:, n) - u_coarse_new) > 10.0)
-                            U_new(:, n) = u_coarse_new + sign(10.0, U_new(:, n) - u_coarse_new)
-                        end where
+                        ! Calculate energy of the new state
+                        energy_k(n) = calculate_energy(U_new(:, n))
                     end if
-                    
-                    ! Calculate energy of the new state
-                    energy_k(n) = calculate_energy(U_new(:, n))
-                    
-                else if (rank == n-1) then
-                    ! Envoyer u_fine au processus 0
-                    call MPI_Send(u_fine, 3, MPI_REAL, 0, 0, MPI_COMM_WORLD, ierr)
-                    ! Send energy value
-                    call MPI_Send(energy_k(n), 1, MPI_REAL, 0, 1, MPI_COMM_WORLD, ierr)
+                end do
+                call prof_stop(PROF_COARSE)
+            
+                ! Gel par tolérance: une tranche dont le départ est figé et dont l'état et
+                ! l'énergie ne varient plus au-delà de la tolérance est considérée convergée
+                call prof_start(PROF_CONV)
+                if (rank == 0 .and. use_freeze) then
+                    do n = 1, n_slices
+                        if (.not. frozen(n-1)) exit
+                        if (frozen(n)) cycle
+                        slice_change = max(maxval(abs(U_new(:, n) - U_n(:, n))) / &
+                                           (maxval(abs(U_n(:, n))) + 1.0E-10), &
+                                           abs(energy_k(n) - energy_k_prev(n)) / (abs(energy_k_prev(n)) + 1.0E-10))
+                        if (slice_change < adapt_tol) frozen(n) = .true.
+                    end do
+                    print '(a,i0,a,i0)', "   Tranches figées: ", count(frozen(1:n_slices)), " / ", n_slices
                 end if
-            end do
-            
-            ! Vérification de la convergence sur le processus 0 with improved criteria
-            if (rank == 0) then
-                max_diff = maxval(abs(U_new - U_n))
                 
-                ! Add improved convergence check from parareal.md
-                ! Monitor both state changes and energy conservation
-                rel_state_change = max_diff / (maxval(abs(U_n)) + 1.0E-10)
+                ! Vérification de la convergence sur le processus 0 with improved criteria
+                if (rank == 0) then
+                    max_diff = maxval(abs(U_new - U_n))
                 
-                ! Calculate maximum relative energy change
-                rel_energy_change = maxval(abs(energy_k - energy_k_prev) / &
-                                    (abs(energy_k_prev) + 1.0E-10))
+                    ! Add improved convergence check from parareal.md
+                    ! Monitor both state changes and energy conservation
+                    rel_state_change = max_diff / (maxval(abs(U_n)) + 1.0E-10)
                 
-                ! Combined convergence metric (from parareal.md section on convergence)
-                conv_metric = max(rel_state_change, rel_energy_change)
+                    ! Calculate maximum relative energy change
+                    rel_energy_change = maxval(abs(energy_k - energy_k_prev) / &
+                                        (abs(energy_k_prev) + 1.0E-10))
                 
-                ! Add better checks for numerical issues
-                if (isnan(max_diff) .or. max_diff > 1.0E20) then
-                    print *, "ERROR: Numerical instability detected! (Difference =", max_diff, ")"
-                    print *, "Parareal has failed to converge for these parameters."
-                    print *, "Suggestions: Increase tau, decrease step size, or use RK4 instead."
-                    converged = -1  ! Special code for failure
-                else
-                    print '(a,e10.4,a,e10.4,a,e10.4)', "   Diff max: ", max_diff, &
-                          " Rel. state change: ", rel_state_change, &
-                          " Rel. energy change: ", rel_energy_change
+                    ! Combined convergence metric (from parareal.md section on convergence)
+                    conv_metric = max(rel_state_change, rel_energy_change)
+                
+                    ! Add better checks for numerical issues
+                    if (isnan(max_diff) .or. max_diff > 1.0E20) then
+                        print *, "ERROR: Numerical instability detected! (Difference =", max_diff, ")"
+                        print *, "Parareal has failed to converge for these parameters."
+                        print *, "Suggestions: Increase tau, decrease step size, or use RK4 instead."
+                        converged = -1  ! Special code for failure
+                    else
+                        print '(a,e10.4,a,e10.4,a,e10.4)', "   Diff max: ", max_diff, &
+                              " Rel. state change: ", rel_state_change, &
+                              " Rel. energy change: ", rel_energy_change
                     
-                    if (conv_metric < adapt_tol) then
-                        converged = 1
-                        print *, ""
-                        print *, "======================================================"
-                        print '(a,i2,a)', " CONVERGENCE ATTEINTE APRÈS ", k, " ITÉRATIONS"
-                        print *, "======================================================"
-                        print '(a,e10.4,a,e10.4,a)', " Métrique finale (", conv_metric, &
-                              ") < tolérance (", adapt_tol, ")"
-                        print *, ""
-                    else if (k == max_iter) then
-                        print *, ""
-                        print *, "======================================================"
-                        print *, " ATTENTION: PAS DE CONVERGENCE APRÈS", max_iter, "ITÉRATIONS"
-                        print *, "======================================================"
-                        print '(a,e10.4,a,e10.4,a)', " Métrique finale (", conv_metric, &
-                              ") > tolérance (", adapt_tol, ")"
+                        if (conv_metric < adapt_tol) then
+                            converged = 1
+                            print *, ""
+                            print *, "======================================================"
+                            print '(a,i2,a)', " CONVERGENCE ATTEINTE APRÈS ", k, " ITÉRATIONS"
+                            print *, "======================================================"
+                            print '(a,e10.4,a,e10.4,a)', " Métrique finale (", conv_metric, &
+                                  ") < tolérance (", adapt_tol, ")"
+                            print *, ""
+                        else if (use_freeze .and. all(frozen)) then
+                            converged = 1
+                            print *, ""
+                            print *, "======================================================"
+                            print '(a,i2,a)', " CONVERGENCE ATTEINTE APRÈS ", k, " ITÉRATIONS"
+                            print *, "======================================================"
+                            print '(a)', " Toutes les tranches sont figées"
+                            print *, ""
+                        else if (k == max_iter) then
+                            print *, ""
+                            print *, "======================================================"
+                            print *, " ATTENTION: PAS DE CONVERGENCE APRÈS", max_iter, "ITÉRATIONS"
+                            print *, "======================================================"
+                            print '(a,e10.4,a,e10.4,a)', " Métrique finale (", conv_metric, &
+                                  ") > tolérance (", adapt_tol, ")"
+                        end if
                     end if
-                end if
                 
-                U_n = U_new  ! Mise à jour pour la prochaine itération
-            end if
+                    ! Diffusion en direct (--stream) des états de l'itération aux bornes des tranches
+                    call stream_write_states(T_n, U_new, k)
+                    U_n = U_new  ! Mise à jour pour la prochaine itération
+                    
+                    ! Point de reprise de l'itération (la fin de fenêtre est enregistrée plus bas)
+                    if (use_checkpoint .and. converged == 0 .and. mod(k, ckpt_every) == 0) then
+                        call prof_start(PROF_OUTPUT)
+                        call checkpoint_write(checkpoint_file, ckpt_key, w, k, bad_value_counter, conv_metric, &
+                                              T_n, U_n, U_prev, energy_k, energy_k_prev, frozen, T_all, U_all, &
+                                              cost_all, window_iter, window_status, window_metric)
+                        call prof_stop(PROF_OUTPUT)
+                    end if
+                end if
+                call prof_stop(PROF_CONV)
             
-            ! Diffuser l'état de convergence et les nouvelles valeurs à tous
-            call MPI_Bcast(converged, 1, MPI_INTEGER, 0, MPI_COMM_WORLD, ierr)
-            call MPI_Bcast(U_n, 3*(num_procs+1), MPI_REAL, 0, MPI_COMM_WORLD, ierr)
-            call MPI_Bcast(energy_k, num_procs+1, MPI_REAL, 0, MPI_COMM_WORLD, ierr)
+                ! Diffuser l'état de convergence et les nouvelles valeurs à tous
+                call prof_start(PROF_COMM)
+                call MPI_Bcast(converged, 1, MPI_INTEGER, 0, MPI_COMM_WORLD, ierr)
+                call MPI_Bcast(U_n, 3*(n_slices+1), MPI_REAL, 0, MPI_COMM_WORLD, ierr)
+                call MPI_Bcast(energy_k, n_slices+1, MPI_REAL, 0, MPI_COMM_WORLD, ierr)
+                if (use_freeze) call MPI_Bcast(frozen, n_slices+1, MPI_LOGICAL, 0, MPI_COMM_WORLD, ierr)
+                call prof_stop(PROF_COMM)
             
-            if (converged /= 0) exit
-        end do
+                if (converged /= 0) exit
+            end do
+        
+            ! Bilan de la fenêtre et points de contrôle convergés
+            window_iter(w) = min(k, max_iter)
+            window_status(w) = converged
+            window_metric(w) = conv_metric
+            T_all((w-1)*n_slices:w*n_slices) = T_n
+            U_all(:, (w-1)*n_slices:w*n_slices) = U_n
+            if (n_timed > 0) cost_all((w-1)*n_slices+1:w*n_slices) = slice_cost / n_timed
+            
+            ! Fenêtre terminée: la reprise commencera à la fenêtre suivante
+            if (rank == 0 .and. use_checkpoint .and. converged /= -1) then
+                call prof_start(PROF_OUTPUT)
+                call checkpoint_write(checkpoint_file, ckpt_key, w+1, 0, bad_value_counter, conv_metric, &
+                                      T_n, U_n, U_prev, energy_k, energy_k_prev, frozen, T_all, U_all, &
+                                      cost_all, window_iter, window_status, window_metric)
+                call prof_stop(PROF_OUTPUT)
+            end if
+        
+            if (converged == -1) then
+                w_fail = w
+                exit
+            end if
+        end do  ! Fin de la boucle sur les fenêtres
+        
+        ! Résumé par fenêtre
+        if (rank == 0 .and. n_windows > 1) then
+            print *, ""
+            print *, "======================================================"
+            print *, "          RÉSUMÉ PAR FENÊTRE"
+            print *, "======================================================"
+            print '(a)', " Fenêtre   [t_debut, t_fin]            Itérations   Convergence   Métrique"
+            do w = 1, n_windows
+                if (window_iter(w) == 0) exit
+                print '(i8,3x,a,f9.2,a,f9.2,a,i8,6x,a,es12.4)', w, "[", T_all((w-1)*n_slices), ", ", &
+                      T_all(w*n_slices), "]", window_iter(w), merge('oui', 'non', window_status(w) == 1), &
+                      window_metric(w)
+            end do
+            print '(a,i0)', " Itérations totales: ", sum(window_iter)
+            print *, "======================================================"
+        end if
+        
+        if (accel_method == ACCEL_KRYLOV) call accel_release()
+        
+        if (g_init == COARSE_FLOWMAP) then
+            if (rank == 0) call flowmap_report()
+            call flowmap_release()
+        end if
         
         ! Handle the convergence failure case
+        call prof_start(PROF_OUTPUT)
         if (converged == -1) then
             if (rank == 0) then
                 ! Write a simple result file with error message
-                write(output_file, '(a,f3.1,a)') 'output/parareal_tau', safe_tau, '.dat'
                 open(unit=10, file=trim(output_file), status='replace')
+                call write_run_header(10, 'parareal', R, tau, h_fine, h_coarse, tf, u0, run_extra)
                 write(10, '(a)') "t X Y Z"
-                write(10, '(f10.6, 3f12.6)') t0, u0(1), u0(2), u0(3)  ! Initial point
                 
-                ! Add NaN for other points to indicate failure
-                do n = 1, num_procs
+                ! Points de contrôle des fenêtres convergées, puis NaN pour la fenêtre en échec
+                do n = 0, (w_fail-1)*n_slices
+                    write(10, '(f10.6, 3f12.6)') T_all(n), U_all(1, n), U_all(2, n), U_all(3, n)
+                end do
+                do n = 1, n_slices
                     write(10, '(f10.6, a)') T_n(n), "         NaN         NaN         NaN"
                 end do
                 
@@ -729,13 +832,13 @@ contains
         
         ! Sauvegarde des résultats finaux (processus 0 uniquement)
         if (converged /= -1 .and. rank == 0) then
-            write(output_file, '(a,f3.1,a)') 'output/parareal_tau', safe_tau, '.dat'
             open(unit=10, file=trim(output_file), status='replace')
+            call write_run_header(10, 'parareal', R, tau, h_fine, h_coarse, tf, u0, run_extra)
             write(10, '(a)') "t X Y Z"
             
             ! Écriture des points de contrôle
-            do n = 0, num_procs
-                write(10, '(f10.6, 3f12.6)') T_n(n), U_n(1, n), U_n(2, n), U_n(3, n)
+            do n = 0, n_total
+                write(10, '(f10.6, 3f12.6)') T_all(n), U_all(1, n), U_all(2, n), U_all(3, n)
             end do
             
             close(10)
@@ -744,20 +847,23 @@ contains
             print *, "          RÉSULTATS PARAREAL"
             print *, "======================================================"
             print '(a,a)', " Résultats sauvegardés dans: ", trim(output_file)
-            print '(a,i0,a)', " ", num_procs+1, " points de contrôle enregistrés"
+            print '(a,i0,a)', " ", n_total+1, " points de contrôle enregistrés"
             print *, "======================================================"
         end if
+        call prof_stop(PROF_OUTPUT)
         
         ! Generate dense output for ALL tau values (not just tau >= 5.0)
         ! This improves visualization and comparison for all scenarios
+        call prof_start(PROF_DENSE)
         if (converged /= -1 .and. rank == 0) then
             ! Create dense output for better visualization and analysis
-            write(output_file, '(a,f3.1,a)') 'output/parareal_dense_tau', safe_tau, '.dat'
-            open(unit=11, file=trim(output_file), status='replace')
+            open(unit=11, file=trim(dense_file), status='replace')
+            call write_run_header(11, 'parareal', R, tau, h_fine, h_coarse, tf, u0, run_extra)
             write(11, '(a)') "t X Y Z"
             
             ! Initial point
             write(11, '(f10.6, 3f12.6)') t0, u0(1), u0(2), u0(3)
+            call stream_write(t0, u0, 0)
             
             ! Number of points per interval (much denser than just checkpoints)
             ! Use fewer points for smaller tau values (less chaotic)
@@ -773,18 +879,18 @@ contains
             early_stop_time = min(tf, 60.0) ! Don't go beyond t=60 for stability
             
             ! Generate dense output for each subinterval
-            do n = 0, num_procs-1
+            do n = 0, n_total-1
                 ! Skip intervals that are beyond our early stop time
-                if (T_n(n) > early_stop_time) then
+                if (T_all(n) > early_stop_time) then
                     exit
                 end if
                 
-                dense_dt = (T_n(n+1) - T_n(n)) / n_dense_points
+                dense_dt = (T_all(n+1) - T_all(n)) / n_dense_points
                 
-                u_local = U_n(:, n) ! Start with known value at interval start
+                u_local = U_all(:, n) ! Start with known value at interval start
                 
                 do i = 1, n_dense_points
-                    t_local = T_n(n) + i * dense_dt
+                    t_local = T_all(n) + i * dense_dt
                     
                     ! Check if we've reached the early stop time
                     if (t_local > early_stop_time) then
@@ -792,48 +898,86 @@ contains
                     end if
                     
                     ! Use RK4 with fine step to get accurate intermediate points
-                    u_local = solve_rk4_interval(T_n(n) + (i-1)*dense_dt, t_local, safe_h_fine/10.0, &
+                    u_local = solve_rk4_interval(T_all(n) + (i-1)*dense_dt, t_local, safe_h_fine/10.0, &
                                                u_local, R, safe_tau)
                     
                     ! Write dense point to output file
                     write(11, '(f10.6, 3f12.6)') t_local, u_local(1), u_local(2), u_local(3)
+                    call stream_write(t_local, u_local, 0)
                 end do
             end do
+            call stream_flush()
             
             close(11)
             print *, ""
             print *, "======================================================"
             print *, "          DENSE OUTPUT TRAJECTORY"
             print *, "======================================================"
-            print '(a,a)', " Dense trajectory sauvegardée dans: ", trim(output_file)
+            print '(a,a)', " Dense trajectory sauvegardée dans: ", trim(dense_file)
             
             ! Calculate actual number of points generated
-            if (T_n(num_procs) > early_stop_time) then
+            if (T_all(n_total) > early_stop_time) then
                 ! Find which subinterval contains early_stop_time
                 stop_interval = 0
-                do n = 0, num_procs-1
-                    if (T_n(n) <= early_stop_time .and. T_n(n+1) > early_stop_time) then
+                do n = 0, n_total-1
+                    if (T_all(n) <= early_stop_time .and. T_all(n+1) > early_stop_time) then
                         stop_interval = n
                         exit
                     end if
                 end do
                 
                 ! Calculate partial interval
-                partial_fraction = (early_stop_time - T_n(stop_interval)) / (T_n(stop_interval+1) - T_n(stop_interval))
+                partial_fraction = (early_stop_time - T_all(stop_interval)) / &
+                                   (T_all(stop_interval+1) - T_all(stop_interval))
                 
                 ! Total = full intervals + partial interval + initial point
                 total_points = stop_interval * n_dense_points + int(partial_fraction * n_dense_points) + 1
             else
-                total_points = num_procs * n_dense_points + 1
+                total_points = n_total * n_dense_points + 1
             end if
             
             print '(a,i0,a)', " ", total_points, " points générés"
             print '(a,f6.1,a)', " Données jusqu'à t=", early_stop_time, " (limitation pour la stabilité)"
             print *, "======================================================"
         end if
+        call prof_stop(PROF_DENSE)
+        
+        ! Rapport d'équilibrage de charge (phase fine)
+        if (rank == 0 .and. sum(rank_busy) > 0.0) then
+            print *, ""
+            print *, "======================================================"
+            print *, "          ÉQUILIBRAGE DE CHARGE (PHASE FINE)"
+            print *, "======================================================"
+            print '(a)', " Processus     Calcul (s)    Attente (s)"
+            do n = 1, num_procs
+                print '(i10,2f15.6)', n-1, rank_busy(n), rank_idle(n)
+            end do
+            print '(a,f14.6,a)', " Attente totale: ", sum(rank_idle), " secondes"
+            print '(a,f8.3,a)', " Déséquilibre (max/moyenne): ", &
+                  maxval(rank_busy) / (sum(rank_busy) / num_procs), " (idéal = 1.0)"
+            print *, "======================================================"
+            
+            if (use_balance .and. w_fail == 0) then
+                call system('mkdir -p output/benchmark')
+                call save_slice_profile(profile_file, n_total, T_all, cost_all, prof_key)
+            end if
+        end if
+        if (allocated(T_prof)) deallocate(T_prof, cost_prof)
+        
+        ! Bilan des solves fins évités par le gel des tranches
+        if (rank == 0 .and. use_freeze .and. n_fine_total > 0) then
+            print *, ""
+            print '(a,i0,a,i0,a,f5.1,a)', " Solves fins évités (tranches figées): ", n_fine_skipped, " sur ", &
+                  n_fine_total, " (", 100.0 * n_fine_skipped / n_fine_total, " %)"
+        end if
+        
+        if (present(iterations)) iterations = sum(window_iter)
         
         ! Libération mémoire
         deallocate(T_n, U_n, U_new, U_prev, energy_k, energy_k_prev)
+        deallocate(slice_time, slice_cost, rank_time, rank_idle, rank_busy)
+        deallocate(u_fine_loc, u_fine_all, slice_t_loc, frozen, frozen_prev)
+        deallocate(T_all, U_all, cost_all, window_iter, window_status, window_metric)
         
     end subroutine solve_parareal
 
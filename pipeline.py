@@ -0,0 +1,473 @@
+"""
+Pipeline déclaratif: exécute un lot de simulations décrit dans un manifeste
+(JSON ou TOML), puis les analyses demandées.
+
+Chaque exécution est identifiée par un hash de ses paramètres complets (méthode,
+R, tau, pas de temps, tf, conditions initiales, options et version du solveur).
+Ses résultats sont rangés dans le magasin de result_cache.py
+(<output_dir>/<hash>.dat, avec un en-tête de paramètres enregistré par le
+solveur). Une exécution déjà présente dans le magasin avec un en-tête
+correspondant n'est pas relancée. Après les analyses, le magasin est réduit
+aux limites max_store_mb / max_store_entries (éviction LRU).
+
+Exemple de manifeste (TOML):
+
+    [settings]
+    max_cores = 8                 # coeurs utilisés simultanément (défaut: tous)
+    max_store_mb = 2000           # taille maximale du magasin de résultats
+    mpirun_args = ["--oversubscribe"]
+
+    [[runs]]
+    name = "rk4_tau{tau}"         # les listes définissent un balayage
+    method = "rk4"
+    tau = [0.5, 2.0]
+    h = 0.001
+    tf = 60.0
+
+    [[runs]]
+    name = "parareal_tau2"
+    method = "parareal"
+    tau = 2.0
+    h_coarse = 0.05
+    h = 0.005
+    tf = 60.0
+    np = 5
+    options = ["--freeze"]
+
+    [[analyses]]
+    type = "compare"
+    rk4 = "rk4_tau2.0"
+    parareal = "parareal_tau2"
+    output = "output/comparisons/tau2"
+
+    [[analyses]]
+    type = "plotter"              # sous-commande quelconque de plotter.py
+    args = ["compare-files", "--rk4", "{rk4_tau0.5}", "--parareal", "{parareal_tau2:dense}", "--no-display"]
+
+Usage:
+    python pipeline.py manifests/scenarios.toml [--dry-run] [--force] [--max-cores N]
+"""
+import argparse
+import itertools
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from result_cache import ResultStore, result_key
+
+# Valeurs par défaut du solveur (main.f90, param.f90)
+DEFAULTS = {
+    'R': 2.5,
+    'tau': 5.0,
+    'h': 0.01,
+    'h_coarse': 0.1,
+    'tf': 100.0,
+    'u0': [1.0, 0.0, 0.0],
+    'np': 5,
+    'threads': 1,
+    'options': [],
+}
+
+# Paramètres Parareal qui modifient le résultat, en plus de result_cache.KEY_FIELDS
+PARAREAL_KEY_FIELDS = ('np', 'threads', 'options')
+
+# Clés dont la valeur est naturellement une liste (pas un balayage)
+LIST_KEYS = ('u0', 'options')
+
+
+def load_manifest(path):
+    """
+    Charge un manifeste JSON ou TOML (selon l'extension).
+
+    Args:
+        path (str): Chemin du manifeste
+
+    Returns:
+        dict: Contenu du manifeste (sections settings, runs, analyses)
+    """
+    if path.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                sys.exit("Erreur: la lecture des manifestes TOML requiert Python 3.11+ ou le paquet 'tomli'.")
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def expand_sweeps(entry):
+    """
+    Développe une entrée de manifeste en une liste d'exécutions: chaque paramètre
+    donné sous forme de liste définit un axe du balayage (produit cartésien).
+    Le nom peut contenir des champs {param} remplacés par leur valeur.
+
+    Args:
+        entry (dict): Entrée [[runs]] du manifeste
+
+    Returns:
+        list: Entrées développées (une par point du balayage)
+    """
+    axes = {}
+    for key, value in entry.items():
+        if key in LIST_KEYS:
+            # u0 = [[1,0,0], [0,1,0]] définit un balayage sur les conditions initiales
+            if key == 'u0' and value and isinstance(value[0], (list, tuple)):
+                axes[key] = [list(v) for v in value]
+        elif isinstance(value, list):
+            axes[key] = value
+
+    if not axes:
+        return [dict(entry)]
+
+    keys = list(axes)
+    expanded = []
+    for combo in itertools.product(*(axes[k] for k in keys)):
+        run = dict(entry)
+        run.update(zip(keys, combo))
+        expanded.append(run)
+    return expanded
+
+
+def normalize_run(entry, version):
+    """
+    Complète une exécution avec les valeurs par défaut et calcule son hash.
+
+    Args:
+        entry (dict): Exécution issue du manifeste
+        version (str): Version du solveur (lorenz_solver --version)
+
+    Returns:
+        dict: Exécution normalisée, avec les clés 'name' et 'hash'
+    """
+    run = dict(DEFAULTS)
+    run.update(entry)
+    if run.get('method') not in ('rk4', 'parareal'):
+        raise ValueError(f"Méthode inconnue pour l'exécution {entry.get('name')!r}: {run.get('method')!r}")
+
+    for key in ('R', 'tau', 'h', 'h_coarse', 'tf'):
+        run[key] = float(run[key])
+    run['u0'] = [float(v) for v in run['u0']]
+    run['np'] = int(run['np'])
+    run['threads'] = int(run['threads'])
+    run['options'] = [str(o) for o in run['options']]
+    run['version'] = version
+    if run['method'] == 'rk4':
+        run['h_coarse'] = 0.0  # Sans objet pour RK4 (valeur écrite dans l'en-tête)
+        run['hash'] = result_key(run)
+    else:
+        run['hash'] = result_key(run, PARAREAL_KEY_FIELDS)
+
+    name = run.get('name', f"{run['method']}_tau{{tau}}")
+    run['name'] = name.format(**{k: v for k, v in run.items() if not isinstance(v, list)})
+    return run
+
+
+def output_files(run, store):
+    """Fichiers de résultats d'une exécution: (préfixe, fichier principal, sortie dense)"""
+    prefix = store.path_for(run['hash'], '')
+    dense = prefix + '_dense.dat' if run['method'] == 'parareal' else None
+    return prefix, prefix + '.dat', dense
+
+
+def read_header(file_path):
+    """
+    Lit l'en-tête "# clé=valeur ..." d'un fichier de résultats.
+
+    Returns:
+        dict: Paramètres enregistrés par le solveur (vide si absent)
+    """
+    params = {}
+    with open(file_path, 'r') as f:
+        for line in f:
+            if not line.startswith('#'):
+                break
+            for item in line[1:].split():
+                if '=' in item:
+                    key, value = item.split('=', 1)
+                    params[key] = value
+    return params
+
+
+def header_matches(file_path, run):
+    """
+    Vérifie qu'un fichier existant a été produit avec les paramètres de l'exécution.
+
+    Args:
+        file_path (str): Fichier de résultats
+        run (dict): Exécution normalisée
+
+    Returns:
+        bool: True si le fichier est complet et correspond aux paramètres
+    """
+    if not os.path.exists(file_path):
+        return False
+    header = read_header(file_path)
+    if header.get('method') != run['method'] or header.get('version') != run['version']:
+        return False
+
+    expected = {'R': run['R'], 'tau': run['tau'], 'h': run['h'], 'tf': run['tf'],
+                'x0': run['u0'][0], 'y0': run['u0'][1], 'z0': run['u0'][2]}
+    if run['method'] == 'parareal':
+        expected.update({'h_coarse': run['h_coarse'], 'ranks': run['np'], 'threads': run['threads']})
+
+    for key, value in expected.items():
+        try:
+            recorded = float(header[key])
+        except (KeyError, ValueError):
+            return False
+        # Les valeurs sont écrites en simple précision par le solveur
+        if abs(recorded - value) > 1e-6 * max(abs(value), 1.0):
+            return False
+    return True
+
+
+def register_run(store, run):
+    """Enregistre les fichiers d'une exécution terminée dans le magasin"""
+    prefix, data_file, dense_file = output_files(run, store)
+    params = {k: run[k] for k in ('name', 'method', 'version', 'R', 'tau', 'h', 'h_coarse', 'tf', 'u0')}
+    if run['method'] == 'parareal':
+        params.update({k: run[k] for k in PARAREAL_KEY_FIELDS})
+    store.register(run['hash'], params, [data_file, dense_file or '', prefix + '.log'])
+
+
+def build_command(run, prefix, settings):
+    """
+    Construit la ligne de commande du solveur pour une exécution.
+
+    Returns:
+        list: Arguments de la commande
+    """
+    solver = settings.get('solver', './lorenz_solver')
+    u0 = [repr(v) for v in run['u0']]
+    flags = [f"--R={run['R']!r}", f"--output={prefix}"]
+
+    if run['method'] == 'rk4':
+        return [solver, 'rk4', repr(run['tau']), repr(run['h']), repr(run['tf'])] + u0 + flags
+
+    if run['threads'] > 1:
+        flags.append(f"--threads={run['threads']}")
+    mpirun = [settings.get('mpirun', 'mpirun')] + list(settings.get('mpirun_args', [])) + ['-np', str(run['np'])]
+    return (mpirun + [solver, 'parareal', repr(run['tau']), repr(run['h_coarse']), repr(run['h']),
+                      repr(run['tf'])] + u0 + flags + run['options'])
+
+
+def run_cores(run):
+    """Nombre de coeurs occupés par une exécution"""
+    return run['np'] * run['threads'] if run['method'] == 'parareal' else 1
+
+
+class CoreBudget:
+    """Limite le nombre de coeurs occupés simultanément par les exécutions"""
+
+    def __init__(self, total):
+        self.total = max(1, total)
+        self.free = self.total
+        self.cond = threading.Condition()
+
+    def acquire(self, n):
+        n = min(n, self.total)
+        with self.cond:
+            self.cond.wait_for(lambda: self.free >= n)
+            self.free -= n
+        return n
+
+    def release(self, n):
+        with self.cond:
+            self.free += n
+            self.cond.notify_all()
+
+
+def execute(command, log_file, budget, cores, env=None):
+    """
+    Lance une commande en réservant des coeurs du budget; la sortie est
+    enregistrée dans log_file.
+
+    Returns:
+        bool: True si la commande s'est terminée sans erreur
+    """
+    taken = budget.acquire(cores)
+    try:
+        with open(log_file, 'w') as log:
+            result = subprocess.run(command, stdout=log, stderr=subprocess.STDOUT, env=env)
+        return result.returncode == 0
+    finally:
+        budget.release(taken)
+
+
+def solver_version(settings):
+    """Version du solveur, utilisée dans le hash des exécutions"""
+    solver = settings.get('solver', './lorenz_solver')
+    try:
+        out = subprocess.run([solver, '--version'], capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        sys.exit(f"Erreur: impossible d'exécuter {solver} (lancer 'make' d'abord).")
+    return out.split()[-1]
+
+
+def resolve_placeholders(args, runs_by_name, store):
+    """
+    Remplace {nom} par le fichier de résultats de l'exécution 'nom' et
+    {nom:dense} par sa sortie dense.
+    """
+    def substitute(match):
+        run = runs_by_name[match.group(1)]
+        _, data_file, dense_file = output_files(run, store)
+        return dense_file if match.group(2) == 'dense' and dense_file else data_file
+    return [re.sub(r'\{([\w.+-]+)(?::(dense))?\}', substitute, str(a)) for a in args]
+
+
+def analysis_command(analysis, runs_by_name, store):
+    """
+    Construit la commande plotter.py d'une analyse du manifeste.
+
+    Returns:
+        tuple: (commande, noms des exécutions requises)
+    """
+    kind = analysis.get('type', 'plotter')
+    if kind == 'compare':
+        rk4, para = runs_by_name[analysis['rk4']], runs_by_name[analysis['parareal']]
+        _, rk4_file, _ = output_files(rk4, store)
+        _, para_file, dense_file = output_files(para, store)
+        if dense_file and os.path.exists(dense_file):
+            para_file = dense_file
+        args = ['compare-files', '--rk4', rk4_file, '--parareal', para_file, '--no-display']
+        if 'output' in analysis:
+            os.makedirs(os.path.dirname(analysis['output']) or '.', exist_ok=True)
+            args += ['--output', analysis['output']]
+        needs = [analysis['rk4'], analysis['parareal']]
+    elif kind == 'plotter':
+        args = resolve_placeholders(analysis['args'], runs_by_name, store)
+        needs = re.findall(r'\{([\w.+-]+)(?::dense)?\}', ' '.join(map(str, analysis['args'])))
+    else:
+        raise ValueError(f"Type d'analyse inconnu: {kind!r}")
+    return [sys.executable, 'plotter.py'] + args, needs
+
+
+def run_pipeline(manifest_path, dry_run=False, force=False, max_cores=None):
+    """
+    Exécute toutes les simulations du manifeste, puis ses analyses.
+
+    Args:
+        manifest_path (str): Chemin du manifeste JSON/TOML
+        dry_run (bool): Affiche les commandes sans les exécuter
+        force (bool): Relance même les exécutions déjà présentes
+        max_cores (int): Nombre maximal de coeurs utilisés simultanément
+
+    Returns:
+        bool: True si toutes les exécutions et analyses ont réussi
+    """
+    manifest = load_manifest(manifest_path)
+    settings = manifest.get('settings', {})
+    output_dir = settings.get('output_dir', 'output/runs')
+    max_store_mb = settings.get('max_store_mb')
+    store = ResultStore(output_dir,
+                        max_bytes=int(max_store_mb * 1024 * 1024) if max_store_mb is not None else None,
+                        max_entries=settings.get('max_store_entries'))
+
+    version = solver_version(settings)
+    runs = [normalize_run(e, version) for entry in manifest.get('runs', []) for e in expand_sweeps(entry)]
+    runs_by_name = {}
+    for run in runs:
+        if run['name'] in runs_by_name:
+            raise ValueError(f"Nom d'exécution en double: {run['name']!r}")
+        runs_by_name[run['name']] = run
+
+    budget = CoreBudget(max_cores or settings.get('max_cores') or os.cpu_count() or 1)
+    print(f"Manifeste: {manifest_path} ({len(runs)} exécutions, solveur {version}, {budget.total} coeurs)")
+
+    # Exécutions à lancer (les identiques ne sont lancées qu'une fois)
+    pending, status = {}, {}
+    for run in runs:
+        prefix, data_file, _ = output_files(run, store)
+        if not force and header_matches(data_file, run):
+            if store.lookup(run['hash']) is None:
+                # Résultat présent mais absent de l'index (magasin antérieur)
+                register_run(store, run)
+            status[run['name']] = 'cache'
+        elif run['hash'] in pending:
+            status[run['name']] = 'dupliquée'
+        else:
+            pending[run['hash']] = run
+            status[run['name']] = 'à lancer'
+
+    for run in runs:
+        print(f"  {run['name']:<30} {run['hash']}  {status[run['name']]}")
+
+    if dry_run:
+        for run in pending.values():
+            prefix, _, _ = output_files(run, store)
+            print(' '.join(build_command(run, prefix, settings)))
+        return True
+
+    def launch(run):
+        prefix, data_file, _ = output_files(run, store)
+        ok = execute(build_command(run, prefix, settings), prefix + '.log', budget, run_cores(run))
+        ok = ok and header_matches(data_file, run)
+        if ok:
+            register_run(store, run)
+        return run['hash'], ok
+
+    with ThreadPoolExecutor(max_workers=max(1, len(pending))) as pool:
+        results = dict(pool.map(launch, pending.values()))
+
+    failed = set()
+    for run in runs:
+        if results.get(run['hash']) is False:
+            failed.add(run['name'])
+            prefix, _, _ = output_files(run, store)
+            print(f"ÉCHEC: {run['name']} (voir {prefix}.log)")
+
+    # Analyses, une fois leurs exécutions terminées avec succès
+    jobs = []
+    for i, analysis in enumerate(manifest.get('analyses', [])):
+        command, needs = analysis_command(analysis, runs_by_name, store)
+        if failed.intersection(needs):
+            print(f"Analyse {i+1} ignorée: exécution requise en échec")
+            continue
+        jobs.append((i, command))
+
+    env = dict(os.environ, MPLBACKEND='Agg')
+
+    def analyse(job):
+        i, command = job
+        log_file = os.path.join(output_dir, f'analysis_{i+1}.log')
+        return i, execute(command, log_file, budget, 1, env=env)
+
+    with ThreadPoolExecutor(max_workers=max(1, len(jobs))) as pool:
+        analysis_results = list(pool.map(analyse, jobs))
+    for i, ok in analysis_results:
+        if not ok:
+            print(f"ÉCHEC de l'analyse {i+1} (voir {output_dir}/analysis_{i+1}.log)")
+
+    # Éviction LRU, sans toucher aux résultats de ce manifeste
+    evicted = store.evict(keep=[run['hash'] for run in runs])
+    if evicted:
+        print(f"{len(evicted)} entrées anciennes supprimées du magasin ({store.total_size() / 1e6:.1f} Mo)")
+
+    print(f"Terminé: {len(pending) - sum(1 for h in results if not results[h])} exécutions lancées, "
+          f"{sum(1 for s in status.values() if s == 'cache')} en cache, {len(failed)} en échec.")
+    return not failed and all(ok for _, ok in analysis_results)
+
+
+def parse_command_line():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Run a batch of Lorenz simulations from a manifest')
+    parser.add_argument('manifest', help='JSON or TOML run manifest')
+    parser.add_argument('--dry-run', action='store_true', help='Print the solver commands without running them')
+    parser.add_argument('--force', action='store_true', help='Re-run simulations even if cached outputs exist')
+    parser.add_argument('--max-cores', type=int, help='Maximum number of cores used at the same time')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_command_line()
+    success = run_pipeline(args.manifest, args.dry_run, args.force, args.max_cores)
+    sys.exit(0 if success else 1)
@@ -1,16 +1,67 @@
 import os
+import glob
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 import re
 import argparse
 import sys
+import shlex
+import stat
+import subprocess
+import time
 import matplotlib.gridspec as gridspec
 from scipy.interpolate import interp1d
+from result_cache import ResultStore
+from build_graph import BuildGraph
+import archive
+import trajectory_codec
+import cost_model
 
-def read_data(file_path):
+# Magasin de résultats: conserve les tableaux déjà analysés (.npy)
+_result_store = None
+
+# Fichiers de trajectoire reconnus: texte du solveur et format compressé
+DATA_EXTENSIONS = ('.dat', trajectory_codec.EXTENSION)
+
+def read_data(file_path, use_cache=True, t_range=None):
     """
-    Lit les données de simulation à partir d'un fichier.
+    Lit les données de simulation à partir d'un fichier, en réutilisant le
+    tableau déjà analysé du magasin de résultats si le fichier n'a pas changé.
+    Les entrées d'archive ("output/runs.h5::rk4_tau5.0") et les trajectoires
+    compressées (.ltz) sont lues directement, en ne décompressant que la
+    fenêtre demandée.
+    
+    Args:
+        file_path (str): Chemin vers le fichier de données ou entrée d'archive
+        use_cache (bool): Utiliser le cache de tableaux analysés
+        t_range (tuple, optional): Fenêtre en temps (t0, t1) à lire
+    
+    Returns:
+        numpy.ndarray: Tableau des données [t, X, Y, Z]
+    """
+    global _result_store
+    if archive.is_archive_path(file_path):
+        return archive.read_entry(file_path, t_range)[0]
+    if trajectory_codec.is_codec_file(file_path):
+        return trajectory_codec.read_trajectory(file_path, t_range)
+    if not use_cache:
+        data = parse_data_file(file_path)
+    else:
+        try:
+            if _result_store is None:
+                _result_store = ResultStore()
+            data = _result_store.load_parsed(file_path, parse_data_file)
+        except OSError:
+            # Magasin inaccessible (dossier en lecture seule...): lecture directe
+            data = parse_data_file(file_path)
+    if t_range is not None:
+        data = data[(data[:, 0] >= t_range[0]) & (data[:, 0] <= t_range[1])]
+    return data
+
+def parse_data_file(file_path):
+    """
+    Analyse un fichier de données texte (en-têtes ignorés).
     
     Args:
         file_path (str): Chemin vers le fichier de données
@@ -24,8 +75,9 @@ def read_data(file_path):
         header = f.readline()  # Skip the header line
         for line in f:
             line = line.strip()
-            # Skip empty lines and lines with asterisks or other non-numeric characters
-            if not line or '**' in line or not any(c.isdigit() for c in line):
+            # Skip empty lines, parameter header lines ("# key=value ...")
+            # and lines with asterisks or other non-numeric characters
+            if not line or line.startswith('#') or '**' in line or not any(c.isdigit() for c in line):
                 continue
             
             try:
@@ -43,6 +95,46 @@ def read_data(file_path):
     # Convert the filtered lines to a numpy array
     return np.array(valid_lines)
 
+def read_header(file_path):
+    """
+    Lit les paramètres d'exécution enregistrés en tête de fichier par le solveur
+    (lignes "# clé=valeur ...").
+    
+    Args:
+        file_path (str): Chemin vers le fichier de données
+    
+    Returns:
+        dict: Paramètres {clé: valeur} (valeurs numériques converties en float),
+              vide pour les fichiers sans en-tête
+    """
+    if archive.is_archive_path(file_path):
+        archive_path, name = archive.split_archive_path(file_path)
+        with archive.RunArchive(archive_path) as run_archive:
+            return run_archive.attributes(name)
+    
+    params = {}
+    if trajectory_codec.is_codec_file(file_path):
+        for key, value in trajectory_codec.TrajectoryReader(file_path).params.items():
+            try:
+                params[key] = float(value)
+            except ValueError:
+                params[key] = value
+        return params
+    
+    with open(file_path, 'r') as f:
+        for line in f:
+            if not line.startswith('#'):
+                break
+            for item in line[1:].split():
+                if '=' not in item:
+                    continue
+                key, value = item.split('=', 1)
+                try:
+                    params[key] = float(value)
+                except ValueError:
+                    params[key] = value
+    return params
+
 def is_parareal_file(file_path):
     """
     Détermine si un fichier est au format Parareal (points discrets)
@@ -53,6 +145,9 @@ def is_parareal_file(file_path):
     Returns:
         bool: True si c'est un fichier Parareal, False sinon
     """
+    method = read_header(file_path).get('method')
+    if method is not None:
+        return method == 'parareal'
     return 'parareal' in os.path.basename(file_path).lower()
 
 def extract_tau(file_path):
@@ -65,6 +160,11 @@ def extract_tau(file_path):
     Returns:
         float: Valeur de tau ou None si non trouvée
     """
+    # Priorité à l'en-tête de paramètres écrit par le solveur
+    tau = read_header(file_path).get('tau')
+    if isinstance(tau, float):
+        return tau
+    
     filename = os.path.basename(file_path)
     match = re.search(r'tau(\d+\.\d+)', filename)
     if match:
@@ -213,27 +313,24 @@ def plot_trajectory(file_path, plot_type='time', compare_with=None):
         print(f"Type de graphique inconnu: {plot_type}")
         print("Types disponibles: 'time', 'phase', '3d'")
 
-def compare_methods(tau_value=None):
+def find_method_files(tau_value=None, output_dir='output'):
     """
-    Compare les résultats de RK4 et Parareal pour une valeur de tau donnée
+    Cherche les fichiers RK4 et Parareal d'une valeur de tau
     
     Args:
-        tau_value (float): Valeur de tau pour laquelle faire la comparaison
-    """
-    output_dir = 'output'
-    
-    if not os.path.exists(output_dir):
-        print(f"Erreur: Le dossier {output_dir} n'existe pas.")
-        return
+        tau_value (float): Valeur de tau (None: derniers fichiers trouvés)
+        output_dir (str): Dossier des fichiers de sortie
     
-    # Chercher les fichiers correspondant à la valeur de tau
+    Returns:
+        tuple: (rk4_file, parareal_file), None si absent
+    """
     tau_str = f"{tau_value:.1f}" if tau_value else None
     
     rk4_file = None
     parareal_file = None
     
     for file in os.listdir(output_dir):
-        if not file.endswith('.dat'):
+        if not file.endswith(DATA_EXTENSIONS):
             continue
             
         file_path = os.path.join(output_dir, file)
@@ -247,6 +344,24 @@ def compare_methods(tau_value=None):
         elif 'parareal' in file.lower():
             parareal_file = file_path
     
+    return rk4_file, parareal_file
+
+def compare_methods(tau_value=None):
+    """
+    Compare les résultats de RK4 et Parareal pour une valeur de tau donnée
+    
+    Args:
+        tau_value (float): Valeur de tau pour laquelle faire la comparaison
+    """
+    output_dir = 'output'
+    
+    if not os.path.exists(output_dir):
+        print(f"Erreur: Le dossier {output_dir} n'existe pas.")
+        return
+    
+    tau_str = f"{tau_value:.1f}" if tau_value else None
+    rk4_file, parareal_file = find_method_files(tau_value, output_dir)
+    
     if not rk4_file or not parareal_file:
         print("Impossible de trouver les fichiers RK4 et Parareal correspondants.")
         if tau_str:
@@ -260,13 +375,14 @@ def compare_methods(tau_value=None):
     plot_trajectory(rk4_file, 'phase', parareal_file)
     plot_trajectory(rk4_file, '3d', parareal_file)
 
-def analyze_all_outputs(compare=False):
+def analyze_all_outputs(compare=False, incremental=False):
     """
     Analyse tous les fichiers de sortie dans le dossier output/.
     Crée tous les types de graphiques pour chaque fichier.
     
     Args:
         compare (bool): Si True, compare les méthodes par valeur de tau
+        incremental (bool): Si True, ne retrace que les figures dont les entrées ont changé
     """
     output_dir = 'output'
     
@@ -274,13 +390,14 @@ def analyze_all_outputs(compare=False):
         print(f"Erreur: Le dossier {output_dir} n'existe pas.")
         return
     
-    files = [f for f in os.listdir(output_dir) if f.endswith('.dat')]
+    files = [f for f in os.listdir(output_dir) if f.endswith(DATA_EXTENSIONS)]
     
     if not files:
         print(f"Aucun fichier .dat trouvé dans {output_dir}/")
         return
         
     print(f"Création des graphiques pour {len(files)} fichiers...")
+    graph = BuildGraph() if incremental else None
     
     # Si compare est True, grouper les fichiers par tau
     if compare:
@@ -292,39 +409,74 @@ def analyze_all_outputs(compare=False):
         
         for tau in tau_values:
             print(f"\nComparaison des méthodes pour tau={tau}:")
+            if graph is not None:
+                rk4_file, parareal_file = find_method_files(tau, output_dir)
+                if rk4_file and parareal_file:
+                    rule = f"methods:tau{tau:.1f}"
+                    inputs = [rk4_file, parareal_file]
+                    targets = [os.path.splitext(rk4_file)[0] + f"_{kind}.png" for kind in ('time', 'phase', '3d')]
+                    if not graph.is_stale(rule, inputs, code=plot_trajectory):
+                        graph.skip(rule)
+                        continue
+                    compare_methods(tau)
+                    graph.record(rule, inputs, targets, code=plot_trajectory)
+                    continue
             compare_methods(tau)
     else:
         # Sinon, traiter chaque fichier individuellement
         for file in files:
             file_path = os.path.join(output_dir, file)
+            rule = f"trajectory:{file}"
+            targets = [os.path.splitext(file_path)[0] + f"_{kind}.png" for kind in ('time', 'phase', '3d')]
+            if graph is not None and not graph.is_stale(rule, [file_path], code=plot_trajectory):
+                graph.skip(rule)
+                continue
             print(f"Traitement de {file}...")
             
             # Créer les trois types de graphiques
             plot_trajectory(file_path, 'time')
             plot_trajectory(file_path, 'phase')
             plot_trajectory(file_path, '3d')
+            if graph is not None:
+                graph.record(rule, [file_path], targets, code=plot_trajectory)
     
+    if graph is not None:
+        graph.summary()
     print("Analyse terminée. Tous les graphiques ont été générés.")
 
-def analyze_benchmark_data(benchmark_dir='output/benchmark'):
+def analyze_benchmark_data(benchmark_dir='output/benchmark', incremental=False, archive_path=None):
     """
     Analyse les données de benchmark et génère des visualisations de performance
     
     Args:
         benchmark_dir (str): Chemin vers le répertoire contenant les fichiers de benchmark
+        incremental (bool): Si True, ne retrace les figures que si les résultats ont changé
+        archive_path (str, optional): Archive HDF5 contenant la table benchmark_results
     """
-    results_file = os.path.join(benchmark_dir, 'benchmark_results.csv')
+    results_file = archive_path or os.path.join(benchmark_dir, 'benchmark_results.csv')
     
     if not os.path.exists(results_file):
         print(f"Erreur: Fichier de résultats des benchmarks non trouvé ({results_file})")
         print("Exécutez d'abord 'make benchmark_extended' pour générer les données")
         return
     
+    graph = BuildGraph() if incremental else None
+    rule = f"benchmark:{os.path.normpath(benchmark_dir)}"
+    if graph is not None and not graph.is_stale(rule, [results_file], code=analyze_benchmark_data):
+        graph.skip(rule)
+        print(f"Les graphiques de {benchmark_dir} sont à jour.")
+        return
+    
     # Lire les données du résumé des benchmarks
-    import csv
-    with open(results_file, 'r') as f:
-        reader = csv.DictReader(f)
-        data = list(reader)
+    if archive_path:
+        with archive.RunArchive(archive_path) as run_archive:
+            table = run_archive.read_table('tables/benchmark_results')
+        data = [{k: str(v) for k, v in zip(table, row)} for row in zip(*table.values())]
+    else:
+        import csv
+        with open(results_file, 'r') as f:
+            reader = csv.DictReader(f)
+            data = list(reader)
     
     if not data:
         print("Aucune donnée de benchmark trouvée dans le fichier CSV")
@@ -513,6 +665,11 @@ def analyze_benchmark_data(benchmark_dir='output/benchmark'):
         plt.savefig(os.path.join(benchmark_dir, 'growth_trends.png'), dpi=300)
         plt.show()
     
+    if graph is not None:
+        targets = [os.path.join(benchmark_dir, name) for name in
+                   ('execution_time_steps.png', 'speedup_steps.png', 'efficiency_steps.png', 'growth_trends.png')]
+        graph.record(rule, [results_file], targets, code=analyze_benchmark_data)
+    
     print("\nAnalyse des benchmarks terminée. Les graphiques ont été sauvegardés dans:", benchmark_dir)
     print("\nRésumé des performances:")
     print(f"{'Problème':<10} {'Étapes':<10} {'h':<10} {'tf':<8} {'RK4':<8} {'Parareal':<8} {'Speedup':<8}")
@@ -544,15 +701,27 @@ def analyze_benchmark_data(benchmark_dir='output/benchmark'):
         else:
             print("\nObservation: L'efficacité reste stable quelle que soit la taille du problème.")
     
-    # Estimer le point de rentabilité (taille du problème à partir de laquelle Parareal est avantageux)
-    speedup_threshold = 1.0  # Parareal est avantageux quand speedup > 1
-    beneficial_sizes = [steps[i] for i, s in enumerate(speedups) if s > speedup_threshold]
-    
-    if beneficial_sizes:
-        min_beneficial = min(beneficial_sizes)
-        print(f"\nPoint de rentabilité: ~{min_beneficial} étapes (à partir de ce point, Parareal devient avantageux)")
+    # Point de rentabilité et recommandation prévus par le modèle de coût
+    # (benchmarks et historique des exécutions, voir cost_model.py)
+    model = cost_model.CostModel(cost_model.load_history(
+        benchmark_file=os.path.join(benchmark_dir, 'benchmark_results.csv')))
+    h_ref = hs[-1]
+    h_coarse_ref = cost_model.BENCHMARK_COARSE_RATIO * h_ref
+    break_even = model.break_even(cost_model.BENCHMARK_TAU, h_ref, h_coarse_ref, cost_model.BENCHMARK_NP)
+    if break_even is not None:
+        print(f"\nPoint de rentabilité prévu (h={h_ref}, {cost_model.BENCHMARK_NP} processus): "
+              f"tf ≈ {break_even:.0f} (~{int(break_even / h_ref)} étapes)")
+    else:
+        print(f"\nLe modèle ne prévoit aucun avantage de Parareal à {cost_model.BENCHMARK_NP} processus (h={h_ref}).")
+    choice = model.recommend(cost_model.BENCHMARK_TAU, h_ref, h_coarse_ref, tfs[-1])
+    prediction = choice['prediction']
+    if choice['method'] == 'parareal':
+        print(f"Recommandation pour tf={tfs[-1]}: Parareal avec {choice['np']} tranches, "
+              f"{prediction['parareal_time']:.2f} s prévues (± {100 * prediction['parareal_error']:.0f} %), "
+              f"accélération {prediction['speedup']:.2f}x")
     else:
-        print("\nParareal n'a pas montré d'avantage pour les tailles de problème testées.")
+        print(f"Recommandation pour tf={tfs[-1]}: RK4, {prediction['rk4_time']:.2f} s prévues "
+              f"(± {100 * prediction['rk4_error']:.0f} %)")
 
 def compare_solutions(rk4_data, parareal_data, output_prefix=None, display=True):
     """
@@ -777,13 +946,15 @@ def compare_solutions(rk4_data, parareal_data, output_prefix=None, display=True)
         'l2_error': [l2_error_X, l2_error_Y, l2_error_Z]
     }
 
-def run_comparison_for_tau(tau_value, output_prefix=None, display=True):
+def run_comparison_for_tau(tau_value, output_prefix=None, display=True, t_range=None):
     """
     Run a comparison analysis for a specific tau value
     
     Args:
         tau_value (float): Tau value to compare
         output_prefix (str, optional): Path prefix for saving output
+        t_range (tuple, optional): Time window to compare (only this window is
+            decompressed for .ltz files and archive entries)
     
     Returns:
         dict: Error metrics
@@ -794,6 +965,39 @@ def run_comparison_for_tau(tau_value, output_prefix=None, display=True):
         print(f"Error: Output directory {output_dir} not found.")
         return None
     
+    tau_str = f"{tau_value:.1f}"
+    rk4_file, parareal_file, use_dense = find_comparison_files(tau_value, output_dir)
+        
+    if not rk4_file or not parareal_file:
+        print(f"Error: Could not find RK4 and/or Parareal files for tau={tau_str}")
+        return None
+    
+    print(f"Comparing RK4 and Parareal solutions for tau={tau_str}")
+    print(f"RK4 file: {os.path.basename(rk4_file)}")
+    print(f"Parareal file: {os.path.basename(parareal_file)}")
+    print(f"Using {'dense' if use_dense else 'standard'} Parareal output")
+    
+    # Load the data
+    rk4_data = read_data(rk4_file, t_range=t_range)
+    parareal_data = read_data(parareal_file, t_range=t_range)
+    
+    # Run the comparison with display option
+    metrics = compare_solutions(rk4_data, parareal_data, output_prefix, display)
+    
+    return metrics
+
+def find_comparison_files(tau_value, output_dir='output'):
+    """
+    Find the RK4 and Parareal files to compare for a tau value
+    (dense Parareal output preferred when available)
+    
+    Args:
+        tau_value (float): Tau value
+        output_dir (str): Output directory
+    
+    Returns:
+        tuple: (rk4_file, parareal_file, use_dense), files are None if not found
+    """
     # Format tau for filename matching
     tau_str = f"{tau_value:.1f}"
     
@@ -804,7 +1008,7 @@ def run_comparison_for_tau(tau_value, output_prefix=None, display=True):
     
     # Look for dense output file for this tau value regardless of its magnitude
     for file in os.listdir(output_dir):
-        if not file.endswith('.dat'):
+        if not file.endswith(DATA_EXTENSIONS):
             continue
             
         file_path = os.path.join(output_dir, file)
@@ -821,7 +1025,7 @@ def run_comparison_for_tau(tau_value, output_prefix=None, display=True):
     parareal_file = None
     
     for file in os.listdir(output_dir):
-        if not file.endswith('.dat'):
+        if not file.endswith(DATA_EXTENSIONS):
             continue
             
         file_path = os.path.join(output_dir, file)
@@ -839,28 +1043,15 @@ def run_comparison_for_tau(tau_value, output_prefix=None, display=True):
     # If dense file exists, use it for Parareal
     if use_dense and dense_file:
         parareal_file = dense_file
-        
-    if not rk4_file or not parareal_file:
-        print(f"Error: Could not find RK4 and/or Parareal files for tau={tau_str}")
-        return None
-    
-    print(f"Comparing RK4 and Parareal solutions for tau={tau_str}")
-    print(f"RK4 file: {os.path.basename(rk4_file)}")
-    print(f"Parareal file: {os.path.basename(parareal_file)}")
-    print(f"Using {'dense' if use_dense else 'standard'} Parareal output")
-    
-    # Load the data
-    rk4_data = read_data(rk4_file)
-    parareal_data = read_data(parareal_file)
-    
-    # Run the comparison with display option
-    metrics = compare_solutions(rk4_data, parareal_data, output_prefix, display)
     
-    return metrics
+    return rk4_file, parareal_file, use_dense
 
-def analyze_all_comparisons():
+def analyze_all_comparisons(incremental=False):
     """
     Run a comprehensive analysis of all available tau values and generate a summary
+    
+    Args:
+        incremental (bool): Only re-render figures whose input files or plotting code changed
     """
     output_dir = 'output'
     
@@ -871,7 +1062,7 @@ def analyze_all_comparisons():
     # Find all unique tau values
     tau_values = set()
     for file in os.listdir(output_dir):
-        if not file.endswith('.dat'):
+        if not file.endswith(DATA_EXTENSIONS):
             continue
         
         tau = extract_tau(os.path.join(output_dir, file))
@@ -906,40 +1097,67 @@ def analyze_all_comparisons():
     os.makedirs(comparison_dir, exist_ok=True)
     
     # Run comparison for each tau value
+    graph = BuildGraph() if incremental else None
     results = {}
     for tau in tau_values:
         print(f"\nAnalyzing tau = {tau}...")
         output_prefix = os.path.join(comparison_dir, f"comparison_tau{tau:.1f}")
+        if graph is not None:
+            # The error metrics are stored with the rule so the summary can be redrawn without re-comparing
+            rule = f"comparison:tau{tau:.1f}"
+            inputs = [f for f in find_comparison_files(tau, output_dir)[:2] if f]
+            if inputs and not graph.is_stale(rule, inputs, code=compare_solutions):
+                graph.skip(rule)
+                results[tau] = graph.data(rule)
+                continue
         metrics = run_comparison_for_tau(tau, output_prefix)
         
         if metrics:
             results[tau] = metrics
+            if graph is not None:
+                metrics = {k: [float(v) for v in values] for k, values in metrics.items()}
+                graph.record(rule, inputs, [f"{output_prefix}_comparison.png", f"{output_prefix}_phase_portraits.png"],
+                             code=compare_solutions, data=metrics)
+    
+    # The summary figure depends only on the metrics of every tau value
+    summary_rule = 'comparison:error_vs_tau'
+    summary_file = os.path.join(comparison_dir, 'error_vs_tau.png')
+    summary_params = {f"{tau:.1f}": [float(v) for v in results[tau]['max_error']] for tau in results}
+    redraw = graph is None or graph.is_stale(summary_rule, [], summary_params, analyze_all_comparisons)
+    if graph is not None and not redraw:
+        graph.skip(summary_rule)
     
     # Create summary visualization
     if results:
-        plt.figure(figsize=(12, 8))
-        
         # X axis: tau values
         x = list(results.keys())
         
-        # Plot max error for X, Y, Z
-        max_error_X = [results[tau]['max_error'][0] for tau in x]
-        max_error_Y = [results[tau]['max_error'][1] for tau in x]
-        max_error_Z = [results[tau]['max_error'][2] for tau in x]
-        
-        plt.semilogy(x, max_error_X, 'o-', label='Max Error X', linewidth=2)
-        plt.semilogy(x, max_error_Y, 's-', label='Max Error Y', linewidth=2)
-        plt.semilogy(x, max_error_Z, '^-', label='Max Error Z', linewidth=2)
-        
-        plt.xlabel('Tau Value')
-        plt.ylabel('Maximum Error (log scale)')
-        plt.title('Maximum Error Between RK4 and Parareal vs. Tau')
-        plt.grid(True, alpha=0.3)
-        plt.legend()
+        if redraw:
+            plt.figure(figsize=(12, 8))
+            
+            # Plot max error for X, Y, Z
+            max_error_X = [results[tau]['max_error'][0] for tau in x]
+            max_error_Y = [results[tau]['max_error'][1] for tau in x]
+            max_error_Z = [results[tau]['max_error'][2] for tau in x]
+            
+            plt.semilogy(x, max_error_X, 'o-', label='Max Error X', linewidth=2)
+            plt.semilogy(x, max_error_Y, 's-', label='Max Error Y', linewidth=2)
+            plt.semilogy(x, max_error_Z, '^-', label='Max Error Z', linewidth=2)
+            
+            plt.xlabel('Tau Value')
+            plt.ylabel('Maximum Error (log scale)')
+            plt.title('Maximum Error Between RK4 and Parareal vs. Tau')
+            plt.grid(True, alpha=0.3)
+            plt.legend()
+            
+            plt.tight_layout()
+            plt.savefig(summary_file, dpi=300)
+            plt.show()
+            if graph is not None:
+                graph.record(summary_rule, [], [summary_file], summary_params, analyze_all_comparisons)
         
-        plt.tight_layout()
-        plt.savefig(os.path.join(comparison_dir, 'error_vs_tau.png'), dpi=300)
-        plt.show()
+        if graph is not None:
+            graph.summary()
         
         # Create summary table
         print("\nSummary of Error Analysis:")
@@ -951,6 +1169,576 @@ def analyze_all_comparisons():
             l2_err_X, l2_err_Y, l2_err_Z = results[tau]['l2_error']
             print(f"{tau:<8.1f} {max_err_X:<15.6e} {max_err_Y:<15.6e} {max_err_Z:<15.6e} {l2_err_X:<15.6e} {l2_err_Y:<15.6e} {l2_err_Z:<15.6e}")
 
+def plot_lyapunov_scan(tau_min=0.5, tau_max=10.0, n_tau=40, R=2.5, output_prefix=None, display=True):
+    """
+    Trace le plus grand exposant de Lyapunov en fonction de tau (balayage vectorisé)
+    et l'horizon de prédictibilité correspondant.
+    
+    Args:
+        tau_min, tau_max (float): Bornes du balayage
+        n_tau (int): Nombre de valeurs de tau
+        R (float): Paramètre d'amplitude
+        output_prefix (str, optional): Préfixe des figures sauvegardées
+        display (bool): Afficher la figure
+    """
+    import lyapunov
+    
+    n_members = 4
+    taus = np.linspace(tau_min, tau_max, n_tau)
+    # Tous les (tau, membre) sont intégrés ensemble
+    tau_grid = np.repeat(taus, n_members)
+    u0s = lyapunov.ensemble_initial_conditions(n_tau * n_members)
+    lyaps, _ = lyapunov.lyapunov_exponent(R, tau_grid, u0s)
+    lyaps = lyaps.reshape(n_tau, n_members)
+    lyap_mean = np.median(lyaps, axis=1)
+    horizons = [lyapunov.predictability_horizon(l) for l in lyap_mean]
+    
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8), sharex=True)
+    ax1.plot(taus, lyap_mean, 'o-', color='tab:blue')
+    ax1.fill_between(taus, lyaps.min(axis=1), lyaps.max(axis=1), color='tab:blue', alpha=0.2)
+    ax1.axhline(0.0, color='k', linewidth=0.8)
+    ax1.set_ylabel('Exposant de Lyapunov maximal')
+    ax1.set_title(f'Chaos et prédictibilité (R = {R})')
+    ax1.grid(True, alpha=0.3)
+    
+    ax2.semilogy(taus, horizons, 's-', color='tab:red')
+    ax2.set_xlabel('τ')
+    ax2.set_ylabel('Horizon de prédictibilité (1e-6 → 1e-2)')
+    ax2.grid(True, alpha=0.3)
+    
+    # Scénarios de référence
+    for tau_ref in (0.5, 2.0, 5.0, 8.9):
+        if tau_min <= tau_ref <= tau_max:
+            for ax in (ax1, ax2):
+                ax.axvline(tau_ref, color='gray', linestyle='--', alpha=0.5)
+    
+    plt.tight_layout()
+    if output_prefix:
+        os.makedirs(os.path.dirname(output_prefix) or '.', exist_ok=True)
+        plt.savefig(f"{output_prefix}_lyapunov.png", dpi=300)
+        print(f"Figure sauvegardée: {output_prefix}_lyapunov.png")
+    if display:
+        plt.show()
+    
+    print(f"{'tau':<8} {'lambda_max':<14} {'horizon':<10}")
+    for tau, lyap, horizon in zip(taus, lyap_mean, horizons):
+        print(f"{tau:<8.2f} {lyap:<14.4f} {horizon:<10.2f}")
+
+def plot_attractor_statistics(file_path, section=('X', 0.0), direction=1, bins=200, output_prefix=None,
+                              display=True):
+    """
+    Trace les statistiques réduites d'une trajectoire (calculées par blocs):
+    section de Poincaré, application de retour des maxima de Z et
+    histogrammes d'occupation des portraits de phase.
+    
+    Args:
+        file_path (str): Fichier de trajectoire
+        section (tuple): Plan de Poincaré (variable, valeur)
+        direction (int): Sens des passages (+1, -1 ou 0)
+        bins (int): Nombre de classes des histogrammes
+        output_prefix (str, optional): Préfixe de la figure sauvegardée
+        display (bool): Afficher la figure
+    """
+    import attractor_stats
+    from matplotlib.colors import LogNorm
+    
+    stats = attractor_stats.compute_statistics(file_path, section, direction, bins)
+    tau = extract_tau(file_path)
+    others = [v for v in 'XYZ' if v != section[0]]
+    
+    fig, axes = plt.subplots(2, 2, figsize=(12, 10))
+    
+    crossings = stats['crossings']
+    ax = axes[0, 0]
+    ax.scatter(crossings[:, attractor_stats.VARIABLES[others[0]]],
+               crossings[:, attractor_stats.VARIABLES[others[1]]], s=4, c=crossings[:, 0], cmap='viridis')
+    ax.set_xlabel(others[0])
+    ax.set_ylabel(others[1])
+    ax.set_title(f'Section de Poincaré {section[0]} = {section[1]:g} ({len(crossings)} passages)')
+    ax.grid(True, alpha=0.3)
+    
+    return_map = stats['return_map']
+    ax = axes[0, 1]
+    ax.scatter(return_map[:, 0], return_map[:, 1], s=4, color='tab:red')
+    if len(return_map):
+        lims = [return_map.min(), return_map.max()]
+        ax.plot(lims, lims, 'k--', linewidth=0.8)
+    ax.set_xlabel('$Z_{max}(n)$')
+    ax.set_ylabel('$Z_{max}(n+1)$')
+    ax.set_title(f'Application de retour des maxima de Z ({len(stats["z_maxima"])} maxima)')
+    ax.grid(True, alpha=0.3)
+    
+    for ax, plane in zip(axes[1], (('X', 'Z'), ('X', 'Y'))):
+        hist = stats['histograms'][plane]
+        edges_a, edges_b = stats['edges'][plane[0]], stats['edges'][plane[1]]
+        mesh = ax.pcolormesh(edges_a, edges_b, hist.T, norm=LogNorm(vmin=1, vmax=max(hist.max(), 1)),
+                             cmap='magma', shading='auto')
+        fig.colorbar(mesh, ax=ax, label='Occupation (points)')
+        ax.set_xlabel(plane[0])
+        ax.set_ylabel(plane[1])
+        ax.set_title(f'Occupation du plan {plane[0]}-{plane[1]}')
+    
+    fig.suptitle(f"Statistiques de l'attracteur (τ = {tau}, {stats['n_points']} points)")
+    plt.tight_layout()
+    
+    if output_prefix:
+        os.makedirs(os.path.dirname(output_prefix) or '.', exist_ok=True)
+        plt.savefig(f"{output_prefix}_stats.png", dpi=300)
+        print(f"Figure sauvegardée: {output_prefix}_stats.png")
+    if display:
+        plt.show()
+    return stats
+
+def read_profile_reports(profile_dir='output/profile'):
+    """
+    Lit les rapports de profilage écrits par le solveur (option --profile).
+
+    Args:
+        profile_dir (str): Répertoire des fichiers profile_rank<r>.csv
+
+    Returns:
+        tuple: (rangs, phases, secondes (rangs, phases), appels aux dérivées (rangs, phases),
+                en-tête du processus 0) ; (None, ...) si aucun rapport n'est trouvé
+    """
+    files = glob.glob(os.path.join(profile_dir, 'profile_rank*.csv'))
+    reports = {}
+    headers = {}
+    for file_path in files:
+        match = re.search(r'profile_rank(\d+)\.csv$', file_path)
+        if not match:
+            continue
+        rank = int(match.group(1))
+        rows = {}
+        with open(file_path, 'r') as f:
+            for line in f:
+                if line.startswith('#'):
+                    headers[rank] = dict(item.split('=', 1) for item in line[1:].split() if '=' in item)
+                    continue
+                fields = [field.strip() for field in line.split(',')]
+                if len(fields) != 4 or fields[0] == 'timer':
+                    continue
+                rows[fields[0]] = (float(fields[1]), int(fields[3]))
+        reports[rank] = rows
+
+    if 0 not in reports:
+        return None, None, None, None, {}
+
+    # Les rapports d'une exécution précédente avec plus de processus ne sont pas écrasés
+    header = headers.get(0, {})
+    n_ranks = int(header.get('ranks', len(reports)))
+    stale = sorted(r for r in reports if r >= n_ranks or headers.get(r, {}).get('method') != header.get('method'))
+    if stale:
+        print(f"Rapports ignorés (autre exécution): rangs {', '.join(str(r) for r in stale)}")
+        for r in stale:
+            del reports[r]
+
+    ranks = sorted(reports)
+    # Ordre des phases tel qu'écrit par le solveur; 'total' sert de contrôle
+    timers = [name for name in reports[ranks[0]] if name != 'total']
+    seconds = np.array([[reports[r].get(name, (0.0, 0))[0] for name in timers] for r in ranks])
+    derivative_calls = np.array([[reports[r].get(name, (0.0, 0))[1] for name in timers] for r in ranks])
+    return ranks, timers, seconds, derivative_calls, header
+
+def plot_profile_reports(profile_dir='output/profile', output_prefix=None, display=True):
+    """
+    Agrège les rapports de profilage par processus et trace la répartition du temps.
+
+    Args:
+        profile_dir (str): Répertoire des rapports profile_rank<r>.csv
+        output_prefix (str): Préfixe de la figure (défaut: <profile_dir>/profile)
+        display (bool): Afficher la figure
+
+    Returns:
+        dict: Temps cumulé et appels aux dérivées par phase, tous processus confondus
+    """
+    ranks, timers, seconds, derivative_calls, header = read_profile_reports(profile_dir)
+    if ranks is None:
+        print(f"Aucun rapport de profilage dans {profile_dir} (lancer le solveur avec --profile)")
+        return None
+
+    totals = seconds.sum(axis=0)
+    calls = derivative_calls.sum(axis=0)
+    grand_total = max(totals.sum(), 1e-12)
+
+    print(f"\nProfil agrégé ({len(ranks)} processus, méthode {header.get('method', '?')}, "
+          f"{header.get('threads', '?')} thread(s)):")
+    print(f"{'Phase':<14} {'Temps (s)':>12} {'Part':>8} {'Appels dérivées':>16}")
+    for name, t, n in zip(timers, totals, calls):
+        print(f"{name:<14} {t:>12.4f} {100.0 * t / grand_total:>7.1f}% {n:>16d}")
+    print(f"{'total':<14} {totals.sum():>12.4f} {100.0:>7.1f}% {calls.sum():>16d}")
+    # Déséquilibre: temps de calcul fin du processus le plus lent rapporté à la moyenne
+    if 'fine' in timers and len(ranks) > 1:
+        fine = seconds[:, timers.index('fine')]
+        if fine.mean() > 0:
+            print(f"Déséquilibre de la propagation fine (max/moyenne): {fine.max() / fine.mean():.2f}")
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+    colors = plt.cm.tab10(np.arange(len(timers)) % 10)
+    x = np.arange(len(ranks))
+
+    ax = axes[0]
+    bottom = np.zeros(len(ranks))
+    for i, name in enumerate(timers):
+        ax.bar(x, seconds[:, i], bottom=bottom, color=colors[i], label=name)
+        bottom += seconds[:, i]
+    ax.set_xticks(x)
+    ax.set_xticklabels([str(r) for r in ranks])
+    ax.set_xlabel('Processus (rang MPI)')
+    ax.set_ylabel('Temps exclusif (s)')
+    ax.set_title('Répartition du temps par processus')
+    ax.legend()
+    ax.grid(True, axis='y', alpha=0.3)
+
+    ax = axes[1]
+    y = np.arange(len(timers))
+    ax.barh(y, totals, color=colors)
+    for yi, t, n in zip(y, totals, calls):
+        ax.text(t, yi, f" {100.0 * t / grand_total:.1f}% ({n:,} dériv.)", va='center', fontsize=9)
+    ax.set_yticks(y)
+    ax.set_yticklabels(timers)
+    ax.invert_yaxis()
+    ax.set_xlabel('Temps cumulé sur les processus (s)')
+    ax.set_title('Phases agrégées et appels à compute_derivatives')
+    ax.set_xlim(0, max(totals.max(), 1e-12) * 1.45)
+    ax.grid(True, axis='x', alpha=0.3)
+
+    fig.suptitle(f"Profil du solveur ({header.get('method', '?')}, {len(ranks)} processus)")
+    plt.tight_layout()
+
+    output_prefix = output_prefix or os.path.join(profile_dir, 'profile')
+    os.makedirs(os.path.dirname(output_prefix) or '.', exist_ok=True)
+    plt.savefig(f"{output_prefix}_breakdown.png", dpi=300)
+    print(f"Figure sauvegardée: {output_prefix}_breakdown.png")
+    if display:
+        plt.show()
+    else:
+        plt.close(fig)
+
+    return {name: {'seconds': float(t), 'derivative_calls': int(n)} for name, t, n in zip(timers, totals, calls)}
+
+# Enregistrement de la diffusion --stream du solveur (voir stream_output.f90):
+# t, X, Y, Z en réels simple précision, puis l'itération Parareal (0: point de trajectoire)
+STREAM_DTYPE = np.dtype([('t', '<f4'), ('x', '<f4'), ('y', '<f4'), ('z', '<f4'), ('iter', '<i4')])
+
+class LiveStream:
+    """
+    Lecture non bloquante et bornée de la diffusion du solveur.
+
+    Seuls les `window` derniers points de trajectoire et les états de la dernière
+    itération Parareal sont conservés; un enregistrement coupé entre deux lectures
+    est complété à la lecture suivante.
+    """
+
+    def __init__(self, path, window=20000, chunk_bytes=1 << 16):
+        """
+        Args:
+            path (str): Tube nommé (créé s'il n'existe pas)
+            window (int): Nombre maximal de points de trajectoire conservés
+            chunk_bytes (int): Nombre maximal d'octets lus par appel à poll()
+        """
+        self.path = path
+        self.created = not os.path.exists(path)
+        if self.created:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            os.mkfifo(path)
+        elif not stat.S_ISFIFO(os.stat(path).st_mode):
+            raise ValueError(f"{path} existe et n'est pas un tube nommé")
+        # Ouverture non bloquante: le solveur peut se connecter après le traceur
+        self.fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        self.window = window
+        self.chunk_bytes = chunk_bytes - chunk_bytes % STREAM_DTYPE.itemsize
+        self.partial = b''
+        self.trajectory = np.zeros(0, dtype=STREAM_DTYPE)
+        self.iterate = np.zeros(0, dtype=STREAM_DTYPE)
+        self.iteration = 0
+        self.n_records = 0
+        self.connected = False
+        self.finished = False
+
+    def poll(self):
+        """
+        Lit les enregistrements disponibles sans attendre.
+
+        Returns:
+            int: Nombre d'enregistrements reçus
+        """
+        if self.finished:
+            return 0
+        try:
+            data = os.read(self.fd, self.chunk_bytes)
+        except BlockingIOError:
+            return 0
+        if not data:
+            # Fin de flux seulement si un solveur s'est déjà connecté
+            self.finished = self.connected
+            return 0
+        self.connected = True
+
+        data = self.partial + data
+        n = len(data) // STREAM_DTYPE.itemsize
+        self.partial = data[n * STREAM_DTYPE.itemsize:]
+        records = np.frombuffer(data, dtype=STREAM_DTYPE, count=n)
+        self.n_records += n
+
+        points = records[records['iter'] == 0]
+        if len(points):
+            self.trajectory = np.concatenate([self.trajectory, points])[-self.window:]
+        for record in records[records['iter'] > 0]:
+            # Nouvelle itération (ou nouvelle fenêtre): les temps repartent en arrière
+            if record['iter'] != self.iteration or (len(self.iterate) and record['t'] <= self.iterate['t'][-1]):
+                self.iterate = np.zeros(0, dtype=STREAM_DTYPE)
+                self.iteration = int(record['iter'])
+            self.iterate = np.append(self.iterate, record)
+        return n
+
+    def close(self):
+        """Ferme le tube (et le supprime s'il a été créé ici)."""
+        os.close(self.fd)
+        if self.created and os.path.exists(self.path):
+            os.remove(self.path)
+
+def _expand_limits(ax, x, y):
+    """
+    Élargit les limites d'un axe pour contenir les données, avec une marge qui
+    espace les élargissements suivants.
+
+    Returns:
+        bool: True si les limites ont changé (le fond doit être redessiné)
+    """
+    changed = False
+    for values, get_lim, set_lim in ((x, ax.get_xlim, ax.set_xlim), (y, ax.get_ylim, ax.set_ylim)):
+        values = values[np.isfinite(values)]
+        if not len(values):
+            continue
+        lo, hi = get_lim()
+        v_min, v_max = float(values.min()), float(values.max())
+        if v_min < lo or v_max > hi:
+            span = max(v_max, hi) - min(v_min, lo)
+            margin = 0.25 * max(span, 1e-6)
+            set_lim(min(v_min, lo) - (margin if v_min < lo else 0.0),
+                    max(v_max, hi) + (margin if v_max > hi else 0.0))
+            changed = True
+    return changed
+
+def live_plot(stream_path='output/stream.fifo', run_command=None, window=20000, interval=0.05,
+              max_seconds=None, output_file=None, display=True):
+    """
+    Trace en direct la diffusion du solveur (option --stream) sans attendre la fin du calcul.
+
+    Les courbes X, Y, Z(t) et le portrait de phase X-Z sont mis à jour en place par
+    blitting: seul le fond est mémorisé, et il n'est redessiné que lorsque les limites
+    des axes doivent s'élargir. Les états aux bornes des tranches de la dernière
+    itération Parareal sont affichés par des marqueurs. Fermer la fenêtre arrête le
+    solveur lancé avec run_command.
+
+    Args:
+        stream_path (str): Tube nommé partagé avec le solveur
+        run_command (str): Commande du solveur à lancer (--stream=<tube> est ajouté)
+        window (int): Nombre de points de trajectoire affichés
+        interval (float): Période de rafraîchissement (s)
+        max_seconds (float): Durée maximale de suivi (None: jusqu'à la fin du flux)
+        output_file (str): Image de l'état final
+        display (bool): Afficher la fenêtre
+
+    Returns:
+        dict: Enregistrements reçus, redessins complets et mises à jour par blitting
+    """
+    stream = LiveStream(stream_path, window)
+    process = None
+    if run_command:
+        command = shlex.split(run_command) + [f'--stream={stream_path}']
+        print(f"Lancement: {' '.join(command)}")
+        process = subprocess.Popen(command)
+
+    fig, (ax_time, ax_phase) = plt.subplots(1, 2, figsize=(14, 6))
+    lines = {c: ax_time.plot([], [], color=color, lw=1, label=c.upper(), animated=True)[0]
+             for c, color in (('x', 'tab:blue'), ('y', 'tab:orange'), ('z', 'tab:green'))}
+    iterate_time, = ax_time.plot([], [], 'o', color='tab:red', ms=4, label='Itéré Parareal (X)', animated=True)
+    phase_line, = ax_phase.plot([], [], color='tab:blue', lw=0.8, animated=True)
+    phase_head, = ax_phase.plot([], [], 'o', color='black', ms=5, animated=True)
+    iterate_phase, = ax_phase.plot([], [], 'o', color='tab:red', ms=4, animated=True)
+    status = ax_time.text(0.01, 0.98, '', transform=ax_time.transAxes, va='top', fontsize=9, animated=True)
+    artists = list(lines.values()) + [iterate_time, phase_line, phase_head, iterate_phase, status]
+
+    ax_time.set_xlabel('Temps')
+    ax_time.set_ylabel('Valeur')
+    ax_time.set_title('Séries temporelles (en direct)')
+    ax_time.legend(loc='upper right')
+    ax_time.grid(True, alpha=0.3)
+    ax_phase.set_xlabel('X')
+    ax_phase.set_ylabel('Z')
+    ax_phase.set_title('Portrait de phase X-Z (en direct)')
+    ax_phase.grid(True, alpha=0.3)
+    ax_time.set_xlim(0.0, 1.0)
+    ax_time.set_ylim(-1.0, 1.0)
+    ax_phase.set_xlim(-1.0, 1.0)
+    ax_phase.set_ylim(-1.0, 1.0)
+
+    closed = []
+    fig.canvas.mpl_connect('close_event', lambda event: closed.append(True))
+    if display:
+        plt.show(block=False)
+    fig.canvas.draw()
+    background = fig.canvas.copy_from_bbox(fig.bbox)
+
+    n_redraws, n_blits = 1, 0
+    start = time.time()
+    try:
+        while not closed:
+            received = stream.poll()
+            if received:
+                traj, it = stream.trajectory, stream.iterate
+                for c, line in lines.items():
+                    line.set_data(traj['t'], traj[c])
+                iterate_time.set_data(it['t'], it['x'])
+                phase_line.set_data(traj['x'], traj['z'])
+                phase_head.set_data(traj['x'][-1:], traj['z'][-1:])
+                iterate_phase.set_data(it['x'], it['z'])
+                t_last = traj['t'][-1] if len(traj) else (it['t'][-1] if len(it) else 0.0)
+                status.set_text(f"t = {t_last:.3f}   itération Parareal: {stream.iteration}   "
+                                f"enregistrements: {stream.n_records}")
+
+                all_t = np.concatenate([traj['t'], it['t']])
+                values = np.concatenate([traj['x'], traj['y'], traj['z'], it['x']])
+                rescaled = _expand_limits(ax_time, all_t, values)
+                rescaled |= _expand_limits(ax_phase, np.concatenate([traj['x'], it['x']]),
+                                           np.concatenate([traj['z'], it['z']]))
+                if rescaled:
+                    # Nouvelles limites: fond (axes, graduations) redessiné puis mémorisé
+                    fig.canvas.draw()
+                    background = fig.canvas.copy_from_bbox(fig.bbox)
+                    n_redraws += 1
+                fig.canvas.restore_region(background)
+                for artist in artists:
+                    artist.axes.draw_artist(artist)
+                fig.canvas.blit(fig.bbox)
+                n_blits += 1
+
+            if stream.finished:
+                break
+            if process is not None and process.poll() is not None and not received:
+                # Solveur terminé: vider le tube, ou abandonner s'il ne s'est jamais connecté
+                if not stream.connected:
+                    break
+                continue
+            if max_seconds is not None and time.time() - start > max_seconds:
+                print(f"Durée maximale atteinte ({max_seconds} s)")
+                break
+            if display:
+                fig.canvas.start_event_loop(interval)
+            elif not received:
+                time.sleep(interval)
+    except KeyboardInterrupt:
+        print("Interrompu")
+    finally:
+        stream.close()
+        if process is not None:
+            if process.poll() is None and (closed or not stream.finished):
+                print("Arrêt du solveur")
+                process.terminate()
+            process.wait()
+
+    print(f"{stream.n_records} enregistrements reçus, {n_redraws} redessins complets, "
+          f"{n_blits} mises à jour par blitting")
+    if output_file:
+        for artist in artists:
+            artist.set_animated(False)
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        fig.savefig(output_file, dpi=150)
+        print(f"Figure sauvegardée: {output_file}")
+    if display and not closed:
+        for artist in artists:
+            artist.set_animated(False)
+        plt.show()
+    plt.close(fig)
+    return {'records': stream.n_records, 'redraws': n_redraws, 'blits': n_blits}
+
+def explore_trajectory(file_path, t_range=None, max_points=None, output_file=None, display=True):
+    """
+    Exploration interactive d'une très longue trajectoire à l'aide de sa pyramide
+    multi-résolution (pyramid.py, construite au premier appel).
+
+    À chaque déplacement ou zoom, seule la tranche visible du niveau adapté à la
+    largeur des axes est lue: enveloppe min/max et moyenne par paquet, ou points
+    bruts quand ils tiennent dans la largeur affichée.
+
+    Args:
+        file_path (str): Trajectoire (.dat, .ltz ou entrée d'archive)
+        t_range (tuple): Fenêtre initiale (t0, t1), toute la trajectoire si None
+        max_points (int): Points affichés par axe (par défaut: largeur des axes en pixels)
+        output_file (str): Image de la vue initiale
+        display (bool): Afficher la fenêtre interactive
+
+    Returns:
+        dict: Niveau, nombre d'éléments et durée (ms) de la dernière requête
+    """
+    import pyramid
+
+    lod = pyramid.ensure_pyramid(file_path)
+    if not lod.n_rows:
+        print(f"Aucune donnée dans {file_path}")
+        return None
+
+    fig, axes = plt.subplots(3, 1, sharex=True, figsize=(14, 9))
+    colors = ('tab:blue', 'tab:orange', 'tab:green')
+    means = [ax.plot([], [], color=color, lw=0.8)[0] for ax, color in zip(axes, colors)]
+    envelopes = [None, None, None]
+    last = {}
+
+    # Limites verticales fixées par le niveau le plus grossier (pas de mise à l'échelle automatique)
+    top = lod.levels[max(lod.levels)] if lod.levels else None
+    for j, (ax, name) in enumerate(zip(axes, ('X', 'Y', 'Z'))):
+        if top is not None:
+            lo, hi = float(top['min'][:, j].min()), float(top['max'][:, j].max())
+        else:
+            lo, hi = float(lod.raw['xyz'][:, j].min()), float(lod.raw['xyz'][:, j].max())
+        margin = 0.05 * max(hi - lo, 1e-6)
+        ax.set_ylim(lo - margin, hi + margin)
+        ax.set_ylabel(name)
+        ax.grid(True, alpha=0.3)
+        ax.set_autoscale_on(False)
+    axes[-1].set_xlabel('Temps')
+    axes[0].set_xlim(*(t_range or lod.t_span))
+
+    def refresh(*_):
+        t0, t1 = axes[0].get_xlim()
+        width = max_points or max(int(axes[0].bbox.width), 100)
+        start = time.perf_counter()
+        level, data = lod.fetch((t0, t1), width)
+        elapsed = 1e3 * (time.perf_counter() - start)
+        for j, ax in enumerate(axes):
+            if envelopes[j] is not None:
+                envelopes[j].remove()
+                envelopes[j] = None
+            if level == 0:
+                means[j].set_data(data[:, 0], data[:, j + 1])
+            else:
+                t_mid = 0.5 * (data['t0'] + data['t1'])
+                means[j].set_data(t_mid, data['mean'][:, j])
+                envelopes[j] = ax.fill_between(t_mid, data['min'][:, j], data['max'][:, j],
+                                               color=colors[j], alpha=0.3, lw=0)
+        detail = 'points bruts' if level == 0 else f'paquets de {1 << level} points (min/max/moyenne)'
+        axes[0].set_title(f"{os.path.basename(str(file_path))}: {lod.n_rows:,} points, "
+                          f"t = [{t0:.3f}, {t1:.3f}], niveau {level} ({detail}), "
+                          f"{len(data)} éléments lus en {elapsed:.1f} ms")
+        last.update(level=level, n=len(data), ms=elapsed)
+        fig.canvas.draw_idle()
+
+    refresh()
+    axes[0].callbacks.connect('xlim_changed', refresh)
+    fig.canvas.mpl_connect('resize_event', refresh)
+    plt.tight_layout()
+    print(f"Vue initiale: niveau {last['level']}, {last['n']} éléments lus en {last['ms']:.2f} ms")
+
+    if output_file:
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        fig.savefig(output_file, dpi=150)
+        print(f"Figure sauvegardée: {output_file}")
+    if display:
+        plt.show()
+    plt.close(fig)
+    return last
+
 def parse_command_line():
     """Parse command line arguments for automated execution"""
     parser = argparse.ArgumentParser(description='Lorenz System Visualization and Analysis Tool')
@@ -962,14 +1750,88 @@ def parse_command_line():
     compare_parser = subparsers.add_parser('compare', help='Compare RK4 and Parareal for a specific tau')
     compare_parser.add_argument('--tau', type=float, required=True, help='Tau value to compare')
     compare_parser.add_argument('--output', type=str, help='Output prefix for saving plots')
+    compare_parser.add_argument('--t-range', type=float, nargs=2, metavar=('T0', 'T1'),
+                                help='Only compare this time window')
     compare_parser.add_argument('--no-display', action='store_true', 
                               help='Do not display plots (save only)')
     
+    # Compare explicit files (e.g. outputs produced by pipeline.py)
+    compare_files_parser = subparsers.add_parser('compare-files', help='Compare an RK4 file with a Parareal file')
+    compare_files_parser.add_argument('--rk4', type=str, required=True, help='RK4 output file')
+    compare_files_parser.add_argument('--parareal', type=str, required=True,
+                                      help='Parareal output file (dense output preferred)')
+    compare_files_parser.add_argument('--output', type=str, help='Output prefix for saving plots')
+    compare_files_parser.add_argument('--t-range', type=float, nargs=2, metavar=('T0', 'T1'),
+                                      help='Only compare this time window (partial read from archives)')
+    compare_files_parser.add_argument('--no-display', action='store_true',
+                                      help='Do not display plots (save only)')
+    
     # Analysis command
     analysis_parser = subparsers.add_parser('analysis', help='Run comprehensive analysis of all tau values')
+    analysis_parser.add_argument('--incremental', action='store_true',
+                                 help='Only re-render figures whose inputs or plotting code changed')
+    
+    # Plot every output file
+    outputs_parser = subparsers.add_parser('outputs', help='Plot time series, phase portrait and 3D view of every output file')
+    outputs_parser.add_argument('--compare', action='store_true', help='Overlay RK4 and Parareal for each tau')
+    outputs_parser.add_argument('--incremental', action='store_true',
+                                help='Only re-render figures whose inputs or plotting code changed')
     
     # Benchmark command
     benchmark_parser = subparsers.add_parser('benchmark', help='Analyze benchmark results')
+    benchmark_parser.add_argument('--incremental', action='store_true',
+                                  help='Only re-render figures if the benchmark results changed')
+    benchmark_parser.add_argument('--archive', type=str, help='Read the results table from an HDF5 archive')
+    
+    # Attractor statistics command
+    stats_parser = subparsers.add_parser('stats', help='Poincaré section, Z-max return map and phase histograms')
+    stats_parser.add_argument('--file', type=str, required=True, help='Trajectory file')
+    stats_parser.add_argument('--section', type=str, default='X=0', help='Poincaré plane, e.g. X=0 or Z=0.4')
+    stats_parser.add_argument('--direction', type=int, default=1, choices=[-1, 0, 1],
+                              help='Crossing direction (1: increasing, -1: decreasing, 0: both)')
+    stats_parser.add_argument('--bins', type=int, default=200, help='Histogram bins per axis')
+    stats_parser.add_argument('--output', type=str, help='Output prefix for saving plots')
+    stats_parser.add_argument('--no-display', action='store_true',
+                              help='Do not display plots (save only)')
+    
+    # Lyapunov scan command
+    lyapunov_parser = subparsers.add_parser('lyapunov', help='Largest Lyapunov exponent as a function of tau')
+    lyapunov_parser.add_argument('--tau-min', type=float, default=0.5, help='Smallest tau value')
+    lyapunov_parser.add_argument('--tau-max', type=float, default=10.0, help='Largest tau value')
+    lyapunov_parser.add_argument('--n-tau', type=int, default=40, help='Number of tau values')
+    lyapunov_parser.add_argument('--output', type=str, default='output/lyapunov/scan',
+                                 help='Output prefix for saving plots')
+    lyapunov_parser.add_argument('--no-display', action='store_true',
+                                 help='Do not display plots (save only)')
+    
+    # Solver profile command
+    profile_parser = subparsers.add_parser('profile', help='Aggregate per-rank solver profiles (--profile runs)')
+    profile_parser.add_argument('--dir', type=str, default='output/profile', help='Directory of profile_rank*.csv')
+    profile_parser.add_argument('--output', type=str, help='Output prefix for saving plots')
+    profile_parser.add_argument('--no-display', action='store_true',
+                                help='Do not display plots (save only)')
+    
+    # Live streaming command
+    live_parser = subparsers.add_parser('live', help='Plot solver states while they are computed (--stream)')
+    live_parser.add_argument('--stream', type=str, default='output/stream.fifo',
+                             help='Named pipe shared with the solver (created if missing)')
+    live_parser.add_argument('--run', type=str,
+                             help='Solver command to launch; --stream=<pipe> is appended')
+    live_parser.add_argument('--window', type=int, default=20000, help='Number of trajectory points kept')
+    live_parser.add_argument('--interval', type=float, default=0.05, help='Refresh period in seconds')
+    live_parser.add_argument('--max-seconds', type=float, help='Stop following the stream after this time')
+    live_parser.add_argument('--output', type=str, help='Save the final figure to this file')
+    live_parser.add_argument('--no-display', action='store_true',
+                             help='Do not display plots (follow the stream headless)')
+    
+    # Level-of-detail explorer command
+    explore_parser = subparsers.add_parser('explore', help='Pan/zoom a long trajectory through its LOD pyramid')
+    explore_parser.add_argument('--file', type=str, required=True, help='Trajectory file (.dat, .ltz or archive entry)')
+    explore_parser.add_argument('--t-range', type=float, nargs=2, metavar=('T0', 'T1'), help='Initial time window')
+    explore_parser.add_argument('--max-points', type=int, help='Points drawn per axis (default: axis width in pixels)')
+    explore_parser.add_argument('--output', type=str, help='Save the initial view to this file')
+    explore_parser.add_argument('--no-display', action='store_true',
+                                help='Do not display plots (save only)')
     
     args = parser.parse_args()
     return args
@@ -980,13 +1842,40 @@ if __name__ == "__main__":
         args = parse_command_line()
         
         if args.command == 'compare':
-            run_comparison_for_tau(args.tau, args.output, not args.no_display)
+            run_comparison_for_tau(args.tau, args.output, not args.no_display, args.t_range)
+            exit(0)
+        elif args.command == 'compare-files':
+            compare_solutions(read_data(args.rk4, t_range=args.t_range), read_data(args.parareal, t_range=args.t_range),
+                              args.output, not args.no_display)
             exit(0)
         elif args.command == 'analysis':
-            analyze_all_comparisons()
+            analyze_all_comparisons(args.incremental)
+            exit(0)
+        elif args.command == 'outputs':
+            analyze_all_outputs(args.compare, args.incremental)
             exit(0)
         elif args.command == 'benchmark':
-            analyze_benchmark_data()
+            analyze_benchmark_data(incremental=args.incremental, archive_path=args.archive)
+            exit(0)
+        elif args.command == 'stats':
+            import attractor_stats
+            output = args.output or os.path.join('output', 'stats', os.path.splitext(os.path.basename(args.file))[0])
+            plot_attractor_statistics(args.file, attractor_stats.parse_section(args.section), args.direction,
+                                      args.bins, output, not args.no_display)
+            exit(0)
+        elif args.command == 'lyapunov':
+            plot_lyapunov_scan(args.tau_min, args.tau_max, args.n_tau, output_prefix=args.output,
+                               display=not args.no_display)
+            exit(0)
+        elif args.command == 'profile':
+            plot_profile_reports(args.dir, args.output, not args.no_display)
+            exit(0)
+        elif args.command == 'live':
+            live_plot(args.stream, args.run, args.window, args.interval, args.max_seconds, args.output,
+                      not args.no_display)
+            exit(0)
+        elif args.command == 'explore':
+            explore_trajectory(args.file, args.t_range, args.max_points, args.output, not args.no_display)
             exit(0)
     
     # If no command line arguments or using menu options
@@ -1002,7 +1891,7 @@ if __name__ == "__main__":
     
     if choice == '1':
         output_dir = 'output'
-        files = [f for f in os.listdir(output_dir) if f.endswith('.dat')]
+        files = [f for f in os.listdir(output_dir) if f.endswith(DATA_EXTENSIONS)]
         
         if not files:
             print(f"Aucun fichier .dat trouvé dans {output_dir}/")
@@ -1041,7 +1930,7 @@ if __name__ == "__main__":
         output_dir = 'output'
         
         for file in os.listdir(output_dir):
-            if not file.endswith('.dat'):
+            if not file.endswith(DATA_EXTENSIONS):
                 continue
                 
             tau = extract_tau(os.path.join(output_dir, file))
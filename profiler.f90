@@ -0,0 +1,139 @@
+module profiler
+    ! Chronomètres nommés des phases du solveur et compteur d'appels de compute_derivatives
+    !
+    ! Désactivé par défaut (prof_enabled = .false.): chaque point d'instrumentation se
+    ! réduit alors à un test. Activé par l'option --profile, il accumule pour chaque
+    ! phase le temps exclusif (une phase imbriquée suspend la phase englobante), le
+    ! nombre d'entrées et le nombre d'appels aux dérivées, puis écrit un rapport CSV
+    ! par processus: output/profile/profile_rank<r>.csv
+    implicit none
+
+    private
+    public :: prof_init, prof_start, prof_stop, prof_write_report, prof_print_summary
+
+    ! Phases instrumentées
+    integer, parameter, public :: PROF_COARSE = 1   ! Propagation grossière (initialisation, correction)
+    integer, parameter, public :: PROF_FINE = 2     ! Propagation fine (tranches Parareal, intégration RK4)
+    integer, parameter, public :: PROF_COMM = 3     ! Communications MPI (attente comprise)
+    integer, parameter, public :: PROF_CONV = 4     ! Tests de convergence et gel des tranches
+    integer, parameter, public :: PROF_OUTPUT = 5   ! Écriture des fichiers de résultats
+    integer, parameter, public :: PROF_DENSE = 6    ! Génération de la sortie dense
+    integer, parameter :: N_TIMERS = 6
+    character(len=12), parameter :: TIMER_NAMES(N_TIMERS) = [character(len=12) :: &
+        'coarse', 'fine', 'mpi_comm', 'convergence', 'output', 'dense_output']
+    integer, parameter :: MAX_DEPTH = 8
+
+    logical, public :: prof_enabled = .false.
+    ! Incrémenté par compute_derivatives quand le profilage est actif (atomique sous OpenMP)
+    integer(8), public :: deriv_calls = 0
+
+    integer(8) :: ticks(N_TIMERS) = 0, timer_derivs(N_TIMERS) = 0, timer_calls(N_TIMERS) = 0
+    integer(8) :: clock_rate = 1, start_clock = 0, mark_clock = 0, mark_derivs = 0
+    integer :: depth = 0
+    integer :: stack(MAX_DEPTH) = 0
+
+contains
+
+    subroutine prof_init()
+        ! Remet les compteurs à zéro et démarre l'horloge globale
+        if (.not. prof_enabled) return
+        call system_clock(start_clock, clock_rate)
+        ticks = 0
+        timer_derivs = 0
+        timer_calls = 0
+        deriv_calls = 0
+        depth = 0
+        mark_clock = start_clock
+        mark_derivs = 0
+    end subroutine prof_init
+
+    subroutine charge_top(now)
+        ! Impute le temps et les appels aux dérivées écoulés à la phase active
+        integer(8), intent(in) :: now
+        if (depth > 0) then
+            ticks(stack(depth)) = ticks(stack(depth)) + (now - mark_clock)
+            timer_derivs(stack(depth)) = timer_derivs(stack(depth)) + (deriv_calls - mark_derivs)
+        end if
+        mark_clock = now
+        mark_derivs = deriv_calls
+    end subroutine charge_top
+
+    subroutine prof_start(id)
+        ! Entre dans la phase id (la phase englobante est suspendue)
+        integer, intent(in) :: id
+        integer(8) :: now
+        if (.not. prof_enabled) return
+        call system_clock(now)
+        call charge_top(now)
+        if (depth < MAX_DEPTH) depth = depth + 1
+        stack(depth) = id
+        timer_calls(id) = timer_calls(id) + 1
+    end subroutine prof_start
+
+    subroutine prof_stop(id)
+        ! Sort de la phase id (la phase englobante reprend)
+        integer, intent(in) :: id
+        integer(8) :: now
+        if (.not. prof_enabled) return
+        if (depth == 0) return
+        call system_clock(now)
+        if (stack(depth) /= id) print '(a,a)', " WARNING: profiler: fin de phase inattendue: ", trim(TIMER_NAMES(id))
+        call charge_top(now)
+        depth = depth - 1
+    end subroutine prof_stop
+
+    subroutine prof_write_report(rank, num_procs, method, n_threads)
+        ! Écrit le rapport du processus rank: une ligne par phase, plus 'other' (temps
+        ! hors phases instrumentées) et 'total' (depuis prof_init)
+        integer, intent(in) :: rank, num_procs, n_threads
+        character(len=*), intent(in) :: method
+        character(len=100) :: report_file
+        integer(8) :: now
+        real(8) :: total, seconds
+        integer :: unit_num, id
+
+        if (.not. prof_enabled) return
+        call system_clock(now)
+        call charge_top(now)
+        total = real(now - start_clock, 8) / clock_rate
+
+        call system('mkdir -p output/profile')
+        write(report_file, '(a,i0,a)') 'output/profile/profile_rank', rank, '.csv'
+        open(newunit=unit_num, file=trim(report_file), status='replace')
+        write(unit_num, '(*(g0))') "# method=", trim(method), " rank=", rank, " ranks=", num_procs, &
+              " threads=", n_threads
+        write(unit_num, '(a)') "timer,seconds,calls,derivative_calls"
+        do id = 1, N_TIMERS
+            seconds = real(ticks(id), 8) / clock_rate
+            write(unit_num, '(a,a,es14.6,a,i0,a,i0)') trim(TIMER_NAMES(id)), ",", seconds, ",", &
+                  timer_calls(id), ",", timer_derivs(id)
+        end do
+        write(unit_num, '(a,es14.6,a,i0)') "other,", max(total - real(sum(ticks), 8) / clock_rate, 0.0d0), &
+              ",0,", deriv_calls - sum(timer_derivs)
+        write(unit_num, '(a,es14.6,a,i0)') "total,", total, ",1,", deriv_calls
+        close(unit_num)
+    end subroutine prof_write_report
+
+    subroutine prof_print_summary()
+        ! Résumé à l'écran pour le processus courant
+        integer :: id
+        real(8) :: total
+        integer(8) :: now
+
+        if (.not. prof_enabled) return
+        call system_clock(now)
+        total = max(real(now - start_clock, 8) / clock_rate, 1.0d-12)
+        print *, ""
+        print *, "======================================================"
+        print *, "          PROFIL DU PROCESSUS 0"
+        print *, "======================================================"
+        print '(a)', " Phase            Temps (s)      Part   Appels dérivées"
+        do id = 1, N_TIMERS
+            print '(1x,a12,f14.6,f9.1,a,i16)', TIMER_NAMES(id), real(ticks(id), 8) / clock_rate, &
+                  100.0d0 * ticks(id) / clock_rate / total, " %", timer_derivs(id)
+        end do
+        print '(a,i0)', " Appels totaux à compute_derivatives: ", deriv_calls
+        print *, "======================================================"
+    end subroutine prof_print_summary
+
+end module profiler
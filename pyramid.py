@@ -0,0 +1,317 @@
+"""
+Pyramide multi-résolution (niveaux de détail) pour explorer de très longues trajectoires.
+
+Pour une trajectoire de 10^6 à 10^7 points, un zoom avec plot_trajectory relit
+et retrace tous les points. La pyramide est calculée une fois, à côté des
+données (même nom, extension .lod):
+  - niveau 0: les points bruts (t en double, X, Y, Z en simple précision);
+  - niveau k (MIN_LEVEL <= k): paquets de 2^k points consécutifs, avec pour
+    chacun l'intervalle de temps couvert et les minimum, maximum et moyenne
+    de X, Y, Z. Chaque niveau est obtenu en fusionnant les paquets deux à
+    deux du niveau précédent, jusqu'à TOP_BUCKETS paquets au plus.
+Le fichier est lu par projection mémoire: une requête (fenêtre en temps,
+nombre de points affichables) choisit le niveau le plus fin qui tient dans
+ce nombre de points et ne lit que la tranche de ce niveau qui recouvre la
+fenêtre. Le coût d'un déplacement ou d'un zoom ne dépend donc pas de la
+longueur de la trajectoire.
+
+Structure du fichier:
+    MAGIC, points bruts (RAW_DTYPE), niveaux (BUCKET_DTYPE, du plus fin au plus
+    grossier), en-tête JSON (source, taille et date de la source, positions
+    des niveaux), longueur de l'en-tête (uint32), END_MAGIC
+
+Usage:
+    python pyramid.py build output/rk4_tau5.0.dat [...] [--force]
+    python pyramid.py info output/rk4_tau5.0.lod
+    python pyramid.py fetch output/rk4_tau5.0.dat --t-range 100 200 [--max-points 2000]
+    python plotter.py explore --file output/rk4_tau5.0.dat
+"""
+import argparse
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+from attractor_stats import iter_chunks
+
+MAGIC = b'LOD1'
+END_MAGIC = b'LODE'
+EXTENSION = '.lod'
+# Niveau le plus fin stocké en paquets (2^3 = 8 points par paquet)
+MIN_LEVEL = 3
+# Le niveau le plus grossier compte au plus TOP_BUCKETS paquets
+TOP_BUCKETS = 256
+# Lignes lues par bloc pendant la construction (multiple de 2^MIN_LEVEL)
+BUILD_CHUNK_ROWS = 1 << 18
+
+RAW_DTYPE = np.dtype([('t', '<f8'), ('xyz', '<f4', (3,))])
+BUCKET_DTYPE = np.dtype([('t0', '<f8'), ('t1', '<f8'), ('count', '<u4'),
+                         ('min', '<f4', (3,)), ('max', '<f4', (3,)), ('mean', '<f4', (3,))])
+
+
+def pyramid_path(file_path):
+    """Fichier .lod associé à une trajectoire (entrée d'archive: à côté de l'archive)"""
+    return os.path.splitext(str(file_path).replace('::', '_'))[0] + EXTENSION
+
+
+def _source_signature(file_path):
+    """Taille et date de modification de la source (fichier de l'archive pour une entrée)"""
+    source = str(file_path).split('::', 1)[0]
+    stat = os.stat(source)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def _base_buckets(rows, bucket):
+    """
+    Paquets de `bucket` points consécutifs (le dernier peut être incomplet).
+
+    Args:
+        rows (numpy.ndarray): Données (n, 4) [t, X, Y, Z]
+        bucket (int): Nombre de points par paquet
+
+    Returns:
+        numpy.ndarray: Paquets (BUCKET_DTYPE)
+    """
+    n_full = len(rows) // bucket
+    out = np.empty(n_full + (len(rows) % bucket > 0), dtype=BUCKET_DTYPE)
+    if n_full:
+        full = rows[:n_full * bucket].reshape(n_full, bucket, 4)
+        out['t0'][:n_full] = full[:, 0, 0]
+        out['t1'][:n_full] = full[:, -1, 0]
+        out['count'][:n_full] = bucket
+        out['min'][:n_full] = full[:, :, 1:].min(axis=1)
+        out['max'][:n_full] = full[:, :, 1:].max(axis=1)
+        out['mean'][:n_full] = full[:, :, 1:].mean(axis=1)
+    if len(out) > n_full:
+        rest = rows[n_full * bucket:]
+        out[-1] = (rest[0, 0], rest[-1, 0], len(rest), rest[:, 1:].min(axis=0), rest[:, 1:].max(axis=0),
+                   rest[:, 1:].mean(axis=0))
+    return out
+
+
+def _merge_pairs(level):
+    """Niveau suivant: fusion des paquets deux à deux (un paquet final isolé est recopié)"""
+    even, odd = level[0::2], level[1::2]
+    out = even.copy()
+    k = len(odd)
+    out['t1'][:k] = odd['t1']
+    out['count'][:k] = even['count'][:k] + odd['count']
+    out['min'][:k] = np.minimum(even['min'][:k], odd['min'])
+    out['max'][:k] = np.maximum(even['max'][:k], odd['max'])
+    weights = (even['count'][:k] / out['count'][:k])[:, None]
+    out['mean'][:k] = weights * even['mean'][:k] + (1.0 - weights) * odd['mean']
+    return out
+
+
+def build_pyramid(file_path, out_path=None):
+    """
+    Construit la pyramide d'une trajectoire en une lecture par blocs.
+
+    Args:
+        file_path (str): Fichier "t X Y Z" du solveur, trajectoire .ltz ou entrée d'archive
+        out_path (str): Fichier .lod (par défaut: à côté de la source)
+
+    Returns:
+        str: Chemin du fichier écrit
+    """
+    out_path = out_path or pyramid_path(file_path)
+    bucket = 1 << MIN_LEVEL
+    signature = _source_signature(file_path)
+    base = []
+    carry = np.empty((0, 4))
+    n_rows = 0
+    tmp_path = out_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        for chunk in iter_chunks(file_path, BUILD_CHUNK_ROWS):
+            raw = np.empty(len(chunk), dtype=RAW_DTYPE)
+            raw['t'] = chunk[:, 0]
+            raw['xyz'] = chunk[:, 1:4]
+            f.write(raw.tobytes())
+            n_rows += len(chunk)
+
+            # Seuls les paquets complets sont formés; le reste attend le bloc suivant
+            rows = np.vstack([carry, chunk[:, :4]])
+            n_full = len(rows) - len(rows) % bucket
+            if n_full:
+                base.append(_base_buckets(rows[:n_full], bucket))
+            carry = rows[n_full:]
+        if len(carry):
+            base.append(_base_buckets(carry, bucket))
+
+        levels = [np.concatenate(base) if base else np.empty(0, dtype=BUCKET_DTYPE)]
+        while len(levels[-1]) > TOP_BUCKETS:
+            levels.append(_merge_pairs(levels[-1]))
+
+        level_info = []
+        for k, level in enumerate(levels):
+            level_info.append({'level': MIN_LEVEL + k, 'offset': f.tell(), 'n': len(level)})
+            f.write(level.tobytes())
+        header = json.dumps({'source': str(file_path), 'source_size': signature['size'],
+                             'source_mtime': signature['mtime'], 'n_rows': n_rows,
+                             'raw_offset': len(MAGIC), 'levels': level_info}).encode()
+        f.write(header + struct.pack('<I', len(header)) + END_MAGIC)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class LODPyramid:
+    """
+    Lecture d'une pyramide par projection mémoire.
+
+    Args:
+        path (str): Fichier .lod
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(4) != MAGIC:
+                raise ValueError(f"{path}: format de pyramide inconnu")
+            f.seek(-8, os.SEEK_END)
+            header_len = struct.unpack('<I', f.read(4))[0]
+            if f.read(4) != END_MAGIC:
+                raise ValueError(f"{path}: en-tête absent (fichier tronqué ?)")
+            f.seek(-8 - header_len, os.SEEK_END)
+            header = json.loads(f.read(header_len))
+        self.source = header['source']
+        self.source_size = header['source_size']
+        self.source_mtime = header['source_mtime']
+        self.n_rows = header['n_rows']
+        self.raw = (np.memmap(path, dtype=RAW_DTYPE, mode='r', offset=header['raw_offset'], shape=(self.n_rows,))
+                    if self.n_rows else np.empty(0, dtype=RAW_DTYPE))
+        self.levels = {}
+        for info in header['levels']:
+            if info['n']:
+                self.levels[info['level']] = np.memmap(path, dtype=BUCKET_DTYPE, mode='r',
+                                                       offset=info['offset'], shape=(info['n'],))
+
+    @property
+    def t_span(self):
+        """Intervalle de temps couvert"""
+        if not self.n_rows:
+            return (np.nan, np.nan)
+        return float(self.raw['t'][0]), float(self.raw['t'][-1])
+
+    def is_stale(self, file_path=None):
+        """Indique si la source a changé depuis la construction"""
+        try:
+            signature = _source_signature(file_path or self.source)
+        except OSError:
+            return True
+        return signature['size'] != self.source_size or signature['mtime'] != self.source_mtime
+
+    def raw_bounds(self, t_range):
+        """
+        Indices [i0, i1) des points bruts dans la fenêtre, localisés par le niveau
+        le plus fin (seuls deux paquets de points bruts sont lus).
+        """
+        base = self.levels.get(MIN_LEVEL)
+        if base is None:
+            return 0, 0
+        bucket = 1 << MIN_LEVEL
+        bounds = []
+        for t, side in ((t_range[0], 'left'), (t_range[1], 'right')):
+            b = min(int(np.searchsorted(base['t1'], t, side='left')), len(base) - 1)
+            lo = b * bucket
+            window = self.raw['t'][lo:lo + bucket]
+            bounds.append(lo + int(np.searchsorted(window, t, side=side)))
+        return bounds[0], bounds[1]
+
+    def fetch(self, t_range=None, max_points=2000):
+        """
+        Données à afficher pour une fenêtre, au niveau le plus fin qui tient en max_points.
+
+        Args:
+            t_range (tuple): Fenêtre en temps (t0, t1), toute la trajectoire si None
+            max_points (int): Nombre de points (ou paquets) affichables, par ex. la largeur en pixels
+
+        Returns:
+            tuple: (niveau, données) ; niveau 0: tableau (n, 4) [t, X, Y, Z] des points bruts,
+                   niveau k: paquets de 2^k points (BUCKET_DTYPE)
+        """
+        if t_range is None:
+            t_range = self.t_span
+        i0, i1 = self.raw_bounds(t_range)
+        n_raw = i1 - i0
+        if n_raw <= max_points or not self.levels:
+            raw = np.array(self.raw[i0:i1])
+            return 0, np.column_stack([raw['t'], raw['xyz'].astype(float)])
+
+        level = min(max(MIN_LEVEL, int(np.ceil(np.log2(n_raw / max_points)))), max(self.levels))
+        buckets = self.levels[level]
+        first = int(np.searchsorted(buckets['t1'], t_range[0], side='left'))
+        last = int(np.searchsorted(buckets['t0'], t_range[1], side='right'))
+        return level, np.array(buckets[first:last])
+
+
+def ensure_pyramid(file_path):
+    """
+    Pyramide d'une trajectoire, construite (ou reconstruite si la source a changé) au besoin.
+
+    Args:
+        file_path (str): Trajectoire source
+
+    Returns:
+        LODPyramid: Pyramide prête à être interrogée
+    """
+    path = pyramid_path(file_path)
+    if os.path.exists(path):
+        try:
+            pyramid = LODPyramid(path)
+            if not pyramid.is_stale(file_path):
+                return pyramid
+        except ValueError:
+            pass
+    start = time.time()
+    build_pyramid(file_path, path)
+    print(f"Pyramide construite: {path} ({time.time() - start:.2f} s)")
+    return LODPyramid(path)
+
+
+def parse_command_line():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Level-of-detail pyramids for long trajectories')
+    subparsers = parser.add_subparsers(dest='command', help='Command to execute')
+
+    build_parser = subparsers.add_parser('build', help='Build the .lod pyramid next to each trajectory')
+    build_parser.add_argument('files', nargs='+', help='Trajectory files (.dat, .ltz or archive.h5::name)')
+    build_parser.add_argument('--force', action='store_true', help='Rebuild even if the pyramid is up to date')
+
+    info_parser = subparsers.add_parser('info', help='Show the levels of a pyramid')
+    info_parser.add_argument('file', help='.lod file')
+
+    fetch_parser = subparsers.add_parser('fetch', help='Time a view query (level selection and read)')
+    fetch_parser.add_argument('file', help='Trajectory file (pyramid built if needed)')
+    fetch_parser.add_argument('--t-range', type=float, nargs=2, metavar=('T0', 'T1'), help='Time window')
+    fetch_parser.add_argument('--max-points', type=int, default=2000, help='Displayable points')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_command_line()
+
+    if args.command == 'build':
+        for file_path in args.files:
+            if args.force or not os.path.exists(pyramid_path(file_path)):
+                start = time.time()
+                out_path = build_pyramid(file_path)
+                print(f"{file_path} -> {out_path} ({time.time() - start:.2f} s)")
+            else:
+                ensure_pyramid(file_path)
+    elif args.command == 'info':
+        pyramid = LODPyramid(args.file)
+        print(f"Fichier: {args.file} ({os.path.getsize(args.file) / 1e6:.2f} Mo)")
+        print(f"Source: {pyramid.source}{' (modifiée depuis)' if pyramid.is_stale() else ''}")
+        print(f"Points: {pyramid.n_rows}, t = [{pyramid.t_span[0]:.6f}, {pyramid.t_span[1]:.6f}]")
+        for level, buckets in pyramid.levels.items():
+            print(f"  niveau {level:2d}: paquets de {1 << level:>8d} points, {len(buckets):>9d} paquets")
+    elif args.command == 'fetch':
+        pyramid = ensure_pyramid(args.file)
+        start = time.perf_counter()
+        level, data = pyramid.fetch(args.t_range, args.max_points)
+        elapsed = time.perf_counter() - start
+        print(f"Niveau {level} ({'points bruts' if level == 0 else f'paquets de {1 << level} points'}): "
+              f"{len(data)} éléments lus en {1e3 * elapsed:.2f} ms")
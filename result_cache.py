@@ -0,0 +1,308 @@
+"""
+Magasin de résultats adressé par contenu.
+
+Chaque résultat de simulation est identifié par un hash de ses paramètres
+complets (méthode, R, tau, h, h_coarse, tf, u0, version du solveur et, pour
+Parareal, disposition MPI et options). Les fichiers sont rangés sous
+<root>/<clé>.dat et décrits dans <root>/index.json (paramètres, taille,
+dernier accès).
+
+Le magasin conserve aussi les tableaux déjà analysés par plotter.py
+(<root>/parsed/<clé>.npy), indexés par chemin, taille et date du fichier
+source, pour éviter de relire les gros fichiers texte.
+
+L'éviction supprime les entrées les moins récemment utilisées (LRU) tant que
+la taille totale ou le nombre d'entrées dépasse les limites fixées.
+
+Plusieurs processus (analyses lancées en parallèle par pipeline.py) peuvent
+partager le magasin: chaque lecture-modification-écriture de l'index se fait
+sous un verrou fcntl sur <root>/index.lock, et l'index est écrit dans un
+fichier temporaire propre à l'écrivain puis renommé. Une consultation ne
+réécrit pas l'index: les dates d'accès sont enregistrées à la prochaine
+écriture du même processus.
+
+Usage:
+    python result_cache.py list [--root output/runs]
+    python result_cache.py evict --max-mb 500 [--max-entries 200]
+    python result_cache.py clear
+"""
+import argparse
+import atexit
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_ROOT = 'output/runs'
+
+# Paramètres qui identifient un résultat
+KEY_FIELDS = ('method', 'R', 'tau', 'h', 'h_coarse', 'tf', 'u0', 'version')
+
+
+def result_key(params, extra_fields=()):
+    """
+    Calcule la clé d'un résultat à partir de ses paramètres.
+
+    Args:
+        params (dict): Paramètres de l'exécution (au moins KEY_FIELDS)
+        extra_fields (tuple): Champs supplémentaires qui modifient le résultat
+                              (par exemple np, threads, options pour Parareal)
+
+    Returns:
+        str: Clé hexadécimale de 12 caractères
+    """
+    key_data = {k: params.get(k) for k in KEY_FIELDS + tuple(extra_fields)}
+    return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode()).hexdigest()[:12]
+
+
+class ResultStore:
+    """
+    Magasin de résultats avec index persistant et éviction LRU.
+
+    Args:
+        root (str): Dossier du magasin
+        max_bytes (int): Taille totale maximale (None = illimitée)
+        max_entries (int): Nombre maximal d'entrées (None = illimité)
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, max_bytes=None, max_entries=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.index_file = os.path.join(root, 'index.json')
+        self.lock_file = os.path.join(root, 'index.lock')
+        self.lock = threading.Lock()
+        # Dates d'accès des consultations, reportées dans l'index à la prochaine écriture
+        self.pending_access = {}
+        os.makedirs(root, exist_ok=True)
+        self.index = self._load_index()
+        atexit.register(self.flush_access)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Verrou exclusif sur l'index, entre threads et entre processus"""
+        with self.lock, open(self.lock_file, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _load_index(self):
+        if not os.path.exists(self.index_file):
+            return {}
+        try:
+            with open(self.index_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Index corrompu: on repart d'un index vide, les fichiers seront réenregistrés
+            return {}
+
+    def _save_index(self):
+        # Appelé sous _locked(), après avoir relu l'index
+        for key, last_access in self.pending_access.items():
+            if key in self.index:
+                self.index[key]['last_access'] = max(self.index[key]['last_access'], last_access)
+        self.pending_access = {}
+        fd, tmp_file = tempfile.mkstemp(dir=self.root, prefix='index.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.index, f, indent=1, sort_keys=True)
+            os.replace(tmp_file, self.index_file)
+        except BaseException:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
+
+    def flush_access(self):
+        """Reporte dans l'index les dates d'accès des consultations en attente"""
+        if not self.pending_access:
+            return
+        with self._locked():
+            self.index = self._load_index()
+            self._save_index()
+
+    def path_for(self, key, suffix='.dat'):
+        """Chemin d'un fichier de l'entrée key"""
+        return os.path.join(self.root, key + suffix)
+
+    def lookup(self, key):
+        """
+        Cherche une entrée. La date d'accès est mise à jour en mémoire et
+        enregistrée à la prochaine écriture de l'index (voir flush_access).
+
+        Returns:
+            dict: Entrée de l'index, ou None si absente ou si un fichier manque
+        """
+        self.index = self._load_index()
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        if not all(os.path.exists(p) for p in entry['files']):
+            with self._locked():
+                self.index = self._load_index()
+                entry = self.index.get(key)
+                if entry is not None and not all(os.path.exists(p) for p in entry['files']):
+                    del self.index[key]
+                    self._save_index()
+            return None
+        now = time.time()
+        entry['last_access'] = now
+        with self.lock:
+            self.pending_access[key] = now
+        return entry
+
+    def register(self, key, params, files, kind='result'):
+        """
+        Enregistre (ou met à jour) une entrée après un calcul.
+
+        Args:
+            key (str): Clé du résultat
+            params (dict): Paramètres de l'exécution
+            files (list): Fichiers produits
+            kind (str): 'result' (simulation) ou 'parsed' (tableau analysé)
+        """
+        files = [p for p in files if os.path.exists(p)]
+        now = time.time()
+        with self._locked():
+            # Relire l'index: d'autres processus (analyses parallèles) ont pu l'enrichir
+            self.index = self._load_index()
+            self.index[key] = {
+                'kind': kind,
+                'params': params,
+                'files': files,
+                'size': sum(os.path.getsize(p) for p in files),
+                'created': now,
+                'last_access': now,
+            }
+            self._save_index()
+
+    def remove(self, key):
+        """Supprime une entrée et ses fichiers"""
+        with self._locked():
+            self.index = self._load_index()
+            if self._remove_entry(key):
+                self._save_index()
+
+    def _remove_entry(self, key):
+        # Appelé sous _locked(): retire l'entrée de self.index et supprime ses fichiers
+        entry = self.index.pop(key, None)
+        if entry is None:
+            return False
+        for path in entry['files']:
+            if os.path.exists(path):
+                os.remove(path)
+        return True
+
+    def total_size(self):
+        """Taille totale des entrées indexées (octets)"""
+        return sum(e['size'] for e in self.index.values())
+
+    def evict(self, max_bytes=None, max_entries=None, keep=()):
+        """
+        Supprime les entrées les moins récemment utilisées jusqu'à respecter les limites.
+
+        Args:
+            max_bytes (int): Taille maximale (défaut: limite du magasin)
+            max_entries (int): Nombre maximal d'entrées (défaut: limite du magasin)
+            keep (iterable): Clés à ne pas supprimer (par exemple celles du lot en cours)
+
+        Returns:
+            list: Clés supprimées
+        """
+        max_bytes = max_bytes if max_bytes is not None else self.max_bytes
+        max_entries = max_entries if max_entries is not None else self.max_entries
+        keep = set(keep)
+        removed = []
+        if max_bytes is None and max_entries is None:
+            self.flush_access()
+            return removed
+        with self._locked():
+            self.index = self._load_index()
+            for key, last_access in self.pending_access.items():
+                if key in self.index:
+                    self.index[key]['last_access'] = max(self.index[key]['last_access'], last_access)
+            candidates = sorted((k for k in self.index if k not in keep),
+                                key=lambda k: self.index[k]['last_access'])
+            for key in candidates:
+                too_big = max_bytes is not None and self.total_size() > max_bytes
+                too_many = max_entries is not None and len(self.index) > max_entries
+                if not (too_big or too_many):
+                    break
+                self._remove_entry(key)
+                removed.append(key)
+            if removed or self.pending_access:
+                self._save_index()
+        return removed
+
+    def load_parsed(self, file_path, parser):
+        """
+        Retourne le tableau analysé d'un fichier de données, depuis le cache .npy
+        si le fichier n'a pas changé, sinon en l'analysant avec parser.
+
+        Args:
+            file_path (str): Fichier de données texte
+            parser (callable): Fonction file_path -> numpy.ndarray
+
+        Returns:
+            numpy.ndarray: Données du fichier
+        """
+        stat = os.stat(file_path)
+        source = {'path': os.path.abspath(file_path), 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+        key = 'parsed/' + hashlib.sha256(json.dumps(source, sort_keys=True).encode()).hexdigest()[:16]
+        npy_file = self.path_for(key, '.npy')
+
+        if self.lookup(key) is not None:
+            return np.load(npy_file)
+
+        data = parser(file_path)
+        os.makedirs(os.path.dirname(npy_file), exist_ok=True)
+        np.save(npy_file, data)
+        self.register(key, source, [npy_file], kind='parsed')
+        self.evict()
+        return data
+
+
+def parse_command_line():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Inspect and trim the content-addressed result store')
+    parser.add_argument('--root', default=DEFAULT_ROOT, help='Store directory')
+    subparsers = parser.add_subparsers(dest='command', help='Command to execute')
+
+    subparsers.add_parser('list', help='List store entries, most recently used first')
+
+    evict_parser = subparsers.add_parser('evict', help='Evict least recently used entries')
+    evict_parser.add_argument('--max-mb', type=float, help='Maximum store size in MB')
+    evict_parser.add_argument('--max-entries', type=int, help='Maximum number of entries')
+
+    subparsers.add_parser('clear', help='Remove every entry')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_command_line()
+    store = ResultStore(args.root)
+
+    if args.command == 'evict':
+        max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None
+        removed = store.evict(max_bytes, args.max_entries)
+        print(f"{len(removed)} entrées supprimées, {store.total_size() / 1e6:.1f} Mo restants")
+    elif args.command == 'clear':
+        for key in list(store.index):
+            store.remove(key)
+        print("Magasin vidé.")
+    else:
+        entries = sorted(store.index.items(), key=lambda kv: -kv[1]['last_access'])
+        print(f"{'Clé':<24} {'Type':<7} {'Méthode':<9} {'tau':>6} {'Taille (Mo)':>12}  Dernier accès")
+        for key, entry in entries:
+            params = entry['params']
+            print(f"{key:<24} {entry['kind']:<7} {str(params.get('method', '-')):<9} "
+                  f"{str(params.get('tau', '-')):>6} {entry['size'] / 1e6:>12.2f}  "
+                  f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['last_access']))}")
+        print(f"{len(entries)} entrées, {store.total_size() / 1e6:.1f} Mo")
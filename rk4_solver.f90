@@ -1,10 +1,13 @@
 ! filepath: /home/yanel/PA/Lorenz-RK4/rk4_solver.f90
 module rk4_solver
     use derivatives
+    use param, only: write_run_header
+    use profiler
+    use stream_output, only: stream_write
     implicit none
     
     private
-    public :: solve_rk4, solve_rk4_interval
+    public :: solve_rk4, solve_rk4_interval, solve_rk4_trajectory, solve_rk4_and_average_x
     
 contains
 
@@ -54,11 +57,14 @@ contains
         if (save_output) then
             filename = output_file
             open(newunit=unit_num, file=trim(filename), status='replace')
+            call write_run_header(unit_num, 'rk4', R, tau, h, 0.0, tf, u0)
             write(unit_num, '(a)') "t X Y Z"
             write(unit_num, '(f10.6, 3f12.6)') t, u(1), u(2), u(3)
         end if
+        call stream_write(t, u, 0)
         
-        ! Intégration RK4
+        ! Intégration RK4 (les écritures sont imputées à la phase 'output')
+        call prof_start(PROF_FINE)
         do i = 1, n_steps
             ! Calcul des coefficients k1, k2, k3, k4
             call compute_derivatives(u, R, safe_tau, k1)
@@ -83,12 +89,16 @@ contains
             end if
             
             t = t + h
+            call stream_write(t, u, 0)
             
             ! Écriture des résultats si nécessaire
             if (save_output) then
+                call prof_start(PROF_OUTPUT)
                 write(unit_num, '(f10.6, 3f12.6)') t, u(1), u(2), u(3)
+                call prof_stop(PROF_OUTPUT)
             end if
         end do
+        call prof_stop(PROF_FINE)
         
         ! Fermeture du fichier de sortie
         if (save_output) then
@@ -145,5 +155,111 @@ contains
         
         u_final = u
     end function solve_rk4_interval
+    
+    subroutine solve_rk4_trajectory(R, tau, t0, h, u0, n_steps, traj)
+        ! Même intégration que solve_rk4, mais la trajectoire est rangée en mémoire
+        ! (utilisée par les liaisons Python, sans fichier intermédiaire)
+        !
+        ! Arguments:
+        !   R, tau      : Paramètres du système
+        !   t0, h       : Temps initial et pas de temps
+        !   u0(3)       : Condition initiale [X0, Y0, Z0]
+        !   n_steps     : Nombre de pas
+        !   traj        : Résultat - lignes [t, X, Y, Z] des points 0..n_steps
+        
+        real, intent(in) :: R, tau, t0, h
+        real, dimension(3), intent(in) :: u0
+        integer, intent(in) :: n_steps
+        real, dimension(4, 0:n_steps), intent(out) :: traj
+        
+        real :: t, safe_tau
+        integer :: i
+        real, dimension(3) :: u, k1, k2, k3, k4
+        
+        u = u0
+        t = t0
+        safe_tau = tau
+        if (abs(safe_tau) < 1.0E-10) safe_tau = 0.01
+        traj(:, 0) = [t, u]
+        
+        do i = 1, n_steps
+            call compute_derivatives(u, R, safe_tau, k1)
+            call compute_derivatives(u + 0.5*h*k1, R, safe_tau, k2)
+            call compute_derivatives(u + 0.5*h*k2, R, safe_tau, k3)
+            call compute_derivatives(u + h*k3, R, safe_tau, k4)
+            u = u + (h/6.0) * (k1 + 2.0*k2 + 2.0*k3 + k4)
+            
+            ! Même reprise que solve_rk4 en cas d'instabilité (sans message)
+            if (any(isnan(u)) .or. any(abs(u) > 1.0E6)) u = u0
+            
+            t = t + h
+            traj(:, i) = [t, u]
+        end do
+    end subroutine solve_rk4_trajectory
+    
+    subroutine solve_rk4_and_average_x(R, tau, t0, tf, t_transient, h, u0, avg_x, final_u, error_flag)
+        ! Intègre avec RK4 et renvoie la moyenne de X après le transitoire
+        ! (même calcul que Refine/rk4_solver.f90, pour les balayages en R)
+        !
+        ! Arguments:
+        !   R, tau      : Paramètres du système
+        !   t0, tf      : Intervalle de temps
+        !   t_transient : Début de la moyenne
+        !   h           : Pas de temps
+        !   u0(3)       : Condition initiale [X0, Y0, Z0]
+        !   avg_x       : Résultat - moyenne de X pour t > t_transient (huge() si instable)
+        !   final_u(3)  : Résultat - état final
+        !   error_flag  : Résultat - 0 si OK, 1 si instabilité
+        
+        real, intent(in) :: R, tau, t0, tf, t_transient, h
+        real, dimension(3), intent(in) :: u0
+        real, intent(out) :: avg_x
+        real, dimension(3), intent(out) :: final_u
+        integer, intent(out) :: error_flag
+        
+        real :: t, safe_tau, sum_x
+        integer :: i, n_steps, n_avg_steps
+        real, dimension(3) :: u, k1, k2, k3, k4
+        logical :: averaging
+        
+        u = u0
+        t = t0
+        n_steps = nint((tf - t0) / h)
+        sum_x = 0.0
+        n_avg_steps = 0
+        error_flag = 0
+        safe_tau = tau
+        if (abs(safe_tau) < 1.0E-10) safe_tau = 0.01
+        
+        do i = 1, n_steps
+            call compute_derivatives(u, R, safe_tau, k1)
+            call compute_derivatives(u + 0.5*h*k1, R, safe_tau, k2)
+            call compute_derivatives(u + 0.5*h*k2, R, safe_tau, k3)
+            call compute_derivatives(u + h*k3, R, safe_tau, k4)
+            
+            ! La moyenne porte sur les états en fin de pas, à partir du pas qui part de t_transient
+            averaging = (t >= t_transient)
+            u = u + (h/6.0) * (k1 + 2.0*k2 + 2.0*k3 + k4)
+            t = t + h
+            if (averaging) then
+                sum_x = sum_x + u(1)
+                n_avg_steps = n_avg_steps + 1
+            end if
+            
+            if (any(isnan(u)) .or. any(abs(u) > 1.0E7)) then
+                error_flag = 1
+                avg_x = huge(1.0)
+                final_u = u
+                return
+            end if
+        end do
+        
+        if (n_avg_steps > 0) then
+            avg_x = sum_x / real(n_avg_steps)
+        else
+            avg_x = 0.0
+        end if
+        final_u = u
+    end subroutine solve_rk4_and_average_x
 
 end module rk4_solver
\ No newline at end of file
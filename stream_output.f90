@@ -0,0 +1,117 @@
+module stream_output
+    ! Diffusion en direct des états calculés (--stream=chemin) vers `plotter.py live`
+    !
+    ! Chaque enregistrement binaire fait 20 octets: t, X, Y, Z (réels simple
+    ! précision) puis le numéro d'itération Parareal (entier 32 bits, 0 pour les
+    ! points de trajectoire). Le chemin est normalement un tube nommé créé par le
+    ! lecteur: l'ouverture attend que celui-ci soit prêt, et un lecteur trop lent
+    ! ralentit le solveur une fois le tampon du tube plein, sans accumulation de
+    ! mémoire. Si le lecteur disparaît, la diffusion s'arrête et le calcul continue.
+    use iso_c_binding, only: c_int, c_funptr, c_intptr_t
+    implicit none
+
+    private
+    public :: stream_open, stream_write, stream_write_states, stream_flush, stream_close
+
+    logical, public, protected :: stream_active = .false.
+
+    ! Nombre d'enregistrements entre deux vidages du tampon (latence de l'affichage)
+    integer, parameter :: FLUSH_EVERY = 256
+
+    integer :: stream_unit = -1
+    integer :: n_pending = 0
+
+    ! signal(SIGPIPE, SIG_IGN): une écriture vers un tube fermé renvoie une erreur
+    ! au lieu de terminer le processus
+    integer(c_int), parameter :: SIGPIPE = 13
+    integer(c_intptr_t), parameter :: SIG_IGN = 1
+    interface
+        function c_signal(signum, handler) result(previous) bind(C, name='signal')
+            import :: c_int, c_funptr
+            integer(c_int), value :: signum
+            type(c_funptr), value :: handler
+            type(c_funptr) :: previous
+        end function c_signal
+    end interface
+
+contains
+
+    subroutine stream_open(path)
+        ! Ouvre le tube (ou fichier) de diffusion; bloque jusqu'à l'arrivée d'un lecteur
+        character(len=*), intent(in) :: path
+        integer :: ios
+        logical :: exists
+        type(c_funptr) :: previous
+
+        previous = c_signal(SIGPIPE, transfer(SIG_IGN, previous))
+        inquire(file=trim(path), exist=exists)
+        open(newunit=stream_unit, file=trim(path), access='stream', form='unformatted', action='write', &
+             status=merge('old', 'new', exists), iostat=ios)
+        if (ios /= 0) then
+            print '(a,a)', " WARNING: diffusion impossible vers ", trim(path)
+            return
+        end if
+        stream_active = .true.
+        n_pending = 0
+        print '(a,a)', " Diffusion des états vers: ", trim(path)
+    end subroutine stream_open
+
+    subroutine stream_write(t, u, iteration)
+        ! Ajoute un enregistrement (t, u, itération)
+        real, intent(in) :: t
+        real, dimension(3), intent(in) :: u
+        integer, intent(in) :: iteration
+        integer :: ios
+
+        if (.not. stream_active) return
+        write(stream_unit, iostat=ios) t, u, iteration
+        if (ios /= 0) then
+            call stream_lost()
+            return
+        end if
+        n_pending = n_pending + 1
+        if (n_pending >= FLUSH_EVERY) call stream_flush()
+    end subroutine stream_write
+
+    subroutine stream_write_states(times, states, iteration)
+        ! Diffuse les états aux bornes des tranches d'une itération Parareal
+        real, dimension(0:), intent(in) :: times
+        real, dimension(:,0:), intent(in) :: states
+        integer, intent(in) :: iteration
+        integer :: n
+
+        if (.not. stream_active) return
+        do n = 0, ubound(times, 1)
+            call stream_write(times(n), states(:, n), iteration)
+        end do
+        call stream_flush()
+    end subroutine stream_write_states
+
+    subroutine stream_flush()
+        ! Transmet immédiatement les enregistrements en attente
+        integer :: ios
+
+        if (.not. stream_active) return
+        flush(stream_unit, iostat=ios)
+        if (ios /= 0) call stream_lost()
+        n_pending = 0
+    end subroutine stream_flush
+
+    subroutine stream_close()
+        ! Ferme la diffusion (le lecteur reçoit la fin de flux)
+        if (.not. stream_active) return
+        call stream_flush()
+        if (stream_active) close(stream_unit)
+        stream_active = .false.
+    end subroutine stream_close
+
+    subroutine stream_lost()
+        ! Le lecteur a fermé le tube: la diffusion s'arrête, pas le calcul
+        integer :: ios
+
+        print *, "WARNING: lecteur de la diffusion déconnecté, diffusion arrêtée"
+        close(stream_unit, iostat=ios)
+        stream_active = .false.
+    end subroutine stream_lost
+
+end module stream_output
@@ -0,0 +1,308 @@
+"""
+Format compressé de trajectoires (.ltz) avec accès direct par fenêtre de temps.
+
+Les fichiers texte du solveur ('(f10.6, 3f12.6)') occupent environ 46 octets
+par point. Ce format les stocke par blocs indépendants:
+  - valeurs quantifiées au pas QUANTUM = 1e-6 (la précision des fichiers
+    texte: la conversion est sans perte par rapport à eux);
+  - différences secondes le long du temps (trajectoire lisse, pas constant:
+    ce sont de petits entiers), stockées dans le plus petit type entier
+    suffisant pour chaque colonne du bloc;
+  - compression zlib rapide de chaque bloc.
+Un index en fin de fichier donne, pour chaque bloc, sa position et son
+intervalle de temps [t_premier, t_dernier]: une lecture par fenêtre ne
+décompresse que les blocs qui la recouvrent.
+
+Structure du fichier:
+    MAGIC, longueur (uint32) et en-tête JSON (paramètres du solveur, quantum,
+    taille des blocs), blocs, index (tableau INDEX_DTYPE),
+    position de l'index (uint64), nombre de blocs (uint32), INDEX_MAGIC
+
+Usage:
+    python trajectory_codec.py encode output/rk4_tau5.0.dat [...] [--block-rows 8192]
+    python trajectory_codec.py decode output/rk4_tau5.0.ltz [--t-range 10 20] [-o sortie.dat]
+    python trajectory_codec.py info output/rk4_tau5.0.ltz
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import zlib
+
+import numpy as np
+
+from attractor_stats import iter_chunks
+from pipeline import read_header
+
+MAGIC = b'LTZ1'
+INDEX_MAGIC = b'LTZI'
+EXTENSION = '.ltz'
+QUANTUM = 1e-6
+# Division par un entier exact: q / SCALE redonne le même double que la lecture du texte
+SCALE = 10 ** 6
+DEFAULT_BLOCK_ROWS = 8192
+ZLIB_LEVEL = 6
+
+INDEX_DTYPE = np.dtype([('offset', '<u8'), ('length', '<u4'), ('n_rows', '<u4'),
+                        ('t_first', '<f8'), ('t_last', '<f8')])
+INT_TYPES = (np.int8, np.int16, np.int32, np.int64)
+# Quantification limitée aux valeurs représentables sans perte dans un int64 (et un double)
+MAX_ABS_VALUE = 2.0 ** 53 * QUANTUM
+
+
+def is_codec_file(file_path):
+    """Indique si file_path est une trajectoire compressée (.ltz)"""
+    return str(file_path).endswith(EXTENSION)
+
+
+def encode_block(data):
+    """
+    Encode un bloc de données (n, 4) [t, X, Y, Z].
+
+    Returns:
+        bytes: Bloc encodé (en-tête des premières valeurs, types, données zlib)
+    """
+    if np.any(np.abs(data) > MAX_ABS_VALUE):
+        raise ValueError(f"Valeur hors de la plage représentable (|v| > {MAX_ABS_VALUE:.3g})")
+    q = np.rint(data * SCALE).astype(np.int64)
+    n = len(q)
+    first = q[0]
+    first_delta = q[1] - q[0] if n > 1 else np.zeros(4, dtype=np.int64)
+    second = np.diff(q, n=2, axis=0) if n > 2 else np.zeros((0, 4), dtype=np.int64)
+
+    codes = bytearray()
+    payload = []
+    for j in range(4):
+        column = second[:, j]
+        peak = int(np.abs(column).max()) if len(column) else 0
+        code = next(k for k, t in enumerate(INT_TYPES) if peak <= np.iinfo(t).max)
+        codes.append(code)
+        payload.append(column.astype(INT_TYPES[code]).tobytes())
+    header = struct.pack('<I', n) + first.astype('<i8').tobytes() + first_delta.astype('<i8').tobytes() + bytes(codes)
+    return header + zlib.compress(b''.join(payload), ZLIB_LEVEL)
+
+
+def decode_block(raw):
+    """
+    Décode un bloc produit par encode_block.
+
+    Returns:
+        numpy.ndarray: Données (n, 4) [t, X, Y, Z]
+    """
+    n = struct.unpack_from('<I', raw, 0)[0]
+    first = np.frombuffer(raw, '<i8', 4, 4)
+    first_delta = np.frombuffer(raw, '<i8', 4, 36)
+    codes = raw[68:72]
+    payload = zlib.decompress(raw[72:])
+
+    q = np.empty((n, 4), dtype=np.int64)
+    q[0] = first
+    offset = 0
+    for j in range(4):
+        dtype = np.dtype(INT_TYPES[codes[j]])
+        count = max(n - 2, 0)
+        second = np.frombuffer(payload, dtype, count, offset).astype(np.int64)
+        offset += count * dtype.itemsize
+        if n > 1:
+            # Intégration des différences secondes: deltas puis valeurs
+            deltas = np.concatenate([[first_delta[j]], second]).cumsum()
+            q[1:, j] = first[j] + deltas.cumsum()
+    return q / SCALE
+
+
+class TrajectoryWriter:
+    """
+    Écrit une trajectoire compressée bloc par bloc.
+
+    Args:
+        path (str): Fichier .ltz
+        params (dict): Paramètres d'exécution (en-tête du solveur)
+        block_rows (int): Nombre de lignes par bloc
+    """
+
+    def __init__(self, path, params=None, block_rows=DEFAULT_BLOCK_ROWS):
+        self.path = path
+        self.block_rows = block_rows
+        self.index = []
+        self.pending = np.empty((0, 4))
+        self.file = open(path, 'wb')
+        header = json.dumps({'params': params or {}, 'quantum': QUANTUM, 'block_rows': block_rows,
+                             'columns': ['t', 'X', 'Y', 'Z']}).encode()
+        self.file.write(MAGIC + struct.pack('<I', len(header)) + header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _flush_block(self, block):
+        raw = encode_block(block)
+        self.index.append((self.file.tell(), len(raw), len(block), block[0, 0], block[-1, 0]))
+        self.file.write(raw)
+
+    def write(self, data):
+        """Ajoute des lignes (n, 4); les blocs complets sont encodés au fil de l'eau"""
+        self.pending = np.vstack([self.pending, np.asarray(data, dtype=float)[:, :4]])
+        while len(self.pending) >= self.block_rows:
+            self._flush_block(self.pending[:self.block_rows])
+            self.pending = self.pending[self.block_rows:]
+
+    def close(self):
+        """Encode le dernier bloc, écrit l'index et ferme le fichier"""
+        if self.file is None:
+            return
+        if len(self.pending):
+            self._flush_block(self.pending)
+        index_offset = self.file.tell()
+        self.file.write(np.array(self.index, dtype=INDEX_DTYPE).tobytes())
+        self.file.write(struct.pack('<QI', index_offset, len(self.index)) + INDEX_MAGIC)
+        self.file.close()
+        self.file = None
+
+
+class TrajectoryReader:
+    """
+    Lecture directe d'une trajectoire compressée.
+
+    Args:
+        path (str): Fichier .ltz
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(4) != MAGIC:
+                raise ValueError(f"{path}: format de trajectoire compressée inconnu")
+            header_len = struct.unpack('<I', f.read(4))[0]
+            header = json.loads(f.read(header_len))
+            f.seek(-16, os.SEEK_END)
+            index_offset, n_blocks = struct.unpack('<QI', f.read(12))
+            if f.read(4) != INDEX_MAGIC:
+                raise ValueError(f"{path}: index absent (fichier tronqué ?)")
+            f.seek(index_offset)
+            self.index = np.frombuffer(f.read(n_blocks * INDEX_DTYPE.itemsize), INDEX_DTYPE)
+        self.params = header['params']
+        self.block_rows = header['block_rows']
+
+    @property
+    def n_rows(self):
+        """Nombre total de lignes"""
+        return int(self.index['n_rows'].sum())
+
+    @property
+    def t_span(self):
+        """Intervalle de temps couvert"""
+        if len(self.index) == 0:
+            return (np.nan, np.nan)
+        return float(self.index['t_first'][0]), float(self.index['t_last'][-1])
+
+    def blocks_for(self, t_range=None):
+        """Indices des blocs recouvrant la fenêtre t_range (tous si None)"""
+        if t_range is None:
+            return np.arange(len(self.index))
+        # t croissant: recherche dichotomique dans l'index
+        first = np.searchsorted(self.index['t_last'], t_range[0], side='left')
+        last = np.searchsorted(self.index['t_first'], t_range[1], side='right')
+        return np.arange(first, last)
+
+    def iter_blocks(self, t_range=None):
+        """Décode les blocs recouvrant la fenêtre, un par un"""
+        with open(self.path, 'rb') as f:
+            for b in self.blocks_for(t_range):
+                f.seek(int(self.index['offset'][b]))
+                yield decode_block(f.read(int(self.index['length'][b])))
+
+    def read(self, t_range=None):
+        """
+        Args:
+            t_range (tuple): Fenêtre en temps (t0, t1), toute la trajectoire si None
+
+        Returns:
+            numpy.ndarray: Données [t, X, Y, Z]
+        """
+        blocks = list(self.iter_blocks(t_range))
+        data = np.vstack(blocks) if blocks else np.empty((0, 4))
+        if t_range is not None:
+            # Tolérance d'un demi-quantum: les temps sont arrondis au pas QUANTUM
+            mask = (data[:, 0] >= t_range[0] - QUANTUM / 2) & (data[:, 0] <= t_range[1] + QUANTUM / 2)
+            data = data[mask]
+        return data
+
+
+def encode_file(file_path, out_path=None, block_rows=DEFAULT_BLOCK_ROWS):
+    """
+    Convertit un fichier texte du solveur en trajectoire compressée.
+
+    Args:
+        file_path (str): Fichier "t X Y Z" avec en-tête de paramètres
+        out_path (str): Fichier .ltz (par défaut: même nom, extension .ltz)
+        block_rows (int): Nombre de lignes par bloc
+
+    Returns:
+        str: Chemin du fichier écrit
+    """
+    out_path = out_path or os.path.splitext(file_path)[0] + EXTENSION
+    with TrajectoryWriter(out_path, read_header(file_path), block_rows) as writer:
+        for chunk in iter_chunks(file_path, block_rows * 8):
+            writer.write(chunk)
+    return out_path
+
+
+def read_trajectory(file_path, t_range=None):
+    """Lit une trajectoire compressée (toute ou une fenêtre en temps)"""
+    return TrajectoryReader(file_path).read(t_range)
+
+
+def parse_command_line():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Compressed trajectory storage with time-indexed blocks')
+    subparsers = parser.add_subparsers(dest='command', help='Command to execute')
+
+    encode_parser = subparsers.add_parser('encode', help='Convert solver text outputs to .ltz')
+    encode_parser.add_argument('files', nargs='+', help='Text output files')
+    encode_parser.add_argument('--block-rows', type=int, default=DEFAULT_BLOCK_ROWS, help='Rows per block')
+    encode_parser.add_argument('--remove', action='store_true', help='Remove the text file after a verified conversion')
+
+    decode_parser = subparsers.add_parser('decode', help='Print (a window of) a .ltz file as text')
+    decode_parser.add_argument('file', help='.ltz file')
+    decode_parser.add_argument('--t-range', type=float, nargs=2, metavar=('T0', 'T1'), help='Time window')
+    decode_parser.add_argument('-o', '--output', type=str, help='Output text file (default: stdout)')
+
+    info_parser = subparsers.add_parser('info', help='Show header and block index summary')
+    info_parser.add_argument('file', help='.ltz file')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_command_line()
+
+    if args.command == 'encode':
+        for file_path in args.files:
+            out_path = encode_file(file_path, block_rows=args.block_rows)
+            size_in, size_out = os.path.getsize(file_path), os.path.getsize(out_path)
+            n_rows = TrajectoryReader(out_path).n_rows
+            print(f"{file_path} -> {out_path}: {size_in / 1e6:.2f} Mo -> {size_out / 1e6:.2f} Mo "
+                  f"(x{size_in / max(size_out, 1):.1f}, {size_out / max(n_rows, 1):.2f} octets/point)")
+            if args.remove:
+                if np.array_equal(np.vstack(list(iter_chunks(file_path))), read_trajectory(out_path)):
+                    # Conversion sans perte vérifiée
+                    os.remove(file_path)
+                else:
+                    print(f"  Conversion non vérifiée: {file_path} conservé")
+    elif args.command == 'decode':
+        reader = TrajectoryReader(args.file)
+        out = open(args.output, 'w') if args.output else sys.stdout
+        out.write('# ' + ' '.join(f"{k}={v}" for k, v in reader.params.items()) + '\n')
+        out.write("t X Y Z\n")
+        np.savetxt(out, reader.read(args.t_range), fmt=['%10.6f', '%12.6f', '%12.6f', '%12.6f'], delimiter='')
+        if args.output:
+            out.close()
+    elif args.command == 'info':
+        reader = TrajectoryReader(args.file)
+        print(f"Fichier: {args.file} ({os.path.getsize(args.file) / 1e6:.2f} Mo)")
+        print(f"Paramètres: {reader.params}")
+        print(f"Points: {reader.n_rows}, t = [{reader.t_span[0]:.6f}, {reader.t_span[1]:.6f}]")
+        print(f"Blocs: {len(reader.index)} de {reader.block_rows} lignes, "
+              f"{reader.index['length'].mean() / max(reader.block_rows, 1):.2f} octets/point en moyenne")